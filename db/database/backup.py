@@ -0,0 +1,213 @@
+"""
+Online Database Backup
+
+Copies the live database with SQLite's incremental backup API, a
+configurable number of pages per step with a sleep between steps, so
+readers and writers are never starved while a nightly backup runs.
+Progress and throughput are reported as the copy proceeds; finished
+backups can be gzip-compressed in a streaming fashion and old backups
+rotated out.
+"""
+
+import gzip
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+
+class OnlineBackup:
+    """
+    Throttled, non-blocking backup of a SQLite database file.
+
+    The source is opened through its own read-only connection. In WAL mode
+    a read transaction is held for the whole copy, so every step reads the
+    same snapshot: concurrent loads keep writing to the WAL and the backup
+    never restarts because of them.
+    """
+
+    def __init__(self, database_path: str, pages_per_step: int = 1024, sleep_seconds: float = 0.05,
+                 logger=None, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 progress_interval_percent: float = 10.0):
+        """
+        Initialize online backup.
+
+        Args:
+            database_path: Path to the live SQLite database
+            pages_per_step: Pages copied per backup step (-1 copies everything in one step)
+            sleep_seconds: Pause between steps, releasing the source for other connections
+            logger: Optional DatabaseLogger instance
+            progress_callback: Called with a progress dict after each step
+            progress_interval_percent: Minimum progress between logged progress events
+        """
+        self.database_path = Path(database_path)
+        self.pages_per_step = pages_per_step
+        self.sleep_seconds = sleep_seconds
+        self.logger = logger
+        self.progress_callback = progress_callback
+        self.progress_interval_percent = progress_interval_percent
+
+    def run(self, backup_path: str, compress: bool = False, verify: bool = True) -> Dict[str, Any]:
+        """
+        Copy the database to ``backup_path``.
+
+        Args:
+            backup_path: Destination file for the backup
+            compress: Gzip the finished backup (``backup_path`` + '.gz') and remove the raw copy
+            verify: Run ``PRAGMA quick_check`` on the finished copy
+
+        Returns:
+            Backup statistics (pages, steps, duration, throughput, sizes, final path)
+        """
+        if not self.database_path.exists():
+            raise FileNotFoundError(f"Database file not found: {self.database_path}")
+
+        backup_file = Path(backup_path)
+        backup_file.parent.mkdir(parents=True, exist_ok=True)
+        partial_file = backup_file.with_name(backup_file.name + '.partial')
+        if partial_file.exists():
+            partial_file.unlink()
+
+        source = sqlite3.connect(f"file:{self.database_path.as_posix()}?mode=ro", uri=True)
+        target = sqlite3.connect(str(partial_file))
+        progress_state = {'steps': 0, 'last_logged_percent': -self.progress_interval_percent}
+        start_time = time.time()
+
+        try:
+            page_size = source.execute("PRAGMA page_size").fetchone()[0]
+            journal_mode = source.execute("PRAGMA journal_mode").fetchone()[0]
+
+            if journal_mode.lower() == 'wal':
+                # Pin one snapshot for the whole copy
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+            def on_progress(status, remaining, total):
+                progress_state['steps'] += 1
+                self._report_progress(progress_state, remaining, total, page_size, start_time)
+
+            source.backup(target, pages=self.pages_per_step, progress=on_progress, sleep=self.sleep_seconds)
+
+            if source.in_transaction:
+                source.rollback()
+
+            if verify:
+                check_result = target.execute("PRAGMA quick_check").fetchone()[0]
+                if check_result != 'ok':
+                    raise sqlite3.DatabaseError(f"Backup integrity check failed: {check_result}")
+        except Exception:
+            target.close()
+            source.close()
+            if partial_file.exists():
+                partial_file.unlink()
+            raise
+
+        target.close()
+        source.close()
+        partial_file.replace(backup_file)
+
+        duration = time.time() - start_time
+        size_bytes = backup_file.stat().st_size
+        stats = {
+            'backup_path': str(backup_file),
+            'pages_total': size_bytes // page_size,
+            'page_size': page_size,
+            'pages_per_step': self.pages_per_step,
+            'steps': progress_state['steps'],
+            'duration_seconds': duration,
+            'size_mb': size_bytes / 1024 / 1024,
+            'throughput_mb_per_second': (size_bytes / 1024 / 1024) / duration if duration > 0 else 0.0,
+            'compressed': False
+        }
+
+        if compress:
+            compressed_file = self.compress_file(backup_file)
+            stats['backup_path'] = str(compressed_file)
+            stats['compressed'] = True
+            stats['compressed_size_mb'] = compressed_file.stat().st_size / 1024 / 1024
+
+        self._log_event("Online backup completed", stats)
+        return stats
+
+    @staticmethod
+    def compress_file(file_path: Path, chunk_size: int = 1024 * 1024) -> Path:
+        """
+        Gzip a file chunk by chunk and remove the original.
+
+        Args:
+            file_path: File to compress
+            chunk_size: Bytes read per chunk (memory use stays constant)
+
+        Returns:
+            Path of the compressed file
+        """
+        file_path = Path(file_path)
+        compressed_path = file_path.with_name(file_path.name + '.gz')
+        with open(file_path, 'rb') as source_file, gzip.open(compressed_path, 'wb') as target_file:
+            shutil.copyfileobj(source_file, target_file, length=chunk_size)
+        file_path.unlink()
+        return compressed_path
+
+    @staticmethod
+    def rotate_backups(backup_dir: str, pattern: str, keep: int) -> List[Path]:
+        """
+        Delete all but the newest ``keep`` backups matching ``pattern``.
+
+        Args:
+            backup_dir: Directory holding backups
+            pattern: Glob pattern identifying backups (e.g. 'trading_analytics_backup_*')
+            keep: Number of most recent backups to keep (0 or less keeps everything)
+
+        Returns:
+            Paths that were deleted
+        """
+        if keep <= 0:
+            return []
+        backups = sorted(
+            (path for path in Path(backup_dir).glob(pattern) if path.is_file() and not path.name.endswith('.partial')),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        removed = []
+        for old_backup in backups[keep:]:
+            old_backup.unlink()
+            removed.append(old_backup)
+        return removed
+
+    @staticmethod
+    def default_backup_path(backup_dir: str = "backups", prefix: str = "trading_analytics_backup") -> str:
+        """Return a timestamped backup path in ``backup_dir``."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return str(Path(backup_dir) / f"{prefix}_{timestamp}.db")
+
+    def _report_progress(self, progress_state: Dict[str, Any], remaining: int, total: int,
+                         page_size: int, start_time: float):
+        """Report progress and throughput after a backup step"""
+        copied = total - remaining
+        elapsed = time.time() - start_time
+        percent = (copied / total * 100) if total else 100.0
+        progress = {
+            'pages_copied': copied,
+            'pages_total': total,
+            'percent_complete': percent,
+            'steps': progress_state['steps'],
+            'elapsed_seconds': elapsed,
+            'throughput_mb_per_second': (copied * page_size / 1024 / 1024) / elapsed if elapsed > 0 else 0.0
+        }
+
+        if self.progress_callback is not None:
+            self.progress_callback(progress)
+
+        if percent - progress_state['last_logged_percent'] >= self.progress_interval_percent or remaining == 0:
+            progress_state['last_logged_percent'] = percent
+            self._log_event("Online backup progress", progress)
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log backup event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("online_backup", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,156 @@
+"""
+Row-Hash Change Detection
+
+Lets a loader write only the rows a reload actually changes. Each stored
+row carries a 64-bit hash of its content (``row_hash``); a reload hashes
+its rows in pandas, reads the stored hashes for the dates it touches (or
+the whole table, for a full refresh) by key, and keeps only rows that are
+new or whose hash differs. A full refresh also returns the stored keys
+missing from the reload, so it can delete those instead of clearing the
+table.
+
+- Hashes come from ``pd.util.hash_pandas_object`` over the content columns,
+  stored as the signed 64-bit integers SQLite holds natively.
+- Stored rows without a hash (written before the column existed) count as
+  changed, so they are rewritten once and carry a hash from then on.
+- Classification reads through the table's own name, so compacted tables
+  (views) and sharded tables (union views) are compared the same way.
+"""
+
+import sqlite3
+from typing import Dict, Any, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from db.database.staging import quote_identifier
+
+
+ROW_HASH_COLUMN = 'row_hash'
+
+# Dates per stored-hash query, well below SQLite's host parameter limit
+_DATE_CHUNK_SIZE = 500
+
+
+def row_hashes(df: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """
+    Hash each row's content columns.
+
+    Args:
+        df: Rows to hash
+        columns: Content columns (the hash ignores the index)
+
+    Returns:
+        Signed 64-bit hash per row
+    """
+    return pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy().view(np.int64)
+
+
+class ChangeDetector:
+    """
+    Adds the row hash column and splits a reload into new, changed and unchanged rows.
+
+    ``ensure_column`` alters the table; callers commit. ``classify`` only reads.
+    """
+
+    def __init__(self, logger=None):
+        """
+        Initialize change detector.
+
+        Args:
+            logger: Optional DatabaseLogger instance
+        """
+        self.logger = logger
+
+    def has_column(self, conn: sqlite3.Connection, table_name: str) -> bool:
+        """Check whether a table (or its view) exposes the row hash column."""
+        return any(row[1] == ROW_HASH_COLUMN for row in conn.execute(
+            f"PRAGMA table_info({quote_identifier(table_name)})"
+        ))
+
+    def ensure_column(self, conn: sqlite3.Connection, table_name: str) -> bool:
+        """
+        Add the row hash column to a main-database table if it is missing.
+
+        Args:
+            conn: Database connection
+            table_name: Table to extend
+
+        Returns:
+            True if the column was added by this call
+        """
+        columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({quote_identifier(table_name)})")]
+        if not columns or ROW_HASH_COLUMN in columns:
+            return False
+        conn.execute(f"ALTER TABLE main.{quote_identifier(table_name)} ADD COLUMN {ROW_HASH_COLUMN} INTEGER")
+        self._log_event("Row hash column added", {'table_name': table_name})
+        return True
+
+    def classify(self, conn: sqlite3.Connection, table_name: str, df: pd.DataFrame,
+                 key_columns: Sequence[str], date_column: str = 'Date',
+                 whole_table: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, int]]:
+        """
+        Compare hashed rows with the stored rows by key.
+
+        Args:
+            conn: Database connection
+            table_name: Table the rows will be written to
+            df: Rows to write, including the row hash column
+            key_columns: Unique key of the table (must include ``date_column``)
+            date_column: Column used to read only the touched dates
+            whole_table: Compare with every stored row (full refresh) and report
+                         stored keys missing from ``df``
+
+        Returns:
+            (rows to write, stored keys to delete, counts of inserted / updated /
+            unchanged / deleted rows)
+        """
+        key_columns = list(key_columns)
+        dates = None if whole_table else df[date_column].dropna().unique()
+        stored = self._stored_hashes(conn, table_name, key_columns, date_column, dates)
+        compared = df[key_columns].merge(stored, on=key_columns, how='left', indicator=True)
+        is_new = (compared['_merge'] == 'left_only').to_numpy()
+        is_unchanged = (compared[f'{ROW_HASH_COLUMN}_stored'].to_numpy() == df[ROW_HASH_COLUMN].to_numpy()) & ~is_new
+
+        removed = stored.iloc[0:0][key_columns]
+        if whole_table:
+            removed = stored[key_columns].merge(
+                df[key_columns].drop_duplicates(), on=key_columns, how='left', indicator=True
+            )
+            removed = removed.loc[removed['_merge'] == 'left_only', key_columns].reset_index(drop=True)
+
+        counts = {
+            'inserted': int(is_new.sum()),
+            'updated': int((~is_new & ~is_unchanged).sum()),
+            'unchanged': int(is_unchanged.sum()),
+            'deleted': len(removed)
+        }
+        self._log_event("Rows compared by hash", {'table_name': table_name, **counts})
+        return df[~is_unchanged].reset_index(drop=True), removed, counts
+
+    def _stored_hashes(self, conn: sqlite3.Connection, table_name: str, key_columns: Sequence[str],
+                       date_column: str, dates=None) -> pd.DataFrame:
+        """Stored keys and hashes for the given dates (every row when ``dates`` is None)"""
+        select_sql = ", ".join(quote_identifier(column) for column in key_columns)
+        columns = list(key_columns) + [f'{ROW_HASH_COLUMN}_stored']
+        rows: List[tuple] = []
+        if dates is None:
+            rows.extend(conn.execute(f"SELECT {select_sql}, {ROW_HASH_COLUMN} FROM {quote_identifier(table_name)}"))
+            dates = []
+        for start in range(0, len(dates), _DATE_CHUNK_SIZE):
+            chunk = [str(date) for date in dates[start:start + _DATE_CHUNK_SIZE]]
+            rows.extend(conn.execute(
+                f"SELECT {select_sql}, {ROW_HASH_COLUMN} FROM {quote_identifier(table_name)} "
+                f"WHERE {quote_identifier(date_column)} IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ))
+        # Object dtype keeps 64-bit hashes exact when NULL hashes would otherwise make the column float
+        return pd.DataFrame(rows, columns=columns, dtype=object)
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log change detection event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("change_detection", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,672 @@
+"""
+Integer-Keyed Compact Storage
+
+Moves the historical fact tables to a compact layout: CUSIPs, source files
+and load batches live once in small dimension tables, and each fact row
+stores integer ids and a Julian-day integer date under a composite primary
+key in a ``WITHOUT ROWID`` table. A view with the original table name and
+column names (plus ``INSTEAD OF`` triggers) keeps every existing reader and
+row-wise writer working, while set-based loads merge into the fact table
+directly.
+"""
+
+import re
+import sqlite3
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from db.database.staging import quote_identifier
+
+
+DIMENSION_TABLES = {
+    'dim_security': """
+        CREATE TABLE IF NOT EXISTS dim_security (
+            security_id INTEGER PRIMARY KEY,
+            cusip_standardized TEXT NOT NULL UNIQUE
+        )
+    """,
+    'dim_cusip': """
+        CREATE TABLE IF NOT EXISTS dim_cusip (
+            cusip_id INTEGER PRIMARY KEY,
+            cusip TEXT NOT NULL UNIQUE
+        )
+    """,
+    'dim_source_file': """
+        CREATE TABLE IF NOT EXISTS dim_source_file (
+            source_file_id INTEGER PRIMARY KEY,
+            source_file TEXT NOT NULL UNIQUE
+        )
+    """,
+    'dim_load_batch': """
+        CREATE TABLE IF NOT EXISTS dim_load_batch (
+            load_batch_id INTEGER PRIMARY KEY,
+            source_file_id INTEGER NOT NULL REFERENCES dim_source_file(source_file_id),
+            loaded_timestamp TEXT NOT NULL,
+            UNIQUE (source_file_id, loaded_timestamp)
+        )
+    """,
+    'compact_storage_columns': """
+        CREATE TABLE IF NOT EXISTS compact_storage_columns (
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            declared_type TEXT,
+            not_null INTEGER NOT NULL DEFAULT 0,
+            default_value TEXT,
+            date_format TEXT,
+            PRIMARY KEY (table_name, column_name)
+        ) WITHOUT ROWID
+    """
+}
+
+# Column kinds that together form a fact row's primary key
+KEY_KINDS = ('date_key', 'security', 'cusip', 'key')
+
+# Stored in place of a NULL extra key column (e.g. a runs row without a
+# Dealer), which the primary key cannot hold; the view renders it as NULL
+NULL_KEY = ''
+
+_INDEX_TABLE_PATTERN = re.compile(r'\bON\s+"?(\w+)"?\s*\(', re.IGNORECASE)
+
+DATE_FORMAT = '%Y-%m-%d'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def julian_day_sql(expression: str) -> str:
+    """SQL converting a date string to its integer Julian day number."""
+    return f"CAST(julianday({expression}) + 0.5 AS INTEGER)"
+
+
+def render_date_sql(expression: str, date_format: str) -> str:
+    """SQL rendering a Julian day number back to the text the loaders write."""
+    return f"strftime('{date_format}', {expression} - 0.5)"
+
+
+class CompactStorage:
+    """
+    Migrates, writes and describes integer-keyed compact fact tables.
+
+    Methods issue plain DDL/DML on the given connection and never commit,
+    so callers run them inside their own write transaction.
+    """
+
+    # Compactable table -> extra primary key columns beyond date and CUSIPs
+    COMPACT_TABLES = {
+        'universe_historical': (),
+        'portfolio_historical': (),
+        'combined_runs_historical': ('Dealer',)
+    }
+
+    def __init__(self, logger=None):
+        """
+        Initialize compact storage.
+
+        Args:
+            logger: Optional DatabaseLogger instance
+        """
+        self.logger = logger
+
+    @staticmethod
+    def fact_table(table_name: str) -> str:
+        """Return the fact table name backing a compacted table."""
+        return f"{table_name}_facts"
+
+    def ensure_dimensions(self, conn: sqlite3.Connection):
+        """Create the dimension and metadata tables if they are missing."""
+        for table_sql in DIMENSION_TABLES.values():
+            conn.execute(table_sql)
+
+    def is_compact(self, conn: sqlite3.Connection, table_name: str) -> bool:
+        """Check whether a table has been moved to compact storage."""
+        if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'compact_storage_columns'"
+        ).fetchone() is None:
+            return False
+        return conn.execute(
+            "SELECT 1 FROM compact_storage_columns WHERE table_name = ? LIMIT 1", (table_name,)
+        ).fetchone() is not None
+
+    def storage_table(self, conn: sqlite3.Connection, table_name: str) -> str:
+        """Return the table that physically holds a table's rows."""
+        return self.fact_table(table_name) if self.is_compact(conn, table_name) else table_name
+
+    def migrate(self, conn: sqlite3.Connection, table_name: str, allow_collapse: bool = False) -> Dict[str, Any]:
+        """
+        Move a row table to compact storage behind a same-named view.
+
+        Dates keep their text format (``YYYY-MM-DD`` or midnight
+        ``YYYY-MM-DD HH:MM:SS``, whichever the column holds); any other time
+        of day is dropped. The surrogate ``id`` column is not carried over.
+        Rows that would share a fact key (e.g. two times of day on one date)
+        abort the migration unless ``allow_collapse`` is set, in which case
+        one row per key is kept. NULL extra key columns are stored as
+        ``NULL_KEY`` and read back as NULL. Rows without a date, CUSIP or
+        standardized CUSIP cannot be keyed and abort the migration.
+
+        Args:
+            conn: Connection holding the caller's write transaction
+            table_name: One of COMPACT_TABLES
+            allow_collapse: Keep one row per fact key instead of aborting on duplicates
+
+        Returns:
+            Dictionary with rows_migrated, rows_collapsed, null_key_rows and the dimension sizes
+
+        Raises:
+            ValueError: If the table cannot be compacted, has unkeyable rows or
+                        (without allow_collapse) rows sharing a key
+        """
+        if table_name not in self.COMPACT_TABLES:
+            raise ValueError(f"Table {table_name} does not support compact storage")
+        if self.is_compact(conn, table_name):
+            raise ValueError(f"Table {table_name} is already in compact storage")
+
+        table_columns = conn.execute(f"PRAGMA table_info({quote_identifier(table_name)})").fetchall()
+        names = {column[1].lower() for column in table_columns}
+        missing = {'date', 'cusip', 'cusip_standardized'} - names
+        if missing:
+            raise ValueError(f"Table {table_name} is missing key columns: {sorted(missing)}")
+
+        unkeyed_rows = self._unkeyed_rows(conn, table_name, table_columns)
+        if unkeyed_rows:
+            raise ValueError(
+                f"Table {table_name} has {unkeyed_rows} rows with a NULL or unparseable date, or a NULL "
+                f"CUSIP or cusip_standardized, which compact storage cannot key; fix or delete them first"
+            )
+
+        extra_keys = {column.lower() for column in self.COMPACT_TABLES[table_name]}
+        rows_collapsed, null_key_rows = self._key_collisions(conn, table_name, table_columns, extra_keys)
+        if rows_collapsed and not allow_collapse:
+            raise ValueError(
+                f"Table {table_name} has {rows_collapsed} rows sharing a compact key (date, CUSIPs and "
+                f"key columns) with another row; migrate with allow_collapse to keep one row per key"
+            )
+
+        self.ensure_dimensions(conn)
+        for position, name, declared_type, not_null, default_value, is_pk in table_columns:
+            kind = self._classify_column(name, declared_type, is_pk, extra_keys)
+            if kind is None:
+                continue
+            date_format = None
+            if kind in ('date_key', 'date'):
+                # Loaders write datetimes as 'YYYY-MM-DD HH:MM:SS'; keep whichever form is stored
+                longest = conn.execute(
+                    f"SELECT MAX(length({quote_identifier(name)})) FROM {quote_identifier(table_name)}"
+                ).fetchone()[0]
+                date_format = DATE_FORMAT if longest is not None and longest <= 10 else DATETIME_FORMAT
+            conn.execute("""
+                INSERT INTO compact_storage_columns
+                    (table_name, column_name, position, kind, declared_type, not_null, default_value,
+                     date_format)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (table_name, name, position, kind, declared_type, not_null, default_value, date_format))
+
+        columns = self._columns(conn, table_name)
+        fact_table = self.fact_table(table_name)
+        conn.execute(self._fact_table_sql(table_name, columns))
+        # Expression index matching the view's rendered date, so date filters stay index searches
+        date_format = next(column['date_format'] for column in columns if column['kind'] == 'date_key')
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS {quote_identifier(f'idx_{fact_table}_date')}
+            ON {quote_identifier(fact_table)} ({render_date_sql('date_jd', date_format)}, security_id)
+        """)
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS {quote_identifier(f'idx_{fact_table}_security')}
+            ON {quote_identifier(fact_table)} (security_id, date_jd)
+        """)
+
+        source_columns = [column['name'] for column in columns]
+        rows_migrated = self._write_rows(
+            conn, table_name, columns, f"main.{quote_identifier(table_name)}",
+            source_columns, verb="INSERT OR REPLACE"
+        )
+
+        conn.execute(f"DROP TABLE main.{quote_identifier(table_name)}")
+        for statement in self._view_sql(table_name, columns):
+            conn.execute(statement)
+
+        dimension_sizes = {
+            dimension: conn.execute(f"SELECT COUNT(*) FROM {dimension}").fetchone()[0]
+            for dimension in ('dim_security', 'dim_cusip', 'dim_source_file', 'dim_load_batch')
+        }
+        self._log_event("Table moved to compact storage", {
+            'table_name': table_name,
+            'rows_migrated': rows_migrated,
+            'rows_collapsed': rows_collapsed,
+            'null_key_rows': null_key_rows,
+            **dimension_sizes
+        })
+        return {'rows_migrated': rows_migrated, 'rows_collapsed': rows_collapsed,
+                'null_key_rows': null_key_rows, **dimension_sizes}
+
+    def merge(self, staging, target_table: str, staged_table: str, columns: Sequence[str],
+              select_expressions: Optional[Sequence[str]] = None,
+              conflict_columns: Optional[Sequence[str]] = None,
+              update_columns: Optional[Sequence[str]] = None,
+              where_sql: Optional[str] = None, params: tuple = (),
+              or_replace: bool = False) -> int:
+        """
+        Merge staged rows into a compacted table (same contract as StagingArea.merge).
+
+        Conflicts are resolved on the fact table's primary key, which covers
+        the original table's unique key.
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        conn = staging.connection
+        if select_expressions is None:
+            select_expressions = [f"s.{quote_identifier(col)}" for col in columns]
+        if len(select_expressions) != len(columns):
+            raise ValueError("select_expressions must match columns one-to-one")
+
+        table_columns = self._columns(conn, target_table)
+        provided = list(columns)
+        select_sql = [f"{expr} AS {quote_identifier(col)}" for col, expr in zip(columns, select_expressions)]
+        lowered = {col.lower() for col in columns}
+        # One timestamp per merge, so every row lands in the same load batch
+        if 'loaded_timestamp' not in lowered:
+            select_sql.append("CURRENT_TIMESTAMP AS loaded_timestamp")
+            provided.append('loaded_timestamp')
+
+        rows_table = staging.qualified('compact_merge_rows')
+        conn.execute(f"DROP TABLE IF EXISTS {rows_table}")
+        staging.execute(
+            f"CREATE TABLE {rows_table} AS SELECT {', '.join(select_sql)} "
+            f"FROM {staging.qualified(staged_table)} AS s WHERE {where_sql or 'true'}",
+            params
+        )
+
+        if or_replace:
+            verb, conflict = "INSERT OR REPLACE", None
+        elif conflict_columns:
+            verb = "INSERT"
+            if update_columns is None:
+                update_columns = list(columns)
+            conflict = self._update_targets(table_columns, update_columns)
+        else:
+            verb, conflict = "INSERT", None
+
+        try:
+            rows_merged = self._write_rows(conn, target_table, table_columns, rows_table,
+                                           provided, verb=verb, conflict_updates=conflict)
+        finally:
+            conn.execute(f"DROP TABLE IF EXISTS {rows_table}")
+
+        self._log_event("Staged rows merged into compact storage", {
+            'target_table': target_table,
+            'staging_table': staged_table,
+            'rows_merged': rows_merged
+        })
+        return rows_merged
+
+    def filter_schema_validation(self, conn: sqlite3.Connection, validation_results: Dict[str, Any],
+                                 index_definitions: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Drop compacted tables (now views) and their row-table indexes from validation findings.
+
+        Args:
+            conn: Database connection
+            validation_results: Result of DatabaseSchema.validate_schema
+            index_definitions: DatabaseSchema.indexes (index name -> CREATE INDEX SQL)
+
+        Returns:
+            Validation results with schema_valid recomputed
+        """
+        compacted = {table for table in self.COMPACT_TABLES if self.is_compact(conn, table)}
+        if not compacted:
+            return validation_results
+
+        def indexed_table(index_name):
+            match = _INDEX_TABLE_PATTERN.search(index_definitions.get(index_name, ''))
+            return match.group(1) if match else None
+
+        adjusted = dict(validation_results)
+        adjusted['missing_tables'] = [
+            table for table in validation_results.get('missing_tables', []) if table not in compacted
+        ]
+        adjusted['missing_indexes'] = [
+            index for index in validation_results.get('missing_indexes', [])
+            if indexed_table(index) not in compacted
+        ]
+        adjusted['schema_valid'] = not (
+            adjusted['missing_tables'] or adjusted.get('missing_views') or adjusted['missing_indexes']
+        )
+        return adjusted
+
+    def _columns(self, conn: sqlite3.Connection, table_name: str) -> List[Dict[str, Any]]:
+        """Read a compacted table's column layout in original order"""
+        return [
+            {
+                'name': row[0], 'kind': row[1], 'declared_type': row[2] or '',
+                'not_null': bool(row[3]), 'default_value': row[4], 'date_format': row[5]
+            }
+            for row in conn.execute("""
+                SELECT column_name, kind, declared_type, not_null, default_value, date_format
+                FROM compact_storage_columns WHERE table_name = ? ORDER BY position
+            """, (table_name,))
+        ]
+
+    @staticmethod
+    def _unkeyed_rows(conn: sqlite3.Connection, table_name: str, table_columns: List[tuple]) -> int:
+        """Count rows whose date, CUSIP or standardized CUSIP cannot go into the fact key"""
+        names = {column[1].lower(): quote_identifier(column[1]) for column in table_columns}
+        return conn.execute(
+            f"SELECT COUNT(*) FROM main.{quote_identifier(table_name)} "
+            f"WHERE {julian_day_sql(names['date'])} IS NULL "
+            f"OR {names['cusip']} IS NULL OR {names['cusip_standardized']} IS NULL"
+        ).fetchone()[0]
+
+    @staticmethod
+    def _key_collisions(conn: sqlite3.Connection, table_name: str, table_columns: List[tuple],
+                        extra_keys) -> Tuple[int, int]:
+        """Count rows that would share a fact key with another row, and rows with a NULL extra key"""
+        names = {column[1].lower(): quote_identifier(column[1]) for column in table_columns}
+        extra = [names[key] for key in sorted(extra_keys) if key in names]
+        key_sql = ", ".join(
+            [julian_day_sql(names['date']), names['cusip_standardized'], names['cusip']]
+            + [f"COALESCE({name}, '{NULL_KEY}')" for name in extra]
+        )
+        table = f"main.{quote_identifier(table_name)}"
+        rows_collapsed = conn.execute(
+            f"SELECT COALESCE(SUM(key_rows - 1), 0) FROM "
+            f"(SELECT COUNT(*) AS key_rows FROM {table} GROUP BY {key_sql} HAVING COUNT(*) > 1)"
+        ).fetchone()[0]
+        null_key_rows = 0
+        if extra:
+            null_key_rows = conn.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE {' OR '.join(f'{name} IS NULL' for name in extra)}"
+            ).fetchone()[0]
+        return rows_collapsed, null_key_rows
+
+    @staticmethod
+    def _classify_column(name: str, declared_type: str, is_pk: int, extra_keys) -> Optional[str]:
+        """Map an original column to its compact storage kind (None drops it)"""
+        lowered = name.lower()
+        declared_type = (declared_type or '').upper()
+        if is_pk and 'INT' in declared_type:
+            return None
+        if lowered == 'date':
+            return 'date_key'
+        if lowered == 'cusip':
+            return 'cusip'
+        if lowered == 'cusip_standardized':
+            return 'security'
+        if lowered == 'source_file':
+            return 'source_file'
+        if lowered == 'loaded_timestamp':
+            return 'loaded_timestamp'
+        if lowered in extra_keys:
+            return 'key'
+        if declared_type == 'DATE':
+            return 'date'
+        return 'value'
+
+    def _fact_table_sql(self, table_name: str, columns: List[Dict[str, Any]]) -> str:
+        """CREATE TABLE statement for a fact table"""
+        definitions = [
+            "date_jd INTEGER NOT NULL",
+            "security_id INTEGER NOT NULL REFERENCES dim_security(security_id)",
+            "cusip_id INTEGER NOT NULL REFERENCES dim_cusip(cusip_id)"
+        ]
+        key_columns = ["date_jd", "security_id", "cusip_id"]
+        has_batch = False
+        for column in columns:
+            kind = column['kind']
+            name = quote_identifier(column['name'])
+            if kind == 'key':
+                definitions.append(f"{name} {column['declared_type']} NOT NULL")
+                key_columns.append(name)
+            elif kind in ('source_file', 'loaded_timestamp'):
+                if not has_batch:
+                    definitions.append("load_batch_id INTEGER REFERENCES dim_load_batch(load_batch_id)")
+                    has_batch = True
+            elif kind in ('date', 'value'):
+                declared_type = 'INTEGER' if kind == 'date' else column['declared_type']
+                definition = f"{name} {declared_type}".rstrip()
+                if column['not_null']:
+                    definition += " NOT NULL"
+                if column['default_value'] is not None and kind == 'value':
+                    definition += f" DEFAULT {column['default_value']}"
+                definitions.append(definition)
+
+        return (
+            f"CREATE TABLE IF NOT EXISTS {quote_identifier(self.fact_table(table_name))} (\n    "
+            + ",\n    ".join(definitions)
+            + f",\n    PRIMARY KEY ({', '.join(key_columns)})\n) WITHOUT ROWID"
+        )
+
+    @staticmethod
+    def _update_targets(columns: List[Dict[str, Any]], update_columns: Sequence[str]) -> List[str]:
+        """Map updated original columns to fact table columns"""
+        kinds = {column['name'].lower(): column for column in columns}
+        targets = []
+        for name in update_columns:
+            column = kinds.get(name.lower())
+            if column is None or column['kind'] in KEY_KINDS:
+                continue
+            if column['kind'] in ('source_file', 'loaded_timestamp'):
+                target = 'load_batch_id'
+            else:
+                target = quote_identifier(column['name'])
+            if target not in targets:
+                targets.append(target)
+        return targets
+
+    def _write_rows(self, conn: sqlite3.Connection, table_name: str, columns: List[Dict[str, Any]],
+                    source_sql: str, provided: Sequence[str], verb: str = "INSERT",
+                    conflict_updates: Optional[List[str]] = None) -> int:
+        """Resolve dimension ids for a row source and write the fact rows"""
+        for statement in self._row_statements(table_name, columns, source_sql, provided, verb,
+                                              conflict_updates):
+            cursor = conn.execute(statement)
+        return cursor.rowcount
+
+    def _row_statements(self, table_name: str, columns: List[Dict[str, Any]], source_sql: str,
+                        provided: Sequence[str], verb: str = "INSERT",
+                        conflict_updates: Optional[List[str]] = None,
+                        schema_prefix: str = "main.") -> List[str]:
+        """
+        Statements that add missing dimension rows and then write fact rows.
+
+        ``source_sql`` is a table or subquery exposing original column names;
+        the last statement writes the facts (``schema_prefix`` is empty inside
+        triggers, which reject qualified names). Dimension inserts use NOT EXISTS
+        rather than a conflict clause so an outer OR REPLACE (inside triggers)
+        can never renumber existing ids.
+        """
+        by_kind = {column['kind']: quote_identifier(column['name']) for column in columns}
+        available = {name.lower() for name in provided}
+        by_name = {column['name'].lower(): column for column in columns}
+
+        def source(kind, default="NULL"):
+            column = next((c for c in columns if c['kind'] == kind), None)
+            if column is None or column['name'].lower() not in available:
+                return default
+            return f"r.{quote_identifier(column['name'])}"
+
+        source_file = f"COALESCE({source('source_file')}, '')"
+        loaded_timestamp = f"COALESCE({source('loaded_timestamp')}, CURRENT_TIMESTAMP)"
+        has_batch = 'source_file' in by_kind or 'loaded_timestamp' in by_kind
+
+        statements = [
+            f"""
+            INSERT INTO dim_security (cusip_standardized)
+            SELECT DISTINCT {source('security')} FROM {source_sql} AS r
+            WHERE {source('security')} IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM dim_security d WHERE d.cusip_standardized = {source('security')})
+            """,
+            f"""
+            INSERT INTO dim_cusip (cusip)
+            SELECT DISTINCT {source('cusip')} FROM {source_sql} AS r
+            WHERE {source('cusip')} IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM dim_cusip d WHERE d.cusip = {source('cusip')})
+            """
+        ]
+        if has_batch:
+            statements += [
+                f"""
+                INSERT INTO dim_source_file (source_file)
+                SELECT DISTINCT {source_file} FROM {source_sql} AS r
+                WHERE NOT EXISTS (SELECT 1 FROM dim_source_file d WHERE d.source_file = {source_file})
+                """,
+                f"""
+                INSERT INTO dim_load_batch (source_file_id, loaded_timestamp)
+                SELECT DISTINCT sf.source_file_id, {loaded_timestamp}
+                FROM {source_sql} AS r JOIN dim_source_file sf ON sf.source_file = {source_file}
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM dim_load_batch b
+                    WHERE b.source_file_id = sf.source_file_id AND b.loaded_timestamp = {loaded_timestamp})
+                """
+            ]
+
+        targets = ["date_jd", "security_id", "cusip_id"]
+        values = [
+            julian_day_sql(source('date_key')),
+            f"(SELECT security_id FROM dim_security WHERE cusip_standardized = {source('security')})",
+            f"(SELECT cusip_id FROM dim_cusip WHERE cusip = {source('cusip')})"
+        ]
+        if has_batch:
+            targets.append("load_batch_id")
+            values.append(f"""(
+                SELECT b.load_batch_id FROM dim_load_batch b
+                JOIN dim_source_file sf ON sf.source_file_id = b.source_file_id
+                WHERE sf.source_file = {source_file} AND b.loaded_timestamp = {loaded_timestamp})""")
+        for name in provided:
+            column = by_name.get(name.lower())
+            if column is None or column['kind'] not in ('key', 'date', 'value'):
+                continue
+            expression = f"r.{quote_identifier(column['name'])}"
+            if column['kind'] == 'date':
+                expression = julian_day_sql(expression)
+            elif column['kind'] == 'key':
+                expression = f"COALESCE({expression}, '{NULL_KEY}')"
+            targets.append(quote_identifier(column['name']))
+            values.append(expression)
+
+        key_sql = ", ".join(["date_jd", "security_id", "cusip_id"] + [
+            quote_identifier(column['name']) for column in columns if column['kind'] == 'key'
+        ])
+        fact_sql = (
+            f"{verb} INTO {schema_prefix}{quote_identifier(self.fact_table(table_name))} ({', '.join(targets)}) "
+            f"SELECT {', '.join(values)} FROM {source_sql} AS r WHERE true"
+        )
+        if conflict_updates is not None:
+            if conflict_updates:
+                set_sql = ", ".join(f"{target} = excluded.{target}" for target in conflict_updates)
+                fact_sql += f" ON CONFLICT ({key_sql}) DO UPDATE SET {set_sql}"
+            else:
+                fact_sql += f" ON CONFLICT ({key_sql}) DO NOTHING"
+        statements.append(fact_sql)
+        return statements
+
+    def _view_sql(self, table_name: str, columns: List[Dict[str, Any]]) -> List[str]:
+        """Compatibility view under the original name plus INSTEAD OF triggers"""
+        view = quote_identifier(table_name)
+        fact_table = quote_identifier(self.fact_table(table_name))
+
+        select_list = []
+        for column in columns:
+            name = quote_identifier(column['name'])
+            kind = column['kind']
+            if kind == 'date_key':
+                expression = render_date_sql("f.date_jd", column['date_format'])
+            elif kind == 'security':
+                expression = "s.cusip_standardized"
+            elif kind == 'cusip':
+                expression = "c.cusip"
+            elif kind == 'source_file':
+                expression = "NULLIF(sf.source_file, '')"
+            elif kind == 'loaded_timestamp':
+                expression = "b.loaded_timestamp"
+            elif kind == 'date':
+                expression = render_date_sql(f"f.{name}", column['date_format'])
+            elif kind == 'key':
+                expression = f"NULLIF(f.{name}, '{NULL_KEY}')"
+            else:
+                expression = f"f.{name}"
+            select_list.append(f"{expression} AS {name}")
+
+        joins = [
+            "LEFT JOIN dim_security s ON s.security_id = f.security_id",
+            "LEFT JOIN dim_cusip c ON c.cusip_id = f.cusip_id"
+        ]
+        if any(column['kind'] in ('source_file', 'loaded_timestamp') for column in columns):
+            joins += [
+                "LEFT JOIN dim_load_batch b ON b.load_batch_id = f.load_batch_id",
+                "LEFT JOIN dim_source_file sf ON sf.source_file_id = b.source_file_id"
+            ]
+        statements = [
+            f"CREATE VIEW {view} AS SELECT {', '.join(select_list)} "
+            f"FROM {fact_table} f {' '.join(joins)}"
+        ]
+
+        # Row-wise writers (executemany inserts, ad-hoc deletes and updates) go through triggers
+        new_values = []
+        for column in columns:
+            name = quote_identifier(column['name'])
+            if column['kind'] == 'value' and column['default_value'] is not None:
+                new_values.append(f"COALESCE(NEW.{name}, {column['default_value']}) AS {name}")
+            else:
+                new_values.append(f"NEW.{name} AS {name}")
+        new_row = f"(SELECT {', '.join(new_values)})"
+        insert_body = ";\n".join(self._row_statements(
+            table_name, columns, new_row, [column['name'] for column in columns], schema_prefix=""
+        ))
+
+        old_date = 'OLD.' + quote_identifier(self._kind_name(columns, 'date_key'))
+        old_security = 'OLD.' + quote_identifier(self._kind_name(columns, 'security'))
+        old_cusip = 'OLD.' + quote_identifier(self._kind_name(columns, 'cusip'))
+        old_key = [
+            f"date_jd = {julian_day_sql(old_date)}",
+            f"security_id = (SELECT security_id FROM dim_security WHERE cusip_standardized = {old_security})",
+            f"cusip_id = (SELECT cusip_id FROM dim_cusip WHERE cusip = {old_cusip})"
+        ] + [
+            f"{quote_identifier(column['name'])} = COALESCE(OLD.{quote_identifier(column['name'])}, '{NULL_KEY}')"
+            for column in columns if column['kind'] == 'key'
+        ]
+        key_sql = " AND ".join(old_key)
+
+        updates = []
+        for column in columns:
+            name = quote_identifier(column['name'])
+            if column['kind'] == 'value':
+                updates.append(f"{name} = NEW.{name}")
+            elif column['kind'] == 'date':
+                updates.append(f"{name} = {julian_day_sql('NEW.' + name)}")
+
+        statements.append(f"""
+            CREATE TRIGGER {quote_identifier(f'{table_name}_compact_insert')}
+            INSTEAD OF INSERT ON {view}
+            BEGIN
+                {insert_body};
+            END
+        """)
+        statements.append(f"""
+            CREATE TRIGGER {quote_identifier(f'{table_name}_compact_delete')}
+            INSTEAD OF DELETE ON {view}
+            BEGIN
+                DELETE FROM {fact_table} WHERE {key_sql};
+            END
+        """)
+        if updates:
+            statements.append(f"""
+                CREATE TRIGGER {quote_identifier(f'{table_name}_compact_update')}
+                INSTEAD OF UPDATE ON {view}
+                BEGIN
+                    UPDATE {fact_table} SET {', '.join(updates)} WHERE {key_sql};
+                END
+            """)
+        return statements
+
+    @staticmethod
+    def _kind_name(columns: List[Dict[str, Any]], kind: str) -> str:
+        """Original column name for a column kind"""
+        return next(column['name'] for column in columns if column['kind'] == kind)
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log compact storage event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("compact_storage", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,258 @@
+"""
+Reader Connection Pool
+
+One dedicated writer connection plus a bounded pool of read-only
+connections (``mode=ro`` URI, ``PRAGMA query_only``) on a WAL database.
+Each reader hands out a consistent snapshot: the read transaction is
+opened up front and held for the whole ``read_snapshot()`` block, so
+dashboards and notebooks see one point in time while ``db_pipe.py`` keeps
+committing, and neither side waits on the other.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+
+class ConnectionPool:
+    """
+    Writer connection and pooled read-only snapshot connections for one database.
+
+    Usage:
+        pool = ConnectionPool("trading_analytics.db", reader_count=4)
+        with pool.read_snapshot() as conn:
+            conn.execute("SELECT ...")
+    """
+
+    DEFAULT_CONFIG = {
+        'connection_timeout': 60.0,
+        'busy_timeout': 60000,
+        'acquire_timeout': 30.0,
+        'cache_size': -64000
+    }
+
+    def __init__(self, database_path: str, reader_count: int = 4, logger=None,
+                 config: Optional[Dict[str, Any]] = None,
+                 writer_connection: Optional[sqlite3.Connection] = None,
+                 on_connect: Optional[Callable[[sqlite3.Connection], Any]] = None):
+        """
+        Initialize connection pool.
+
+        Args:
+            database_path: Path to SQLite database file
+            reader_count: Maximum number of read-only connections
+            logger: Optional DatabaseLogger instance
+            config: Timeout and cache overrides (see DEFAULT_CONFIG)
+            writer_connection: Existing writer to share (e.g. DatabaseConnection.connect());
+                               the pool does not close a shared writer
+            on_connect: Called with each new reader before it is made query-only
+                        (e.g. to attach databases)
+        """
+        if reader_count < 1:
+            raise ValueError("reader_count must be at least 1")
+
+        self.database_path = Path(database_path)
+        self.reader_count = reader_count
+        self.logger = logger
+        self.config = {**self.DEFAULT_CONFIG, **(config or {})}
+
+        self._writer = writer_connection
+        self._owns_writer = writer_connection is None
+        self._on_connect = on_connect
+        self._writer_lock = threading.RLock()
+        self._readers: queue.Queue = queue.Queue()
+        self._readers_created = 0
+        self._pool_lock = threading.Lock()
+        self._closed = False
+
+        self._stats = {
+            'snapshots_served': 0,
+            'readers_in_use': 0,
+            'peak_readers_in_use': 0,
+            'total_wait_time_ms': 0.0,
+            'max_wait_time_ms': 0.0,
+            'acquire_timeouts': 0,
+            'readers_discarded': 0,
+            'total_snapshot_time_ms': 0.0
+        }
+
+    def writer(self) -> sqlite3.Connection:
+        """Return the single writer connection, opening it in WAL mode if needed."""
+        with self._writer_lock:
+            if self._writer is None:
+                self.database_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(
+                    str(self.database_path),
+                    timeout=self.config['connection_timeout'],
+                    check_same_thread=False
+                )
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA synchronous = NORMAL")
+                conn.execute(f"PRAGMA busy_timeout = {int(self.config['busy_timeout'])}")
+                conn.execute(f"PRAGMA cache_size = {int(self.config['cache_size'])}")
+                self._writer = conn
+                self._owns_writer = True
+            return self._writer
+
+    @contextmanager
+    def read_snapshot(self, timeout: Optional[float] = None):
+        """
+        Borrow a read-only connection holding one consistent snapshot.
+
+        Args:
+            timeout: Seconds to wait for a free reader (default: config acquire_timeout)
+
+        Yields:
+            Read-only sqlite3 connection inside an open read transaction
+        """
+        conn = self._acquire_reader(timeout)
+        snapshot_start = time.time()
+        healthy = True
+        try:
+            conn.execute("BEGIN")
+            # First read pins the WAL snapshot for the rest of the block
+            conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+            yield conn
+        except sqlite3.DatabaseError:
+            healthy = False
+            raise
+        finally:
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                healthy = False
+            self._release_reader(conn, healthy, (time.time() - snapshot_start) * 1000)
+
+    def execute_read(self, query: str, params: tuple = ()) -> List[tuple]:
+        """Run one read query on a pooled snapshot and return all rows."""
+        with self.read_snapshot() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def get_connection_statistics(self) -> Dict[str, Any]:
+        """Return pool usage statistics."""
+        with self._pool_lock:
+            stats = dict(self._stats)
+            readers_created = self._readers_created
+        served = stats['snapshots_served']
+        stats.update({
+            'mode': 'pooled',
+            'reader_count': self.reader_count,
+            'readers_created': readers_created,
+            'readers_available': self._readers.qsize(),
+            'avg_wait_time_ms': stats['total_wait_time_ms'] / served if served else 0.0,
+            'avg_snapshot_time_ms': stats['total_snapshot_time_ms'] / served if served else 0.0,
+            'writer_open': self._writer is not None,
+            'active_connections': stats['readers_in_use'] + (1 if self._writer is not None else 0)
+        })
+        return stats
+
+    def close_all(self):
+        """Close every idle reader and the writer (if owned by the pool)."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._pool_lock:
+                self._readers_created -= 1
+        with self._writer_lock:
+            if self._writer is not None and self._owns_writer:
+                self._writer.close()
+            self._writer = None
+
+    def _open_reader(self) -> sqlite3.Connection:
+        """Open a read-only, query-only connection"""
+        # The writer creates the WAL and shared-memory files read-only connections rely on
+        self.writer()
+        conn = sqlite3.connect(
+            f"file:{self.database_path.as_posix()}?mode=ro",
+            uri=True,
+            timeout=self.config['connection_timeout'],
+            check_same_thread=False,
+            isolation_level=None
+        )
+        if self._on_connect is not None:
+            self._on_connect(conn)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.config['busy_timeout'])}")
+        conn.execute(f"PRAGMA cache_size = {int(self.config['cache_size'])}")
+        return conn
+
+    def _acquire_reader(self, timeout: Optional[float]) -> sqlite3.Connection:
+        """Take an idle reader, open a new one below the limit, or wait for one"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        wait_start = time.time()
+        conn = None
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_open = self._readers_created < self.reader_count
+                if can_open:
+                    self._readers_created += 1
+            if can_open:
+                try:
+                    conn = self._open_reader()
+                except Exception:
+                    with self._pool_lock:
+                        self._readers_created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._readers.get(
+                        timeout=self.config['acquire_timeout'] if timeout is None else timeout
+                    )
+                except queue.Empty:
+                    with self._pool_lock:
+                        self._stats['acquire_timeouts'] += 1
+                    raise TimeoutError(
+                        f"No read connection available within timeout ({self.reader_count} readers in use)"
+                    )
+
+        wait_ms = (time.time() - wait_start) * 1000
+        with self._pool_lock:
+            self._stats['snapshots_served'] += 1
+            self._stats['readers_in_use'] += 1
+            self._stats['peak_readers_in_use'] = max(
+                self._stats['peak_readers_in_use'], self._stats['readers_in_use']
+            )
+            self._stats['total_wait_time_ms'] += wait_ms
+            self._stats['max_wait_time_ms'] = max(self._stats['max_wait_time_ms'], wait_ms)
+        return conn
+
+    def _release_reader(self, conn: sqlite3.Connection, healthy: bool, snapshot_ms: float):
+        """Return a reader to the pool, or discard it if it is broken or the pool closed"""
+        with self._pool_lock:
+            self._stats['readers_in_use'] -= 1
+            self._stats['total_snapshot_time_ms'] += snapshot_ms
+            if not healthy or self._closed:
+                self._readers_created -= 1
+                if not healthy:
+                    self._stats['readers_discarded'] += 1
+
+        if healthy and not self._closed:
+            self._readers.put(conn)
+        else:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            if not healthy:
+                self._log_event("Discarded broken read connection")
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log pool event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("connection_pool", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,229 @@
+"""
+Index Advisor
+
+Aggregates ``perf_query_log`` by normalised statement and proposes
+indexes for the statements whose plans scan a whole table or sort in a
+temporary B-tree, ranked by the total time those statements cost.
+
+- Key columns come from the statement itself: equality predicates first,
+  then one range predicate, then ORDER BY / GROUP BY / MIN / MAX /
+  DISTINCT columns, keeping only real columns of the scanned table.
+- When the statement reads only a few other columns of that table they
+  are appended, making the suggestion a covering index.
+- Suggestions already served by an existing index prefix are skipped.
+
+The parsing is a heuristic over the normalised SQL, meant to point at the
+statements worth fixing, not to replace reading their plans.
+"""
+
+import re
+import sqlite3
+from typing import Dict, Any, List, Optional, Tuple
+
+from db.database.staging import quote_identifier
+
+
+_IDENTIFIER = r'(?:"(?:[^"]|"")+"|\w+)'
+_TABLE_REFERENCE = re.compile(
+    rf'\b(?:FROM|JOIN)\s+(?:\w+\.)?({_IDENTIFIER})'
+    r'(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|ON|LEFT|INNER|CROSS|OUTER|GROUP|ORDER|LIMIT|USING|NATURAL|UNION|WINDOW|HAVING)\b)(\w+))?',
+    re.IGNORECASE
+)
+_PREDICATE = re.compile(
+    rf'(?:(\w+)\.)?({_IDENTIFIER})\s*(==|=|<=|>=|<|>|\bIS\b|\bIN\b|\bBETWEEN\b|\bLIKE\b)',
+    re.IGNORECASE
+)
+_ORDERING_CLAUSE = re.compile(r'\b(?:ORDER|GROUP)\s+BY\s+(.+?)(?=\bLIMIT\b|\bHAVING\b|\)|$)', re.IGNORECASE)
+_ORDERING_FUNCTION = re.compile(rf'\b(?:MIN|MAX|DISTINCT)\s*\(?\s*(?:(\w+)\.)?({_IDENTIFIER})', re.IGNORECASE)
+_SELECT_LIST = re.compile(r'^\s*SELECT\s+(.+?)\s+FROM\b', re.IGNORECASE)
+_PLAN_SCAN = re.compile(r'^SCAN (?:\w+\.)?(\S+)')
+_EQUALITY_OPERATORS = ('=', '==', 'IS', 'IN')
+
+# Extra columns appended to make an index covering
+MAX_COVERING_COLUMNS = 3
+
+
+class IndexAdvisor:
+    """
+    Turns the slow-query log into ranked candidate indexes.
+    """
+
+    def __init__(self, logger=None, min_executions: int = 1):
+        """
+        Initialize index advisor.
+
+        Args:
+            logger: Optional DatabaseLogger instance
+            min_executions: Logged executions a statement needs before it is considered
+        """
+        self.logger = logger
+        self.min_executions = min_executions
+
+    def advise(self, conn: sqlite3.Connection, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Propose indexes for the logged slow statements.
+
+        Args:
+            conn: Connection to the database holding ``perf_query_log``
+            limit: Maximum number of suggestions
+
+        Returns:
+            Suggestions ordered by total logged time, each with the table,
+            columns, CREATE INDEX statement and the statements it would help
+        """
+        if conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'perf_query_log'").fetchone() is None:
+            return []
+
+        suggestions: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+        for sql, executions, total_ms, max_ms, plan in conn.execute("""
+            SELECT normalized_sql, COUNT(*), SUM(duration_ms), MAX(duration_ms), MAX(query_plan)
+            FROM perf_query_log
+            GROUP BY normalized_sql
+            HAVING COUNT(*) >= ?
+            ORDER BY SUM(duration_ms) DESC
+        """, (self.min_executions,)).fetchall():
+            for table, columns, covering, reason in self._candidates(conn, sql, plan):
+                suggestion = suggestions.setdefault((table, columns), {
+                    'table_name': table,
+                    'columns': list(columns),
+                    'covering': covering,
+                    'create_sql': self._create_sql(table, columns),
+                    'reasons': [],
+                    'executions': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'statements': []
+                })
+                suggestion['executions'] += executions
+                suggestion['total_ms'] = round(suggestion['total_ms'] + total_ms, 3)
+                suggestion['max_ms'] = max(suggestion['max_ms'], max_ms)
+                if reason not in suggestion['reasons']:
+                    suggestion['reasons'].append(reason)
+                suggestion['statements'].append(sql)
+
+        ranked = sorted(suggestions.values(), key=lambda item: item['total_ms'], reverse=True)[:limit]
+        self._log_event("Index advice generated", {
+            'suggestions': len(ranked),
+            'tables': sorted({item['table_name'] for item in ranked})
+        })
+        return ranked
+
+    def _candidates(self, conn: sqlite3.Connection, sql: str,
+                    plan: Optional[str]) -> List[Tuple[str, Tuple[str, ...], bool, str]]:
+        """(table, key columns, covering, reason) for each table the statement scans"""
+        plan_steps = (plan or '').splitlines()
+        scanned = {match.group(1) for match in map(_PLAN_SCAN.match, plan_steps) if match}
+        sorts = any(step.startswith('USE TEMP B-TREE') for step in plan_steps)
+        if not scanned and not sorts:
+            return []
+
+        references = [(self._unquote(match.group(1)), match.group(2)) for match in _TABLE_REFERENCE.finditer(sql)]
+        candidates = []
+        for table, alias in references:
+            names = {table.lower()} | ({alias.lower()} if alias else set())
+            is_scanned = any(name.lower() in names for name in scanned)
+            if not is_scanned and not (sorts and len(references) == 1):
+                continue
+            table_columns = self._table_columns(conn, table)
+            if not table_columns:
+                continue
+
+            qualifiers = names if len(references) > 1 else names | {None}
+            equality, ranges = [], []
+            for qualifier, column, operator in _PREDICATE.findall(sql):
+                column = table_columns.get(self._unquote(column).lower())
+                if column is None or (qualifier.lower() or None) not in qualifiers:
+                    continue
+                target = equality if operator.upper() in _EQUALITY_OPERATORS else ranges
+                if column not in target:
+                    target.append(column)
+
+            ordering = []
+            for clause in _ORDERING_CLAUSE.findall(sql):
+                for term in clause.split(','):
+                    term = re.sub(r'\s+(?:ASC|DESC)\s*$', '', term.strip(), flags=re.IGNORECASE)
+                    column = table_columns.get(self._unquote(term.split('.')[-1]).lower())
+                    if column and column not in ordering:
+                        ordering.append(column)
+            for qualifier, column in _ORDERING_FUNCTION.findall(sql):
+                column = table_columns.get(self._unquote(column).lower())
+                if column and (qualifier.lower() or None) in qualifiers and column not in ordering:
+                    ordering.append(column)
+
+            key = list(equality)
+            key += [column for column in ranges[:1] if column not in key]
+            key += [column for column in ordering if column not in key]
+            if not key:
+                continue
+
+            selected = self._selected_columns(sql, table_columns, qualifiers)
+            extra = [column for column in selected or [] if column not in key] if selected is not None else None
+            covering = extra is not None and len(extra) <= MAX_COVERING_COLUMNS
+            if covering:
+                key += extra
+            if self._already_indexed(conn, table, key):
+                continue
+
+            reason = f"SCAN {table}" if is_scanned else "temporary sort"
+            candidates.append((table, tuple(key), covering, reason))
+        return candidates
+
+    @staticmethod
+    def _selected_columns(sql: str, table_columns: Dict[str, str], qualifiers) -> Optional[List[str]]:
+        """Columns of the table in the SELECT list (None when it selects *)"""
+        match = _SELECT_LIST.match(sql)
+        if match is None:
+            return []
+        select_list = match.group(1)
+        if re.search(r'(^|[\s,.])\*', select_list):
+            return None
+        columns = []
+        for qualifier, column in re.findall(rf'(?:(\w+)\.)?({_IDENTIFIER})', select_list):
+            column = table_columns.get(IndexAdvisor._unquote(column).lower())
+            if column and (qualifier.lower() or None) in qualifiers and column not in columns:
+                columns.append(column)
+        return columns
+
+    @staticmethod
+    def _already_indexed(conn: sqlite3.Connection, table: str, key: List[str]) -> bool:
+        """Check whether an existing index starts with the suggested key columns"""
+        wanted = [column.lower() for column in key]
+        for index in conn.execute(f"PRAGMA index_list({quote_identifier(table)})").fetchall():
+            indexed = [row[2].lower() for row in conn.execute(
+                f"PRAGMA index_info({quote_identifier(index[1])})"
+            ) if row[2]]
+            if indexed[:len(wanted)] == wanted:
+                return True
+        return False
+
+    @staticmethod
+    def _table_columns(conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+        """Lower-cased name -> real name for the columns of a base table (empty for views)"""
+        if conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ? COLLATE NOCASE", (table,)
+        ).fetchone() is None:
+            return {}
+        return {row[1].lower(): row[1] for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})")}
+
+    @staticmethod
+    def _create_sql(table: str, columns: Tuple[str, ...]) -> str:
+        """CREATE INDEX statement for a suggestion"""
+        name = "idx_" + "_".join(re.sub(r'\W+', '_', part).strip('_').lower() for part in (table,) + columns)
+        return (f"CREATE INDEX IF NOT EXISTS {name} ON {quote_identifier(table)}"
+                f"({', '.join(quote_identifier(column) for column in columns)})")
+
+    @staticmethod
+    def _unquote(identifier: str) -> str:
+        """Strip SQL identifier quotes"""
+        if identifier.startswith('"') and identifier.endswith('"'):
+            return identifier[1:-1].replace('""', '"')
+        return identifier
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log index advisor event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("index_advisor", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,356 @@
+"""
+Materialised Summary Views
+
+Replaces the aggregate views ``cusip_match_summary`` and
+``data_quality_dashboard`` with views over small, incrementally maintained
+tables. The view names and columns are unchanged for existing consumers,
+but reading them no longer aggregates the full historical tables.
+
+- cusip_match_summary: loaders subtract the rows on the dates they are about
+  to rewrite (``begin_delta``) and add them back after the write
+  (``end_delta``), keeping per-CUSIP match counts exact with index range
+  scans over the touched dates only.
+- data_quality_dashboard: data_quality_log is append-mostly, so triggers
+  keep per-table check counters current in the inserting transaction.
+
+Only the aggregate views are materialised; the current_* views resolve
+through the (date, cusip) indexes and stay as plain views.
+"""
+
+import json
+import sqlite3
+from typing import Dict, Any, List, Optional, Iterable
+
+
+MATERIALIZED_TABLES = {
+    'mv_cusip_match_state': """
+        CREATE TABLE IF NOT EXISTS mv_cusip_match_state (
+            table_name TEXT NOT NULL,
+            cusip_standardized TEXT NOT NULL,
+            matched_rows INTEGER NOT NULL DEFAULT 0,
+            unmatched_rows INTEGER NOT NULL DEFAULT 0,
+            total_rows INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (table_name, cusip_standardized)
+        ) WITHOUT ROWID
+    """,
+    'mv_cusip_match_summary': """
+        CREATE TABLE IF NOT EXISTS mv_cusip_match_summary (
+            table_name TEXT PRIMARY KEY,
+            total_cusips INTEGER NOT NULL,
+            matched_cusips INTEGER NOT NULL,
+            unmatched_cusips INTEGER NOT NULL,
+            match_rate_percent REAL,
+            reference_date TEXT
+        )
+    """,
+    'mv_data_quality_dashboard': """
+        CREATE TABLE IF NOT EXISTS mv_data_quality_dashboard (
+            table_name TEXT PRIMARY KEY,
+            total_checks INTEGER NOT NULL DEFAULT 0,
+            checks_passed INTEGER NOT NULL DEFAULT 0,
+            checks_failed INTEGER NOT NULL DEFAULT 0,
+            checks_warning INTEGER NOT NULL DEFAULT 0,
+            last_check_time TIMESTAMP
+        )
+    """,
+    'mv_view_definitions': """
+        CREATE TABLE IF NOT EXISTS mv_view_definitions (
+            view_name TEXT PRIMARY KEY,
+            original_sql TEXT NOT NULL,
+            installed_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+}
+
+MATERIALIZED_VIEWS = {
+    'cusip_match_summary': """
+        CREATE VIEW cusip_match_summary AS
+        SELECT table_name, total_cusips, matched_cusips, unmatched_cusips,
+               match_rate_percent, reference_date
+        FROM mv_cusip_match_summary
+    """,
+    'data_quality_dashboard': """
+        CREATE VIEW data_quality_dashboard AS
+        SELECT NULLIF(table_name, '') AS table_name, total_checks, checks_passed,
+               checks_failed, checks_warning,
+               ROUND(100.0 * checks_passed / total_checks, 2) AS pass_rate_percent,
+               last_check_time
+        FROM mv_data_quality_dashboard
+    """
+}
+
+
+def _quality_row_sql(row: str, sign: int) -> str:
+    """UPSERT adding (sign=1) or removing (sign=-1) one data_quality_log row from the counters."""
+    last_check_sql = (
+        "NULLIF(MAX(COALESCE(last_check_time, ''), COALESCE(excluded.last_check_time, '')), '')"
+        if sign > 0 else "last_check_time"
+    )
+    return f"""
+        INSERT INTO mv_data_quality_dashboard
+            (table_name, total_checks, checks_passed, checks_failed, checks_warning, last_check_time)
+        VALUES (COALESCE({row}.table_name, ''), {sign}, {sign} * ({row}.check_result = 'pass'),
+                {sign} * ({row}.check_result = 'fail'), {sign} * ({row}.check_result = 'warning'),
+                {row}.check_timestamp)
+        ON CONFLICT (table_name) DO UPDATE SET
+            total_checks = total_checks + excluded.total_checks,
+            checks_passed = checks_passed + excluded.checks_passed,
+            checks_failed = checks_failed + excluded.checks_failed,
+            checks_warning = checks_warning + excluded.checks_warning,
+            last_check_time = {last_check_sql};
+    """
+
+
+_QUALITY_RECOMPUTE_LAST_CHECK = """
+        UPDATE mv_data_quality_dashboard SET last_check_time = (
+            SELECT MAX(check_timestamp) FROM data_quality_log
+            WHERE COALESCE(data_quality_log.table_name, '') = mv_data_quality_dashboard.table_name
+        ) WHERE table_name = COALESCE(OLD.table_name, '');
+        DELETE FROM mv_data_quality_dashboard WHERE total_checks <= 0;
+"""
+
+DATA_QUALITY_TRIGGERS = {
+    'trg_mv_data_quality_insert': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_mv_data_quality_insert
+        AFTER INSERT ON data_quality_log
+        BEGIN
+            {_quality_row_sql('NEW', 1)}
+        END
+    """,
+    'trg_mv_data_quality_delete': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_mv_data_quality_delete
+        AFTER DELETE ON data_quality_log
+        BEGIN
+            {_quality_row_sql('OLD', -1)}
+            {_QUALITY_RECOMPUTE_LAST_CHECK}
+        END
+    """,
+    'trg_mv_data_quality_update': f"""
+        CREATE TRIGGER IF NOT EXISTS trg_mv_data_quality_update
+        AFTER UPDATE ON data_quality_log
+        BEGIN
+            {_quality_row_sql('OLD', -1)}
+            {_quality_row_sql('NEW', 1)}
+            {_QUALITY_RECOMPUTE_LAST_CHECK}
+        END
+    """
+}
+
+
+class MaterializedViews:
+    """
+    Installs and maintains the materialised summary views.
+
+    Maintenance methods issue plain DML and never commit, so loaders call
+    them inside their write transaction and the summaries commit (or roll
+    back) with the data.
+    """
+
+    # Tables contributing to cusip_match_summary -> date column (None for snapshot tables)
+    MATCH_SOURCES = {
+        'portfolio_historical': 'date',
+        'combined_runs_historical': 'date',
+        'run_monitor': None,
+        'gspread_analytics': None
+    }
+
+    def __init__(self, logger=None):
+        """
+        Initialize materialised views.
+
+        Args:
+            logger: Optional DatabaseLogger instance
+        """
+        self.logger = logger
+
+    def ensure_installed(self, conn: sqlite3.Connection) -> bool:
+        """
+        Install the backing tables, triggers and views if they are not in place.
+
+        Also reinstalls after a schema recreation put the original views back.
+
+        Returns:
+            True if anything was (re)installed and the tables were rebuilt
+        """
+        installed_views = {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'view' AND sql LIKE '%FROM mv_%'"
+            )
+        }
+        if installed_views >= set(self._installable_views(conn)):
+            return False
+
+        for table_sql in MATERIALIZED_TABLES.values():
+            conn.execute(table_sql)
+
+        for view_name in self._installable_views(conn):
+            if view_name in installed_views:
+                continue
+            original = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = ?", (view_name,)
+            ).fetchone()
+            if original:
+                conn.execute("""
+                    INSERT OR REPLACE INTO mv_view_definitions (view_name, original_sql) VALUES (?, ?)
+                """, (view_name, original[0]))
+            conn.execute(f"DROP VIEW IF EXISTS {view_name}")
+            conn.execute(MATERIALIZED_VIEWS[view_name])
+
+        if 'data_quality_dashboard' in self._installable_views(conn):
+            for trigger_sql in DATA_QUALITY_TRIGGERS.values():
+                conn.execute(trigger_sql)
+
+        self.rebuild(conn)
+        self._log_event("Materialised views installed", {'views': self._installable_views(conn)})
+        return True
+
+    def restore_views(self, conn: sqlite3.Connection):
+        """Put the original aggregate view definitions back and drop the triggers."""
+        for trigger_name in DATA_QUALITY_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+        for view_name, original_sql in conn.execute(
+                "SELECT view_name, original_sql FROM mv_view_definitions").fetchall():
+            conn.execute(f"DROP VIEW IF EXISTS {view_name}")
+            conn.execute(original_sql)
+
+    def rebuild(self, conn: sqlite3.Connection):
+        """Recompute every materialised table from the live tables."""
+        for table_name in self._match_sources(conn):
+            self.refresh_table(conn, table_name)
+
+        if 'data_quality_dashboard' in self._installable_views(conn):
+            conn.execute("DELETE FROM mv_data_quality_dashboard")
+            conn.execute("""
+                INSERT INTO mv_data_quality_dashboard
+                    (table_name, total_checks, checks_passed, checks_failed, checks_warning, last_check_time)
+                SELECT COALESCE(table_name, ''), COUNT(*), SUM(check_result = 'pass'),
+                       SUM(check_result = 'fail'), SUM(check_result = 'warning'), MAX(check_timestamp)
+                FROM data_quality_log
+                GROUP BY COALESCE(table_name, '')
+            """)
+
+    def refresh_table(self, conn: sqlite3.Connection, table_name: str):
+        """
+        Recompute one source table's match state in full.
+
+        Used for snapshot tables and full refreshes, where every row was rewritten anyway.
+        """
+        if table_name not in self._match_sources(conn):
+            return
+        conn.execute("DELETE FROM mv_cusip_match_state WHERE table_name = ?", (table_name,))
+        self._apply_rows(conn, table_name, None, 1)
+        self._refresh_summary_row(conn, table_name)
+
+    def begin_delta(self, conn: sqlite3.Connection, table_name: str, dates: Optional[Iterable[Any]]):
+        """
+        Remove the contribution of rows on the dates a load is about to write.
+
+        Args:
+            conn: Connection holding the loader's write transaction
+            table_name: Source table being loaded
+            dates: Dates the load will write (None for a full refresh)
+        """
+        if dates is None or table_name not in self._match_sources(conn):
+            return
+        self._apply_rows(conn, table_name, list(dates), -1)
+
+    def end_delta(self, conn: sqlite3.Connection, table_name: str, dates: Optional[Iterable[Any]]):
+        """
+        Add back the rows on the written dates and refresh the summary row.
+
+        Args:
+            conn: Connection holding the loader's write transaction
+            table_name: Source table that was loaded
+            dates: Dates the load wrote (None for a full refresh)
+        """
+        if table_name not in self._match_sources(conn):
+            return
+        if dates is None:
+            self.refresh_table(conn, table_name)
+            return
+        self._apply_rows(conn, table_name, list(dates), 1)
+        conn.execute("""
+            DELETE FROM mv_cusip_match_state WHERE table_name = ? AND total_rows <= 0
+        """, (table_name,))
+        self._refresh_summary_row(conn, table_name)
+
+    def get_cusip_match_summary(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """Return the materialised cusip_match_summary rows."""
+        columns = ['table_name', 'total_cusips', 'matched_cusips', 'unmatched_cusips',
+                   'match_rate_percent', 'reference_date']
+        return [dict(zip(columns, row)) for row in conn.execute(
+            f"SELECT {', '.join(columns)} FROM mv_cusip_match_summary ORDER BY table_name"
+        )]
+
+    def _apply_rows(self, conn: sqlite3.Connection, table_name: str, dates: Optional[List[Any]], sign: int):
+        """Add (sign=1) or subtract (sign=-1) per-CUSIP match counts for the given dates"""
+        date_column = self.MATCH_SOURCES[table_name]
+        where_sql = "cusip_standardized IS NOT NULL"
+        params: tuple = (table_name,)
+        if dates is not None:
+            if date_column is None:
+                return
+            where_sql += f" AND {date_column} IN (SELECT value FROM json_each(?))"
+            params += (json.dumps(sorted({str(date) for date in dates if date is not None})),)
+
+        conn.execute(f"""
+            INSERT INTO mv_cusip_match_state
+                (table_name, cusip_standardized, matched_rows, unmatched_rows, total_rows)
+            SELECT ?, cusip_standardized,
+                   {sign} * SUM(universe_match_status = 'matched'),
+                   {sign} * SUM(universe_match_status = 'unmatched'),
+                   {sign} * COUNT(*)
+            FROM {table_name}
+            WHERE {where_sql}
+            GROUP BY cusip_standardized
+            ON CONFLICT (table_name, cusip_standardized) DO UPDATE SET
+                matched_rows = matched_rows + excluded.matched_rows,
+                unmatched_rows = unmatched_rows + excluded.unmatched_rows,
+                total_rows = total_rows + excluded.total_rows
+        """, params)
+
+    def _refresh_summary_row(self, conn: sqlite3.Connection, table_name: str):
+        """Recompute one cusip_match_summary row from the per-CUSIP state"""
+        date_column = self.MATCH_SOURCES[table_name]
+        reference_date = None
+        if date_column is not None:
+            # Index-backed MAX on the date column
+            reference_date = conn.execute(f"SELECT MAX({date_column}) FROM {table_name}").fetchone()[0]
+
+        conn.execute("""
+            INSERT OR REPLACE INTO mv_cusip_match_summary
+                (table_name, total_cusips, matched_cusips, unmatched_cusips, match_rate_percent, reference_date)
+            SELECT ?, COUNT(*), COALESCE(SUM(matched_rows > 0), 0), COALESCE(SUM(unmatched_rows > 0), 0),
+                   ROUND(100.0 * COALESCE(SUM(matched_rows > 0), 0) / MAX(COUNT(*), 1), 2), ?
+            FROM mv_cusip_match_state
+            WHERE table_name = ?
+        """, (table_name, reference_date, table_name))
+
+    def _match_sources(self, conn: sqlite3.Connection) -> List[str]:
+        """Source tables present in this database that carry universe_match_status"""
+        return [
+            table_name for table_name in self.MATCH_SOURCES
+            if 'universe_match_status' in self._table_columns(conn, table_name)
+        ]
+
+    def _installable_views(self, conn: sqlite3.Connection) -> List[str]:
+        """Materialised views whose source tables exist in this database"""
+        views = []
+        if self._match_sources(conn):
+            views.append('cusip_match_summary')
+        if {'table_name', 'check_result', 'check_timestamp'} <= self._table_columns(conn, 'data_quality_log'):
+            views.append('data_quality_dashboard')
+        return views
+
+    @staticmethod
+    def _table_columns(conn: sqlite3.Connection, table_name: str) -> set:
+        """Return a table's column names (empty if the table does not exist)"""
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")}
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log materialised view event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("materialized_views", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,259 @@
+"""
+Slow-Query Log
+
+Times the statements issued through instrumented query methods, and those
+run through ``SlowQueryLog.execute`` on a raw connection (the staging merges
+and anti-joins of the loaders), and keeps a sample of the slow ones in
+``perf_query_log``: normalised SQL (literals
+replaced by ``?``), the shape of the parameters, duration, rows touched
+and the ``EXPLAIN QUERY PLAN`` output. ``IndexAdvisor`` turns the log
+into candidate indexes.
+
+- Every call is timed (one ``perf_counter`` pair); only calls over the
+  threshold are considered, and of those only ``sample_rate`` are kept.
+- The plan is explained once per normalised statement and reused.
+- Entries are buffered and written by ``flush`` outside the caller's
+  transactions, so a load never carries log rows (or their locks).
+"""
+
+import functools
+import random
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable
+
+
+PERF_QUERY_LOG_TABLE = """
+    CREATE TABLE IF NOT EXISTS perf_query_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        logged_timestamp TIMESTAMP NOT NULL,
+        source TEXT,
+        statement_type TEXT,
+        normalized_sql TEXT NOT NULL,
+        param_shape TEXT,
+        duration_ms REAL NOT NULL,
+        rows_touched INTEGER,
+        query_plan TEXT
+    )
+"""
+
+PERF_QUERY_LOG_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_perf_query_log_sql ON perf_query_log(normalized_sql, duration_ms)
+"""
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?(?![\w\"])")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a statement to its shape so repeated executions group together.
+
+    String and numeric literals become ``?``, lists of placeholders collapse
+    to ``(?, ...)`` and whitespace is collapsed.
+    """
+    normalized = _STRING_LITERAL.sub("?", sql)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PARAMETER_LIST.sub("(?, ...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def param_shape(params: Any) -> str:
+    """Describe parameters without their values (e.g. ``tuple[2]``, ``many[1000 x 3]``)."""
+    if params is None:
+        return 'none'
+    if isinstance(params, dict):
+        return f"dict[{', '.join(sorted(params))}]"
+    if isinstance(params, (list, tuple)):
+        if params and isinstance(params[0], (list, tuple, dict)):
+            return f"many[{len(params)} x {len(params[0])}]"
+        return f"{type(params).__name__}[{len(params)}]"
+    return type(params).__name__
+
+
+class SlowQueryLog:
+    """
+    Captures slow statements from instrumented query methods.
+
+    ``instrument`` wraps a method on one object (e.g. a DatabaseConnection's
+    ``execute_query``); the wrapper times the call and passes it to
+    ``observe``. Call ``flush`` at points where no write transaction is open.
+    """
+
+    def __init__(self, threshold_ms: float = 100.0, sample_rate: float = 1.0, logger=None,
+                 plan_connection: Optional[Callable[[], sqlite3.Connection]] = None,
+                 flush_size: int = 100):
+        """
+        Initialize slow-query log.
+
+        Args:
+            threshold_ms: Calls taking at least this long are candidates for the log
+            sample_rate: Fraction of slow calls recorded (0.0 - 1.0)
+            logger: Optional DatabaseLogger instance
+            plan_connection: Returns the connection used for EXPLAIN QUERY PLAN
+                             (None skips plans)
+            flush_size: Pending entries that trigger an automatic flush
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.logger = logger
+        self.plan_connection = plan_connection
+        self.flush_size = flush_size
+        self._random = random.Random()
+        self._pending: List[tuple] = []
+        self._plans: Dict[str, Optional[str]] = {}
+        self._stats = {'calls_timed': 0, 'slow_calls': 0, 'entries_recorded': 0, 'entries_flushed': 0}
+
+    def instrument(self, target: Any, method_name: str, source: Optional[str] = None):
+        """
+        Time every call of ``target.<method_name>(sql, params, ...)``.
+
+        Args:
+            target: Object whose method is wrapped (only this instance is affected)
+            method_name: Method taking the SQL text as first argument
+            source: Label stored with the entries (default: the method name)
+        """
+        method = getattr(target, method_name)
+        if getattr(method, '_slow_query_log', None) is self:
+            return
+
+        @functools.wraps(method)
+        def timed(sql, *args, **kwargs):
+            start = time.perf_counter()
+            result = method(sql, *args, **kwargs)
+            duration_ms = (time.perf_counter() - start) * 1000
+            params = args[0] if args else kwargs.get('params', kwargs.get('params_list'))
+            if isinstance(result, list):
+                rows_touched = len(result)
+            elif isinstance(result, int) and not isinstance(result, bool):
+                rows_touched = result
+            else:
+                rows_touched = None
+            self.observe(sql, params, duration_ms, rows_touched, source or method_name)
+            return result
+
+        timed._slow_query_log = self
+        setattr(target, method_name, timed)
+
+    def execute(self, conn: sqlite3.Connection, sql: str, params: Any = (),
+                source: Optional[str] = None) -> sqlite3.Cursor:
+        """
+        Run one statement on a raw connection and time it.
+
+        Args:
+            conn: Connection to execute on
+            sql: Statement text
+            params: Statement parameters
+            source: Label stored with the entry
+
+        Returns:
+            The statement's cursor
+        """
+        start = time.perf_counter()
+        cursor = conn.execute(sql, params)
+        duration_ms = (time.perf_counter() - start) * 1000
+        rows_touched = cursor.rowcount if cursor.rowcount >= 0 else None
+        self.observe(sql, params, duration_ms, rows_touched, source)
+        return cursor
+
+    def observe(self, sql: str, params: Any, duration_ms: float, rows_touched: Optional[int] = None,
+                source: Optional[str] = None) -> bool:
+        """
+        Consider one executed statement for the log.
+
+        Returns:
+            True if the statement was recorded
+        """
+        self._stats['calls_timed'] += 1
+        if duration_ms < self.threshold_ms:
+            return False
+        self._stats['slow_calls'] += 1
+        if self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+            return False
+
+        normalized = normalize_sql(sql)
+        if normalized not in self._plans:
+            self._plans[normalized] = self._explain(sql, params)
+        statement_type = normalized.split(' ', 1)[0].upper() if normalized else ''
+
+        self._pending.append((
+            datetime.now().strftime('%Y-%m-%d %H:%M:%S'), source, statement_type, normalized,
+            param_shape(params), round(duration_ms, 3), rows_touched, self._plans[normalized]
+        ))
+        self._stats['entries_recorded'] += 1
+
+        if self.plan_connection is not None and len(self._pending) >= self.flush_size:
+            conn = self.plan_connection()
+            if not conn.in_transaction:
+                self.flush(conn)
+        return True
+
+    @property
+    def pending(self) -> int:
+        """Entries recorded but not yet written."""
+        return len(self._pending)
+
+    def flush(self, conn: sqlite3.Connection) -> int:
+        """
+        Write pending entries to ``perf_query_log`` in their own transaction.
+
+        Args:
+            conn: Connection outside any transaction
+
+        Returns:
+            Number of entries written
+        """
+        if conn.in_transaction:
+            raise RuntimeError("flush must run outside a transaction")
+        self.ensure_table(conn)
+        entries, self._pending = self._pending, []
+        if entries:
+            conn.executemany("""
+                INSERT INTO perf_query_log
+                    (logged_timestamp, source, statement_type, normalized_sql, param_shape,
+                     duration_ms, rows_touched, query_plan)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, entries)
+        conn.commit()
+        self._stats['entries_flushed'] += len(entries)
+        if entries:
+            self._log_event("Slow queries flushed", {'entries': len(entries)})
+        return len(entries)
+
+    @staticmethod
+    def ensure_table(conn: sqlite3.Connection):
+        """Create the log table if it is missing."""
+        conn.execute(PERF_QUERY_LOG_TABLE)
+        conn.execute(PERF_QUERY_LOG_INDEX)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Counts of timed, slow, recorded and flushed calls."""
+        return {**self._stats, 'pending': self.pending, 'threshold_ms': self.threshold_ms,
+                'sample_rate': self.sample_rate}
+
+    def _explain(self, sql: str, params: Any) -> Optional[str]:
+        """EXPLAIN QUERY PLAN for a statement, one step per line (None if unavailable)"""
+        if self.plan_connection is None or not sql.lstrip().upper().startswith(
+                ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')):
+            return None
+        if isinstance(params, (list, tuple)) and params and isinstance(params[0], (list, tuple, dict)):
+            params = params[0]  # executemany: explain with the first row's parameters
+        try:
+            rows = self.plan_connection().execute("EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+        except sqlite3.Error:
+            return None
+        return "\n".join(row[3] for row in rows)
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log slow-query event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("slow_query_log", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,535 @@
+"""
+Query Plan Regression Suite
+
+Builds a synthetic database of configurable size with the real schema
+(``DatabaseSchema.create_complete_schema``), then runs the catalogue of
+queries the pipeline and ``--status`` report actually issue under
+``EXPLAIN QUERY PLAN`` and a timer. A query that degrades to a full table
+scan, or runs past its latency budget, is reported as a regression, so a
+schema change cannot silently drop an index the workload relies on.
+
+Usage:
+    python -m db.database.query_plans --dates 250 --cusips 5000
+"""
+
+import argparse
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+# Queries issued by db_pipe.py and the status summaries. Named parameters are
+# resolved from the database under test (see QueryPlanAuditor.resolve_parameters).
+# 'setup' statements create TEMP tables standing in for the staging tables a
+# loader probes the live tables from; TEMP scans are never reported.
+QUERY_CATALOGUE = [
+    {
+        'name': 'universe_latest_date',
+        'description': 'Reference date for orphan detection and current_universe',
+        'sql': "SELECT MAX(date) FROM universe_historical",
+        'budget_ms': 50.0
+    },
+    {
+        'name': 'universe_distinct_dates',
+        'description': 'Incremental update strategy: dates already loaded',
+        'sql': "SELECT DISTINCT date FROM universe_historical ORDER BY date",
+        'budget_ms': 500.0
+    },
+    {
+        'name': 'runs_distinct_dates',
+        'description': 'Runs update strategy: dates already loaded',
+        'sql': "SELECT DISTINCT date FROM combined_runs_historical ORDER BY date",
+        'budget_ms': 500.0
+    },
+    {
+        'name': 'runs_new_dates_filter',
+        'description': 'Incremental runs merge: staged rows whose date is not loaded yet',
+        'setup': [
+            "DROP TABLE IF EXISTS temp.runs_stage",
+            """
+                CREATE TEMP TABLE runs_stage AS
+                SELECT "Date", cusip_standardized, "Dealer" FROM combined_runs_historical
+                WHERE date = :reference_date
+                UNION ALL
+                SELECT date(:reference_date, '+1 day'), cusip_standardized, "Dealer" FROM combined_runs_historical
+                WHERE date = :reference_date
+            """
+        ],
+        'sql': """
+            SELECT COUNT(*) FROM temp.runs_stage AS s
+            WHERE NOT EXISTS (SELECT 1 FROM combined_runs_historical h WHERE h.date = s."Date")
+        """,
+        'budget_ms': 50.0
+    },
+    {
+        'name': 'portfolio_universe_keys',
+        'description': 'Portfolio load: latest-universe CUSIPs staged as the match lookup',
+        'sql': "SELECT DISTINCT cusip_standardized FROM main.current_universe",
+        'budget_ms': 250.0
+    },
+    {
+        'name': 'portfolio_universe_match',
+        'description': 'Portfolio load: staged positions matched against the latest universe',
+        'setup': [
+            "DROP TABLE IF EXISTS temp.universe_keys",
+            "CREATE TEMP TABLE universe_keys AS SELECT DISTINCT cusip_standardized FROM main.current_universe",
+            "CREATE INDEX temp.idx_universe_keys ON universe_keys (cusip_standardized)",
+            "DROP TABLE IF EXISTS temp.portfolio_stage",
+            """
+                CREATE TEMP TABLE portfolio_stage AS
+                SELECT cusip_standardized FROM portfolio_historical WHERE date = :reference_date
+            """
+        ],
+        'sql': """
+            SELECT COALESCE(SUM(EXISTS (SELECT 1 FROM temp.universe_keys u
+                                        WHERE u.cusip_standardized = s.cusip_standardized)), 0),
+                   COALESCE(SUM(NOT EXISTS (SELECT 1 FROM temp.universe_keys u
+                                            WHERE u.cusip_standardized = s.cusip_standardized)), 0)
+            FROM temp.portfolio_stage AS s
+        """,
+        'budget_ms': 50.0
+    },
+    {
+        'name': 'universe_date_range_count',
+        'description': 'Row count over a date window',
+        'sql': """
+            SELECT COUNT(*) FROM universe_historical
+            WHERE date BETWEEN :first_date AND :reference_date
+        """,
+        'budget_ms': 500.0
+    },
+    {
+        'name': 'portfolio_orphans_latest',
+        'description': 'Status report: portfolio CUSIPs missing from the latest universe',
+        'sql': """
+            SELECT t.cusip_standardized, MAX(t."SECURITY")
+            FROM portfolio_historical t
+            WHERE t.date = :reference_date
+              AND t.cusip_standardized IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM universe_historical u
+                  WHERE u.date = :reference_date AND u.cusip_standardized = t.cusip_standardized
+              )
+            GROUP BY t.cusip_standardized
+        """,
+        'budget_ms': 250.0
+    },
+    {
+        'name': 'runs_orphans_latest',
+        'description': 'Status report: runs CUSIPs missing from the latest universe',
+        'sql': """
+            SELECT t.cusip_standardized, MAX(t."Security")
+            FROM combined_runs_historical t
+            WHERE t.date = :reference_date
+              AND t.cusip_standardized IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM universe_historical u
+                  WHERE u.date = :reference_date AND u.cusip_standardized = t.cusip_standardized
+              )
+            GROUP BY t.cusip_standardized
+        """,
+        'budget_ms': 250.0
+    },
+    {
+        'name': 'run_monitor_orphans',
+        'description': 'Status report: run monitor CUSIPs missing from the latest universe',
+        'sql': """
+            SELECT t.cusip_standardized, MAX(t."Security")
+            FROM run_monitor t
+            WHERE t.cusip_standardized IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM universe_historical u
+                  WHERE u.date = :reference_date AND u.cusip_standardized = t.cusip_standardized
+              )
+            GROUP BY t.cusip_standardized
+        """,
+        'budget_ms': 250.0,
+        # Snapshot table: compared as a whole by design, one probe per row
+        'allowed_scans': ('run_monitor',)
+    },
+    {
+        'name': 'universe_cusip_history',
+        'description': 'Per-CUSIP history lookup in the universe',
+        'sql': "SELECT * FROM universe_historical WHERE cusip_standardized = :cusip ORDER BY date",
+        'budget_ms': 50.0
+    },
+    {
+        'name': 'portfolio_cusip_history',
+        'description': 'Per-CUSIP position history',
+        'sql': "SELECT * FROM portfolio_historical WHERE cusip_standardized = :cusip ORDER BY date",
+        'budget_ms': 50.0
+    },
+    {
+        'name': 'runs_cusip_history',
+        'description': 'Per-CUSIP dealer run history',
+        'sql': "SELECT * FROM combined_runs_historical WHERE cusip_standardized = :cusip ORDER BY date",
+        'budget_ms': 50.0
+    },
+    {
+        'name': 'unmatched_by_source',
+        'description': 'Status report: unmatched CUSIPs per source table',
+        'sql': """
+            SELECT source_table, COUNT(*) FROM unmatched_cusips_last_date
+            GROUP BY source_table ORDER BY 2 DESC
+        """,
+        'budget_ms': 100.0,
+        # Last-date tracking table is bounded by one universe date
+        'allowed_scans': ('unmatched_cusips_last_date',)
+    }
+]
+
+
+# A full scan reads every row of the table: a plain SCAN, or a SCAN through a
+# non-covering index (taken for ORDER BY, with a table lookup per row).
+# Covering-index scans such as DISTINCT date are bounded by the latency budget.
+_SCAN_PATTERN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(?P<covering> USING COVERING INDEX)?')
+_INDEX_PATTERN = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+
+
+def build_synthetic_database(database_path: str, dates: int = 30, cusips: int = 400,
+                             dealers: int = 3, schema=None, analyze: bool = False) -> Dict[str, int]:
+    """
+    Create the complete schema and fill it with synthetic data.
+
+    Every CUSIP is in the universe on every date, except that every 50th CUSIP
+    is missing on the latest date (the orphans). The portfolio holds every 10th
+    CUSIP, runs quote every 3rd CUSIP from each dealer, and the run monitor and
+    G-spread tables cover the same CUSIPs as the runs.
+
+    Args:
+        database_path: New database file to create
+        dates: Number of business dates
+        cusips: Number of distinct CUSIPs
+        dealers: Dealers quoting each runs CUSIP
+        schema: DatabaseSchema instance (default: a new DatabaseSchema)
+        analyze: Run ANALYZE after loading (as --optimize-db does)
+
+    Returns:
+        Row count per filled table
+    """
+    if schema is None:
+        from db.database.schema import DatabaseSchema
+        schema = DatabaseSchema()
+
+    conn = sqlite3.connect(database_path)
+    try:
+        if schema.create_complete_schema(conn) is False:
+            raise RuntimeError("Schema creation failed for synthetic database")
+
+        conn.executescript("""
+            CREATE TEMP TABLE synth_dates AS
+                WITH RECURSIVE d(k) AS (SELECT 0 UNION ALL SELECT k + 1 FROM d WHERE k + 1 < {dates})
+                SELECT k, date('2024-01-01', '+' || k || ' days') AS d FROM d;
+            CREATE TEMP TABLE synth_cusips AS
+                WITH RECURSIVE c(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM c WHERE n + 1 < {cusips})
+                SELECT n, printf('%06dAA%d', n, n % 10) AS cusip FROM c;
+            CREATE TEMP TABLE synth_dealers AS
+                WITH RECURSIVE r(j) AS (SELECT 0 UNION ALL SELECT j + 1 FROM r WHERE j + 1 < {dealers})
+                SELECT j, 'DEALER' || j AS dealer FROM r;
+        """.format(dates=int(dates), cusips=int(cusips), dealers=int(dealers)))
+
+        latest = "(SELECT MAX(d) FROM temp.synth_dates)"
+        universe_rows = f"""
+            SELECT c.n, dt.k, dt.d, c.cusip, NULL AS dealer, 'matched' AS status
+            FROM temp.synth_dates dt CROSS JOIN temp.synth_cusips c
+            WHERE NOT (dt.d = {latest} AND c.n % 50 = 0)
+        """
+        orphan_status = f"CASE WHEN c.n % 50 = 0 AND dt.d = {latest} THEN 'unmatched' ELSE 'matched' END"
+        sources = {
+            'universe_historical': universe_rows,
+            'portfolio_historical': f"""
+                SELECT c.n, dt.k, dt.d, c.cusip, NULL AS dealer, {orphan_status} AS status
+                FROM temp.synth_dates dt CROSS JOIN temp.synth_cusips c WHERE c.n % 10 = 0
+            """,
+            'combined_runs_historical': f"""
+                SELECT c.n, dt.k, dt.d, c.cusip, r.dealer, {orphan_status} AS status
+                FROM temp.synth_dates dt CROSS JOIN temp.synth_cusips c CROSS JOIN temp.synth_dealers r
+                WHERE c.n % 3 = 0
+            """,
+            'run_monitor': f"""
+                SELECT c.n, 0 AS k, {latest} AS d, c.cusip, NULL AS dealer,
+                       CASE WHEN c.n % 50 = 0 THEN 'unmatched' ELSE 'matched' END AS status
+                FROM temp.synth_cusips c WHERE c.n % 3 = 0
+            """,
+            'gspread_analytics': f"""
+                SELECT c.n, 0 AS k, {latest} AS d, c.cusip, NULL AS dealer, 'matched' AS status
+                FROM temp.synth_cusips c WHERE c.n % 3 = 0
+            """,
+            'unmatched_cusips_all_dates': f"""
+                SELECT c.n, dt.k, dt.d, c.cusip, NULL AS dealer, 'unmatched' AS status
+                FROM temp.synth_dates dt CROSS JOIN temp.synth_cusips c
+                WHERE c.n % 50 = 0 AND dt.d = {latest}
+            """,
+            'unmatched_cusips_last_date': """
+                SELECT c.n, 0 AS k, NULL AS d, c.cusip, NULL AS dealer, 'unmatched' AS status
+                FROM temp.synth_cusips c WHERE c.n % 50 = 0
+            """
+        }
+
+        row_counts = {}
+        for table_name, source_sql in sources.items():
+            row_counts[table_name] = _insert_synthetic_rows(conn, table_name, source_sql)
+
+        conn.execute("DROP TABLE temp.synth_dates")
+        conn.execute("DROP TABLE temp.synth_cusips")
+        conn.execute("DROP TABLE temp.synth_dealers")
+        conn.commit()
+        if analyze:
+            conn.execute("ANALYZE")
+            conn.commit()
+        return row_counts
+    finally:
+        conn.close()
+
+
+def _insert_synthetic_rows(conn: sqlite3.Connection, table_name: str, source_sql: str) -> int:
+    """Fill every column of a schema table from a synthetic row source"""
+    columns = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
+    if not columns:
+        return 0
+
+    # Known columns by (lower-case) name; everything else gets a typed filler
+    known = {
+        'date': 's.d',
+        'cusip': 's.cusip',
+        'cusip_standardized': 's.cusip',
+        'cusip_original': 's.cusip',
+        'security': "'BOND ' || s.n",
+        'security_name': "'BOND ' || s.n",
+        'dealer': 's.dealer',
+        'universe_match_status': 's.status',
+        'match_status': 's.status',
+        'source_table': "'portfolio_historical'",
+        'source_file': "'synthetic'"
+    }
+
+    names, expressions = [], []
+    for _, name, declared_type, _, default, is_pk in columns:
+        lowered = name.lower()
+        declared_type = (declared_type or '').upper()
+        if is_pk and 'INT' in declared_type:
+            continue
+        if lowered in known:
+            expression = known[lowered]
+        elif default is not None:
+            continue
+        elif 'DATE' in declared_type or 'TIME' in declared_type:
+            expression = 's.d'
+        elif 'INT' in declared_type:
+            expression = 's.n'
+        elif any(numeric in declared_type for numeric in ('REAL', 'FLOA', 'DOUB', 'NUM')):
+            expression = '((s.n * 31 + s.k * 7) % 1000) / 10.0'
+        else:
+            expression = "'X' || (s.n % 97)"
+        names.append('"{}"'.format(name.replace('"', '""')))
+        expressions.append(expression)
+
+    return conn.execute(f"""
+        INSERT OR IGNORE INTO {table_name} ({", ".join(names)})
+        SELECT {", ".join(expressions)} FROM ({source_sql}) AS s
+    """).rowcount
+
+
+class QueryPlanAuditor:
+    """
+    Runs the query catalogue with EXPLAIN QUERY PLAN and timing.
+
+    A result is a regression when the plan contains a full scan of a table
+    not listed in the entry's ``allowed_scans``, or when the median runtime
+    exceeds the entry's ``budget_ms`` (times ``budget_scale``).
+    """
+
+    def __init__(self, conn: sqlite3.Connection, logger=None, repeat: int = 3,
+                 budget_scale: float = 1.0):
+        """
+        Initialize query plan auditor.
+
+        Args:
+            conn: Connection to the database under test
+            logger: Optional DatabaseLogger instance
+            repeat: Timed executions per query (the median is reported)
+            budget_scale: Multiplier applied to every latency budget
+        """
+        self.conn = conn
+        self.logger = logger
+        self.repeat = max(1, repeat)
+        self.budget_scale = budget_scale
+
+    def resolve_parameters(self) -> Dict[str, Any]:
+        """Pick parameter values (dates, a sample CUSIP) from the database under test."""
+        first_date, reference_date = self.conn.execute(
+            "SELECT MIN(date), MAX(date) FROM universe_historical"
+        ).fetchone()
+        sample = self.conn.execute("""
+            SELECT cusip_standardized FROM portfolio_historical
+            WHERE date = ? AND cusip_standardized IS NOT NULL LIMIT 1
+        """, (reference_date,)).fetchone()
+        return {
+            'first_date': first_date,
+            'reference_date': reference_date,
+            'cusip': sample[0] if sample else None
+        }
+
+    def explain(self, sql: str, params: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Return the EXPLAIN QUERY PLAN detail lines for a query."""
+        # EXPLAIN never re-checks the schema cookie, so key the statement cache on it
+        schema_version = self.conn.execute("PRAGMA schema_version").fetchone()[0]
+        return [
+            row[3] for row in self.conn.execute(
+                f"EXPLAIN QUERY PLAN {sql} /* schema_version {schema_version} */", params or {}
+            )
+        ]
+
+    def analyse_plan(self, plan: List[str], allowed_scans=()) -> Dict[str, Any]:
+        """
+        Classify plan steps.
+
+        Returns:
+            Dictionary with full_scans (tables read row by row in full),
+            indexes_used and temp_btrees (sorts/distincts without an index)
+        """
+        tables = {
+            row[0].lower() for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        }
+        allowed = {table.lower() for table in allowed_scans}
+
+        full_scans, indexes_used = [], []
+        for detail in plan:
+            scan = _SCAN_PATTERN.match(detail)
+            if scan and not scan.group('covering'):
+                table = scan.group(1).lower()
+                # Subqueries, CTEs and virtual tables are not base-table scans
+                if table in tables and table not in allowed:
+                    full_scans.append(scan.group(1))
+            indexes_used.extend(_INDEX_PATTERN.findall(detail))
+
+        return {
+            'full_scans': full_scans,
+            'indexes_used': sorted(set(indexes_used)),
+            'temp_btrees': sum(1 for detail in plan if 'TEMP B-TREE' in detail)
+        }
+
+    def run_query(self, entry: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Explain and time one catalogue entry (after running its setup statements)."""
+        for statement in entry.get('setup', ()):
+            self.conn.execute(statement, params)
+        plan = self.explain(entry['sql'], params)
+        analysis = self.analyse_plan(plan, entry.get('allowed_scans', ()))
+
+        timings = []
+        rows = 0
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            rows = len(self.conn.execute(entry['sql'], params).fetchall())
+            timings.append((time.perf_counter() - start) * 1000)
+
+        budget_ms = entry['budget_ms'] * self.budget_scale
+        median_ms = statistics.median(timings)
+        return {
+            'name': entry['name'],
+            'description': entry.get('description', ''),
+            'plan': plan,
+            'rows': rows,
+            'median_ms': median_ms,
+            'max_ms': max(timings),
+            'budget_ms': budget_ms,
+            'over_budget': median_ms > budget_ms,
+            **analysis
+        }
+
+    def run_catalogue(self, catalogue: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Run every catalogue entry and return the results."""
+        params = self.resolve_parameters()
+        results = [self.run_query(entry, params) for entry in (catalogue or QUERY_CATALOGUE)]
+
+        regressions = self.find_regressions(results)
+        self._log_event("Query plan audit completed", {
+            'queries': len(results),
+            'regressions': regressions
+        })
+        return results
+
+    @staticmethod
+    def find_regressions(results: List[Dict[str, Any]]) -> List[str]:
+        """Describe every full scan and budget overrun in a set of results."""
+        regressions = []
+        for result in results:
+            if result['full_scans']:
+                regressions.append(
+                    f"{result['name']}: full scan of {', '.join(result['full_scans'])}"
+                )
+            if result['over_budget']:
+                regressions.append(
+                    f"{result['name']}: {result['median_ms']:.1f} ms exceeds "
+                    f"{result['budget_ms']:.1f} ms budget"
+                )
+        return regressions
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log audit event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("query_plans", {
+                'message': message,
+                'details': details or {}
+            })
+
+
+def main():
+    """Build a synthetic database and print the query plan audit."""
+    parser = argparse.ArgumentParser(description='Query plan regression suite')
+    parser.add_argument('--database', default='query_plan_benchmark.db',
+                        help='Synthetic database file to create (replaced if present)')
+    parser.add_argument('--dates', type=int, default=250, help='Business dates to generate')
+    parser.add_argument('--cusips', type=int, default=5000, help='Distinct CUSIPs to generate')
+    parser.add_argument('--dealers', type=int, default=3, help='Dealers per runs CUSIP')
+    parser.add_argument('--analyze', action='store_true', help='Run ANALYZE before auditing')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed executions per query')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='Multiplier applied to every latency budget')
+    args = parser.parse_args()
+
+    database_path = Path(args.database)
+    database_path.unlink(missing_ok=True)
+
+    print(f"🔧 Building synthetic database ({args.dates} dates x {args.cusips} CUSIPs)...")
+    build_start = time.time()
+    row_counts = build_synthetic_database(
+        str(database_path), dates=args.dates, cusips=args.cusips,
+        dealers=args.dealers, analyze=args.analyze
+    )
+    print(f"   ✅ {sum(row_counts.values()):,} rows in {time.time() - build_start:.1f}s")
+
+    conn = sqlite3.connect(str(database_path))
+    try:
+        auditor = QueryPlanAuditor(conn, repeat=args.repeat, budget_scale=args.budget_scale)
+        results = auditor.run_catalogue()
+    finally:
+        conn.close()
+
+    print("\n📊 QUERY PLAN AUDIT:")
+    for result in results:
+        status = '❌' if result['full_scans'] or result['over_budget'] else '✅'
+        print(f"   {status} {result['name']}: {result['median_ms']:.2f} ms "
+              f"(budget {result['budget_ms']:.0f} ms, {result['rows']:,} rows)")
+        for detail in result['plan']:
+            print(f"         {detail}")
+
+    regressions = QueryPlanAuditor.find_regressions(results)
+    if regressions:
+        print("\n❌ REGRESSIONS:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+
+    print("\n✅ All queries use indexes and are within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+In-Database Run Monitor
+
+Computes the run monitor report (DoD/WoW/MTD/QTD/YTD/1YR bid spread
+changes, size changes and best bid/offer with dealer attribution) straight
+from ``combined_runs_historical``, instead of exporting the runs history to
+``runs/run_monitor.py`` and loading its ``run_monitor.parquet`` back.
+
+- Period reference dates follow runs/run_monitor.py: each resolves to the
+  latest runs date on or before it with one index-backed MAX(date).
+- Changes join the as-of rows to the at most six reference dates through
+  the (date, cusip_standardized) index, so a refresh reads a handful of
+  dates however long the history is.
+- Best bid/offer take the first of each CUSIP's dealer quotes in a window
+  ordered by size eligibility, tightest spread, then largest size.
+- Per-dealer rows are aggregated per CUSIP exactly as load_run_monitor_data
+  aggregates run_monitor.parquet, so both paths fill run_monitor alike.
+
+Every computed as-of date is kept in ``run_monitor_history``; ``run_monitor``
+holds the report for the latest runs date, with each CUSIP's match status
+against the latest universe date. CUSIPs outside that universe are tracked
+in the unmatched CUSIP tables, as load_run_monitor_data tracks them.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from dateutil.relativedelta import relativedelta
+
+
+RUN_MONITOR_HISTORY_TABLE = """
+    CREATE TABLE IF NOT EXISTS run_monitor_history (
+        as_of_date DATE NOT NULL,
+        cusip_standardized TEXT NOT NULL,
+        "CUSIP" TEXT,
+        "Security" TEXT,
+        "Bid Spread" REAL,
+        "Ask Spread" REAL,
+        "Bid Size" REAL,
+        "Ask Size" REAL,
+        "DoD" REAL,
+        "WoW" REAL,
+        "MTD" REAL,
+        "QTD" REAL,
+        "YTD" REAL,
+        "1YR" REAL,
+        "DoD Chg Bid Size" REAL,
+        "DoD Chg Ask Size" REAL,
+        "MTD Chg Bid Size" REAL,
+        "MTD Chg Ask Size" REAL,
+        "Best Bid" REAL,
+        "Best Offer" REAL,
+        "Bid/Offer" REAL,
+        "Dealer @ Best Bid" TEXT,
+        "Dealer @ Best Offer" TEXT,
+        "Size @ Best Bid" REAL,
+        "Size @ Best Offer" REAL,
+        "G Spread" REAL,
+        "Keyword" TEXT,
+        computed_timestamp TIMESTAMP,
+        PRIMARY KEY (as_of_date, cusip_standardized)
+    ) WITHOUT ROWID
+"""
+
+# Report columns shared by run_monitor and run_monitor_history
+REPORT_COLUMNS = [
+    'CUSIP', 'cusip_standardized', 'Security', 'Bid Spread', 'Ask Spread', 'Bid Size', 'Ask Size',
+    'DoD', 'WoW', 'MTD', 'QTD', 'YTD', '1YR',
+    'DoD Chg Bid Size', 'DoD Chg Ask Size', 'MTD Chg Bid Size', 'MTD Chg Ask Size',
+    'Best Bid', 'Best Offer', 'Bid/Offer', 'Dealer @ Best Bid', 'Dealer @ Best Offer',
+    'Size @ Best Bid', 'Size @ Best Offer', 'G Spread', 'Keyword'
+]
+
+PERIODS = ['DoD', 'WoW', 'MTD', 'QTD', 'YTD', '1YR']
+
+# Periods that also report bid/ask size changes
+SIZE_CHANGE_PERIODS = ['DoD', 'MTD']
+
+
+def period_reference_dates(as_of: datetime) -> Dict[str, datetime]:
+    """Reference date for each period, as runs/run_monitor.py calculates them."""
+    quarter_start = datetime(as_of.year, ((as_of.month - 1) // 3) * 3 + 1, 1)
+    return {
+        'DoD': as_of - timedelta(days=1),
+        'WoW': as_of - timedelta(weeks=1),
+        'MTD': as_of.replace(day=1) - timedelta(days=1),
+        'QTD': quarter_start - timedelta(days=1),
+        'YTD': datetime(as_of.year - 1, 12, 31),
+        '1YR': as_of - relativedelta(years=1)
+    }
+
+
+def _period_param(period: str) -> str:
+    """Named parameter holding a period's resolved runs date"""
+    return 'period_' + period.lower()
+
+
+def _report_sql() -> str:
+    """SELECT producing one run_monitor row per CUSIP for :as_of"""
+    history_dates = ", ".join(f":{_period_param(period)}" for period in PERIODS)
+
+    def change(period: str, column: str) -> str:
+        return (f'l."{column}" - MAX(CASE WHEN h.date = :{_period_param(period)} '
+                f'THEN h."{column}" END)')
+
+    spread_changes = ",\n                   ".join(
+        f'{change(period, "Bid Spread")} AS "{period}"' for period in PERIODS
+    )
+    size_changes = ",\n                   ".join(
+        f'{change(period, size_column)} AS "{period} Chg {size_column}"'
+        for period in SIZE_CHANGE_PERIODS for size_column in ('Bid Size', 'Ask Size')
+    )
+    averaged = ", ".join(
+        f'AVG("{column}")' for column in PERIODS + [
+            f'{period} Chg {size_column}'
+            for period in SIZE_CHANGE_PERIODS for size_column in ('Bid Size', 'Ask Size')
+        ]
+    )
+
+    def eligible(quote: str) -> str:
+        return f'COALESCE("{quote} Size" >= :min_size AND "{quote} Spread" IS NOT NULL, 0)'
+
+    def level_window(quote: str) -> str:
+        # Eligible quotes first, then tightest spread, then largest size
+        return (f'PARTITION BY cusip_standardized ORDER BY {eligible(quote)} DESC, '
+                f'"{quote} Spread", "{quote} Size" DESC, "Dealer"')
+
+    def best_level(quote: str, column: str, window: str) -> str:
+        # The top-ranked quote is ineligible only when none of the CUSIP's quotes are
+        return f'FIRST_VALUE(CASE WHEN {eligible(quote)} THEN "{column}" END) OVER {window}'
+
+    # TOTAL() and AVG() match the sum/mean aggregation of load_run_monitor_data
+    return f"""
+        WITH dealer_rows AS (
+            SELECT l.cusip_standardized, l."CUSIP", l."Security", l."Dealer",
+                   l."Bid Spread", l."Ask Spread", l."Bid Size", l."Ask Size",
+                   l."Bid Interpolated Spread to Government" AS "G Spread", l."Keyword",
+                   {spread_changes},
+                   {size_changes}
+            FROM combined_runs_historical l
+            LEFT JOIN combined_runs_historical h
+                ON h.date IN ({history_dates})
+               AND h.cusip_standardized = l.cusip_standardized
+               AND h."Dealer" = l."Dealer"
+            WHERE l.date = :as_of
+            GROUP BY l.cusip_standardized, l."CUSIP", l."Dealer"
+        ),
+        quotes AS (
+            SELECT *,
+                   {best_level('Bid', 'Bid Spread', 'bid_level')} AS best_bid,
+                   {best_level('Bid', 'Dealer', 'bid_level')} AS best_bid_dealer,
+                   {best_level('Bid', 'Bid Size', 'bid_level')} AS best_bid_size,
+                   {best_level('Ask', 'Ask Spread', 'offer_level')} AS best_offer,
+                   {best_level('Ask', 'Dealer', 'offer_level')} AS best_offer_dealer,
+                   {best_level('Ask', 'Ask Size', 'offer_level')} AS best_offer_size
+            FROM dealer_rows
+            WINDOW bid_level AS ({level_window('Bid')}),
+                   offer_level AS ({level_window('Ask')})
+        )
+        SELECT MIN("CUSIP"), cusip_standardized, MIN("Security"),
+               AVG("Bid Spread"), AVG("Ask Spread"), TOTAL("Bid Size"), TOTAL("Ask Size"),
+               {averaged},
+               AVG(best_bid), AVG(best_offer), AVG(best_bid - best_offer),
+               MIN(best_bid_dealer), MIN(best_offer_dealer),
+               TOTAL(best_bid_size), TOTAL(best_offer_size),
+               AVG("G Spread"), MIN("Keyword")
+        FROM quotes
+        GROUP BY cusip_standardized
+    """
+
+
+class RunMonitorEngine:
+    """
+    Computes the run monitor report inside the database.
+
+    Methods issue plain DML and never commit, so callers run them inside
+    their own write transaction.
+    """
+
+    SOURCE_TABLE = 'combined_runs_historical'
+    HISTORY_TABLE = 'run_monitor_history'
+    CURRENT_TABLE = 'run_monitor'
+    UNIVERSE_TABLE = 'universe_historical'
+
+    def __init__(self, logger=None, min_size_threshold: float = 2_000_000):
+        """
+        Initialize the run monitor engine.
+
+        Args:
+            logger: Optional DatabaseLogger instance
+            min_size_threshold: Minimum bid/ask size for a quote to count towards best levels
+        """
+        self.logger = logger
+        self.min_size_threshold = min_size_threshold
+
+    def ensure_tables(self, conn: sqlite3.Connection):
+        """Create the as-of history table if it does not exist."""
+        conn.execute(RUN_MONITOR_HISTORY_TABLE)
+
+    def resolve_as_of(self, conn: sqlite3.Connection, as_of_date: Any = None) -> Optional[str]:
+        """
+        Return the stored runs date a report as of ``as_of_date`` is computed for.
+
+        Args:
+            conn: Database connection
+            as_of_date: Date or 'YYYY-MM-DD' string (None for the latest runs date)
+
+        Returns:
+            Latest stored runs date on or before as_of_date, or None if there is none
+        """
+        if as_of_date is None:
+            return conn.execute(f"SELECT MAX(date) FROM {self.SOURCE_TABLE}").fetchone()[0]
+        return self._latest_date_on_or_before(conn, self._to_datetime(as_of_date))
+
+    def resolve_periods(self, conn: sqlite3.Connection, as_of: str) -> Dict[str, Optional[str]]:
+        """Resolve each period's reference date to the latest runs date on or before it."""
+        return {
+            period: self._latest_date_on_or_before(conn, reference_date)
+            for period, reference_date in period_reference_dates(self._to_datetime(as_of)).items()
+        }
+
+    def refresh(self, conn: sqlite3.Connection, as_of_date: Any = None) -> Dict[str, Any]:
+        """
+        Compute the report as of a date and store it.
+
+        The report always replaces that date's rows in run_monitor_history;
+        run_monitor is replaced as well when the as-of date is the latest runs date,
+        and its CUSIPs missing from the latest universe date are recorded as unmatched.
+
+        Args:
+            conn: Connection holding the caller's write transaction
+            as_of_date: Date or 'YYYY-MM-DD' string (None for the latest runs date)
+
+        Returns:
+            Dictionary with the as-of date, resolved period dates, rows written
+            and unmatched CUSIPs
+
+        Raises:
+            ValueError: If there are no runs on or before as_of_date
+        """
+        as_of = self.resolve_as_of(conn, as_of_date)
+        if as_of is None:
+            raise ValueError(f"No runs on or before {as_of_date or 'today'} in {self.SOURCE_TABLE}")
+
+        self.ensure_tables(conn)
+        periods = self.resolve_periods(conn, as_of)
+        as_of_key = self._to_datetime(as_of).strftime('%Y-%m-%d')
+        computed_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        params = {_period_param(period): periods[period] for period in PERIODS}
+        params.update({
+            'as_of': as_of,
+            'as_of_key': as_of_key,
+            'min_size': self.min_size_threshold,
+            'computed_timestamp': computed_timestamp
+        })
+
+        report_columns = ", ".join(f'"{column}"' for column in REPORT_COLUMNS)
+        conn.execute(f"DELETE FROM {self.HISTORY_TABLE} WHERE as_of_date = ?", (as_of_key,))
+        conn.execute(f"""
+            INSERT INTO {self.HISTORY_TABLE} (as_of_date, {report_columns}, computed_timestamp)
+            SELECT :as_of_key, report.*, :computed_timestamp FROM ({_report_sql()}) AS report
+        """, params)
+        rows_written = conn.execute(
+            f"SELECT COUNT(*) FROM {self.HISTORY_TABLE} WHERE as_of_date = ?", (as_of_key,)
+        ).fetchone()[0]
+
+        latest = conn.execute(f"SELECT MAX(date) FROM {self.SOURCE_TABLE}").fetchone()[0]
+        current_updated = as_of == latest
+        unmatched_cusips = 0
+        if current_updated:
+            unmatched_cusips = self._write_current(conn, as_of_key)
+
+        result = {
+            'as_of_date': as_of_key,
+            'period_dates': periods,
+            'rows_written': rows_written,
+            'current_updated': current_updated,
+            'unmatched_cusips': unmatched_cusips
+        }
+        self._log_event("Run monitor computed in database", result)
+        return result
+
+    def _write_current(self, conn: sqlite3.Connection, as_of_key: str) -> int:
+        """
+        Replace run_monitor with an as-of date's report, matched against the latest universe date.
+
+        Unmatched CUSIPs are added to the unmatched CUSIP tables.
+
+        Returns:
+            Number of unmatched CUSIPs
+        """
+        report_columns = ", ".join(f'"{column}"' for column in REPORT_COLUMNS)
+        history_columns = ", ".join(f'r."{column}"' for column in REPORT_COLUMNS)
+        conn.execute(f"DELETE FROM {self.CURRENT_TABLE}")
+        conn.execute(f"""
+            INSERT INTO {self.CURRENT_TABLE} (
+                {report_columns}, universe_match_status, universe_match_date, source_file, loaded_timestamp
+            )
+            SELECT {history_columns},
+                   CASE WHEN u.cusip_standardized IS NOT NULL THEN 'matched' ELSE 'unmatched' END,
+                   DATE('now', 'localtime'), :source_table, r.computed_timestamp
+            FROM {self.HISTORY_TABLE} r
+            LEFT JOIN (
+                SELECT DISTINCT cusip_standardized FROM {self.UNIVERSE_TABLE}
+                WHERE date = (SELECT MAX(date) FROM {self.UNIVERSE_TABLE})
+            ) u ON u.cusip_standardized = r.cusip_standardized
+            WHERE r.as_of_date = :as_of_key
+        """, {'source_table': self.SOURCE_TABLE, 'as_of_key': as_of_key})
+
+        # Recomputing a date replaces the unmatched rows recorded for it
+        params = {'source_table': self.CURRENT_TABLE, 'source_file': self.SOURCE_TABLE, 'as_of_key': as_of_key}
+        conn.execute("""
+            DELETE FROM unmatched_cusips_all_dates WHERE source_table = :source_table AND date = :as_of_key
+        """, params)
+        unmatched = conn.execute(f"""
+            INSERT INTO unmatched_cusips_all_dates (
+                source_table, date, cusip_original, cusip_standardized, security_name,
+                universe_match_attempted_date, source_file
+            )
+            SELECT :source_table, :as_of_key, COALESCE("CUSIP", ''), cusip_standardized, COALESCE("Security", ''),
+                   DATE('now', 'localtime'), :source_file
+            FROM {self.CURRENT_TABLE}
+            WHERE universe_match_status = 'unmatched'
+        """, params).rowcount
+        conn.execute(f"""
+            INSERT OR REPLACE INTO unmatched_cusips_last_date (
+                source_table, cusip_original, cusip_standardized, security_name,
+                universe_match_attempted_date, source_file
+            )
+            SELECT :source_table, COALESCE("CUSIP", ''), cusip_standardized, COALESCE("Security", ''),
+                   DATE('now', 'localtime'), :source_file
+            FROM {self.CURRENT_TABLE}
+            WHERE universe_match_status = 'unmatched'
+        """, params)
+        return unmatched
+
+    def _latest_date_on_or_before(self, conn: sqlite3.Connection, day: datetime) -> Optional[str]:
+        """Index-backed MAX(date) over runs dates up to the end of ``day``"""
+        next_day = (day + timedelta(days=1)).strftime('%Y-%m-%d')
+        return conn.execute(
+            f"SELECT MAX(date) FROM {self.SOURCE_TABLE} WHERE date < ?", (next_day,)
+        ).fetchone()[0]
+
+    @staticmethod
+    def _to_datetime(value: Any) -> datetime:
+        """Parse a stored or user-supplied date to a midnight datetime"""
+        if isinstance(value, datetime):
+            parsed = value
+        elif hasattr(value, 'year'):
+            parsed = datetime(value.year, value.month, value.day)
+        else:
+            parsed = datetime.fromisoformat(str(value)[:10])
+        return datetime(parsed.year, parsed.month, parsed.day)
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log run monitor event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("run_monitor_engine", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,371 @@
+"""
+Per-Year History Shards
+
+Moves the cold years of the historical fact tables out of the main
+database into one SQLite file per year, so VACUUM, backups and full
+rewrites of the main (current) database stop growing with total history.
+
+- Layout: ``<db dir>/<db stem>_shards/<db stem>_<year>.db`` holds every
+  historical table's rows for that year, with the same table and index
+  definitions as the main database. ``shard_registry`` in the main
+  database lists the shards.
+- Reads: ``attach()`` attaches each shard and creates a TEMP view per
+  table with the table's own name, a ``UNION ALL`` of the main table and
+  the shards. TEMP objects take precedence over main for unqualified
+  names, so existing queries see the full history; views and triggers
+  stored in the main database keep resolving to the main tables.
+- Routing: every shard branch carries its year's date range, so a query
+  with a date predicate costs one empty index probe per other shard.
+- Writes: loads write ``main.<table>``; staged merges route rows for a
+  sealed year into that year's shard (``merge_routes``).
+
+SQLite attaches at most 10 databases per connection by default, and the
+staging area takes one of them, so keep the number of shards below nine.
+"""
+
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+SHARD_REGISTRY_TABLE = """
+    CREATE TABLE IF NOT EXISTS shard_registry (
+        year INTEGER PRIMARY KEY,
+        path TEXT NOT NULL,
+        first_date TEXT,
+        last_date TEXT,
+        row_count INTEGER NOT NULL DEFAULT 0,
+        modified_timestamp TIMESTAMP,
+        backup_timestamp TIMESTAMP
+    )
+"""
+
+_CREATE_TABLE_PATTERN = re.compile(r'^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?', re.IGNORECASE)
+_CREATE_INDEX_PATTERN = re.compile(
+    r'^\s*CREATE\s+(UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?', re.IGNORECASE
+)
+
+
+class ShardManager:
+    """
+    Creates, attaches and maintains per-year shards of the historical tables.
+
+    Methods that move rows issue plain DML and never commit; ``attach`` and
+    ``seal_years`` attach databases, which SQLite only allows outside a
+    transaction.
+    """
+
+    SHARD_TABLES = ('universe_historical', 'portfolio_historical', 'combined_runs_historical')
+    DATE_COLUMN = 'date'
+
+    def __init__(self, database_path: str, logger=None, shard_dir: Optional[str] = None):
+        """
+        Initialize shard manager.
+
+        Args:
+            database_path: Path to the main SQLite database
+            logger: Optional DatabaseLogger instance
+            shard_dir: Directory for shard files (default: ``<db stem>_shards`` beside the database)
+        """
+        self.database_path = Path(database_path)
+        self.shard_dir = Path(shard_dir) if shard_dir else (
+            self.database_path.parent / f"{self.database_path.stem}_shards"
+        )
+        self.logger = logger
+
+    def shard_path(self, year: int) -> Path:
+        """File holding one year's shard."""
+        return self.shard_dir / f"{self.database_path.stem}_{year}.db"
+
+    @staticmethod
+    def schema_name(year: int) -> str:
+        """Schema name a shard is attached under."""
+        return f"shard_{int(year)}"
+
+    def registered_shards(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """Return the registered shards, oldest first (empty if the database is not sharded)."""
+        if not conn.execute(
+                "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'shard_registry'").fetchone():
+            return []
+        columns = ['year', 'path', 'first_date', 'last_date', 'row_count',
+                   'modified_timestamp', 'backup_timestamp']
+        return [dict(zip(columns, row)) for row in conn.execute(
+            f"SELECT {', '.join(columns)} FROM main.shard_registry ORDER BY year"
+        )]
+
+    def is_sharded(self, conn: sqlite3.Connection) -> bool:
+        """Return True if any year has been moved to a shard."""
+        return bool(self.registered_shards(conn))
+
+    def attach(self, conn: sqlite3.Connection, read_only: bool = False) -> List[int]:
+        """
+        Attach every registered shard and (re)create the union views.
+
+        Cheap when the shards are already attached, so callers can run it
+        on every connect.
+
+        Args:
+            conn: Connection to attach the shards to (outside a transaction)
+            read_only: Attach through ``mode=ro`` URIs (the connection must use ``uri=True``)
+
+        Returns:
+            Years attached by this call
+        """
+        shards = self.registered_shards(conn)
+        if not shards:
+            return []
+
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        newly_attached = []
+        for shard in shards:
+            schema = self.schema_name(shard['year'])
+            if schema in attached:
+                continue
+            path = Path(shard['path'])
+            if not path.exists():
+                raise FileNotFoundError(f"Shard for {shard['year']} not found: {path}")
+            target = f"file:{path.as_posix()}?mode=ro" if read_only else str(path)
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (target,))
+            newly_attached.append(shard['year'])
+
+        if newly_attached:
+            self._create_union_views(conn, [shard['year'] for shard in shards])
+            self._log_event("Shards attached", {'years': newly_attached})
+        return newly_attached
+
+    def seal_years(self, conn: sqlite3.Connection, before_year: Optional[int] = None) -> Dict[int, Dict[str, int]]:
+        """
+        Move every year before ``before_year`` from the main tables into per-year shards.
+
+        Rows for a year that already has a shard are merged into it, so the
+        call can be repeated after back-filled history lands in the main tables.
+
+        Args:
+            conn: Main database connection (outside a transaction)
+            before_year: First year kept in the main database
+                         (default: the year of the latest stored date)
+
+        Returns:
+            Rows moved per year and table
+        """
+        tables = [table for table in self.SHARD_TABLES if self._main_columns(conn, table)]
+        if before_year is None:
+            latest = max((conn.execute(f"SELECT MAX({self.DATE_COLUMN}) FROM main.{table}").fetchone()[0] or ''
+                          for table in tables), default='')
+            if not latest:
+                return {}
+            before_year = int(latest[:4])
+
+        years = sorted({
+            int(row[0]) for table in tables for row in conn.execute(
+                f"SELECT DISTINCT substr({self.DATE_COLUMN}, 1, 4) FROM main.{table} "
+                f"WHERE {self.DATE_COLUMN} < ?", (f"{before_year:04d}-01-01",)
+            ) if row[0] and str(row[0]).isdigit()
+        })
+        if not years:
+            return {}
+
+        conn.execute(SHARD_REGISTRY_TABLE)
+        conn.commit()
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        for year in years:
+            if self.schema_name(year) not in attached:
+                conn.execute(f"ATTACH DATABASE ? AS {self.schema_name(year)}", (str(self.shard_path(year)),))
+
+        moved = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for year in years:
+                moved[year] = {table: self._move_year(conn, table, year) for table in tables}
+                self._register(conn, year, tables)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        self._create_union_views(conn, [shard['year'] for shard in self.registered_shards(conn)])
+        self._log_event("History sealed into shards", {'rows_moved': moved, 'before_year': before_year})
+        return moved
+
+    def merge_routes(self, conn: sqlite3.Connection, table_name: str,
+                     date_expression: str) -> List[Tuple[str, str]]:
+        """
+        Split a staged merge between the shards and the main database.
+
+        Args:
+            conn: Connection with the shards attached
+            table_name: Live table being merged into
+            date_expression: SQL expression for a staged row's date
+
+        Returns:
+            (schema, filter) pairs covering every staged row once, or an empty
+            list when the table is not sharded
+        """
+        if table_name not in self.SHARD_TABLES:
+            return []
+        years = [shard['year'] for shard in self.registered_shards(conn)]
+        if not years:
+            return []
+
+        year_sql = f"substr({date_expression}, 1, 4)"
+        routes = [(self.schema_name(year), f"{year_sql} = '{year:04d}'") for year in years]
+        sealed = ", ".join(f"'{year:04d}'" for year in years)
+        routes.append(('main', f"COALESCE({year_sql} NOT IN ({sealed}), 1)"))
+        return routes
+
+    def sync_columns(self, conn: sqlite3.Connection, table_name: str):
+        """Add columns new in a main table to its shards and rebuild the union views."""
+        shards = self.registered_shards(conn)
+        if table_name not in self.SHARD_TABLES or not shards:
+            return
+        for shard in shards:
+            schema = self.schema_name(shard['year'])
+            if self._table_exists(conn, schema, table_name):
+                self._ensure_shard_table(conn, schema, table_name)
+        self._create_union_views(conn, [shard['year'] for shard in shards])
+
+    def clear(self, conn: sqlite3.Connection, table_name: str):
+        """Delete a table's rows from every attached shard (full refresh)."""
+        if table_name not in self.SHARD_TABLES:
+            return
+        for shard in self.registered_shards(conn):
+            conn.execute(f"DELETE FROM {self.schema_name(shard['year'])}.{table_name}")
+            conn.execute(
+                "UPDATE main.shard_registry SET modified_timestamp = ? WHERE year = ?",
+                (self._now(), shard['year'])
+            )
+
+    def vacuum(self, conn: sqlite3.Connection, year: Optional[int] = None):
+        """
+        VACUUM one attached shard, or the main database when ``year`` is None.
+
+        VACUUM replays the stored index definitions with unqualified table
+        names, which the TEMP union views would capture, so the views are
+        dropped for the duration and recreated afterwards.
+        """
+        shards = self.registered_shards(conn)
+        if year is not None and year not in {shard['year'] for shard in shards}:
+            raise ValueError(f"No shard registered for {year}")
+        for table_name in self.SHARD_TABLES:
+            conn.execute(f"DROP VIEW IF EXISTS temp.{table_name}")
+        try:
+            conn.execute(f"VACUUM {'main' if year is None else self.schema_name(year)}")
+        finally:
+            if shards:
+                self._create_union_views(conn, [shard['year'] for shard in shards])
+        self._log_event("Database vacuumed", {'year': year})
+
+    def shards_needing_backup(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        """Shards changed since their last backup (sealed shards are backed up once)."""
+        return [
+            shard for shard in self.registered_shards(conn)
+            if not shard['backup_timestamp'] or (shard['modified_timestamp'] or '') > shard['backup_timestamp']
+        ]
+
+    def mark_backed_up(self, conn: sqlite3.Connection, year: int):
+        """Record a shard backup."""
+        conn.execute("UPDATE main.shard_registry SET backup_timestamp = ? WHERE year = ?", (self._now(), year))
+
+    def _move_year(self, conn: sqlite3.Connection, table_name: str, year: int) -> int:
+        """Copy one year of a main table into its shard and delete it from main"""
+        schema = self.schema_name(year)
+        self._ensure_shard_table(conn, schema, table_name)
+
+        columns = ", ".join(f'"{column}"' for column in self._main_columns(conn, table_name))
+        year_filter = f"{self.DATE_COLUMN} >= ? AND {self.DATE_COLUMN} < ?"
+        bounds = (f"{year:04d}-01-01", f"{year + 1:04d}-01-01")
+        conn.execute(f"""
+            INSERT OR REPLACE INTO {schema}.{table_name} ({columns})
+            SELECT {columns} FROM main.{table_name} WHERE {year_filter}
+        """, bounds)
+        return conn.execute(f"DELETE FROM main.{table_name} WHERE {year_filter}", bounds).rowcount
+
+    def _ensure_shard_table(self, conn: sqlite3.Connection, schema: str, table_name: str):
+        """Create a table and its indexes in a shard from the main definitions, adding new columns"""
+        table_sql = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).fetchone()[0]
+        conn.execute(_CREATE_TABLE_PATTERN.sub(f"CREATE TABLE IF NOT EXISTS {schema}.", table_sql, count=1))
+
+        shard_columns = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table_name})")}
+        for row in conn.execute(f"PRAGMA main.table_info({table_name})").fetchall():
+            if row[1] not in shard_columns:
+                conn.execute(f'ALTER TABLE {schema}.{table_name} ADD COLUMN "{row[1]}" {row[2]}')
+
+        for (index_sql,) in conn.execute(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                (table_name,)).fetchall():
+            conn.execute(_CREATE_INDEX_PATTERN.sub(
+                lambda match: f"CREATE {match.group(1) or ''}INDEX IF NOT EXISTS {schema}.", index_sql, count=1
+            ))
+
+    def _register(self, conn: sqlite3.Connection, year: int, tables: List[str]):
+        """Record a shard's date range and row count in the registry"""
+        schema = self.schema_name(year)
+        stats = [conn.execute(
+            f"SELECT MIN({self.DATE_COLUMN}), MAX({self.DATE_COLUMN}), COUNT(*) FROM {schema}.{table}"
+        ).fetchone() for table in tables if self._table_exists(conn, schema, table)]
+        conn.execute("""
+            INSERT INTO main.shard_registry (year, path, first_date, last_date, row_count, modified_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (year) DO UPDATE SET
+                path = excluded.path, first_date = excluded.first_date, last_date = excluded.last_date,
+                row_count = excluded.row_count, modified_timestamp = excluded.modified_timestamp
+        """, (
+            year, str(self.shard_path(year)),
+            min((row[0] for row in stats if row[0]), default=None),
+            max((row[1] for row in stats if row[1]), default=None),
+            sum(row[2] for row in stats), self._now()
+        ))
+
+    def _create_union_views(self, conn: sqlite3.Connection, years: List[int]):
+        """(Re)create the TEMP union view of each sharded table"""
+        for table_name in self.SHARD_TABLES:
+            columns = self._main_columns(conn, table_name)
+            if not columns:
+                continue
+            column_sql = ", ".join(f'"{column}"' for column in columns)
+            branches = [f"SELECT {column_sql} FROM main.{table_name}"]
+            for year in years:
+                schema = self.schema_name(year)
+                if not self._table_exists(conn, schema, table_name):
+                    continue
+                # Columns added to main after a year was sealed read as NULL
+                shard_columns = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table_name})")}
+                shard_column_sql = ", ".join(
+                    f'"{column}"' if column in shard_columns else f'NULL AS "{column}"' for column in columns
+                )
+                branches.append(
+                    f"SELECT {shard_column_sql} FROM {schema}.{table_name} "
+                    f"WHERE {self.DATE_COLUMN} >= '{year:04d}-01-01' AND {self.DATE_COLUMN} < '{year + 1:04d}-01-01'"
+                )
+            conn.execute(f"DROP VIEW IF EXISTS temp.{table_name}")
+            conn.execute(f"CREATE TEMP VIEW {table_name} AS " + " UNION ALL ".join(branches))
+
+    @staticmethod
+    def _main_columns(conn: sqlite3.Connection, table_name: str) -> List[str]:
+        """Column names of a main-database table (empty if it does not exist)"""
+        return [row[1] for row in conn.execute(f"PRAGMA main.table_info({table_name})")]
+
+    @staticmethod
+    def _table_exists(conn: sqlite3.Connection, schema: str, table_name: str) -> bool:
+        """Check whether a table exists in an attached schema"""
+        return conn.execute(
+            f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).fetchone() is not None
+
+    @staticmethod
+    def _now() -> str:
+        """Current local timestamp in the format SQLite stores"""
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log shard event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("shards", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,287 @@
+"""
+Read-Only Analyst Snapshots
+
+Exports a compacted, self-contained copy of the database for analysts
+with ``VACUUM INTO``, so they query a local file instead of copying the
+live database by hand and contending with the loads.
+
+- The copy is taken through the exporter's own read-only connection: one
+  read transaction, so the writer keeps committing to the WAL meanwhile.
+- The snapshot is written with a large page size and rollback journal,
+  then marked read-only on disk; ``open_snapshot`` applies the read-side
+  PRAGMAs (``query_only``, ``mmap_size``, cache), which SQLite does not
+  persist in the file.
+- Optional table and date filters slim the copy down, and sealed history
+  shards are folded back into their tables so the snapshot is complete.
+- A JSON manifest next to the snapshot records the source, filters, page
+  size and per-table row counts and date ranges.
+"""
+
+import json
+import os
+import stat
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from db.database.staging import quote_identifier
+from db.database.compact_storage import CompactStorage, DIMENSION_TABLES, julian_day_sql
+
+
+# Connection settings for read-heavy use of a snapshot (not persisted by SQLite)
+READ_PRAGMAS = {
+    'query_only': 1,
+    'mmap_size': 1024 * 1024 * 1024,
+    'cache_size': -256 * 1024,
+    'temp_store': 2
+}
+
+
+def manifest_path(snapshot_path: str) -> Path:
+    """Return the manifest file written alongside a snapshot."""
+    snapshot_file = Path(snapshot_path)
+    return snapshot_file.with_name(snapshot_file.name + '.manifest.json')
+
+
+def open_snapshot(snapshot_path: str) -> sqlite3.Connection:
+    """
+    Open a snapshot read-only with the read-heavy PRAGMAs applied.
+
+    Args:
+        snapshot_path: Snapshot file written by ``SnapshotExporter.export``
+
+    Returns:
+        Read-only SQLite connection
+    """
+    conn = sqlite3.connect(f"file:{Path(snapshot_path).as_posix()}?mode=ro", uri=True)
+    for pragma, value in READ_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+
+class SnapshotExporter:
+    """
+    Writes read-only analytics snapshots of a SQLite database.
+
+    The live database is only read, once, by ``VACUUM INTO``; filtering,
+    shard folding and the final compaction run against the new file.
+    """
+
+    def __init__(self, database_path: str, page_size: int = 65536, logger=None):
+        """
+        Initialize snapshot exporter.
+
+        Args:
+            database_path: Path to the live SQLite database
+            page_size: Page size of the snapshot file (larger pages suit scans)
+            logger: Optional DatabaseLogger instance
+        """
+        self.database_path = Path(database_path)
+        self.page_size = page_size
+        self.logger = logger
+
+    def export(self, snapshot_path: str, tables: Optional[Sequence[str]] = None,
+               start_date: Optional[str] = None, end_date: Optional[str] = None,
+               shards: Optional[Sequence[Tuple[int, str]]] = None) -> Dict[str, Any]:
+        """
+        Write a snapshot and its manifest.
+
+        Args:
+            snapshot_path: Destination file (replaced if it exists)
+            tables: Tables to keep (None keeps every table); views over dropped
+                    tables are dropped with them
+            start_date: Drop rows dated before this day (YYYY-MM-DD)
+            end_date: Drop rows dated after this day (YYYY-MM-DD)
+            shards: (year, path) of history shards to fold back into their tables
+
+        Returns:
+            The manifest written next to the snapshot
+        """
+        if not self.database_path.exists():
+            raise FileNotFoundError(f"Database file not found: {self.database_path}")
+        for bound in (start_date, end_date):
+            if bound:
+                datetime.strptime(bound, '%Y-%m-%d')  # ValueError on anything but YYYY-MM-DD
+
+        snapshot_file = Path(snapshot_path)
+        snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        partial_file = snapshot_file.with_name(snapshot_file.name + '.partial')
+        for stale in (partial_file, snapshot_file):
+            self._remove(stale)
+
+        start_time = time.time()
+        source = sqlite3.connect(
+            f"file:{self.database_path.as_posix()}?mode=ro", uri=True, isolation_level=None
+        )
+        try:
+            # page_size set on the source connection applies to the VACUUM INTO target
+            source.execute(f"PRAGMA page_size = {int(self.page_size)}")
+            source.execute("VACUUM INTO ?", (str(partial_file),))
+        finally:
+            source.close()
+        copy_seconds = time.time() - start_time
+
+        shards = [(year, path) for year, path in (shards or []) if self._year_in_range(year, start_date, end_date)]
+        filtered = bool(tables) or bool(start_date) or bool(end_date) or bool(shards)
+        snapshot = sqlite3.connect(str(partial_file), isolation_level=None)
+        try:
+            snapshot.execute("PRAGMA journal_mode = DELETE")
+            if filtered:
+                self._slim(snapshot, tables, start_date, end_date, shards)
+            table_stats = self._table_stats(snapshot)
+            page_size = snapshot.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            snapshot.close()
+
+        partial_file.replace(snapshot_file)
+        os.chmod(snapshot_file, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+
+        manifest = {
+            'snapshot_path': str(snapshot_file),
+            'source_database': str(self.database_path),
+            'created_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'filters': {
+                'tables': list(tables) if tables else None,
+                'start_date': start_date,
+                'end_date': end_date
+            },
+            'shards_included': [year for year, _ in shards],
+            'page_size': page_size,
+            'read_pragmas': READ_PRAGMAS,
+            'size_mb': round(snapshot_file.stat().st_size / (1024 * 1024), 2),
+            'copy_seconds': round(copy_seconds, 3),
+            'duration_seconds': round(time.time() - start_time, 3),
+            'tables': table_stats
+        }
+        with open(manifest_path(str(snapshot_file)), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        self._log_event("Snapshot exported", {
+            'snapshot_path': manifest['snapshot_path'],
+            'size_mb': manifest['size_mb'],
+            'duration_seconds': manifest['duration_seconds'],
+            'filters': manifest['filters']
+        })
+        return manifest
+
+    def _slim(self, conn: sqlite3.Connection, tables: Optional[Sequence[str]], start_date: Optional[str],
+              end_date: Optional[str], shards: List[Tuple[int, str]]):
+        """Fold in shards, drop unwanted tables and rows, then compact the snapshot file"""
+        # A read-only copy needs no write-maintenance triggers, and they would fire on the deletes below
+        for (trigger,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+            conn.execute(f"DROP TRIGGER {quote_identifier(trigger)}")
+
+        for _, path in shards:
+            conn.execute("ATTACH DATABASE ? AS shard", (str(path),))
+            try:
+                conn.execute("BEGIN")
+                for (table,) in conn.execute("SELECT name FROM shard.sqlite_master WHERE type = 'table'").fetchall():
+                    columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({quote_identifier(table)})")]
+                    shard_columns = {row[1] for row in conn.execute(f"PRAGMA shard.table_info({quote_identifier(table)})")}
+                    column_sql = ", ".join(quote_identifier(column) for column in columns if column in shard_columns)
+                    if column_sql:
+                        conn.execute(
+                            f"INSERT OR IGNORE INTO main.{quote_identifier(table)} ({column_sql}) "
+                            f"SELECT {column_sql} FROM shard.{quote_identifier(table)}"
+                        )
+                conn.commit()
+            finally:
+                conn.execute("DETACH DATABASE shard")
+
+        conn.execute("BEGIN")
+        conn.execute("DROP TABLE IF EXISTS shard_registry")
+
+        existing = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        if tables:
+            kept = self._kept_tables(tables)
+            for table in existing:
+                if table not in kept:
+                    conn.execute(f"DROP TABLE {quote_identifier(table)}")
+            existing = [table for table in existing if table in kept]
+
+        if start_date or end_date:
+            for table in existing:
+                date_filter = self._outside_range_sql(conn, table, start_date, end_date)
+                if date_filter:
+                    conn.execute(f"DELETE FROM {quote_identifier(table)} WHERE {date_filter}")
+        conn.commit()
+
+        # Views over dropped tables no longer compile
+        for (view,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'").fetchall():
+            try:
+                conn.execute(f"SELECT * FROM {quote_identifier(view)} LIMIT 0").fetchall()
+            except sqlite3.OperationalError:
+                conn.execute(f"DROP VIEW {quote_identifier(view)}")
+
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+
+    @staticmethod
+    def _kept_tables(tables: Sequence[str]) -> set:
+        """Requested tables plus the fact and dimension tables backing compacted ones"""
+        kept = set(tables)
+        compacted = [table for table in tables if table in CompactStorage.COMPACT_TABLES]
+        if compacted:
+            kept.update(CompactStorage.fact_table(table) for table in compacted)
+            kept.update(DIMENSION_TABLES)
+        return kept
+
+    @staticmethod
+    def _outside_range_sql(conn: sqlite3.Connection, table: str, start_date: Optional[str],
+                           end_date: Optional[str]) -> Optional[str]:
+        """WHERE clause matching a table's rows outside the date range (None if it has no date)"""
+        columns = {row[1].lower(): row[1] for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})")}
+        conditions = []
+        if 'date' in columns:
+            column = quote_identifier(columns['date'])
+            if start_date:
+                conditions.append(f"{column} < '{start_date}'")
+            if end_date:
+                conditions.append(f"{column} >= date('{end_date}', '+1 day')")
+        elif 'date_jd' in columns:
+            if start_date:
+                conditions.append("date_jd < " + julian_day_sql(f"'{start_date}'"))
+            if end_date:
+                conditions.append("date_jd > " + julian_day_sql(f"'{end_date}'"))
+        return " OR ".join(conditions) or None
+
+    @staticmethod
+    def _year_in_range(year: int, start_date: Optional[str], end_date: Optional[str]) -> bool:
+        """Check whether a shard's year overlaps the date range"""
+        return (not start_date or year >= int(start_date[:4])) and (not end_date or year <= int(end_date[:4]))
+
+    @staticmethod
+    def _table_stats(conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+        """Row count and date range of every table in the snapshot"""
+        stats = {}
+        for (table,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall():
+            columns = {row[1].lower(): row[1] for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})")}
+            table_sql = quote_identifier(table)
+            if 'date' in columns:
+                column = quote_identifier(columns['date'])
+                row = conn.execute(f"SELECT COUNT(*), MIN({column}), MAX({column}) FROM {table_sql}").fetchone()
+            else:
+                row = conn.execute(f"SELECT COUNT(*), NULL, NULL FROM {table_sql}").fetchone()
+            stats[table] = {'rows': row[0], 'first_date': row[1], 'last_date': row[2]}
+        return stats
+
+    @staticmethod
+    def _remove(path: Path):
+        """Delete a file, clearing the read-only flag a previous snapshot left on it"""
+        if path.exists():
+            os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+            path.unlink()
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log snapshot event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("snapshot", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,288 @@
+"""
+Staging Area for Set-Based Loads
+
+Bulk-inserts DataFrames into a scratch database attached to the live
+connection (in-memory by default, or an anonymous temp file), where the
+staging tables carry no indexes or constraints. Staged rows are then
+merged into the live tables with a single ``INSERT ... SELECT`` /
+``UPSERT ... ON CONFLICT`` statement, so the target table's write lock
+is only held for the short merge and SQLite does the row work instead
+of Python loops.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Sequence
+
+import pandas as pd
+
+
+def quote_identifier(name: str) -> str:
+    """Quote an SQLite identifier (handles spaces, parentheses and quotes)."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def frame_to_records(df: pd.DataFrame) -> List[tuple]:
+    """
+    Convert a DataFrame into SQLite-bindable row tuples column-wise.
+
+    Datetime columns are rendered as ``YYYY-MM-DD HH:MM:SS`` strings (the
+    same format ``str(pd.Timestamp)`` produced in the row-by-row loaders),
+    numpy scalars become Python scalars and NaN/NaT become NULL.
+    """
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+        columns.append(series.astype(object).where(series.notna(), None).tolist())
+    return list(zip(*columns))
+
+
+class StagingArea:
+    """
+    Scratch database attached to a live SQLite connection.
+
+    Usage:
+        with StagingArea(conn) as staging:
+            staging.stage_dataframe('universe_stage', df)
+            with staging.write_transaction():
+                staging.merge('universe_historical', 'universe_stage',
+                              columns=[...], conflict_columns=[...])
+    """
+
+    def __init__(self, connection: sqlite3.Connection, schema_name: str = 'staging',
+                 location: str = ':memory:', logger=None, query_log=None):
+        """
+        Initialize staging area.
+
+        Args:
+            connection: Live SQLite connection the staging database is attached to
+            schema_name: Schema name used for the attached database
+            location: ':memory:' for an in-memory database, '' for an anonymous temp file
+            logger: Optional DatabaseLogger instance
+            query_log: Optional SlowQueryLog timing the statements run through execute()
+        """
+        self.connection = connection
+        self.schema_name = schema_name
+        self.location = location
+        self.logger = logger
+        self.query_log = query_log
+        self._attached = False
+        self._staged_tables: Dict[str, int] = {}
+
+    def __enter__(self) -> 'StagingArea':
+        self.attach()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.detach()
+        return False
+
+    def attach(self):
+        """Attach the staging database (ATTACH is not allowed inside a transaction)."""
+        if self._attached:
+            return
+        if self.connection.in_transaction:
+            self.connection.commit()
+        self.connection.execute(f"ATTACH DATABASE ? AS {quote_identifier(self.schema_name)}",
+                                (self.location,))
+        # Scratch data never needs durability
+        self.connection.execute(f"PRAGMA {quote_identifier(self.schema_name)}.journal_mode = OFF")
+        self.connection.execute(f"PRAGMA {quote_identifier(self.schema_name)}.synchronous = OFF")
+        self._attached = True
+        self._log_event("Staging database attached", {'location': self.location or 'temp_file'})
+
+    def detach(self):
+        """Detach the staging database, discarding all staged rows."""
+        if not self._attached:
+            return
+        if self.connection.in_transaction:
+            self.connection.rollback()
+        self.connection.execute(f"DETACH DATABASE {quote_identifier(self.schema_name)}")
+        self._attached = False
+        self._staged_tables.clear()
+
+    def execute(self, sql: str, params: Any = ()) -> sqlite3.Cursor:
+        """Run a statement over live and staged tables, timed by the slow-query log when one is set."""
+        if self.query_log is None:
+            return self.connection.execute(sql, params)
+        return self.query_log.execute(self.connection, sql, params, source='staging')
+
+    def qualified(self, table_name: str) -> str:
+        """Return the schema-qualified name of a staging table."""
+        return f"{quote_identifier(self.schema_name)}.{quote_identifier(table_name)}"
+
+    def stage_dataframe(self, table_name: str, df: pd.DataFrame, batch_size: int = 1000,
+                        append: bool = False) -> int:
+        """
+        Bulk-insert a DataFrame into an unindexed, unconstrained staging table.
+
+        The table is recreated with one untyped column per DataFrame column,
+        unless ``append`` is set and the table was already staged (used when
+        streaming a source batch by batch). Only the staging database is
+        locked while rows are inserted.
+
+        Args:
+            table_name: Staging table name
+            df: Rows to stage (column names become staging column names)
+            batch_size: Rows per executemany call
+            append: Append to an existing staging table instead of recreating it
+
+        Returns:
+            Number of rows staged by this call
+        """
+        target = self.qualified(table_name)
+        column_sql = ", ".join(quote_identifier(col) for col in df.columns)
+        placeholders = ", ".join("?" for _ in df.columns)
+
+        if not (append and table_name in self._staged_tables):
+            self.connection.execute(f"DROP TABLE IF EXISTS {target}")
+            self.connection.execute(f"CREATE TABLE {target} ({column_sql})")
+            self._staged_tables[table_name] = 0
+
+        insert_sql = f"INSERT INTO {target} ({column_sql}) VALUES ({placeholders})"
+        staged = 0
+        if self.connection.in_transaction:
+            self.connection.commit()
+        try:
+            self.connection.execute("BEGIN")
+            for start_idx in range(0, len(df), batch_size):
+                records = frame_to_records(df.iloc[start_idx:start_idx + batch_size])
+                self.connection.executemany(insert_sql, records)
+                staged += len(records)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+        self._staged_tables[table_name] += staged
+        self._log_event("Rows staged", {'staging_table': table_name, 'rows': staged})
+        return staged
+
+    def staged_row_count(self, table_name: str) -> int:
+        """Return the number of rows staged into a table so far."""
+        return self._staged_tables.get(table_name, 0)
+
+    def drop(self, table_name: str):
+        """Drop a staging table to release its space early."""
+        if self.connection.in_transaction:
+            self.connection.commit()
+        self.connection.execute(f"DROP TABLE IF EXISTS {self.qualified(table_name)}")
+        self._staged_tables.pop(table_name, None)
+
+    def stage_query(self, table_name: str, select_sql: str, params: tuple = (),
+                    index_columns: Optional[Sequence[str]] = None) -> int:
+        """
+        Materialise a query result (typically a lookup set) into the staging database.
+
+        Args:
+            table_name: Staging table name
+            select_sql: SELECT statement evaluated against the live database
+            params: Query parameters
+            index_columns: Optional columns to index (lookup tables only)
+
+        Returns:
+            Number of rows materialised
+        """
+        target = self.qualified(table_name)
+        self.connection.execute(f"DROP TABLE IF EXISTS {target}")
+        self.execute(f"CREATE TABLE {target} AS {select_sql}", params)
+        if index_columns:
+            index_name = quote_identifier(f"idx_{table_name}")
+            columns_sql = ", ".join(quote_identifier(col) for col in index_columns)
+            self.connection.execute(
+                f"CREATE INDEX {quote_identifier(self.schema_name)}.{index_name} "
+                f"ON {quote_identifier(table_name)} ({columns_sql})"
+            )
+        self.connection.commit()
+        count = self.connection.execute(f"SELECT COUNT(*) FROM {target}").fetchone()[0]
+        self._staged_tables[table_name] = count
+        return count
+
+    @contextmanager
+    def write_transaction(self):
+        """
+        Hold the live database write lock for the duration of the block.
+
+        Uses BEGIN IMMEDIATE so the lock is taken up front and the merge
+        cannot fail half-way through on a busy database.
+        """
+        if self.connection.in_transaction:
+            self.connection.commit()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+
+    def merge(self, target_table: str, staged_table: str, columns: Sequence[str],
+              select_expressions: Optional[Sequence[str]] = None,
+              conflict_columns: Optional[Sequence[str]] = None,
+              update_columns: Optional[Sequence[str]] = None,
+              where_sql: Optional[str] = None, params: tuple = (),
+              or_replace: bool = False, target_schema: str = 'main') -> int:
+        """
+        Merge staged rows into a live table with one set-based statement.
+
+        Args:
+            target_table: Live table name
+            staged_table: Staging table name (aliased as ``s`` in expressions)
+            columns: Target columns to populate
+            select_expressions: SQL expression per target column (default: same-named staged column)
+            conflict_columns: Unique key for ``ON CONFLICT ... DO UPDATE`` (None for plain insert)
+            update_columns: Columns updated on conflict (default: all non-key columns)
+            where_sql: Optional filter over the staged rows
+            params: Parameters for the select expressions / filter
+            or_replace: Use ``INSERT OR REPLACE`` instead of an UPSERT clause
+            target_schema: Schema of the live table (e.g. an attached shard)
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        if select_expressions is None:
+            select_expressions = [f"s.{quote_identifier(col)}" for col in columns]
+        if len(select_expressions) != len(columns):
+            raise ValueError("select_expressions must match columns one-to-one")
+
+        verb = "INSERT OR REPLACE" if or_replace else "INSERT"
+        sql = (
+            f"{verb} INTO {quote_identifier(target_schema)}.{quote_identifier(target_table)} "
+            f"({', '.join(quote_identifier(col) for col in columns)}) "
+            f"SELECT {', '.join(select_expressions)} "
+            f"FROM {self.qualified(staged_table)} AS s "
+            # WHERE is required to disambiguate INSERT ... SELECT ... ON CONFLICT
+            f"WHERE {where_sql or 'true'}"
+        )
+
+        if conflict_columns and not or_replace:
+            key_sql = ", ".join(quote_identifier(col) for col in conflict_columns)
+            if update_columns is None:
+                keys = {col.lower() for col in conflict_columns}
+                update_columns = [col for col in columns if col.lower() not in keys]
+            if update_columns:
+                set_sql = ", ".join(
+                    f"{quote_identifier(col)} = excluded.{quote_identifier(col)}" for col in update_columns
+                )
+                sql += f" ON CONFLICT ({key_sql}) DO UPDATE SET {set_sql}"
+            else:
+                sql += f" ON CONFLICT ({key_sql}) DO NOTHING"
+
+        cursor = self.execute(sql, params)
+        rows_merged = cursor.rowcount
+        self._log_event("Staged rows merged", {
+            'target_table': f"{target_schema}.{target_table}",
+            'staging_table': staged_table,
+            'rows_merged': rows_merged
+        })
+        return rows_merged
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log staging event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("staging_area", {
+                'message': message,
+                'details': details or {}
+            })
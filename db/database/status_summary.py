@@ -0,0 +1,309 @@
+"""
+Materialised Status Summaries
+
+Small summary tables kept current by the loaders, in the same transaction
+as the data they describe: row counts and distinct CUSIPs per table and
+date, CUSIPs orphaned against the latest universe date, and per-table
+match rates. ``db_pipe.py --status`` reads only these tables, so its cost
+no longer grows with the amount of history loaded.
+"""
+
+import json
+import sqlite3
+from typing import Dict, Any, List, Optional, Iterable
+
+
+STATUS_SUMMARY_TABLES = {
+    'status_table_counts': """
+        CREATE TABLE IF NOT EXISTS status_table_counts (
+            table_name TEXT NOT NULL,
+            date TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            distinct_cusips INTEGER NOT NULL,
+            updated_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (table_name, date)
+        ) WITHOUT ROWID
+    """,
+    'status_orphaned_cusips': """
+        CREATE TABLE IF NOT EXISTS status_orphaned_cusips (
+            table_name TEXT NOT NULL,
+            cusip_standardized TEXT NOT NULL,
+            security_name TEXT,
+            reference_date TEXT,
+            PRIMARY KEY (table_name, cusip_standardized)
+        ) WITHOUT ROWID
+    """,
+    'status_match_rates': """
+        CREATE TABLE IF NOT EXISTS status_match_rates (
+            table_name TEXT PRIMARY KEY,
+            reference_date TEXT,
+            total_cusips INTEGER NOT NULL,
+            matched_cusips INTEGER NOT NULL,
+            orphaned_cusips INTEGER NOT NULL,
+            match_rate_percent REAL,
+            updated_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+}
+
+
+class StatusSummary:
+    """
+    Maintains and reads the materialised status summary tables.
+
+    Refresh methods issue plain DML on the given connection and never
+    commit, so callers run them inside the loader's write transaction.
+    Tables without a date dimension are summarised under the date ''.
+    """
+
+    # Tracked table -> date column (None for current-snapshot tables)
+    TRACKED_TABLES = {
+        'universe_historical': 'date',
+        'portfolio_historical': 'date',
+        'combined_runs_historical': 'date',
+        'run_monitor': None,
+        'gspread_analytics': None,
+        'unmatched_cusips_all_dates': 'date',
+        'unmatched_cusips_last_date': None
+    }
+
+    # Table checked against the latest universe -> (security column, compare on reference date only)
+    ORPHAN_SOURCES = {
+        'portfolio_historical': ('"SECURITY"', True),
+        'combined_runs_historical': ('"Security"', True),
+        'run_monitor': ('"Security"', False),
+        'gspread_analytics': ('"Security"', False)
+    }
+
+    UNIVERSE_TABLE = 'universe_historical'
+
+    def __init__(self, logger=None):
+        """
+        Initialize status summary.
+
+        Args:
+            logger: Optional DatabaseLogger instance
+        """
+        self.logger = logger
+
+    def ensure_tables(self, conn: sqlite3.Connection) -> bool:
+        """
+        Create the summary tables if they are missing.
+
+        Returns:
+            True if the tables were created (they need a full rebuild)
+        """
+        existing = {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({})".format(
+                    ", ".join("?" for _ in STATUS_SUMMARY_TABLES)),
+                tuple(STATUS_SUMMARY_TABLES)
+            )
+        }
+        if len(existing) == len(STATUS_SUMMARY_TABLES):
+            return False
+
+        for table_sql in STATUS_SUMMARY_TABLES.values():
+            conn.execute(table_sql)
+        return True
+
+    def rebuild(self, conn: sqlite3.Connection):
+        """Recompute every summary from the live tables (first use or repair)."""
+        for table_name in self.TRACKED_TABLES:
+            self.refresh_counts(conn, table_name)
+        self.refresh_orphans(conn)
+        self._log_event("Status summaries rebuilt", {'tables': list(self.TRACKED_TABLES)})
+
+    def refresh_counts(self, conn: sqlite3.Connection, table_name: str,
+                       dates: Optional[Iterable[Any]] = None):
+        """
+        Recompute row counts for a table, limited to the given dates.
+
+        Args:
+            conn: Connection holding the loader's write transaction
+            table_name: Tracked table name
+            dates: Dates touched by the load (None recomputes every date)
+        """
+        date_column = self.TRACKED_TABLES[table_name]
+        if not self._table_exists(conn, table_name):
+            return
+
+        if date_column is None:
+            conn.execute("DELETE FROM status_table_counts WHERE table_name = ?", (table_name,))
+            conn.execute(f"""
+                INSERT INTO status_table_counts (table_name, date, row_count, distinct_cusips)
+                SELECT ?, '', COUNT(*), COUNT(DISTINCT cusip_standardized) FROM {table_name}
+            """, (table_name,))
+            return
+
+        if dates is None:
+            conn.execute("DELETE FROM status_table_counts WHERE table_name = ?", (table_name,))
+            conn.execute(f"""
+                INSERT INTO status_table_counts (table_name, date, row_count, distinct_cusips)
+                SELECT ?, COALESCE({date_column}, ''), COUNT(*), COUNT(DISTINCT cusip_standardized)
+                FROM {table_name}
+                GROUP BY COALESCE({date_column}, '')
+            """, (table_name,))
+            return
+
+        date_values = sorted({str(date) for date in dates if date is not None and str(date) != ''})
+        has_null_dates = any(date is None or str(date) == '' for date in dates)
+        dates_json = json.dumps(date_values)
+
+        conn.execute("""
+            DELETE FROM status_table_counts
+            WHERE table_name = ? AND date IN (SELECT value FROM json_each(?))
+        """, (table_name, dates_json))
+        conn.execute(f"""
+            INSERT INTO status_table_counts (table_name, date, row_count, distinct_cusips)
+            SELECT ?, {date_column}, COUNT(*), COUNT(DISTINCT cusip_standardized)
+            FROM {table_name}
+            WHERE {date_column} IN (SELECT value FROM json_each(?))
+            GROUP BY {date_column}
+        """, (table_name, dates_json))
+
+        if has_null_dates:
+            conn.execute("DELETE FROM status_table_counts WHERE table_name = ? AND date = ''", (table_name,))
+            conn.execute(f"""
+                INSERT INTO status_table_counts (table_name, date, row_count, distinct_cusips)
+                SELECT ?, '', row_count, distinct_cusips FROM (
+                    SELECT COUNT(*) AS row_count, COUNT(DISTINCT cusip_standardized) AS distinct_cusips
+                    FROM {table_name}
+                    WHERE {date_column} IS NULL OR {date_column} = ''
+                ) WHERE row_count > 0
+            """, (table_name,))
+
+    def refresh_orphans(self, conn: sqlite3.Connection, tables: Optional[Iterable[str]] = None):
+        """
+        Recompute orphaned CUSIPs and match rates against the latest universe date.
+
+        Dated tables are compared on the reference date only; snapshot tables
+        (run monitor, G-spread analytics) are compared as a whole. Every lookup
+        is an index probe on universe (date, cusip_standardized).
+
+        Args:
+            conn: Connection holding the loader's write transaction
+            tables: Tables to refresh (None refreshes all of them, e.g. after a universe load)
+        """
+        reference_date = self.get_reference_date(conn)
+        target_tables = list(tables) if tables is not None else list(self.ORPHAN_SOURCES)
+
+        for table_name in target_tables:
+            security_column, dated = self.ORPHAN_SOURCES[table_name]
+            conn.execute("DELETE FROM status_orphaned_cusips WHERE table_name = ?", (table_name,))
+            conn.execute("DELETE FROM status_match_rates WHERE table_name = ?", (table_name,))
+            if reference_date is None or not self._table_exists(conn, table_name):
+                continue
+
+            date_filter = "t.date = ?" if dated else "1 = 1"
+            date_params = (reference_date,) if dated else ()
+
+            orphaned = conn.execute(f"""
+                INSERT INTO status_orphaned_cusips (table_name, cusip_standardized, security_name, reference_date)
+                SELECT ?, t.cusip_standardized, MAX(t.{security_column}), ?
+                FROM {table_name} t
+                WHERE {date_filter}
+                  AND t.cusip_standardized IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM {self.UNIVERSE_TABLE} u
+                      WHERE u.date = ? AND u.cusip_standardized = t.cusip_standardized
+                  )
+                GROUP BY t.cusip_standardized
+            """, (table_name, reference_date, *date_params, reference_date)).rowcount
+
+            total = conn.execute(f"""
+                SELECT COUNT(DISTINCT t.cusip_standardized) FROM {table_name} t WHERE {date_filter}
+            """, date_params).fetchone()[0]
+
+            conn.execute("""
+                INSERT INTO status_match_rates
+                    (table_name, reference_date, total_cusips, matched_cusips, orphaned_cusips, match_rate_percent)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (table_name, reference_date, total, total - orphaned, orphaned,
+                  round(100.0 * (total - orphaned) / total, 2) if total else None))
+
+    def get_reference_date(self, conn: sqlite3.Connection) -> Optional[str]:
+        """Return the latest universe date recorded in the summaries."""
+        row = conn.execute("""
+            SELECT MAX(date) FROM status_table_counts WHERE table_name = ? AND date <> ''
+        """, (self.UNIVERSE_TABLE,)).fetchone()
+        return row[0] if row else None
+
+    def get_row_counts(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """Return total rows per tracked table."""
+        counts = {table_name: 0 for table_name in self.TRACKED_TABLES}
+        for table_name, row_count in conn.execute("""
+            SELECT table_name, SUM(row_count) FROM status_table_counts GROUP BY table_name
+        """):
+            counts[table_name] = row_count or 0
+        return counts
+
+    def get_latest_dates(self, conn: sqlite3.Connection) -> Dict[str, Optional[str]]:
+        """Return the most recent loaded date per dated table."""
+        latest = {table_name: None for table_name, column in self.TRACKED_TABLES.items() if column}
+        for table_name, latest_date in conn.execute("""
+            SELECT table_name, MAX(date) FROM status_table_counts WHERE date <> '' GROUP BY table_name
+        """):
+            if table_name in latest:
+                latest[table_name] = latest_date
+        return latest
+
+    def get_coverage(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """
+        Return latest-universe coverage: orphan counts, match rates and orphan details.
+
+        Returns:
+            Dictionary with reference_date, universe_cusips, orphaned_by_table,
+            match_rates and orphaned_cusips
+        """
+        reference_date = self.get_reference_date(conn)
+        universe_row = conn.execute("""
+            SELECT distinct_cusips FROM status_table_counts WHERE table_name = ? AND date = ?
+        """, (self.UNIVERSE_TABLE, reference_date)).fetchone()
+
+        match_rates = {
+            row[0]: {
+                'total_cusips': row[1],
+                'matched_cusips': row[2],
+                'orphaned_cusips': row[3],
+                'match_rate_percent': row[4]
+            }
+            for row in conn.execute("""
+                SELECT table_name, total_cusips, matched_cusips, orphaned_cusips, match_rate_percent
+                FROM status_match_rates ORDER BY table_name
+            """)
+        }
+
+        orphaned_cusips: List[Dict[str, Any]] = [
+            {'table_name': row[0], 'cusip_standardized': row[1], 'security_name': row[2] or ''}
+            for row in conn.execute("""
+                SELECT table_name, cusip_standardized, security_name
+                FROM status_orphaned_cusips ORDER BY table_name, cusip_standardized
+            """)
+        ]
+
+        return {
+            'reference_date': reference_date,
+            'universe_cusips': universe_row[0] if universe_row else 0,
+            'orphaned_by_table': {
+                table_name: rates['orphaned_cusips']
+                for table_name, rates in match_rates.items() if rates['orphaned_cusips'] > 0
+            },
+            'match_rates': match_rates,
+            'orphaned_cusips': orphaned_cusips
+        }
+
+    @staticmethod
+    def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
+        """Check whether a live table (or compacted table view) exists"""
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (table_name,)
+        ).fetchone() is not None
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log summary event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("status_summary", {
+                'message': message,
+                'details': details or {}
+            })
@@ -0,0 +1,239 @@
+"""
+Persistent CUSIP Standardization Cache
+
+Memoises standardisation results per distinct raw CUSIP so a load only
+standardises values it has never seen:
+
+- A column is factorised; known values come from the cache, new ones go
+  through ``standardize_series`` once, and the results are mapped back to
+  the rows through the factor codes.
+- Results persist in ``cusip_standardization_cache`` keyed by raw value
+  and standardizer version, so later runs start warm. Standardising only
+  reads the table: new results stay pending until ``flush`` writes them
+  inside the loader's write transaction, and join the cache proper once
+  ``mark_persisted`` confirms the commit, so a rolled-back load writes
+  them again next time.
+- The version hashes the special mappings, patterns, check-digit setting
+  and rules version; when any of them changes the cache starts over and
+  rows written under other versions are deleted.
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from db.utils.cusip_vectorized import standardize_series, DEFAULT_PATTERNS, RESULT_COLUMNS
+
+
+CUSIP_CACHE_TABLE = """
+    CREATE TABLE IF NOT EXISTS cusip_standardization_cache (
+        raw_value TEXT NOT NULL,
+        standardizer_version TEXT NOT NULL,
+        cusip_original TEXT,
+        cusip_standardized TEXT,
+        standardization_status TEXT,
+        standardization_pattern TEXT,
+        cached_timestamp TIMESTAMP,
+        PRIMARY KEY (raw_value, standardizer_version)
+    ) WITHOUT ROWID
+"""
+
+# Bump when the standardisation rules themselves change
+RULES_VERSION = 1
+
+_EMPTY_RESULT = ('', '', 'invalid', 'empty')
+
+
+def standardizer_version(standardizer=None) -> str:
+    """Fingerprint of everything that decides a standardisation result."""
+    patterns = getattr(standardizer, 'patterns', None) or DEFAULT_PATTERNS
+    payload = json.dumps({
+        'rules': RULES_VERSION,
+        'special_mappings': getattr(standardizer, 'special_mappings', None) or {},
+        'patterns': {name: getattr(regex, 'pattern', regex) for name, regex in patterns.items()},
+        'check_digit_validation': bool(getattr(standardizer, 'enable_check_digit_validation', True))
+    }, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class CUSIPStandardizationCache:
+    """
+    Memoised, persistent front end to ``standardize_series``.
+    """
+
+    def __init__(self, standardizer=None, logger=None):
+        """
+        Initialize standardization cache.
+
+        Args:
+            standardizer: CUSIPStandardizer whose rules the cached results follow
+            logger: Optional DatabaseLogger instance
+        """
+        self.standardizer = standardizer
+        self.logger = logger
+        self._version: Optional[str] = None
+        self._entries: Dict[str, Tuple[str, str, str, str]] = {}
+        self._pending: Dict[str, Tuple[str, str, str, str]] = {}
+        self._loaded = False
+        self._stale_rows = False
+        self._stats = {'hits': 0, 'misses': 0, 'rows_served': 0, 'entries_loaded': 0,
+                       'entries_persisted': 0, 'invalidations': 0}
+
+    @property
+    def version(self) -> str:
+        """Current standardizer version."""
+        return standardizer_version(self.standardizer)
+
+    def standardize_series(self, cusips: pd.Series, conn: Optional[sqlite3.Connection] = None) -> pd.DataFrame:
+        """
+        Standardise a column, computing only values missing from the cache.
+
+        Args:
+            cusips: Raw CUSIP values (any dtype, nulls allowed)
+            conn: Connection holding the persistent cache (None keeps it in memory);
+                  it is only read, new entries wait for ``flush``
+
+        Returns:
+            DataFrame aligned to ``cusips`` with the ``standardize_series`` columns
+        """
+        self._check_version(conn)
+
+        codes, uniques = pd.factorize(cusips, use_na_sentinel=True)
+        keys = [str(value) for value in uniques]
+        missing = [key for key in dict.fromkeys(keys) if key not in self._entries and key not in self._pending]
+        if missing:
+            computed = standardize_series(pd.Series(missing, dtype=object), self.standardizer)
+            self._pending.update(zip(missing, computed.itertuples(index=False, name=None)))
+
+        self._stats['hits'] += len(keys) - len(missing)
+        self._stats['misses'] += len(missing)
+        self._stats['rows_served'] += len(cusips)
+
+        # Nulls take the extra empty row appended after the distinct values
+        unique_results = pd.DataFrame(
+            [self._entries.get(key) or self._pending[key] for key in keys] + [_EMPTY_RESULT], columns=RESULT_COLUMNS
+        )
+        results = unique_results.take(np.where(codes < 0, len(keys), codes))
+        results.index = cusips.index
+        return results
+
+    @property
+    def pending(self) -> int:
+        """Entries computed but not yet persisted."""
+        return len(self._pending)
+
+    def flush(self, conn: sqlite3.Connection) -> int:
+        """
+        Write pending entries, and delete rows of other versions (no commit).
+
+        Call inside the loader's write transaction, then ``mark_persisted``
+        once it has committed; until then the entries stay pending.
+
+        Args:
+            conn: Connection holding the write transaction
+
+        Returns:
+            Number of entries written
+        """
+        if not self._pending and not self._stale_rows:
+            return 0
+        self.ensure_table(conn)
+        if self._stale_rows:
+            stale = conn.execute(
+                "DELETE FROM cusip_standardization_cache WHERE standardizer_version != ?", (self._version,)
+            ).rowcount
+            self._log_event("Stale CUSIP cache entries deleted", {'entries': stale})
+        cached_timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows: List[tuple] = [
+            (key, self._version, *result, cached_timestamp) for key, result in self._pending.items()
+        ]
+        conn.executemany("""
+            INSERT OR REPLACE INTO cusip_standardization_cache
+                (raw_value, standardizer_version, cusip_original, cusip_standardized,
+                 standardization_status, standardization_pattern, cached_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        return len(rows)
+
+    def mark_persisted(self):
+        """Move flushed entries into the cache once their transaction has committed."""
+        self._stats['entries_persisted'] += len(self._pending)
+        self._entries.update(self._pending)
+        self._pending = {}
+        self._stale_rows = False
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Hit, miss and persistence counts for the cache."""
+        lookups = self._stats['hits'] + self._stats['misses']
+        return {
+            **self._stats,
+            'entries': len(self._entries),
+            'pending': self.pending,
+            'hit_rate': round(self._stats['hits'] / lookups * 100, 2) if lookups else 0.0,
+            'version': self._version
+        }
+
+    def clear(self, conn: Optional[sqlite3.Connection] = None):
+        """Forget every cached result (and delete the persisted ones when given a connection)."""
+        self._entries = {}
+        self._pending = {}
+        self._loaded = False
+        self._stale_rows = False
+        if conn is not None:
+            self.ensure_table(conn)
+            conn.execute("DELETE FROM cusip_standardization_cache")
+
+    @staticmethod
+    def ensure_table(conn: sqlite3.Connection):
+        """Create the cache table if it is missing."""
+        conn.execute(CUSIP_CACHE_TABLE)
+
+    def _check_version(self, conn: Optional[sqlite3.Connection]):
+        """Start over when the standardizer changed; load persisted entries once per version (read only)"""
+        version = self.version
+        if version != self._version:
+            if self._version is not None:
+                self._stats['invalidations'] += 1
+                self._log_event("CUSIP cache invalidated", {'old_version': self._version, 'new_version': version})
+            self._version = version
+            self._entries = {}
+            self._pending = {}
+            self._loaded = False
+
+        if conn is not None and not self._loaded:
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cusip_standardization_cache'"
+            ).fetchone():
+                self._loaded = True
+                return
+            stale = conn.execute(
+                "SELECT COUNT(*) FROM cusip_standardization_cache WHERE standardizer_version != ?", (version,)
+            ).fetchone()[0]
+            self._stale_rows = stale > 0
+            rows = conn.execute("""
+                SELECT raw_value, cusip_original, cusip_standardized, standardization_status, standardization_pattern
+                FROM cusip_standardization_cache
+                WHERE standardizer_version = ?
+            """, (version,)).fetchall()
+            for raw_value, *result in rows:
+                self._entries.setdefault(raw_value, tuple(result))
+            self._loaded = True
+            self._stats['entries_loaded'] += len(rows)
+            self._log_event("CUSIP cache loaded", {
+                'version': version,
+                'entries': len(rows),
+                'stale_entries': stale
+            })
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log CUSIP cache event through the pipeline logger when available"""
+        if self.logger is not None:
+            self.logger.log_pipeline_step("cusip_cache", {
+                'message': message,
+                'details': details or {}
+            })
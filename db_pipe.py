@@ -24,10 +24,12 @@ from datetime import datetime, time as datetime_time
 import argparse
 import time
 import pandas as pd
+import numpy as np
 import multiprocessing as mp
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import gc
 import logging
+from contextlib import contextmanager
 
 # Add src to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -37,9 +39,24 @@ from db.database.connection import DatabaseConnection
 from db.database.schema import DatabaseSchema
 from db.utils.db_logger import DatabaseLogger
 from db.utils.cusip_standardizer import CUSIPStandardizer
+from db.utils.cusip_vectorized import standardization_counts
+from db.utils.cusip_cache import CUSIPStandardizationCache
+from db.database.staging import StagingArea
+from db.database.backup import OnlineBackup
+from db.database.status_summary import StatusSummary
+from db.database.materialized_views import MaterializedViews
+from db.database.connection_pool import ConnectionPool
+from db.database.compact_storage import CompactStorage
+from db.database.run_monitor_engine import RunMonitorEngine
+from db.database.shards import ShardManager
+from db.database.change_detection import ChangeDetector, ROW_HASH_COLUMN, row_hashes
+from db.database.snapshot import SnapshotExporter, manifest_path
+from db.database.query_log import SlowQueryLog
+from db.database.index_advisor import IndexAdvisor
 
 # Import existing pipeline components for data reading
 from src.utils.config import load_config
+from src.utils.bond_names import BondNameResolver, missing_cusip_mask
 from src.utils.expert_logging import setup_logging
 from src.pipeline.excel_processor import ExcelProcessor
 from src.pipeline.parquet_processor import ParquetProcessor
@@ -60,7 +77,10 @@ class DatabasePipeline:
     
     def __init__(self, database_path: str = "trading_analytics.db", config_path: str = "config/config.yaml",
                  batch_size: int = 1000, parallel: bool = False, low_memory: bool = False, 
-                 optimize_db: bool = False, disable_logging: bool = False):
+                 optimize_db: bool = False, disable_logging: bool = False,
+                 staging_location: str = ':memory:', read_pool_size: int = 0,
+                 run_monitor_in_db: bool = False, slow_query_ms: float = 0,
+                 slow_query_sample_rate: float = 1.0):
         """
         Initialize database pipeline with configuration and optimization options.
         
@@ -69,9 +89,18 @@ class DatabasePipeline:
             config_path: Path to configuration file
             batch_size: Batch size for database operations
             parallel: Enable parallel processing for CUSIP standardization
-            low_memory: Enable low memory mode with garbage collection
+            low_memory: Stream runs and G-spread sources in record batches (bounded memory)
             optimize_db: Optimize database after loading
             disable_logging: Disable detailed logging for faster execution
+            staging_location: Attached staging database for set-based loads
+                              (':memory:' or '' for an anonymous temp file)
+            read_pool_size: Read-only snapshot connections for status reads
+                            (0 reads through the writer connection)
+            run_monitor_in_db: Compute run_monitor from combined_runs_historical
+                               instead of loading run_monitor.parquet
+            slow_query_ms: Log queries taking at least this long to perf_query_log
+                           (0 disables the slow-query log)
+            slow_query_sample_rate: Fraction of slow queries logged
         """
         self.database_path = Path(database_path)
         self.config_path = Path(config_path)
@@ -80,6 +109,9 @@ class DatabasePipeline:
         self.low_memory = low_memory
         self.optimize_db = optimize_db
         self.disable_logging = disable_logging
+        self.staging_location = staging_location
+        self.read_pool_size = read_pool_size
+        self.run_monitor_in_db = run_monitor_in_db
         
         # Load configuration
         self.config = load_config() if self.config_path.exists() else {}
@@ -107,12 +139,33 @@ class DatabasePipeline:
             logger=self.logger, 
             config=db_config
         )
+        self.connection_pool = None
+        
+        # Time queries issued through the connection; slow ones go to perf_query_log
+        self.slow_query_log = None
+        if slow_query_ms > 0:
+            self.slow_query_log = SlowQueryLog(
+                threshold_ms=slow_query_ms,
+                sample_rate=slow_query_sample_rate,
+                logger=self.logger,
+                plan_connection=self._connect
+            )
+            self.slow_query_log.instrument(self.db_connection, 'execute_query', source='db_connection')
+            self.slow_query_log.instrument(self.db_connection, 'execute_many', source='db_connection')
         
         self.db_schema = DatabaseSchema(logger=self.logger)
+        self.status_summary = StatusSummary(logger=self.logger)
+        self.materialized_views = MaterializedViews(logger=self.logger)
+        self.compact_storage = CompactStorage(logger=self.logger)
+        self.run_monitor_engine = RunMonitorEngine(logger=self.logger)
+        self.shard_manager = ShardManager(str(self.database_path), logger=self.logger)
+        self.change_detector = ChangeDetector(logger=self.logger)
         self.cusip_standardizer = CUSIPStandardizer(
             logger=self.logger, 
             enable_check_digit_validation=True
         )
+        self.cusip_cache = CUSIPStandardizationCache(self.cusip_standardizer, logger=self.logger)
+        self.name_resolver: Optional[BondNameResolver] = None
         
         # Pipeline state
         self.pipeline_stats = {
@@ -132,7 +185,10 @@ class DatabasePipeline:
             'parallel': parallel,
             'low_memory': low_memory,
             'optimize_db': optimize_db,
-            'disable_logging': disable_logging
+            'disable_logging': disable_logging,
+            'read_pool_size': read_pool_size,
+            'run_monitor_in_db': run_monitor_in_db,
+            'slow_query_ms': slow_query_ms
         })
     
     def initialize_database(self, force_recreate: bool = False) -> bool:
@@ -153,11 +209,12 @@ class DatabasePipeline:
                     self._log_pipeline_event("Database file exists, validating schema")
                     
                     # Validate existing schema
-                    conn = self.db_connection.connect()
-                    validation_results = self.db_schema.validate_schema(conn)
+                    conn = self._connect()
+                    validation_results = self._validate_schema(conn)
                     
                     if validation_results['schema_valid']:
                         self._log_pipeline_event("Existing database schema is valid")
+                        self._ensure_summary_tables(conn)
                         return True
                     else:
                         self._log_pipeline_event("Schema validation failed, recreating database", {
@@ -175,7 +232,7 @@ class DatabasePipeline:
                 
                 # Initialize database connection
                 self._log_pipeline_event("Establishing database connection")
-                conn = self.db_connection.connect()
+                conn = self._connect()
                 
                 # Create complete schema
                 self._log_pipeline_event("Creating database schema")
@@ -185,10 +242,12 @@ class DatabasePipeline:
                     raise Exception("Failed to create database schema")
                 
                 # Validate schema creation
-                validation_results = self.db_schema.validate_schema(conn)
+                validation_results = self._validate_schema(conn)
                 if not validation_results['schema_valid']:
                     raise Exception(f"Schema validation failed: {validation_results}")
                 
+                self._ensure_summary_tables(conn)
+                
                 # Run initial health check
                 health_results = self.db_connection.check_health()
                 if not health_results['connection_healthy']:
@@ -284,68 +343,74 @@ class DatabasePipeline:
                     force_full_refresh=force_full_refresh
                 )
                 
-                # Process universe data
+                # Standardize CUSIPs for the whole column, then stage and merge set-based
+                cusip_results = self._standardize_cusips(universe_df['CUSIP'], 'universe_historical')
+                date_strings = self._to_sqlite_date_strings(universe_df['Date'])
+                staged_df = pd.DataFrame({
+                    'Date': date_strings,
+                    'CUSIP': universe_df['CUSIP'].values,
+                    'cusip_standardized': cusip_results['cusip_standardized'].values,
+                    'Security': self._column_or_default(universe_df, 'Security', ''),
+                    'G Sprd': self._column_or_default(universe_df, 'G Sprd'),
+                    'OAS (Mid)': self._column_or_default(universe_df, 'OAS (Mid)'),
+                    'Yrs (Mat)': self._column_or_default(universe_df, 'Yrs (Mat)'),
+                    'Rating': self._column_or_default(universe_df, 'Rating', ''),
+                    'source_file': universe_file,
+                    'file_date': date_strings  # file_date same as date for universe
+                })
+                key_columns = ['Date', 'CUSIP', 'cusip_standardized']
+                
+                # Hash each row's content so unchanged rows skip the write entirely;
+                # a full refresh then deletes only the stored rows missing from the file
+                conn = self._connect()
+                full_refresh = update_decision['update_type'] == 'full_refresh'
+                hashed = self._ensure_row_hash_column(conn, 'universe_historical')
+                removed_df = None
+                row_counts = {'inserted': len(staged_df), 'updated': 0, 'unchanged': 0, 'deleted': 0}
+                if hashed:
+                    staged_df[ROW_HASH_COLUMN] = row_hashes(
+                        staged_df, [column for column in staged_df.columns if column not in key_columns]
+                    )
+                    staged_df, removed_df, row_counts = self.change_detector.classify(
+                        conn, 'universe_historical', staged_df, key_columns, whole_table=full_refresh
+                    )
+                self._log_pipeline_event("Universe rows compared with stored rows", row_counts)
+                
                 processed_records = 0
-                with self.db_connection.transaction():
-                    
-                    if update_decision['update_type'] == 'full_refresh':
-                        # Clear existing data
-                        self.db_connection.execute_query(
-                            "DELETE FROM universe_historical",
-                            fetch_results=False
-                        )
-                        self._log_pipeline_event("Cleared existing universe data for full refresh")
-                    
-                    # Process data in batches
-                    batch_size = 1000
-                    for start_idx in range(0, len(universe_df), batch_size):
-                        end_idx = min(start_idx + batch_size, len(universe_df))
-                        batch_df = universe_df.iloc[start_idx:end_idx]
+                if not staged_df.empty or (removed_df is not None and not removed_df.empty) or not hashed:
+                    with StagingArea(conn, location=self.staging_location, logger=self.logger,
+                                     query_log=self.slow_query_log) as staging:
+                        staged_columns = list(staged_df.columns)
+                        staged_rows = staging.stage_dataframe('universe_stage', staged_df, batch_size=self.batch_size)
+                        if removed_df is not None and not removed_df.empty:
+                            staging.stage_dataframe('universe_removed', removed_df, batch_size=self.batch_size)
+                        touched_dates = None if full_refresh else staged_df['Date'].unique()
+                        del staged_df
                         
-                        # Standardize CUSIPs in batch
-                        cusip_results = self.cusip_standardizer.standardize_cusip_batch(
-                            batch_df['CUSIP'],
-                            context={'table_name': 'universe_historical', 'source_file': universe_file}
-                        )
+                        self._log_pipeline_event("Universe data staged", {'rows_staged': staged_rows})
                         
-                        # Prepare batch data for insertion
-                        batch_records = []
-                        for idx, (_, row) in enumerate(batch_df.iterrows()):
-                            cusip_result = cusip_results.iloc[idx]
-                            
-                            # Convert pandas Timestamp to string for SQLite compatibility
-                            date_str = str(row['Date']) if pd.notna(row['Date']) else None
+                        # Write lock is held only for the merge
+                        with self._write_transaction(staging):
+                            if full_refresh and not hashed:
+                                self._clear_table(conn, 'universe_historical')
+                                self._log_pipeline_event("Cleared existing universe data for full refresh")
+                            elif row_counts['deleted']:
+                                self._delete_staged_keys(
+                                    staging, 'universe_historical', 'universe_removed', key_columns
+                                )
                             
-                            record = (
-                                date_str,
-                                row['CUSIP'],
-                                cusip_result['cusip_standardized'],
-                                row.get('Security', ''),
-                                row.get('G Sprd'),
-                                row.get('OAS (Mid)'),
-                                row.get('Yrs (Mat)'),
-                                row.get('Rating', ''),
-                                universe_file,
-                                date_str  # file_date same as date for universe
+                            processed_records = self._merge_staged(
+                                staging, 'universe_historical', 'universe_stage',
+                                columns=staged_columns,
+                                conflict_columns=key_columns
                             )
-                            batch_records.append(record)
-                        
-                        # Insert batch
-                        insert_sql = """
-                            INSERT OR REPLACE INTO universe_historical 
-                            ("Date", "CUSIP", cusip_standardized, "Security", "G Sprd", "OAS (Mid)", 
-                             "Yrs (Mat)", "Rating", source_file, file_date)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """
-                        
-                        rows_affected = self.db_connection.execute_many(insert_sql, batch_records)
-                        processed_records += rows_affected
-                        
-                        self._log_pipeline_event(f"Processed universe batch {start_idx//batch_size + 1}", {
-                            'records_in_batch': len(batch_records),
-                            'rows_affected': rows_affected,
-                            'total_processed': processed_records
-                        })
+                            
+                            self._apply_summary_delta(conn, 'universe_historical', touched_dates)
+                            
+                            if 'Security' in universe_df.columns:
+                                self._update_name_index(
+                                    conn, universe_df['Security'], cusip_results['cusip_standardized']
+                                )
                 
                 # Update pipeline statistics
                 self.pipeline_stats['total_records_processed'] += processed_records
@@ -353,6 +418,10 @@ class DatabasePipeline:
                 
                 self._log_pipeline_event("Universe data loading completed", {
                     'total_records_processed': processed_records,
+                    'rows_inserted': row_counts['inserted'],
+                    'rows_updated': row_counts['updated'],
+                    'rows_unchanged': row_counts['unchanged'],
+                    'rows_deleted': row_counts['deleted'],
                     'update_type': update_decision['update_type'],
                     'file_processed': universe_file
                 })
@@ -420,9 +489,6 @@ class DatabasePipeline:
                     'columns': list(portfolio_df.columns)
                 })
                 
-                # Get current universe for CUSIP validation
-                universe_cusips = self._get_current_universe_cusips()
-                
                 # Determine update strategy
                 update_decision = self._decide_update_strategy(
                     table_name='portfolio_historical',
@@ -431,100 +497,85 @@ class DatabasePipeline:
                     force_full_refresh=force_full_refresh
                 )
                 
-                # Process portfolio data
-                processed_records = 0
-                matched_cusips = 0
-                unmatched_cusips = 0
+                # Fill missing CUSIPs from the security name, then standardize the whole column
+                portfolio_df['CUSIP'] = self._resolve_missing_cusips(portfolio_df, 'SECURITY', 'portfolio_historical')
+                cusip_results = self._standardize_cusips(portfolio_df['CUSIP'], 'portfolio_historical')
+                date_strings = self._to_sqlite_date_strings(portfolio_df['Date'])
+                staged_df = pd.DataFrame({
+                    'Date': date_strings,
+                    'CUSIP': portfolio_df['CUSIP'].values,
+                    'cusip_standardized': cusip_results['cusip_standardized'].values,
+                    'SECURITY': self._column_or_default(portfolio_df, 'SECURITY', ''),
+                    'QUANTITY': self._column_or_default(portfolio_df, 'QUANTITY'),
+                    'PRICE': self._column_or_default(portfolio_df, 'PRICE'),
+                    'MARKET VALUE': self._column_or_default(portfolio_df, 'VALUE'),
+                    'WEIGHT': self._column_or_default(portfolio_df, 'VALUE PCT NAV'),
+                    'source_file': portfolio_file,
+                    'file_date': date_strings  # file_date same as date
+                })
                 
-                with self.db_connection.transaction():
+                conn = self._connect()
+                with StagingArea(conn, location=self.staging_location, logger=self.logger,
+                                 query_log=self.slow_query_log) as staging:
+                    staging.stage_dataframe('portfolio_stage', staged_df, batch_size=self.batch_size)
+                    del staged_df
                     
-                    if update_decision['update_type'] == 'full_refresh':
-                        # Clear existing data
-                        self.db_connection.execute_query(
-                            "DELETE FROM portfolio_historical",
-                            fetch_results=False
-                        )
-                        self._log_pipeline_event("Cleared existing portfolio data for full refresh")
+                    # Current universe CUSIPs as an indexed lookup table for the anti-join
+                    staging.stage_query(
+                        'universe_keys',
+                        "SELECT DISTINCT cusip_standardized FROM main.current_universe",
+                        index_columns=['cusip_standardized']
+                    )
+                    match_expression = (
+                        f"EXISTS (SELECT 1 FROM {staging.qualified('universe_keys')} u "
+                        "WHERE u.cusip_standardized = s.cusip_standardized)"
+                    )
+                    
+                    matched_cusips, unmatched_cusips = staging.execute(f"""
+                        SELECT COALESCE(SUM({match_expression}), 0),
+                               COALESCE(SUM(NOT {match_expression}), 0)
+                        FROM {staging.qualified('portfolio_stage')} s
+                    """).fetchone()
                     
-                    # Process data in batches
-                    batch_size = 1000
-                    for start_idx in range(0, len(portfolio_df), batch_size):
-                        end_idx = min(start_idx + batch_size, len(portfolio_df))
-                        batch_df = portfolio_df.iloc[start_idx:end_idx]
+                    touched_dates = None if update_decision['update_type'] == 'full_refresh' else date_strings.unique()
+                    
+                    # Write lock is held only for the merge
+                    with self._write_transaction(staging):
+                        self._begin_summary_delta(conn, 'portfolio_historical', touched_dates)
+                        if update_decision['update_type'] == 'full_refresh':
+                            self._clear_table(conn, 'portfolio_historical')
+                            self._log_pipeline_event("Cleared existing portfolio data for full refresh")
                         
-                        # Standardize CUSIPs and validate against universe
-                        batch_records = []
-                        batch_unmatched = []
+                        processed_records = self._merge_staged(
+                            staging, 'portfolio_historical', 'portfolio_stage',
+                            columns=['Date', 'CUSIP', 'cusip_standardized', 'SECURITY', 'QUANTITY', 'PRICE',
+                                     'MARKET VALUE', 'WEIGHT', 'universe_match_status', 'universe_match_date',
+                                     'source_file', 'file_date'],
+                            select_expressions=[
+                                's."Date"', 's."CUSIP"', 's.cusip_standardized', 's."SECURITY"',
+                                's."QUANTITY"', 's."PRICE"', 's."MARKET VALUE"', 's."WEIGHT"',
+                                f"CASE WHEN {match_expression} THEN 'matched' ELSE 'unmatched' END",
+                                "DATE('now', 'localtime')",
+                                's.source_file', 's.file_date'
+                            ],
+                            conflict_columns=['Date', 'CUSIP', 'cusip_standardized']
+                        )
                         
-                        for _, row in batch_df.iterrows():
-                            # Standardize CUSIP
-                            cusip_result = self.cusip_standardizer.standardize_cusip(
-                                row['CUSIP'],
-                                context={'table_name': 'portfolio_historical', 'source_file': portfolio_file}
+                        # Track unmatched CUSIPs with an anti-join inside SQLite
+                        if unmatched_cusips:
+                            self._merge_unmatched_cusips(
+                                staging, 'portfolio_stage', 'portfolio_historical', portfolio_file,
+                                security_column='SECURITY', date_column='Date',
+                                where_sql=f"NOT {match_expression}"
                             )
-                            
-                            standardized_cusip = cusip_result['cusip_standardized']
-                            
-                            # Check universe match
-                            universe_match = standardized_cusip in universe_cusips
-                            if universe_match:
-                                matched_cusips += 1
-                                match_status = 'matched'
-                            else:
-                                unmatched_cusips += 1
-                                match_status = 'unmatched'
-                                
-                                # Track unmatched CUSIP
-                                unmatched_date = str(row['Date']) if pd.notna(row['Date']) else None
-                                batch_unmatched.append({
-                                    'cusip_original': row['CUSIP'],
-                                    'cusip_standardized': standardized_cusip,
-                                    'security_name': row.get('SECURITY', ''),
-                                    'date': unmatched_date
-                                })
-                            
-                            # Convert pandas Timestamp to string for SQLite compatibility
-                            date_str = str(row['Date']) if pd.notna(row['Date']) else None
-                            
-                            # Prepare record for insertion
-                            record = (
-                                date_str,
-                                row['CUSIP'],
-                                standardized_cusip,
-                                row.get('SECURITY', ''),
-                                row.get('QUANTITY'),
-                                row.get('PRICE'),
-                                row.get('VALUE'),  # This maps to MARKET VALUE column
-                                row.get('VALUE PCT NAV'),  # This maps to WEIGHT column
-                                match_status,
-                                datetime.now().date(),
-                                portfolio_file,
-                                date_str  # file_date same as date
-                            )
-                            batch_records.append(record)
-                        
-                        # Insert portfolio batch
-                        insert_sql = """
-                            INSERT OR REPLACE INTO portfolio_historical 
-                            ("Date", "CUSIP", cusip_standardized, "SECURITY", "QUANTITY", "PRICE", "MARKET VALUE", 
-                             "WEIGHT", universe_match_status, universe_match_date, 
-                             source_file, file_date)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """
-                        
-                        rows_affected = self.db_connection.execute_many(insert_sql, batch_records)
-                        processed_records += rows_affected
-                        
-                        # Insert unmatched CUSIPs
-                        if batch_unmatched:
-                            self._insert_unmatched_cusips('portfolio_historical', batch_unmatched, portfolio_file)
                         
-                        self._log_pipeline_event(f"Processed portfolio batch {start_idx//batch_size + 1}", {
-                            'records_in_batch': len(batch_records),
-                            'rows_affected': rows_affected,
-                            'matched_cusips': matched_cusips,
-                            'unmatched_cusips': unmatched_cusips
-                        })
+                        self._apply_summary_delta(conn, 'portfolio_historical', touched_dates)
+                
+                self._log_pipeline_event("Portfolio data merged", {
+                    'rows_affected': processed_records,
+                    'matched_cusips': matched_cusips,
+                    'unmatched_cusips': unmatched_cusips
+                })
                 
                 # Update pipeline statistics
                 self.pipeline_stats['total_records_processed'] += processed_records
@@ -560,6 +611,9 @@ class DatabasePipeline:
         Returns:
             True if load successful, False otherwise
         """
+        if self.low_memory:
+            return self._load_combined_runs_streaming(runs_file, force_full_refresh)
+        
         try:
             with self.logger.operation_context("load_combined_runs_data", {'file': runs_file}):
                 
@@ -583,45 +637,28 @@ class DatabasePipeline:
                     'columns': list(df.columns)
                 })
                 
-                # Standardize CUSIPs with error handling for logging issues
+                # Keep the CUSIP as received, fill missing ones from the security name, then standardize
                 df['cusip_original'] = df['CUSIP'].copy()
+                df['CUSIP'] = self._resolve_missing_cusips(df, 'Security', 'combined_runs_historical')
                 
-                def safe_standardize_cusip(cusip):
-                    if pd.isna(cusip):
-                        return None
-                    try:
-                        result = self.cusip_standardizer.standardize_cusip(cusip)
-                        if isinstance(result, dict):
-                            standardized = result.get('cusip_standardized')
-                            if standardized and standardized.strip():  # Check if we got a valid result
-                                return standardized
-                            else:
-                                # If standardization failed, return original CUSIP as fallback
-                                return cusip
-                        else:
-                            return result if result else cusip  # Fallback to original if None
-                    except Exception as e:
-                        # Log the error but don't fail the pipeline
-                        print(f"Warning: CUSIP standardization failed for {cusip}: {e}")
-                        return cusip  # Return original CUSIP as fallback
-                
-                df['cusip_standardized'] = df['CUSIP'].apply(safe_standardize_cusip)
+                df['cusip_standardized'] = self._standardize_cusip_column(df['CUSIP'], 'combined_runs_historical')
                 
-                # Handle unmatched CUSIPs
+                # Unmatched CUSIPs are tracked during the merge and left out of the load
                 unmatched_mask = df['cusip_standardized'].isna()
                 unmatched_count = unmatched_mask.sum()
+                unmatched_df = None
                 
                 if unmatched_count > 0:
                     self._log_pipeline_event(f"Found {unmatched_count} unmatched CUSIPs in combined runs data")
-                    unmatched_list = df[unmatched_mask][['cusip_original', 'Security']].to_dict('records')
-                    self._insert_unmatched_cusips('combined_runs_historical', unmatched_list, runs_file)
-                    df = df[~unmatched_mask]  # Remove unmatched records
+                    unmatched_df = pd.DataFrame({
+                        'Date': pd.to_datetime(df.loc[unmatched_mask, 'Date']).dt.strftime('%Y-%m-%d').values,
+                        'CUSIP': df.loc[unmatched_mask, 'cusip_original'].values,
+                        'cusip_standardized': None,
+                        'Security': self._column_or_default(df.loc[unmatched_mask], 'Security')
+                    })
+                    df = df[~unmatched_mask].copy()  # Remove unmatched records
                 
-                # Prepare data for database insertion
-                df['date'] = pd.to_datetime(df['Date']).dt.date
-                df['source_file'] = runs_file
-                df['file_date'] = df['date']  # file_date same as date for combined runs
-                df['loaded_timestamp'] = datetime.now()
+                df['date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
                 
                 # Aggregate data by date, CUSIP, and dealer to handle duplicates
                 self._log_pipeline_event("Checking for duplicates and taking most recent records")
@@ -648,166 +685,75 @@ class DatabasePipeline:
                         'duplicates_removed': original_count - len(df)
                     })
                 
-                # Data is already deduplicated by taking most recent records (no averaging needed)
-                
-                # Convert timestamp columns to strings for SQLite compatibility
-                timestamp_columns = ['date']
-                for col in timestamp_columns:
-                    if col in df.columns:
-                        df[col] = df[col].astype(str)
-                
                 # Decide update strategy
                 update_strategy = self._decide_update_strategy(
                     'combined_runs_historical', runs_file, df, force_full_refresh
                 )
-                
-                # Execute database operations
-                conn = self.db_connection.connect()
-                
-                if update_strategy['update_type'] == 'full_refresh':
-                    self._log_pipeline_event("Performing full refresh of combined runs data")
-                    
-                    # Clear existing data
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM combined_runs_historical")
-                    
-                    # Insert new data in batches
-                    batch_size = 1000
-                    total_batches = (len(df) + batch_size - 1) // batch_size
+                full_refresh = update_strategy['update_type'] == 'full_refresh'
+                
+                staged_df = pd.DataFrame({
+                    'Date': df['date'].values,
+                    'CUSIP': df['CUSIP'].values,
+                    'cusip_standardized': df['cusip_standardized'].values,
+                    'Security': self._column_or_default(df, 'Security'),
+                    'Dealer': df['Dealer'].values,
+                    'Bid Spread': self._column_or_default(df, 'Bid Spread'),
+                    'Ask Spread': self._column_or_default(df, 'Ask Spread'),
+                    'Bid Size': self._column_or_default(df, 'Bid Size'),
+                    'Ask Size': self._column_or_default(df, 'Ask Size'),
+                    'Bid Interpolated Spread to Government': self._column_or_default(
+                        df, 'Bid Interpolated Spread to Government'),
+                    'Keyword': self._column_or_default(df, 'Keyword')
+                })
+                touched_dates = None if full_refresh else df['date'].unique()
+                
+                # Stage and merge set-based, so rows for a sealed year are routed to its shard
+                conn = self._connect()
+                with StagingArea(conn, location=self.staging_location, logger=self.logger,
+                                 query_log=self.slow_query_log) as staging:
+                    staging.stage_dataframe('runs_stage', staged_df, batch_size=self.batch_size)
+                    del staged_df
+                    if unmatched_df is not None:
+                        staging.stage_dataframe('runs_unmatched', unmatched_df, batch_size=self.batch_size)
                     
-                    for i in range(0, len(df), batch_size):
-                        batch = df.iloc[i:i+batch_size]
-                        batch_records = batch.to_dict('records')
-                        
-                        # Transform column names to match SQL parameters (replace spaces with underscores)
-                        # Only keep the keys required by the SQL insert
-                        required_keys = [
-                            'date', 'cusip_original', 'cusip_standardized', 'Security', 'Dealer',
-                            'Bid_Spread', 'Ask_Spread', 'Bid_Size', 'Ask_Size',
-                            'Bid_Interpolated_Spread_to_Government', 'Keyword',
-                            'source_file', 'file_date', 'loaded_timestamp'
-                        ]
-                        
-                        # Transform and filter records
-                        transformed_batch_records = []
-                        for record in batch_records:
-                            transformed_record = {}
-                            for key, value in record.items():
-                                if key == 'Bid Spread':
-                                    transformed_record['Bid_Spread'] = value
-                                elif key == 'Ask Spread':
-                                    transformed_record['Ask_Spread'] = value
-                                elif key == 'Bid Size':
-                                    transformed_record['Bid_Size'] = value
-                                elif key == 'Ask Size':
-                                    transformed_record['Ask_Size'] = value
-                                elif key == 'Bid Interpolated Spread to Government':
-                                    transformed_record['Bid_Interpolated_Spread_to_Government'] = value
-                                else:
-                                    transformed_record[key] = value
-                            # Convert datetime/timestamp objects to strings for SQLite compatibility
-                            for k, v in transformed_record.items():
-                                if isinstance(v, (pd.Timestamp, datetime, datetime_time)):
-                                    transformed_record[k] = str(v)
-                            # Filter to only required keys
-                            filtered_record = {k: transformed_record.get(k, None) for k in required_keys}
-                            transformed_batch_records.append(filtered_record)
-                        batch_records = transformed_batch_records
-                        if batch_records:
-                            print(f"DEBUG: Combined runs batch {i//batch_size + 1}, first record keys: {list(batch_records[0].keys())}")
-                            print(f"DEBUG: Combined runs batch {i//batch_size + 1}, first record types: {[type(v) for v in batch_records[0].values()]}")
-                        
-                        # Insert batch
-                        cursor.executemany("""
-                            INSERT INTO combined_runs_historical (
-                                "Date", "CUSIP", cusip_standardized, "Security", "Dealer", 
-                                "Bid Spread", "Ask Spread", "Bid Size", "Ask Size",
-                                "Bid Interpolated Spread to Government", "Keyword",
-                                source_file, file_date, loaded_timestamp
-                            ) VALUES (
-                                :date, :cusip_original, :cusip_standardized, :Security, :Dealer,
-                                :Bid_Spread, :Ask_Spread, :Bid_Size, :Ask_Size,
-                                :Bid_Interpolated_Spread_to_Government, :Keyword,
-                                :source_file, :file_date, :loaded_timestamp
+                    # Write lock is held only for the merge
+                    with self._write_transaction(staging):
+                        self._begin_summary_delta(conn, 'combined_runs_historical', touched_dates)
+                        if unmatched_df is not None:
+                            self._merge_unmatched_cusips(
+                                staging, 'runs_unmatched', 'combined_runs_historical', runs_file,
+                                security_column='Security', date_column='Date'
                             )
-                        """, batch_records)
                         
-                        batch_num = (i // batch_size) + 1
-                        self._log_pipeline_event(f"Inserted batch {batch_num}/{total_batches}", {
-                            'batch_size': len(batch),
-                            'total_inserted': i + len(batch)
-                        })
-                    
-                    conn.commit()
-                    
-                else:  # Incremental update
-                    self._log_pipeline_event("Performing incremental update of combined runs data")
-                    
-                    # Get existing dates
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT DISTINCT date FROM combined_runs_historical")
-                    existing_dates = {row[0] for row in cursor.fetchall()}
-                    
-                    # Filter to new dates only
-                    new_dates = set(df['date'].unique()) - existing_dates
-                    new_data = df[df['date'].isin(new_dates)]
-                    
-                    if len(new_data) > 0:
-                        # Insert new data in batches
-                        batch_size = 1000
-                        total_batches = (len(new_data) + batch_size - 1) // batch_size
+                        if full_refresh:
+                            self._log_pipeline_event("Performing full refresh of combined runs data")
+                            self._clear_table(conn, 'combined_runs_historical')
+                            new_dates_filter = None
+                        else:
+                            self._log_pipeline_event("Performing incremental update of combined runs data")
+                            new_dates_filter = (
+                                'NOT EXISTS (SELECT 1 FROM combined_runs_historical h '
+                                'WHERE h.date = s."Date")'
+                            )
                         
-                        for i in range(0, len(new_data), batch_size):
-                            batch = new_data.iloc[i:i+batch_size]
-                            batch_records = batch.to_dict('records')
-                            
-                            # Transform column names to match SQL parameters (replace spaces with underscores)
-                            for idx, record in enumerate(batch_records):
-                                transformed_record = {}
-                                for key, value in record.items():
-                                    if key == 'Bid Spread':
-                                        transformed_record['Bid_Spread'] = value
-                                    elif key == 'Ask Spread':
-                                        transformed_record['Ask_Spread'] = value
-                                    elif key == 'Bid Size':
-                                        transformed_record['Bid_Size'] = value
-                                    elif key == 'Ask Size':
-                                        transformed_record['Ask_Size'] = value
-                                    elif key == 'Bid Interpolated Spread to Government':
-                                        transformed_record['Bid_Interpolated_Spread_to_Government'] = value
-                                    else:
-                                        transformed_record[key] = value
-                                
-                                # Convert datetime/timestamp objects to strings for SQLite compatibility
-                                for key, value in transformed_record.items():
-                                    if isinstance(value, (pd.Timestamp, datetime, datetime_time)):
-                                        transformed_record[key] = str(value)
-                                
-                                batch_records[idx] = transformed_record
-                            
-                            cursor.executemany("""
-                                INSERT INTO combined_runs_historical (
-                                    "Date", "CUSIP", cusip_standardized, "Security", "Dealer", 
-                                    "Bid Spread", "Ask Spread", "Bid Size", "Ask Size",
-                                    "Bid Interpolated Spread to Government", "Keyword",
-                                    source_file, file_date, loaded_timestamp
-                                ) VALUES (
-                                    :date, :cusip_original, :cusip_standardized, :Security, :Dealer,
-                                    :Bid_Spread, :Ask_Spread, :Bid_Size, :Ask_Size,
-                                    :Bid_Interpolated_Spread_to_Government, :Keyword,
-                                    :source_file, :file_date, :loaded_timestamp
-                                )
-                            """, batch_records)
-                            
-                            batch_num = (i // batch_size) + 1
-                            self._log_pipeline_event(f"Inserted batch {batch_num}/{total_batches}", {
-                                'batch_size': len(batch),
-                                'total_inserted': i + len(batch)
-                            })
+                        rows_inserted = self._merge_staged(
+                            staging, 'combined_runs_historical', 'runs_stage',
+                            columns=['Date', 'CUSIP', 'cusip_standardized', 'Security', 'Dealer',
+                                     'Bid Spread', 'Ask Spread', 'Bid Size', 'Ask Size',
+                                     'Bid Interpolated Spread to Government', 'Keyword',
+                                     'source_file', 'file_date', 'loaded_timestamp'],
+                            select_expressions=['s."Date"', 's."CUSIP"', 's.cusip_standardized', 's."Security"',
+                                                's."Dealer"', 's."Bid Spread"', 's."Ask Spread"', 's."Bid Size"',
+                                                's."Ask Size"', 's."Bid Interpolated Spread to Government"',
+                                                's."Keyword"', '?', 's."Date"', '?'],
+                            where_sql=new_dates_filter,
+                            params=(runs_file, str(datetime.now()))
+                        )
                         
-                        conn.commit()
-                    else:
-                        self._log_pipeline_event("No new data to insert for combined runs")
+                        self._apply_summary_delta(conn, 'combined_runs_historical', touched_dates)
+                
+                if rows_inserted == 0:
+                    self._log_pipeline_event("No new data to insert for combined runs")
                 
                 # Update pipeline statistics
                 self.pipeline_stats['total_records_processed'] += len(df)
@@ -817,6 +763,7 @@ class DatabasePipeline:
                 
                 self._log_pipeline_event("Combined runs data loading completed successfully", {
                     'records_processed': len(df),
+                    'records_inserted': rows_inserted,
                     'cusips_matched': len(df) - unmatched_count,
                     'cusips_unmatched': unmatched_count,
                     'update_strategy': update_strategy['update_type']
@@ -873,22 +820,7 @@ class DatabasePipeline:
                 # Standardize CUSIPs with error handling for logging issues
                 print(f"DEBUG: Standardizing CUSIPs")
                 df['cusip_original'] = df['CUSIP'].copy()
-                
-                def safe_standardize_cusip(cusip):
-                    if pd.isna(cusip):
-                        return None
-                    try:
-                        result = self.cusip_standardizer.standardize_cusip(cusip)
-                        if isinstance(result, dict):
-                            return result.get('standardized_cusip')
-                        else:
-                            return result
-                    except Exception as e:
-                        # Log the error but don't fail the pipeline
-                        print(f"Warning: CUSIP standardization failed for {cusip}: {e}")
-                        return cusip  # Return original CUSIP as fallback
-                
-                df['cusip_standardized'] = df['CUSIP'].apply(safe_standardize_cusip)
+                df['cusip_standardized'] = self._standardize_cusip_column(df['CUSIP'], 'run_monitor')
                 print(f"DEBUG: CUSIP standardization complete, standardized count: {df['cusip_standardized'].notna().sum()}, nulls: {df['cusip_standardized'].isna().sum()}")
                 
                 # Handle unmatched CUSIPs
@@ -976,7 +908,7 @@ class DatabasePipeline:
                 self._log_pipeline_event("Performing full refresh of run monitor data")
                 
                 # Execute database operations
-                conn = self.db_connection.connect()
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # Clear existing data
@@ -1068,7 +1000,10 @@ class DatabasePipeline:
                         'total_inserted': i + len(batch)
                     })
                 
+                self._apply_summary_delta(conn, 'run_monitor')
+                self._persist_lookups(conn)
                 conn.commit()
+                self.cusip_cache.mark_persisted()
                 
                 # Update pipeline statistics
                 self.pipeline_stats['total_records_processed'] += len(agg_df)
@@ -1092,6 +1027,48 @@ class DatabasePipeline:
             self._log_pipeline_error("Failed to load run monitor data", e, {'file': run_monitor_file})
             return False
 
+    def refresh_run_monitor(self, as_of_date: Optional[str] = None) -> bool:
+        """
+        Compute the run monitor report from combined_runs_historical.
+        
+        Only the as-of date and its period reference dates are read, so an
+        intraday refresh after a runs load does not re-read the full history.
+        
+        Args:
+            as_of_date: Report date as 'YYYY-MM-DD' (None for the latest runs date)
+            
+        Returns:
+            True if the report was computed, False otherwise
+        """
+        try:
+            with self.logger.operation_context("refresh_run_monitor", {'as_of_date': as_of_date}):
+                conn = self._connect()
+                if conn.in_transaction:
+                    conn.commit()
+                
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    result = self.run_monitor_engine.refresh(conn, as_of_date)
+                    if result['current_updated']:
+                        self._apply_summary_delta(conn, 'run_monitor')
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                
+                if result['current_updated']:
+                    self.pipeline_stats['total_records_processed'] += result['rows_written']
+                    self.pipeline_stats['cusips_matched'] += result['rows_written'] - result['unmatched_cusips']
+                    self.pipeline_stats['cusips_unmatched'] += result['unmatched_cusips']
+                    self.pipeline_stats['tables_updated'].append('run_monitor')
+                
+                self._log_pipeline_event("Run monitor computed from combined runs", result)
+                return True
+                
+        except Exception as e:
+            self._log_pipeline_error("Failed to compute run monitor", e, {'as_of_date': as_of_date})
+            return False
+
     def load_gspread_analytics_data(self, gspread_file: str, force_full_refresh: bool = False) -> bool:
         """
         Load G-spread analytics data with full refresh logic.
@@ -1103,6 +1080,9 @@ class DatabasePipeline:
         Returns:
             True if load successful, False otherwise
         """
+        if self.low_memory:
+            return self._load_gspread_analytics_streaming(gspread_file)
+        
         try:
             with self.logger.operation_context("load_gspread_analytics_data", {'file': gspread_file}):
                 
@@ -1126,47 +1106,11 @@ class DatabasePipeline:
                     'columns': list(df.columns)
                 })
                 
-                # Standardize CUSIPs for the single CUSIP column
+                # Keep the CUSIP as received, fill missing ones from the security name,
+                # then standardize the single CUSIP column
                 df['cusip_original'] = df['CUSIP'].copy()
-                
-                def safe_standardize_cusip(cusip):
-                    if pd.isna(cusip):
-                        return None
-                    try:
-                        result = self.cusip_standardizer.standardize_cusip(cusip)
-                        if isinstance(result, dict):
-                            standardized = result.get('cusip_standardized')
-                            if standardized and standardized.strip():  # Check if we got a valid result
-                                return standardized
-                            else:
-                                # If standardization failed, return original CUSIP as fallback
-                                return cusip
-                        else:
-                            return result if result else cusip  # Fallback to original if None
-                    except Exception as e:
-                        # Log the error but don't fail the pipeline
-                        if not self.disable_logging:
-                            print(f"Warning: CUSIP standardization failed for {cusip}: {e}")
-                        return cusip  # Return original CUSIP as fallback
-                
-                # Use parallel processing if enabled
-                if self.parallel and len(df) > 1000:  # Only parallelize for large datasets
-                    self._log_pipeline_event("Using parallel CUSIP standardization", {
-                        'total_records': len(df),
-                        'workers': min(mp.cpu_count(), 8)  # Limit to 8 workers
-                    })
-                    
-                    # Process CUSIP in parallel
-                    with ThreadPoolExecutor(max_workers=min(mp.cpu_count(), 8)) as executor:
-                        cusip_results = list(executor.map(safe_standardize_cusip, df['CUSIP']))
-                    df['cusip_standardized'] = cusip_results
-                    
-                    # Garbage collection if low memory mode
-                    if self.low_memory:
-                        gc.collect()
-                else:
-                    # Sequential processing
-                    df['cusip_standardized'] = df['CUSIP'].apply(safe_standardize_cusip)
+                df['CUSIP'] = self._resolve_missing_cusips(df, 'Security', 'gspread_analytics')
+                df['cusip_standardized'] = self._standardize_cusip_column(df['CUSIP'], 'gspread_analytics')
                 
                 # Handle unmatched CUSIPs
                 unmatched_mask = df['cusip_standardized'].isna()
@@ -1197,7 +1141,7 @@ class DatabasePipeline:
                 self._log_pipeline_event("Performing full refresh of G-spread analytics data")
                 
                 # Execute database operations
-                conn = self.db_connection.connect()
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # Clear existing data
@@ -1226,7 +1170,7 @@ class DatabasePipeline:
                             "CUSIP", cusip_standardized, "Security", "GSpread", "DATE",
                             universe_match_status, universe_match_date, source_file, loaded_timestamp
                         ) VALUES (
-                            :cusip_original, :cusip_standardized, :Security, :GSpread, :DATE,
+                            :CUSIP, :cusip_standardized, :Security, :GSpread, :DATE,
                             'matched', NULL, :source_file, :loaded_timestamp
                         )
                     """, batch_records)
@@ -1241,7 +1185,10 @@ class DatabasePipeline:
                     if self.low_memory and batch_num % 10 == 0:  # Every 10 batches
                         gc.collect()
                 
+                self._apply_summary_delta(conn, 'gspread_analytics')
+                self._persist_lookups(conn)
                 conn.commit()
+                self.cusip_cache.mark_persisted()
                 
                 # Update pipeline statistics
                 self.pipeline_stats['total_records_processed'] += len(df)
@@ -1273,12 +1220,12 @@ class DatabasePipeline:
             with self.logger.operation_context("database_optimization"):
                 self._log_pipeline_event("Starting database optimization")
                 
-                conn = self.db_connection.connect()
+                conn = self._connect()
                 cursor = conn.cursor()
                 
                 # VACUUM to reclaim space and optimize storage
                 self._log_pipeline_event("Running VACUUM operation")
-                cursor.execute("VACUUM")
+                self.shard_manager.vacuum(conn)
                 
                 # ANALYZE to update statistics for query optimization
                 self._log_pipeline_event("Running ANALYZE operation")
@@ -1302,7 +1249,129 @@ class DatabasePipeline:
         except Exception as e:
             self._log_pipeline_error("Database optimization failed", e)
             return False
-    
+
+    def migrate_to_compact_storage(self, tables: Optional[List[str]] = None, allow_collapse: bool = False) -> bool:
+        """
+        Move the historical tables to integer-keyed compact storage (one-off).
+
+        Each table becomes a WITHOUT ROWID fact table keyed by Julian-day date
+        and security/CUSIP ids, behind a view with the original name and columns.
+
+        Args:
+            tables: Tables to migrate (default: universe, portfolio and runs history)
+            allow_collapse: Keep one row per compact key instead of failing when
+                            rows share a key (e.g. two times of day on one date)
+
+        Returns:
+            True if migration successful, False otherwise
+        """
+        try:
+            with self.logger.operation_context("compact_storage_migration"):
+                size_before_mb = self.database_path.stat().st_size / (1024 * 1024)
+                conn = self._connect()
+                if conn.in_transaction:
+                    conn.commit()
+
+                if self.shard_manager.is_sharded(conn):
+                    raise ValueError("Compact storage cannot be combined with sharded history")
+                
+                migrated = {}
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for table_name in tables or list(CompactStorage.COMPACT_TABLES):
+                        if self.compact_storage.is_compact(conn, table_name):
+                            self._log_pipeline_event("Table already in compact storage", {'table_name': table_name})
+                            continue
+                        migrated[table_name] = self.compact_storage.migrate(
+                            conn, table_name, allow_collapse=allow_collapse
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+                # Reclaim the pages freed by the dropped row tables and indexes
+                conn.execute("VACUUM")
+                size_after_mb = self.database_path.stat().st_size / (1024 * 1024)
+
+                self._log_pipeline_event("Compact storage migration completed", {
+                    'tables_migrated': migrated,
+                    'size_before_mb': round(size_before_mb, 2),
+                    'size_after_mb': round(size_after_mb, 2)
+                })
+
+                return True
+
+        except Exception as e:
+            self._log_pipeline_error("Compact storage migration failed", e)
+            return False
+
+    def shard_history(self, before_year: Optional[int] = None) -> bool:
+        """
+        Move cold years of the historical tables into per-year shard files.
+        
+        The main database keeps the current year, so loads, VACUUM and
+        backups of it no longer touch years of history. Can be re-run, e.g.
+        after a year end, to seal the finished year.
+        
+        Args:
+            before_year: First year kept in the main database (default: year of the latest date)
+            
+        Returns:
+            True if sharding successful, False otherwise
+        """
+        try:
+            with self.logger.operation_context("shard_history", {'before_year': before_year}):
+                size_before_mb = self.database_path.stat().st_size / (1024 * 1024)
+                conn = self._connect()
+                if conn.in_transaction:
+                    conn.commit()
+                
+                compacted = [table for table in ShardManager.SHARD_TABLES
+                             if self.compact_storage.is_compact(conn, table)]
+                if compacted:
+                    raise ValueError(f"Sharded history cannot be combined with compact storage: {compacted}")
+                
+                moved = self.shard_manager.seal_years(conn, before_year)
+                
+                # Hand the pages freed in the main database back to the file system
+                if moved:
+                    self.shard_manager.vacuum(conn)
+                size_after_mb = self.database_path.stat().st_size / (1024 * 1024)
+                
+                self._log_pipeline_event("History sharding completed", {
+                    'rows_moved': moved,
+                    'shards': [shard['year'] for shard in self.shard_manager.registered_shards(conn)],
+                    'size_before_mb': round(size_before_mb, 2),
+                    'size_after_mb': round(size_after_mb, 2)
+                })
+                
+                return True
+                
+        except Exception as e:
+            self._log_pipeline_error("History sharding failed", e)
+            return False
+
+    def vacuum_shard(self, year: int) -> bool:
+        """
+        VACUUM a single history shard, leaving the main database and other shards alone.
+        
+        Args:
+            year: Shard year
+            
+        Returns:
+            True if the shard was vacuumed, False otherwise
+        """
+        try:
+            conn = self._connect()
+            if conn.in_transaction:
+                conn.commit()
+            self.shard_manager.vacuum(conn, year)
+            return True
+        except Exception as e:
+            self._log_pipeline_error("Shard VACUUM failed", e, {'year': year})
+            return False
+
     def run_full_pipeline(self, data_sources: Dict[str, str], force_full_refresh: bool = False) -> bool:
         """
         Run complete pipeline for all data sources.
@@ -1349,8 +1418,11 @@ class DatabasePipeline:
                     if self.load_combined_runs_data(data_sources['runs'], force_full_refresh):
                         success_count += 1
                 
-                # 4. Load run monitor data (requires universe for CUSIP validation)
-                if 'run_monitor' in data_sources:
+                # 4. Run monitor: computed from the loaded runs, or loaded from run_monitor.parquet
+                if self.run_monitor_in_db:
+                    if self.refresh_run_monitor() and 'run_monitor' in data_sources:
+                        success_count += 1
+                elif 'run_monitor' in data_sources:
                     if self.load_run_monitor_data(data_sources['run_monitor'], force_full_refresh):
                         success_count += 1
                 
@@ -1374,6 +1446,8 @@ class DatabasePipeline:
                     else:
                         self._log_pipeline_event("Database optimization failed, but pipeline completed")
                 
+                self._flush_slow_queries()
+                
                 self._log_pipeline_event("Full pipeline execution completed", {
                     'duration_seconds': duration,
                     'sources_processed': success_count,
@@ -1391,52 +1465,166 @@ class DatabasePipeline:
             self._log_pipeline_error("Full pipeline execution failed", e)
             return False
     
-    def create_backup(self, backup_path: Optional[str] = None) -> bool:
+    def create_backup(self, backup_path: Optional[str] = None, pages_per_step: int = 1024,
+                      sleep_seconds: float = 0.05, compress: bool = False, keep_backups: int = 0) -> bool:
         """
-        Create database backup with timestamp.
+        Create an online database backup with timestamp.
+        
+        Pages are copied in steps with a pause between them, so loads and
+        queries keep running while the backup is taken.
         
         Args:
             backup_path: Custom backup path, or None for auto-generated path
+            pages_per_step: Pages copied per backup step (-1 for a single step)
+            sleep_seconds: Pause between backup steps
+            compress: Gzip the finished backup
+            keep_backups: Keep only this many most recent auto-named backups (0 keeps all)
             
         Returns:
             True if backup successful, False otherwise
         """
         try:
-            if backup_path is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_path = f"backups/trading_analytics_backup_{timestamp}.db"
+            auto_named = backup_path is None
+            if auto_named:
+                backup_path = OnlineBackup.default_backup_path()
             
-            success = self.db_connection.backup_database(backup_path)
+            backup = OnlineBackup(
+                str(self.database_path),
+                pages_per_step=pages_per_step,
+                sleep_seconds=sleep_seconds,
+                logger=self.logger
+            )
+            backup_stats = backup.run(backup_path, compress=compress)
             
-            if success:
-                self._log_pipeline_event("Database backup created successfully", {
-                    'backup_path': backup_path,
-                    'original_size_mb': self.db_connection._get_database_file_size()
-                })
+            removed = []
+            if auto_named and keep_backups > 0:
+                removed = OnlineBackup.rotate_backups(
+                    str(Path(backup_path).parent), "trading_analytics_backup_*", keep_backups
+                )
             
-            return success
+            # Sealed shards rarely change: copy only those modified since their last backup
+            conn = self._connect()
+            shard_backups = []
+            for shard in self.shard_manager.shards_needing_backup(conn):
+                shard_backup = OnlineBackup(
+                    shard['path'],
+                    pages_per_step=pages_per_step,
+                    sleep_seconds=sleep_seconds,
+                    logger=self.logger
+                ).run(str(Path(backup_path).parent / 'shards' / Path(shard['path']).name), compress=compress)
+                self.shard_manager.mark_backed_up(conn, shard['year'])
+                conn.commit()
+                shard_backups.append(shard_backup['backup_path'])
+            
+            self._log_pipeline_event("Database backup created successfully", {
+                'backup_path': backup_stats['backup_path'],
+                'original_size_mb': self.db_connection._get_database_file_size(),
+                'backup_size_mb': backup_stats.get('compressed_size_mb', backup_stats['size_mb']),
+                'steps': backup_stats['steps'],
+                'duration_seconds': backup_stats['duration_seconds'],
+                'throughput_mb_per_second': backup_stats['throughput_mb_per_second'],
+                'rotated_backups': [str(path) for path in removed],
+                'shard_backups': shard_backups
+            })
+            
+            return True
             
         except Exception as e:
             self._log_pipeline_error("Database backup failed", e)
             return False
     
+    def export_snapshot(self, snapshot_path: str, tables: Optional[List[str]] = None,
+                        start_date: Optional[str] = None, end_date: Optional[str] = None) -> bool:
+        """
+        Export a compacted, read-only analytics snapshot with a manifest alongside it.
+        
+        The live database is read once through VACUUM INTO, so loads keep
+        running; history shards are folded back into the snapshot's tables.
+        
+        Args:
+            snapshot_path: Destination snapshot file
+            tables: Tables to include (None for all)
+            start_date: First date kept in dated tables (YYYY-MM-DD)
+            end_date: Last date kept in dated tables (YYYY-MM-DD)
+            
+        Returns:
+            True if the snapshot was written, False otherwise
+        """
+        try:
+            with self.logger.operation_context("export_snapshot", {'snapshot_path': snapshot_path}):
+                conn = self._connect()
+                shards = [(shard['year'], shard['path']) for shard in self.shard_manager.registered_shards(conn)]
+                if conn.in_transaction:
+                    conn.commit()
+                
+                manifest = SnapshotExporter(str(self.database_path), logger=self.logger).export(
+                    snapshot_path, tables=tables, start_date=start_date, end_date=end_date, shards=shards
+                )
+                
+                self._log_pipeline_event("Analytics snapshot exported", {
+                    'snapshot_path': manifest['snapshot_path'],
+                    'manifest_path': str(manifest_path(manifest['snapshot_path'])),
+                    'size_mb': manifest['size_mb'],
+                    'duration_seconds': manifest['duration_seconds'],
+                    'tables': len(manifest['tables'])
+                })
+                
+                return True
+                
+        except Exception as e:
+            self._log_pipeline_error("Snapshot export failed", e, {'snapshot_path': snapshot_path})
+            return False
+    
+    def index_advice(self, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """
+        Propose indexes from the slow queries logged in perf_query_log.
+        
+        Args:
+            limit: Maximum number of suggestions
+            
+        Returns:
+            Suggestions ranked by total logged time, or None on failure
+        """
+        try:
+            self._flush_slow_queries()
+            conn = self._connect()
+            suggestions = IndexAdvisor(logger=self.logger).advise(conn, limit=limit)
+            self._log_pipeline_event("Index advice generated", {'suggestions': len(suggestions)})
+            return suggestions
+        except Exception as e:
+            self._log_pipeline_error("Index advice failed", e)
+            return None
+    
     def get_pipeline_status(self) -> Dict[str, Any]:
         """Get comprehensive pipeline status and statistics"""
         
         # Get database health
         health_results = self.db_connection.check_health()
         
-        # Get connection statistics
-        conn_stats = self.db_connection.get_connection_statistics()
-        
         # Get CUSIP standardization statistics
         cusip_stats = self.cusip_standardizer.get_standardization_statistics()
+        cusip_stats['cache'] = self.cusip_cache.get_statistics()
+        if self.name_resolver is not None:
+            cusip_stats['name_index'] = self.name_resolver.get_statistics()
         
-        # Get table row counts
-        table_counts = self._get_table_row_counts()
+        # Read every summary from one snapshot so the report is consistent
+        with self._status_reader() as conn:
+            # Get table row counts
+            table_counts = self._get_table_row_counts(conn)
+            
+            # Get unmatched CUSIP summary
+            unmatched_summary = self._get_unmatched_cusip_summary(conn)
+            
+            # Get latest-universe coverage
+            universe_coverage = self._get_universe_coverage(conn)
         
-        # Get unmatched CUSIP summary
-        unmatched_summary = self._get_unmatched_cusip_summary()
+        # Get connection statistics
+        conn_stats = self.db_connection.get_connection_statistics()
+        if self.connection_pool is not None:
+            conn_stats['read_pool'] = self.connection_pool.get_connection_statistics()
+        if self.slow_query_log is not None:
+            self._flush_slow_queries()
+            conn_stats['slow_query_log'] = self.slow_query_log.get_statistics()
         
         return {
             'pipeline_statistics': self.pipeline_stats,
@@ -1445,9 +1633,265 @@ class DatabasePipeline:
             'cusip_statistics': cusip_stats,
             'table_row_counts': table_counts,
             'unmatched_cusip_summary': unmatched_summary,
+            'universe_coverage': universe_coverage,
             'last_updated': datetime.now().isoformat()
         }
     
+    # ============================================
+    # LOW-MEMORY STREAMING LOADERS
+    # ============================================
+    
+    def _iter_source_batches(self, source_file: str, columns: Optional[List[str]] = None):
+        """Yield a source file as DataFrames of at most batch_size rows (Arrow record batches or CSV chunks)"""
+        if source_file.lower().endswith('.csv'):
+            usecols = None if columns is None else (lambda col: col in columns)
+            yield from pd.read_csv(source_file, chunksize=self.batch_size, usecols=usecols)
+        else:
+            parquet_processor = ParquetProcessor(config={}, logger=self.logger.db_logger)
+            yield from parquet_processor.iter_parquet_batches(
+                source_file, batch_size=self.batch_size, columns=columns
+            )
+    
+    def _load_combined_runs_streaming(self, runs_file: str, force_full_refresh: bool = False) -> bool:
+        """
+        Low-memory variant of load_combined_runs_data.
+        
+        Streams the source in record batches. Each batch is standardized,
+        transformed, appended to a temp-file staging table and discarded.
+        Duplicate resolution (most recent Time per date/CUSIP/dealer) and the
+        incremental new-dates filter run inside SQLite during the merge, so
+        peak memory is bounded by batch size rather than by the runs history.
+        
+        Args:
+            runs_file: Path to combined runs parquet (or CSV) file
+            force_full_refresh: Whether to force full refresh instead of incremental
+            
+        Returns:
+            True if load successful, False otherwise
+        """
+        source_columns = [
+            'Date', 'Time', 'CUSIP', 'Security', 'Dealer', 'Bid Spread', 'Ask Spread',
+            'Bid Size', 'Ask Size', 'Bid Interpolated Spread to Government', 'Keyword'
+        ]
+        try:
+            with self.logger.operation_context("load_combined_runs_data_streaming", {'file': runs_file}):
+                conn = self._connect()
+                
+                # Temp-file staging keeps the staged history out of memory
+                with StagingArea(conn, location='', logger=self.logger,
+                                 query_log=self.slow_query_log) as staging:
+                    batches = self._iter_source_batches(runs_file, columns=source_columns)
+                    for batch_num, batch_df in enumerate(batches, start=1):
+                        batch_df['CUSIP'] = self._resolve_missing_cusips(
+                            batch_df, 'Security', 'combined_runs_historical'
+                        )
+                        times = batch_df['Time'] if 'Time' in batch_df.columns else pd.Series(None, index=batch_df.index)
+                        staged_df = pd.DataFrame({
+                            'Date': pd.to_datetime(batch_df['Date']).dt.strftime('%Y-%m-%d').values,
+                            'Time': times.astype(str).where(times.notna(), None).values,
+                            'CUSIP': batch_df['CUSIP'].values,
+                            'cusip_standardized': self._standardize_cusip_column(batch_df['CUSIP']).values,
+                            'Security': self._column_or_default(batch_df, 'Security'),
+                            'Dealer': batch_df['Dealer'].values,
+                            'Bid Spread': self._column_or_default(batch_df, 'Bid Spread'),
+                            'Ask Spread': self._column_or_default(batch_df, 'Ask Spread'),
+                            'Bid Size': self._column_or_default(batch_df, 'Bid Size'),
+                            'Ask Size': self._column_or_default(batch_df, 'Ask Size'),
+                            'Bid Interpolated Spread to Government': self._column_or_default(
+                                batch_df, 'Bid Interpolated Spread to Government'),
+                            'Keyword': self._column_or_default(batch_df, 'Keyword')
+                        })
+                        staging.stage_dataframe('runs_stage', staged_df, batch_size=self.batch_size, append=True)
+                        del batch_df, staged_df
+                        
+                        if batch_num % 10 == 0:
+                            gc.collect()
+                    
+                    total_staged = staging.staged_row_count('runs_stage')
+                    if total_staged == 0:
+                        raise Exception("Combined runs file is empty or could not be read")
+                    
+                    stage_table = staging.qualified('runs_stage')
+                    unmatched_count = staging.execute(
+                        f"SELECT COUNT(*) FROM {stage_table} WHERE cusip_standardized IS NULL"
+                    ).fetchone()[0]
+                    
+                    # Take the most recent record for each date/CUSIP/dealer combination
+                    record_count = staging.stage_query('runs_latest', f"""
+                        SELECT * FROM (
+                            SELECT s.*, ROW_NUMBER() OVER (
+                                PARTITION BY s."Date", s.cusip_standardized, s."Dealer"
+                                ORDER BY s."Time" DESC
+                            ) AS recency_rank
+                            FROM {stage_table} s
+                            WHERE s.cusip_standardized IS NOT NULL
+                        ) WHERE recency_rank = 1
+                    """)
+                    
+                    self._log_pipeline_event("Combined runs data streamed into staging", {
+                        'file': runs_file,
+                        'records_staged': total_staged,
+                        'records_after_deduplication': record_count,
+                        'duplicates_removed': total_staged - unmatched_count - record_count,
+                        'unmatched_cusips': unmatched_count
+                    })
+                    
+                    staged_dates = pd.DataFrame({'date': [
+                        row[0] for row in staging.execute(
+                            f'SELECT DISTINCT "Date" FROM {staging.qualified("runs_latest")}'
+                        )
+                    ]})
+                    update_strategy = self._decide_update_strategy(
+                        'combined_runs_historical', runs_file, staged_dates, force_full_refresh
+                    )
+                    del staged_dates
+                    
+                    if update_strategy['update_type'] == 'full_refresh':
+                        touched_dates = None
+                    else:
+                        touched_dates = [
+                            row[0] for row in staging.execute(
+                                f'SELECT DISTINCT "Date" FROM {staging.qualified("runs_latest")}'
+                            )
+                        ]
+                    
+                    # Write lock is held only for the merge
+                    with self._write_transaction(staging):
+                        self._begin_summary_delta(conn, 'combined_runs_historical', touched_dates)
+                        if unmatched_count > 0:
+                            self._merge_unmatched_cusips(
+                                staging, 'runs_stage', 'combined_runs_historical', runs_file,
+                                security_column='Security', date_column='Date',
+                                where_sql='s.cusip_standardized IS NULL'
+                            )
+                        
+                        if update_strategy['update_type'] == 'full_refresh':
+                            self._clear_table(conn, 'combined_runs_historical')
+                            new_dates_filter = None
+                        else:
+                            new_dates_filter = (
+                                'NOT EXISTS (SELECT 1 FROM combined_runs_historical h '
+                                'WHERE h.date = s."Date")'
+                            )
+                        
+                        rows_inserted = self._merge_staged(
+                            staging, 'combined_runs_historical', 'runs_latest',
+                            columns=['Date', 'CUSIP', 'cusip_standardized', 'Security', 'Dealer',
+                                     'Bid Spread', 'Ask Spread', 'Bid Size', 'Ask Size',
+                                     'Bid Interpolated Spread to Government', 'Keyword',
+                                     'source_file', 'file_date', 'loaded_timestamp'],
+                            select_expressions=['s."Date"', 's."CUSIP"', 's.cusip_standardized', 's."Security"',
+                                                's."Dealer"', 's."Bid Spread"', 's."Ask Spread"', 's."Bid Size"',
+                                                's."Ask Size"', 's."Bid Interpolated Spread to Government"',
+                                                's."Keyword"', '?', 's."Date"', '?'],
+                            where_sql=new_dates_filter,
+                            params=(runs_file, str(datetime.now()))
+                        )
+                        
+                        self._apply_summary_delta(conn, 'combined_runs_historical', touched_dates)
+                
+                # Update pipeline statistics
+                self.pipeline_stats['total_records_processed'] += record_count
+                self.pipeline_stats['cusips_matched'] += record_count
+                self.pipeline_stats['cusips_unmatched'] += unmatched_count
+                self.pipeline_stats['tables_updated'].append('combined_runs_historical')
+                
+                self._log_pipeline_event("Combined runs data loading completed successfully", {
+                    'records_processed': record_count,
+                    'records_inserted': rows_inserted,
+                    'cusips_unmatched': unmatched_count,
+                    'update_strategy': update_strategy['update_type'],
+                    'streaming': True
+                })
+                
+                return True
+                
+        except Exception as e:
+            self._log_pipeline_error("Failed to load combined runs data", e, {'file': runs_file})
+            return False
+    
+    def _load_gspread_analytics_streaming(self, gspread_file: str) -> bool:
+        """
+        Low-memory variant of load_gspread_analytics_data.
+        
+        Streams the source in record batches into a temp-file staging table,
+        then replaces gspread_analytics in one short write transaction.
+        
+        Args:
+            gspread_file: Path to G-spread analytics parquet (or CSV) file
+            
+        Returns:
+            True if load successful, False otherwise
+        """
+        try:
+            with self.logger.operation_context("load_gspread_analytics_data_streaming", {'file': gspread_file}):
+                conn = self._connect()
+                
+                with StagingArea(conn, location='', logger=self.logger,
+                                 query_log=self.slow_query_log) as staging:
+                    batches = self._iter_source_batches(gspread_file, columns=['CUSIP', 'Security', 'GSpread', 'DATE'])
+                    for batch_num, batch_df in enumerate(batches, start=1):
+                        batch_df['CUSIP'] = self._resolve_missing_cusips(batch_df, 'Security', 'gspread_analytics')
+                        staged_df = pd.DataFrame({
+                            'CUSIP': batch_df['CUSIP'].values,
+                            'cusip_standardized': self._standardize_cusip_column(batch_df['CUSIP']).values,
+                            'Security': self._column_or_default(batch_df, 'Security'),
+                            'GSpread': self._column_or_default(batch_df, 'GSpread'),
+                            'DATE': self._column_or_default(batch_df, 'DATE')
+                        })
+                        staging.stage_dataframe('gspread_stage', staged_df, batch_size=self.batch_size, append=True)
+                        del batch_df, staged_df
+                        
+                        if batch_num % 10 == 0:
+                            gc.collect()
+                    
+                    total_staged = staging.staged_row_count('gspread_stage')
+                    unmatched_count = staging.execute(
+                        f"SELECT COUNT(*) FROM {staging.qualified('gspread_stage')} WHERE cusip_standardized IS NULL"
+                    ).fetchone()[0]
+                    record_count = total_staged - unmatched_count
+                    
+                    # G-spread analytics is always full refresh (no date dimension)
+                    with self._write_transaction(staging):
+                        if unmatched_count > 0:
+                            self._merge_unmatched_cusips(
+                                staging, 'gspread_stage', 'gspread_analytics', gspread_file,
+                                security_column='Security', date_column='DATE',
+                                where_sql='s.cusip_standardized IS NULL'
+                            )
+                        
+                        conn.execute("DELETE FROM gspread_analytics")
+                        staging.merge(
+                            'gspread_analytics', 'gspread_stage',
+                            columns=['CUSIP', 'cusip_standardized', 'Security', 'GSpread', 'DATE',
+                                     'universe_match_status', 'universe_match_date', 'source_file',
+                                     'loaded_timestamp'],
+                            select_expressions=['s."CUSIP"', 's.cusip_standardized', 's."Security"',
+                                                's."GSpread"', 's."DATE"', "'matched'", 'NULL', '?', '?'],
+                            where_sql='s.cusip_standardized IS NOT NULL',
+                            params=(gspread_file, str(datetime.now()))
+                        )
+                        self._apply_summary_delta(conn, 'gspread_analytics')
+                
+                # Update pipeline statistics
+                self.pipeline_stats['total_records_processed'] += record_count
+                self.pipeline_stats['cusips_matched'] += record_count
+                self.pipeline_stats['cusips_unmatched'] += unmatched_count
+                self.pipeline_stats['tables_updated'].append('gspread_analytics')
+                
+                self._log_pipeline_event("G-spread analytics data loading completed successfully", {
+                    'records_processed': record_count,
+                    'cusips_unmatched': unmatched_count,
+                    'update_strategy': 'full_refresh',
+                    'streaming': True
+                })
+                
+                return True
+                
+        except Exception as e:
+            self._log_pipeline_error("Failed to load G-spread analytics data", e, {'file': gspread_file})
+            return False
+    
     # ============================================
     # HELPER METHODS
     # ============================================
@@ -1519,70 +1963,311 @@ class DatabasePipeline:
         
         return decision
     
-    def _get_current_universe_cusips(self) -> set:
-        """Get set of current universe CUSIPs for validation"""
-        try:
-            results = self.db_connection.execute_query(
-                "SELECT DISTINCT cusip_standardized FROM current_universe"
-            )
-            return {row[0] for row in results} if results else set()
-        except Exception:
-            return set()
-    
     def _insert_unmatched_cusips(self, source_table: str, unmatched_list: List[Dict], source_file: str):
         """Insert unmatched CUSIPs into tracking tables"""
         try:
-            current_date = datetime.now().date()
-            
-            # Insert into all dates table
-            all_dates_records = []
-            last_date_records = []
+            if not unmatched_list:
+                return
             
-            for unmatched in unmatched_list:
-                # All dates record
-                all_dates_record = (
-                    source_table,
-                    unmatched.get('date'),
-                    unmatched['cusip_original'],
-                    unmatched['cusip_standardized'],
-                    unmatched.get('security_name', ''),
-                    current_date,
-                    source_file
-                )
-                all_dates_records.append(all_dates_record)
-                
-                # Last date record
-                last_date_record = (
-                    source_table,
-                    unmatched['cusip_original'],
-                    unmatched['cusip_standardized'],
-                    unmatched.get('security_name', ''),
-                    current_date,
-                    source_file
-                )
-                last_date_records.append(last_date_record)
+            unmatched_df = pd.DataFrame(unmatched_list)
+            security_names = unmatched_df.get('security_name', unmatched_df.get('Security'))
+            staged_df = pd.DataFrame({
+                'date': self._column_or_default(unmatched_df, 'date'),
+                'cusip_original': unmatched_df['cusip_original'].values,
+                'cusip_standardized': self._column_or_default(unmatched_df, 'cusip_standardized'),
+                'security_name': security_names.values if security_names is not None else ''
+            })
             
-            # Insert batch into all dates table
-            if all_dates_records:
-                self.db_connection.execute_many("""
-                    INSERT INTO unmatched_cusips_all_dates 
-                    (source_table, date, cusip_original, cusip_standardized, 
-                     security_name, universe_match_attempted_date, source_file)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, all_dates_records)
-            
-            # Insert batch into last date table (with REPLACE for updates)
-            if last_date_records:
-                self.db_connection.execute_many("""
-                    INSERT OR REPLACE INTO unmatched_cusips_last_date 
-                    (source_table, cusip_original, cusip_standardized, 
-                     security_name, universe_match_attempted_date, source_file)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, last_date_records)
+            conn = self._connect()
+            with StagingArea(conn, location=self.staging_location, logger=self.logger,
+                             query_log=self.slow_query_log) as staging:
+                staging.stage_dataframe('unmatched_stage', staged_df, batch_size=self.batch_size)
+                with staging.write_transaction():
+                    self._merge_unmatched_cusips(
+                        staging, 'unmatched_stage', source_table, source_file,
+                        security_column='security_name', date_column='date',
+                        cusip_column='cusip_original'
+                    )
             
         except Exception as e:
             self._log_pipeline_error("Failed to insert unmatched CUSIPs", e)
     
+    def _merge_unmatched_cusips(self, staging: StagingArea, staged_table: str, source_table: str,
+                                source_file: str, security_column: str, date_column: str,
+                                cusip_column: str = 'CUSIP', where_sql: Optional[str] = None) -> int:
+        """
+        Copy unmatched CUSIPs from a staging table into the tracking tables.
+        
+        Must run inside ``staging.write_transaction()``.
+        
+        Args:
+            staging: Attached staging area holding the rows
+            staged_table: Staging table name
+            source_table: Table the CUSIPs were loaded into
+            source_file: Source file path recorded with each CUSIP
+            security_column: Staged column holding the security name
+            date_column: Staged column holding the row date
+            cusip_column: Staged column holding the original CUSIP
+            where_sql: Optional filter selecting the unmatched rows (e.g. an anti-join)
+            
+        Returns:
+            Number of rows added to unmatched_cusips_all_dates
+        """
+        security_expression = f"COALESCE(s.\"{security_column}\", '')"
+        cusip_expression = f"COALESCE(s.\"{cusip_column}\", '')"
+        common_params = (source_table, source_file)
+        
+        # Insert into all dates table
+        rows_inserted = staging.merge(
+            'unmatched_cusips_all_dates', staged_table,
+            columns=['source_table', 'date', 'cusip_original', 'cusip_standardized',
+                     'security_name', 'universe_match_attempted_date', 'source_file'],
+            select_expressions=['?', f's."{date_column}"', cusip_expression, 's.cusip_standardized',
+                                security_expression, "DATE('now', 'localtime')", '?'],
+            where_sql=where_sql, params=common_params
+        )
+        
+        # Insert into last date table (with REPLACE for updates)
+        staging.merge(
+            'unmatched_cusips_last_date', staged_table,
+            columns=['source_table', 'cusip_original', 'cusip_standardized',
+                     'security_name', 'universe_match_attempted_date', 'source_file'],
+            select_expressions=['?', cusip_expression, 's.cusip_standardized',
+                                security_expression, "DATE('now', 'localtime')", '?'],
+            where_sql=where_sql, params=common_params, or_replace=True
+        )
+        
+        touched_dates = [
+            row[0] for row in staging.connection.execute(
+                f'SELECT DISTINCT s."{date_column}" FROM {staging.qualified(staged_table)} AS s '
+                f'WHERE {where_sql or "true"}'
+            )
+        ]
+        self._apply_summary_delta(staging.connection, 'unmatched_cusips_all_dates', touched_dates)
+        self._apply_summary_delta(staging.connection, 'unmatched_cusips_last_date')
+        
+        return rows_inserted
+    
+    def _validate_schema(self, conn) -> Dict[str, Any]:
+        """Validate the schema, treating compacted tables (now views) as present"""
+        validation_results = self.db_schema.validate_schema(conn)
+        return self.compact_storage.filter_schema_validation(conn, validation_results, self.db_schema.indexes)
+    
+    def _merge_staged(self, staging: StagingArea, target_table: str, staged_table: str, **merge_options) -> int:
+        """
+        Merge staged rows into a live table.
+        
+        Writes straight into the fact table of a compacted table, and routes
+        rows for a sealed year into that year's shard.
+        """
+        if self.compact_storage.is_compact(staging.connection, target_table):
+            return self.compact_storage.merge(staging, target_table, staged_table, **merge_options)
+        
+        columns = merge_options['columns']
+        date_index = next((i for i, column in enumerate(columns) if column.lower() == 'date'), None)
+        routes = []
+        if date_index is not None:
+            select_expressions = merge_options.get('select_expressions')
+            date_expression = (select_expressions[date_index] if select_expressions
+                               else f's."{columns[date_index]}"')
+            routes = self.shard_manager.merge_routes(staging.connection, target_table, date_expression)
+        if not routes:
+            return staging.merge(target_table, staged_table, **merge_options)
+        
+        rows_merged = 0
+        where_sql = merge_options.pop('where_sql', None)
+        for schema, route_sql in routes:
+            rows_merged += staging.merge(
+                target_table, staged_table, target_schema=schema,
+                where_sql=f"({where_sql or 'true'}) AND {route_sql}", **merge_options
+            )
+        return rows_merged
+    
+    def _ensure_row_hash_column(self, conn, table_name: str) -> bool:
+        """
+        Make sure a table stores row hashes, adding the column (to main and every shard) if needed.
+        
+        Returns False for a table compacted before the column existed, which is loaded without hashes.
+        """
+        if self.compact_storage.is_compact(conn, table_name):
+            return self.change_detector.has_column(conn, table_name)
+        if self.change_detector.ensure_column(conn, table_name):
+            self.shard_manager.sync_columns(conn, table_name)
+            conn.commit()
+        return True
+    
+    def _delete_staged_keys(self, staging: StagingArea, table_name: str, staged_table: str,
+                            key_columns: List[str]) -> int:
+        """Delete the rows whose keys were staged, from the main table and every shard (or through the compact view)"""
+        key_sql = ", ".join(f'"{column}"' for column in key_columns)
+        conn = staging.connection
+        if self.compact_storage.is_compact(conn, table_name):
+            targets = [table_name]
+        else:
+            targets = [f"main.{table_name}"] + [
+                f"{self.shard_manager.schema_name(shard['year'])}.{table_name}"
+                for shard in self.shard_manager.registered_shards(conn)
+            ]
+        return sum(staging.execute(
+            f"DELETE FROM {target} WHERE ({key_sql}) IN (SELECT {key_sql} FROM {staging.qualified(staged_table)})"
+        ).rowcount for target in targets)
+    
+    def _clear_table(self, conn, table_name: str):
+        """Delete every row of a table (the fact table directly when compacted, and every shard)"""
+        conn.execute(f"DELETE FROM main.{self.compact_storage.storage_table(conn, table_name)}")
+        self.shard_manager.clear(conn, table_name)
+    
+    def _ensure_summary_tables(self, conn):
+        """Create the status summaries and materialised views, building them once from the live tables if new"""
+        created = self.status_summary.ensure_tables(conn)
+        if created:
+            self.status_summary.rebuild(conn)
+        installed = self.materialized_views.ensure_installed(conn)
+        if created or installed:
+            conn.commit()
+    
+    def _begin_summary_delta(self, conn, table_name: str, dates=None):
+        """
+        Remove the rows a load is about to rewrite from the materialised views.
+        
+        Call inside the write transaction before the write, and pair with
+        ``_apply_summary_delta`` after it.
+        
+        Args:
+            conn: Connection holding the write transaction
+            table_name: Table about to be loaded
+            dates: Dates the load will write (None for full refresh)
+        """
+        self.materialized_views.ensure_installed(conn)
+        self.materialized_views.begin_delta(conn, table_name, dates)
+    
+    def _apply_summary_delta(self, conn, table_name: str, dates=None):
+        """
+        Apply a load's delta to the status summaries and materialised views.
+        
+        Runs inside the loader's write transaction so the summaries commit
+        (or roll back) together with the data.
+        
+        Args:
+            conn: Connection holding the write transaction
+            table_name: Table that was loaded
+            dates: Dates touched by the load (None for full refresh / snapshot tables)
+        """
+        if self.status_summary.ensure_tables(conn):
+            self.status_summary.rebuild(conn)
+        else:
+            self.status_summary.refresh_counts(conn, table_name, dates)
+            if table_name == StatusSummary.UNIVERSE_TABLE:
+                # A new universe date changes orphans for every dependent table
+                self.status_summary.refresh_orphans(conn)
+            elif table_name in StatusSummary.ORPHAN_SOURCES:
+                self.status_summary.refresh_orphans(conn, [table_name])
+        
+        # A fresh install is built from the tables as they are now, with this load included
+        if not self.materialized_views.ensure_installed(conn):
+            self.materialized_views.end_delta(conn, table_name, dates)
+    
+    def _standardize_cusips(self, cusips: pd.Series, table_name: Optional[str] = None) -> pd.DataFrame:
+        """Standardize a whole CUSIP column, computing only values the persistent cache has not seen"""
+        results = self.cusip_cache.standardize_series(cusips, self._connect())
+        if table_name is not None:
+            self._log_pipeline_event("CUSIPs standardized", {
+                'table_name': table_name,
+                'rows': len(results),
+                'statuses': standardization_counts(results)
+            })
+        return results
+    
+    def _standardize_cusip_column(self, cusips: pd.Series, table_name: Optional[str] = None) -> pd.Series:
+        """Standardized CUSIP per row: None for nulls, the original value where standardization gives nothing"""
+        standardized = self._standardize_cusips(cusips, table_name)['cusip_standardized']
+        standardized = standardized.where(standardized.str.strip() != '', cusips)
+        return standardized.where(cusips.notna(), None)
+    
+    @contextmanager
+    def _write_transaction(self, staging: StagingArea):
+        """Loader write transaction that also persists the CUSIP cache entries and bond names gathered for the load"""
+        try:
+            with staging.write_transaction() as conn:
+                yield conn
+                self._persist_lookups(conn)
+        except Exception:
+            # Reload the bond name index from what was committed
+            self.name_resolver = None
+            raise
+        self.cusip_cache.mark_persisted()
+    
+    def _persist_lookups(self, conn):
+        """Write pending CUSIP cache entries and bond name index changes (no commit)"""
+        self.cusip_cache.flush(conn)
+        if self.name_resolver is not None:
+            self.name_resolver.save(conn)
+    
+    def _get_name_resolver(self, conn=None) -> BondNameResolver:
+        """
+        Bond name index, loaded once from bond_name_index (built from universe_historical the first time).
+        
+        A freshly built index is written by the next loader write transaction, not here.
+        """
+        if self.name_resolver is None:
+            conn = conn or self._connect()
+            self.name_resolver = BondNameResolver.load(conn)
+            if not len(self.name_resolver):
+                universe_names = pd.read_sql_query(
+                    'SELECT "Security", cusip_standardized FROM universe_historical ORDER BY "Date"', conn
+                )
+                self.name_resolver.update(universe_names, 'Security', 'cusip_standardized')
+        return self.name_resolver
+    
+    def _update_name_index(self, conn, names: pd.Series, cusips: pd.Series):
+        """Add loaded universe names to the bond name index (written with the load's transaction)"""
+        resolver = self._get_name_resolver(conn)
+        counts = resolver.update(pd.DataFrame({'Security': names.values, 'CUSIP': cusips.values}))
+        self._log_pipeline_event("Bond name index updated", counts)
+    
+    def _resolve_missing_cusips(self, df: pd.DataFrame, name_column: str,
+                                table_name: Optional[str] = None) -> pd.Series:
+        """
+        CUSIP column with missing CUSIPs filled in where the security name resolves against the universe.
+        
+        Each resolved name is logged with the universe name it matched, the match type and the score.
+        """
+        cusips = df['CUSIP']
+        if name_column not in df.columns:
+            return cusips
+        positions = np.flatnonzero((missing_cusip_mask(cusips) & df[name_column].notna()).to_numpy())
+        if not len(positions):
+            return cusips
+        
+        resolved = self._get_name_resolver().resolve(df[name_column].to_numpy(dtype=object)[positions])
+        found = resolved['cusip'].notna().to_numpy()
+        values = cusips.to_numpy(dtype=object).copy()
+        values[positions[found]] = resolved['cusip'].to_numpy(dtype=object)[found]
+        if table_name is not None:
+            self._log_pipeline_event("Missing CUSIPs resolved from security names", {
+                'table_name': table_name,
+                'missing': len(positions),
+                'resolved': int(found.sum()),
+                'fuzzy_matches': int((resolved['match_type'] == 'fuzzy').sum()),
+                'resolutions': resolved[found][['name', 'matched_name', 'cusip', 'match_type', 'score']]
+                               .drop_duplicates('name').to_dict('records')
+            })
+        return pd.Series(values, index=cusips.index)
+    
+    @staticmethod
+    def _to_sqlite_date_strings(dates: pd.Series) -> pd.Series:
+        """Render a date column the way SQLite rows have always stored it (str of the value)"""
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            formatted = dates.dt.strftime('%Y-%m-%d %H:%M:%S')
+        else:
+            formatted = dates.astype(str)
+        return formatted.where(dates.notna(), None).reset_index(drop=True)
+    
+    @staticmethod
+    def _column_or_default(df: pd.DataFrame, column: str, default: Any = None):
+        """Return a column's values, or a scalar default when the column is absent"""
+        return df[column].values if column in df.columns else default
+    
     def _generate_pipeline_summary(self) -> Dict[str, Any]:
         """Generate comprehensive pipeline execution summary"""
         try:
@@ -1606,43 +2291,102 @@ class DatabasePipeline:
             self._log_pipeline_error("Error generating pipeline summary", e)
             return {'error': str(e)}
     
-    def _get_table_row_counts(self) -> Dict[str, int]:
-        """Get row counts for all main tables"""
-        tables = ['universe_historical', 'portfolio_historical', 'combined_runs_historical', 
-                 'run_monitor', 'gspread_analytics', 
-                 'unmatched_cusips_all_dates', 'unmatched_cusips_last_date']
-        
-        counts = {}
-        for table in tables:
-            try:
-                result = self.db_connection.execute_query(f"SELECT COUNT(*) FROM {table}")
-                counts[table] = result[0][0] if result else 0
-            except Exception:
-                counts[table] = 0
-        
-        return counts
+    def _connect(self):
+        """Get the writer connection, with any history shards attached behind their union views"""
+        conn = self.db_connection.connect()
+        if not conn.in_transaction:
+            self.shard_manager.attach(conn)
+        return conn
     
-    def _get_unmatched_cusip_summary(self) -> Dict[str, Any]:
+    def _get_connection_pool(self) -> Optional[ConnectionPool]:
+        """Get the read-only connection pool (None when pooled reads are disabled)"""
+        if self.read_pool_size > 0 and self.connection_pool is None:
+            self.connection_pool = ConnectionPool(
+                str(self.database_path),
+                reader_count=self.read_pool_size,
+                logger=self.logger,
+                config={'busy_timeout': 60000},
+                writer_connection=self._connect(),
+                on_connect=lambda reader: self.shard_manager.attach(reader, read_only=True)
+            )
+            if self.slow_query_log is not None:
+                self.slow_query_log.instrument(self.connection_pool, 'execute_read', source='read_pool')
+        return self.connection_pool
+    
+    def _flush_slow_queries(self):
+        """Write buffered slow-query entries, unless a write transaction is open"""
+        if self.slow_query_log is None or not self.slow_query_log.pending:
+            return
+        conn = self._connect()
+        if not conn.in_transaction:
+            self.slow_query_log.flush(conn)
+    
+    @contextmanager
+    def _status_reader(self, conn=None):
+        """Yield a connection for status reads: the given one, a pooled snapshot, or the writer"""
+        if conn is not None:
+            yield conn
+            return
+        
+        # Summary tables are created (and first built) through the writer
+        self._ensure_summary_tables(self._connect())
+        pool = self._get_connection_pool()
+        if pool is None:
+            yield self._connect()
+        else:
+            with pool.read_snapshot() as reader:
+                yield reader
+    
+    def _get_table_row_counts(self, conn=None) -> Dict[str, int]:
+        """Get row counts for all main tables from the status summaries"""
+        try:
+            with self._status_reader(conn) as reader:
+                return self.status_summary.get_row_counts(reader)
+        except Exception as e:
+            self._log_pipeline_error("Error reading table row counts", e)
+            return {table: 0 for table in StatusSummary.TRACKED_TABLES}
+    
+    def _get_universe_coverage(self, conn=None) -> Dict[str, Any]:
+        """Get latest-universe coverage (orphans and match rates) from the status summaries"""
+        try:
+            with self._status_reader(conn) as reader:
+                coverage = self.status_summary.get_coverage(reader)
+                coverage['latest_dates'] = self.status_summary.get_latest_dates(reader)
+            return coverage
+        except Exception as e:
+            self._log_pipeline_error("Error reading universe coverage", e)
+            return {
+                'reference_date': None,
+                'universe_cusips': 0,
+                'orphaned_by_table': {},
+                'match_rates': {},
+                'orphaned_cusips': [],
+                'latest_dates': {},
+                'error': str(e)
+            }
+    
+    def _get_unmatched_cusip_summary(self, conn=None) -> Dict[str, Any]:
         """Get summary of unmatched CUSIPs"""
         try:
-            # Get counts by source table
-            results = self.db_connection.execute_query("""
-                SELECT source_table, COUNT(*) as unmatched_count
-                FROM unmatched_cusips_last_date
-                GROUP BY source_table
-                ORDER BY unmatched_count DESC
-            """)
+            with self._status_reader(conn) as reader:
+                # Get counts by source table
+                results = reader.execute("""
+                    SELECT source_table, COUNT(*) as unmatched_count
+                    FROM unmatched_cusips_last_date
+                    GROUP BY source_table
+                    ORDER BY unmatched_count DESC
+                """).fetchall()
+                
+                # Get most recent unmatched examples
+                examples = reader.execute("""
+                    SELECT source_table, cusip_original, cusip_standardized, security_name
+                    FROM unmatched_cusips_last_date
+                    ORDER BY loaded_timestamp DESC
+                    LIMIT 10
+                """).fetchall()
             
             by_table = {row[0]: row[1] for row in results} if results else {}
             
-            # Get most recent unmatched examples
-            examples = self.db_connection.execute_query("""
-                SELECT source_table, cusip_original, cusip_standardized, security_name
-                FROM unmatched_cusips_last_date
-                ORDER BY loaded_timestamp DESC
-                LIMIT 10
-            """)
-            
             return {
                 'unmatched_by_table': by_table,
                 'total_unmatched_last_date': sum(by_table.values()),
@@ -1681,6 +2425,37 @@ class DatabasePipeline:
         })
 
 
+def _print_universe_coverage(coverage: Dict[str, Any]):
+    """Print latest-universe coverage read from the status summaries"""
+    print(f"\n🌍 LAST UNIVERSE DATE COVERAGE:")
+    if coverage.get('error'):
+        print(f"   ⚠️  Could not perform last universe date coverage analysis: {coverage['error']}")
+        return
+    if not coverage.get('reference_date'):
+        print(f"   ⚠️  Could not determine last universe date")
+        return
+    
+    print(f"   📅 Last universe date: {coverage['reference_date']}")
+    print(f"   🌍 Total CUSIPs on last date: {coverage['universe_cusips']:,}")
+    
+    orphaned_by_table = coverage['orphaned_by_table']
+    total_orphaned = sum(orphaned_by_table.values())
+    if total_orphaned == 0:
+        print(f"   🟢 No orphaned CUSIPs found - all CUSIPs in other tables exist in universe")
+        return
+    
+    print(f"   ⚠️  Orphaned CUSIPs (in other tables but NOT in universe): {total_orphaned:,}")
+    print(f"   📊 Orphaned by table:")
+    for table, count in orphaned_by_table.items():
+        match_rate = coverage['match_rates'][table]['match_rate_percent']
+        print(f"      • {table}: {count:,} orphaned ({match_rate:.1f}% matched)")
+    
+    print(f"   📝 All orphaned CUSIPs (not in universe):")
+    for orphan in coverage['orphaned_cusips']:
+        print(f"      - {orphan['cusip_standardized']} ({orphan['security_name'][:50]}...) "
+              f"- Orphaned in {orphan['table_name']}")
+
+
 def main():
     """Main entry point for database pipeline execution"""
     parser = argparse.ArgumentParser(description='Trading Analytics Database Pipeline')
@@ -1693,7 +2468,15 @@ def main():
     parser.add_argument('--force-refresh', action='store_true',
                        help='Force full refresh instead of incremental updates')
     parser.add_argument('--backup', action='store_true',
-                       help='Create database backup')
+                       help='Create online database backup')
+    parser.add_argument('--backup-pages', type=int, default=1024,
+                       help='Pages copied per online backup step (default: 1024, -1 for one step)')
+    parser.add_argument('--backup-sleep', type=float, default=0.05,
+                       help='Seconds to pause between backup steps (default: 0.05)')
+    parser.add_argument('--backup-compress', action='store_true',
+                       help='Gzip the finished backup')
+    parser.add_argument('--backup-keep', type=int, default=0,
+                       help='Keep only the N most recent backups (default: 0, keep all)')
     parser.add_argument('--status', action='store_true',
                        help='Show pipeline status and statistics')
     parser.add_argument('--universe', type=str,
@@ -1711,11 +2494,41 @@ def main():
     parser.add_argument('--parallel', action='store_true',
                        help='Enable parallel processing for CUSIP standardization')
     parser.add_argument('--low-memory', action='store_true',
-                       help='Enable low memory mode with garbage collection')
+                       help='Stream runs and G-spread sources in record batches to bound memory use')
     parser.add_argument('--optimize-db', action='store_true',
                        help='Optimize database after loading (VACUUM, ANALYZE)')
     parser.add_argument('--disable-logging', action='store_true',
                        help='Disable detailed logging for faster execution')
+    parser.add_argument('--staging-temp-file', action='store_true',
+                       help='Stage loads in an anonymous temp-file database instead of memory')
+    parser.add_argument('--compact-storage', action='store_true',
+                       help='Move historical tables to integer-keyed compact storage (one-off migration)')
+    parser.add_argument('--compact-allow-collapse', action='store_true',
+                       help='Keep one row per compact key when migrating rows that share a key')
+    parser.add_argument('--read-pool', type=int, default=0,
+                       help='Serve status reads from N read-only WAL snapshot connections (0 = off)')
+    parser.add_argument('--run-monitor-in-db', action='store_true',
+                       help='Compute run_monitor from combined_runs_historical instead of run_monitor.parquet')
+    parser.add_argument('--shard-history', action='store_true',
+                       help='Move cold years of the historical tables into per-year shard databases')
+    parser.add_argument('--vacuum-shard', type=int, metavar='YEAR',
+                       help='VACUUM one history shard')
+    parser.add_argument('--run-monitor-asof', type=str,
+                       help='Compute the run monitor report as of DATE (YYYY-MM-DD) into run_monitor_history')
+    parser.add_argument('--slow-query-ms', type=float, default=0,
+                       help='Log queries slower than N ms to perf_query_log (default: 0, off)')
+    parser.add_argument('--slow-query-sample', type=float, default=1.0,
+                       help='Fraction of slow queries logged (default: 1.0)')
+    parser.add_argument('--index-advice', action='store_true',
+                       help='Suggest indexes from the slow queries in perf_query_log')
+    parser.add_argument('--snapshot', type=str, metavar='PATH',
+                       help='Export a compacted read-only analytics snapshot to PATH')
+    parser.add_argument('--snapshot-tables', nargs='+', metavar='TABLE',
+                       help='Tables to include in the snapshot (default: all)')
+    parser.add_argument('--snapshot-start', type=str,
+                       help='First date kept in the snapshot (YYYY-MM-DD)')
+    parser.add_argument('--snapshot-end', type=str,
+                       help='Last date kept in the snapshot (YYYY-MM-DD)')
     
     args = parser.parse_args()
     
@@ -1727,7 +2540,12 @@ def main():
         parallel=args.parallel,
         low_memory=args.low_memory,
         optimize_db=args.optimize_db,
-        disable_logging=args.disable_logging
+        disable_logging=args.disable_logging,
+        staging_location='' if args.staging_temp_file else ':memory:',
+        read_pool_size=args.read_pool,
+        run_monitor_in_db=args.run_monitor_in_db,
+        slow_query_ms=args.slow_query_ms,
+        slow_query_sample_rate=args.slow_query_sample
     )
     
     # Handle different operations
@@ -1739,10 +2557,73 @@ def main():
     
     elif args.backup:
         print("💾 Creating database backup...")
-        success = pipeline.create_backup()
+        success = pipeline.create_backup(
+            pages_per_step=args.backup_pages,
+            sleep_seconds=args.backup_sleep,
+            compress=args.backup_compress,
+            keep_backups=args.backup_keep
+        )
         print("✅ Backup created successfully!" if success else "❌ Backup creation failed!")
         return 0 if success else 1
     
+    elif args.compact_storage:
+        print("📦 Migrating historical tables to compact storage...")
+        size_before_mb = pipeline.database_path.stat().st_size / (1024 * 1024) if pipeline.database_path.exists() else 0
+        success = pipeline.migrate_to_compact_storage(allow_collapse=args.compact_allow_collapse)
+        if success:
+            size_after_mb = pipeline.database_path.stat().st_size / (1024 * 1024)
+            print(f"   📦 Size: {size_before_mb:.2f} MB -> {size_after_mb:.2f} MB")
+        print("✅ Compact storage migration completed!" if success else "❌ Compact storage migration failed!")
+        return 0 if success else 1
+    
+    elif args.shard_history:
+        print("🗂️  Moving cold history into per-year shards...")
+        success = pipeline.shard_history()
+        print("✅ History sharded successfully!" if success else "❌ History sharding failed!")
+        return 0 if success else 1
+    
+    elif args.vacuum_shard:
+        print(f"🧹 Vacuuming {args.vacuum_shard} shard...")
+        success = pipeline.vacuum_shard(args.vacuum_shard)
+        print("✅ Shard vacuumed successfully!" if success else "❌ Shard VACUUM failed!")
+        return 0 if success else 1
+    
+    elif args.index_advice:
+        print("🔎 Analysing slow-query log...")
+        suggestions = pipeline.index_advice()
+        if suggestions is None:
+            print("❌ Index advice failed!")
+            return 1
+        if not suggestions:
+            print("   No index suggestions (run with --slow-query-ms to collect slow queries)")
+        for rank, suggestion in enumerate(suggestions, 1):
+            print(f"   {rank}. {suggestion['create_sql']};")
+            print(f"      {suggestion['executions']:,} slow executions, {suggestion['total_ms']:,.1f} ms total, "
+                  f"max {suggestion['max_ms']:,.1f} ms ({', '.join(suggestion['reasons'])}"
+                  f"{', covering' if suggestion['covering'] else ''})")
+            print(f"      e.g. {suggestion['statements'][0][:120]}")
+        print("✅ Index advice generated!")
+        return 0
+    
+    elif args.snapshot:
+        print(f"📸 Exporting analytics snapshot to {args.snapshot}...")
+        success = pipeline.export_snapshot(
+            args.snapshot,
+            tables=args.snapshot_tables,
+            start_date=args.snapshot_start,
+            end_date=args.snapshot_end
+        )
+        if success:
+            print(f"   📄 Manifest: {manifest_path(args.snapshot)}")
+        print("✅ Snapshot exported successfully!" if success else "❌ Snapshot export failed!")
+        return 0 if success else 1
+    
+    elif args.run_monitor_asof:
+        print(f"📈 Computing run monitor as of {args.run_monitor_asof}...")
+        success = pipeline.refresh_run_monitor(args.run_monitor_asof)
+        print("✅ Run monitor computed successfully!" if success else "❌ Run monitor computation failed!")
+        return 0 if success else 1
+    
     elif args.status:
         print("📊 Getting pipeline status...")
         try:
@@ -1769,6 +2650,11 @@ def main():
         print(f"   📊 Total Queries: {conn_stats.get('total_queries', 0):,}")
         print(f"   ⏱️  Average Query Time: {conn_stats.get('avg_query_time_ms', 0):.2f} ms")
         print(f"   🔄 Active Connections: {conn_stats.get('active_connections', 0)}")
+        if 'read_pool' in conn_stats:
+            read_pool = conn_stats['read_pool']
+            print(f"   📖 Read Pool: {read_pool['readers_created']}/{read_pool['reader_count']} readers, "
+                  f"{read_pool['snapshots_served']:,} snapshots, "
+                  f"avg wait {read_pool['avg_wait_time_ms']:.2f} ms")
         
         # Table Row Counts with Analysis
         print(f"\n📋 TABLE STATISTICS:")
@@ -1821,152 +2707,7 @@ def main():
                     print(f"      - {example['cusip_original']} ({example['security_name'][:30]}...)")
         
         # Last Universe Date Coverage Analysis
-        print(f"\n🌍 LAST UNIVERSE DATE COVERAGE:")
-        try:
-            # Get the last universe date
-            last_date_result = pipeline.db_connection.execute_query("SELECT MAX(date) FROM universe_historical")
-            if last_date_result and last_date_result[0] and last_date_result[0][0]:
-                last_universe_date = last_date_result[0][0]
-                print(f"   📅 Last universe date: {last_universe_date}")
-                
-                # Get total CUSIPs on last universe date
-                total_last_date_result = pipeline.db_connection.execute_query(
-                    "SELECT COUNT(DISTINCT cusip_standardized) FROM universe_historical WHERE date = ?", 
-                    (last_universe_date,)
-                )
-                total_last_date_cusips = total_last_date_result[0][0] if total_last_date_result else 0
-                print(f"   🌍 Total CUSIPs on last date: {total_last_date_cusips:,}")
-                
-                # Get orphaned CUSIPs (in other tables but NOT in universe) by table
-                orphaned_by_table = {}
-                
-                # Check portfolio for orphaned CUSIPs
-                portfolio_orphaned_result = pipeline.db_connection.execute_query("""
-                    SELECT COUNT(DISTINCT p.cusip_standardized) 
-                    FROM portfolio_historical p 
-                    LEFT JOIN universe_historical u ON p.cusip_standardized = u.cusip_standardized 
-                        AND p.date = u.date
-                    WHERE p.date = ? AND u.cusip_standardized IS NULL
-                """, (last_universe_date,))
-                portfolio_orphaned = portfolio_orphaned_result[0][0] if portfolio_orphaned_result else 0
-                if portfolio_orphaned > 0:
-                    orphaned_by_table['portfolio_historical'] = portfolio_orphaned
-                
-                # Check combined runs for orphaned CUSIPs
-                runs_orphaned_result = pipeline.db_connection.execute_query("""
-                    SELECT COUNT(DISTINCT r.cusip_standardized) 
-                    FROM combined_runs_historical r 
-                    LEFT JOIN universe_historical u ON r.cusip_standardized = u.cusip_standardized 
-                        AND r.date = u.date
-                    WHERE r.date = ? AND u.cusip_standardized IS NULL
-                """, (last_universe_date,))
-                runs_orphaned = runs_orphaned_result[0][0] if runs_orphaned_result else 0
-                if runs_orphaned > 0:
-                    orphaned_by_table['combined_runs_historical'] = runs_orphaned
-                
-                # Check run monitor for orphaned CUSIPs (current table, no date)
-                monitor_orphaned_result = pipeline.db_connection.execute_query("""
-                    SELECT COUNT(DISTINCT m.cusip_standardized) 
-                    FROM run_monitor m 
-                    LEFT JOIN universe_historical u ON m.cusip_standardized = u.cusip_standardized
-                    WHERE u.cusip_standardized IS NULL
-                """)
-                monitor_orphaned = monitor_orphaned_result[0][0] if monitor_orphaned_result else 0
-                if monitor_orphaned > 0:
-                    orphaned_by_table['run_monitor'] = monitor_orphaned
-                
-                # Check gspread analytics for orphaned CUSIPs (current table, no date)
-                gspread_orphaned_result = pipeline.db_connection.execute_query("""
-                    SELECT COUNT(DISTINCT g.cusip_1_standardized) + COUNT(DISTINCT g.cusip_2_standardized) 
-                    FROM gspread_analytics g 
-                    LEFT JOIN universe_historical u1 ON g.cusip_1_standardized = u1.cusip_standardized
-                    LEFT JOIN universe_historical u2 ON g.cusip_2_standardized = u2.cusip_standardized
-                    WHERE u1.cusip_standardized IS NULL AND u2.cusip_standardized IS NULL
-                """)
-                gspread_orphaned = gspread_orphaned_result[0][0] if gspread_orphaned_result else 0
-                if gspread_orphaned > 0:
-                    orphaned_by_table['gspread_analytics'] = gspread_orphaned
-                
-                # Calculate total orphaned CUSIPs
-                total_orphaned = sum(orphaned_by_table.values())
-                
-                if total_orphaned > 0:
-                    print(f"   ⚠️  Orphaned CUSIPs (in other tables but NOT in universe): {total_orphaned:,}")
-                    
-                    # Show breakdown by table
-                    print(f"   📊 Orphaned by table:")
-                    for table, count in orphaned_by_table.items():
-                        print(f"      • {table}: {count:,} orphaned")
-                    
-                    # Show all orphaned CUSIPs
-                    print(f"   📝 All orphaned CUSIPs (not in universe):")
-                    
-                    # Get portfolio orphaned details
-                    portfolio_orphaned_details_result = pipeline.db_connection.execute_query("""
-                        SELECT p.cusip_standardized, p.security 
-                        FROM portfolio_historical p 
-                        LEFT JOIN universe_historical u ON p.cusip_standardized = u.cusip_standardized 
-                            AND p.date = u.date
-                        WHERE p.date = ? AND u.cusip_standardized IS NULL
-                        ORDER BY p.cusip_standardized
-                    """, (last_universe_date,))
-                    
-                    for row in portfolio_orphaned_details_result:
-                        cusip, security = row
-                        print(f"      - {cusip} ({security[:50]}...) - Orphaned in portfolio")
-                    
-                    # Get runs orphaned details
-                    runs_orphaned_details_result = pipeline.db_connection.execute_query("""
-                        SELECT r.cusip_standardized, r.security 
-                        FROM combined_runs_historical r 
-                        LEFT JOIN universe_historical u ON r.cusip_standardized = u.cusip_standardized 
-                            AND r.date = u.date
-                        WHERE r.date = ? AND u.cusip_standardized IS NULL
-                        ORDER BY r.cusip_standardized
-                    """, (last_universe_date,))
-                    
-                    for row in runs_orphaned_details_result:
-                        cusip, security = row
-                        print(f"      - {cusip} ({security[:50]}...) - Orphaned in runs")
-                    
-                    # Get monitor orphaned details
-                    monitor_orphaned_details_result = pipeline.db_connection.execute_query("""
-                        SELECT m.cusip_standardized, m.security 
-                        FROM run_monitor m 
-                        LEFT JOIN universe_historical u ON m.cusip_standardized = u.cusip_standardized
-                        WHERE u.cusip_standardized IS NULL
-                        ORDER BY m.cusip_standardized
-                    """)
-                    
-                    for row in monitor_orphaned_details_result:
-                        cusip, security = row
-                        print(f"      - {cusip} ({security[:50]}...) - Orphaned in run monitor")
-                    
-                    # Get gspread orphaned details
-                    gspread_orphaned_details_result = pipeline.db_connection.execute_query("""
-                        SELECT g.cusip_1_standardized, g.cusip_2_standardized, g.bond_name_1, g.bond_name_2
-                        FROM gspread_analytics g 
-                        LEFT JOIN universe_historical u1 ON g.cusip_1_standardized = u1.cusip_standardized
-                        LEFT JOIN universe_historical u2 ON g.cusip_2_standardized = u2.cusip_standardized
-                        WHERE u1.cusip_standardized IS NULL OR u2.cusip_standardized IS NULL
-                        ORDER BY g.cusip_1_standardized, g.cusip_2_standardized
-                    """)
-                    
-                    for row in gspread_orphaned_details_result:
-                        cusip1, cusip2, security1, security2 = row
-                        if cusip1 and cusip1 not in [None, '']:
-                            print(f"      - {cusip1} ({security1[:50]}...) - Orphaned in gspread (CUSIP_1)")
-                        if cusip2 and cusip2 not in [None, '']:
-                            print(f"      - {cusip2} ({security2[:50]}...) - Orphaned in gspread (CUSIP_2)")
-                        
-                else:
-                    print(f"   🟢 No orphaned CUSIPs found - all CUSIPs in other tables exist in universe")
-                    
-            else:
-                print(f"   ⚠️  Could not determine last universe date")
-                
-        except Exception as e:
-            print(f"   ⚠️  Could not perform last universe date coverage analysis: {e}")
+        _print_universe_coverage(status['universe_coverage'])
         
         # Data Quality Assessment
         print(f"\n✅ DATA QUALITY ASSESSMENT:")
@@ -2197,19 +2938,12 @@ def main():
                 
                 # Data Freshness
                 print(f"\n🕒 DATA FRESHNESS:")
-                try:
-                    # Get most recent dates from historical tables
-                    for table in ['universe_historical', 'portfolio_historical', 'combined_runs_historical']:
-                        try:
-                            result = pipeline.db_connection.execute_query(f"SELECT MAX(date) FROM {table}")
-                            if result and result[0] and result[0][0]:
-                                print(f"   📅 {table}: Latest date = {result[0][0]}")
-                            else:
-                                print(f"   📅 {table}: No date data available")
-                        except Exception:
-                            print(f"   📅 {table}: Date query failed")
-                except Exception as e:
-                    print(f"   ⚠️  Could not determine data freshness: {e}")
+                latest_dates = status['universe_coverage'].get('latest_dates', {})
+                for table in ['universe_historical', 'portfolio_historical', 'combined_runs_historical']:
+                    if latest_dates.get(table):
+                        print(f"   📅 {table}: Latest date = {latest_dates[table]}")
+                    else:
+                        print(f"   📅 {table}: No date data available")
                 
                 # Data Distribution Analysis
                 print(f"\n📊 DATA DISTRIBUTION ANALYSIS:")
@@ -2248,152 +2982,7 @@ def main():
                     print(f"   ⚠️  Could not perform distribution analysis: {e}")
                 
                 # Last Universe Date Coverage Analysis
-                print(f"\n🌍 LAST UNIVERSE DATE COVERAGE:")
-                try:
-                    # Get the last universe date
-                    last_date_result = pipeline.db_connection.execute_query("SELECT MAX(date) FROM universe_historical")
-                    if last_date_result and last_date_result[0] and last_date_result[0][0]:
-                        last_universe_date = last_date_result[0][0]
-                        print(f"   📅 Last universe date: {last_universe_date}")
-                        
-                        # Get total CUSIPs on last universe date
-                        total_last_date_result = pipeline.db_connection.execute_query(
-                            "SELECT COUNT(DISTINCT cusip_standardized) FROM universe_historical WHERE date = ?", 
-                            (last_universe_date,)
-                        )
-                        total_last_date_cusips = total_last_date_result[0][0] if total_last_date_result else 0
-                        print(f"   🌍 Total CUSIPs on last date: {total_last_date_cusips:,}")
-                        
-                        # Get orphaned CUSIPs (in other tables but NOT in universe) by table
-                        orphaned_by_table = {}
-                        
-                        # Check portfolio for orphaned CUSIPs
-                        portfolio_orphaned_result = pipeline.db_connection.execute_query("""
-                            SELECT COUNT(DISTINCT p.cusip_standardized) 
-                            FROM portfolio_historical p 
-                            LEFT JOIN universe_historical u ON p.cusip_standardized = u.cusip_standardized 
-                                AND p.date = u.date
-                            WHERE p.date = ? AND u.cusip_standardized IS NULL
-                        """, (last_universe_date,))
-                        portfolio_orphaned = portfolio_orphaned_result[0][0] if portfolio_orphaned_result else 0
-                        if portfolio_orphaned > 0:
-                            orphaned_by_table['portfolio_historical'] = portfolio_orphaned
-                        
-                        # Check combined runs for orphaned CUSIPs
-                        runs_orphaned_result = pipeline.db_connection.execute_query("""
-                            SELECT COUNT(DISTINCT r.cusip_standardized) 
-                            FROM combined_runs_historical r 
-                            LEFT JOIN universe_historical u ON r.cusip_standardized = u.cusip_standardized 
-                                AND r.date = u.date
-                            WHERE r.date = ? AND u.cusip_standardized IS NULL
-                        """, (last_universe_date,))
-                        runs_orphaned = runs_orphaned_result[0][0] if runs_orphaned_result else 0
-                        if runs_orphaned > 0:
-                            orphaned_by_table['combined_runs_historical'] = runs_orphaned
-                        
-                        # Check run monitor for orphaned CUSIPs (current table, no date)
-                        monitor_orphaned_result = pipeline.db_connection.execute_query("""
-                            SELECT COUNT(DISTINCT m.cusip_standardized) 
-                            FROM run_monitor m 
-                            LEFT JOIN universe_historical u ON m.cusip_standardized = u.cusip_standardized
-                            WHERE u.cusip_standardized IS NULL
-                        """)
-                        monitor_orphaned = monitor_orphaned_result[0][0] if monitor_orphaned_result else 0
-                        if monitor_orphaned > 0:
-                            orphaned_by_table['run_monitor'] = monitor_orphaned
-                        
-                        # Check gspread analytics for orphaned CUSIPs (current table, no date)
-                        gspread_orphaned_result = pipeline.db_connection.execute_query("""
-                            SELECT COUNT(DISTINCT g.cusip_1_standardized) + COUNT(DISTINCT g.cusip_2_standardized) 
-                            FROM gspread_analytics g 
-                            LEFT JOIN universe_historical u1 ON g.cusip_1_standardized = u1.cusip_standardized
-                            LEFT JOIN universe_historical u2 ON g.cusip_2_standardized = u2.cusip_standardized
-                            WHERE u1.cusip_standardized IS NULL AND u2.cusip_standardized IS NULL
-                        """)
-                        gspread_orphaned = gspread_orphaned_result[0][0] if gspread_orphaned_result else 0
-                        if gspread_orphaned > 0:
-                            orphaned_by_table['gspread_analytics'] = gspread_orphaned
-                        
-                        # Calculate total orphaned CUSIPs
-                        total_orphaned = sum(orphaned_by_table.values())
-                        
-                        if total_orphaned > 0:
-                            print(f"   ⚠️  Orphaned CUSIPs (in other tables but NOT in universe): {total_orphaned:,}")
-                            
-                            # Show breakdown by table
-                            print(f"   📊 Orphaned by table:")
-                            for table, count in orphaned_by_table.items():
-                                print(f"      • {table}: {count:,} orphaned")
-                            
-                            # Show all orphaned CUSIPs
-                            print(f"   📝 All orphaned CUSIPs (not in universe):")
-                            
-                            # Get portfolio orphaned details
-                            portfolio_orphaned_details_result = pipeline.db_connection.execute_query("""
-                                SELECT p.cusip_standardized, p.security 
-                                FROM portfolio_historical p 
-                                LEFT JOIN universe_historical u ON p.cusip_standardized = u.cusip_standardized 
-                                    AND p.date = u.date
-                                WHERE p.date = ? AND u.cusip_standardized IS NULL
-                                ORDER BY p.cusip_standardized
-                            """, (last_universe_date,))
-                            
-                            for row in portfolio_orphaned_details_result:
-                                cusip, security = row
-                                print(f"      - {cusip} ({security[:50]}...) - Orphaned in portfolio")
-                            
-                            # Get runs orphaned details
-                            runs_orphaned_details_result = pipeline.db_connection.execute_query("""
-                                SELECT r.cusip_standardized, r.security 
-                                FROM combined_runs_historical r 
-                                LEFT JOIN universe_historical u ON r.cusip_standardized = u.cusip_standardized 
-                                    AND r.date = u.date
-                                WHERE r.date = ? AND u.cusip_standardized IS NULL
-                                ORDER BY r.cusip_standardized
-                            """, (last_universe_date,))
-                            
-                            for row in runs_orphaned_details_result:
-                                cusip, security = row
-                                print(f"      - {cusip} ({security[:50]}...) - Orphaned in runs")
-                            
-                            # Get monitor orphaned details
-                            monitor_orphaned_details_result = pipeline.db_connection.execute_query("""
-                                SELECT m.cusip_standardized, m.security 
-                                FROM run_monitor m 
-                                LEFT JOIN universe_historical u ON m.cusip_standardized = u.cusip_standardized
-                                WHERE u.cusip_standardized IS NULL
-                                ORDER BY m.cusip_standardized
-                            """)
-                            
-                            for row in monitor_orphaned_details_result:
-                                cusip, security = row
-                                print(f"      - {cusip} ({security[:50]}...) - Orphaned in run monitor")
-                            
-                            # Get gspread orphaned details
-                            gspread_orphaned_details_result = pipeline.db_connection.execute_query("""
-                                SELECT g.cusip_1_standardized, g.cusip_2_standardized, g.bond_name_1, g.bond_name_2
-                                FROM gspread_analytics g 
-                                LEFT JOIN universe_historical u1 ON g.cusip_1_standardized = u1.cusip_standardized
-                                LEFT JOIN universe_historical u2 ON g.cusip_2_standardized = u2.cusip_standardized
-                                WHERE u1.cusip_standardized IS NULL OR u2.cusip_standardized IS NULL
-                                ORDER BY g.cusip_1_standardized, g.cusip_2_standardized
-                            """)
-                            
-                            for row in gspread_orphaned_details_result:
-                                cusip1, cusip2, security1, security2 = row
-                                if cusip1 and cusip1 not in [None, '']:
-                                    print(f"      - {cusip1} ({security1[:50]}...) - Orphaned in gspread (CUSIP_1)")
-                                if cusip2 and cusip2 not in [None, '']:
-                                    print(f"      - {cusip2} ({security2[:50]}...) - Orphaned in gspread (CUSIP_2)")
-                                
-                        else:
-                            print(f"   🟢 No orphaned CUSIPs found - all CUSIPs in other tables exist in universe")
-                            
-                    else:
-                        print(f"   ⚠️  Could not determine last universe date")
-                        
-                except Exception as e:
-                    print(f"   ⚠️  Could not perform last universe date coverage analysis: {e}")
+                _print_universe_coverage(status['universe_coverage'])
                 
                 # Validation Summary
                 print(f"\n✅ VALIDATION SUMMARY:")
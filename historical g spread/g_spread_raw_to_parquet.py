@@ -0,0 +1,49 @@
+import sys
+import argparse
+from pathlib import Path
+import yaml
+
+# This allows the script to import modules from the 'src' directory
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.pipeline.g_spread_processor import process_g_spread_files
+from src.utils.logging import LogManager
+
+if __name__ == "__main__":
+    """
+    This script acts as a simple runner for the G spread processing pipeline.
+    The core logic is located in the `src/pipeline/g_spread_processor.py` module.
+    """
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description='G Spread Data Processor')
+    parser.add_argument('--remap-all', action='store_true',
+                       help='Fuzzy-match every bond column again instead of reusing the stored column mapping')
+    parser.add_argument('--force-full-refresh', action='store_true',
+                       help='Parse the whole input CSV again instead of only rows appended since the last load')
+    args = parser.parse_args()
+    # Load logging configuration
+    config_path = Path(__file__).parent.parent / 'config' / 'config.yaml'
+    with open(config_path, 'r', encoding='utf-8-sig') as f:
+        config = yaml.safe_load(f)
+
+    log_config = config.get('logging', {})
+    log_file = Path(__file__).parent.parent / 'logs' / 'g_spread_processor.log'
+
+    # Setup logger
+    logger = LogManager(
+        log_file=str(log_file),
+        log_level=log_config.get('level', 'INFO'),
+        log_format=log_config.get('format')
+    )
+
+    logger.info("Starting G spread processing pipeline...")
+    if args.remap_all:
+        logger.info("🔄 REMAP ALL: Fuzzy-matching every bond column from scratch")
+    if args.force_full_refresh:
+        logger.info("🔄 FORCE FULL REFRESH: Parsing the whole G spread CSV")
+
+    try:
+        process_g_spread_files(logger, remap_all=args.remap_all, force_full_refresh=args.force_full_refresh)
+        logger.info("G spread processing pipeline finished successfully.")
+    except Exception as e:
+        logger.error("G spread processing pipeline failed.", exc=e)
@@ -28,7 +28,9 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # Add project root to path for imports
-sys.path.append(os.path.dirname(__file__))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.cusip_codec import encode_cusips, NULL_KEY
 
 class RunMonitor:
     def __init__(self, source_file='runs/combined_runs.parquet', output_dir='runs'):
@@ -130,6 +132,7 @@ class RunMonitor:
         print("-" * 50)
         
         # Get records for the most recent date
+        self._ensure_cusip_keys()
         latest_data = self.df[self.df['Date'] == self.most_recent_date].copy()
         print(f"🎯 Analyzing {len(latest_data):,} records from {self.most_recent_date.strftime('%Y-%m-%d')}")
         
@@ -149,16 +152,21 @@ class RunMonitor:
             print(f"   {period:3s}: {ref_date.strftime('%Y-%m-%d')} → Available: {available_date.strftime('%Y-%m-%d') if available_date else 'None'}")
         
         # Initialize results DataFrame
-        results = latest_data[['Security', 'CUSIP', 'Dealer', 'Bid Spread', 'Ask Spread', 
+        results = latest_data[['Security', 'CUSIP', 'cusip_key', 'Dealer', 'Bid Spread', 'Ask Spread', 
                               'Bid Size', 'Ask Size', 'Keyword']].copy()
         
+        # Each CUSIP/Dealer takes the first latest record's values; null keys never match
+        join_keys = ['cusip_key', 'Dealer']
+        latest_first = latest_data[join_keys + ['Bid Spread', 'Bid Size', 'Ask Size']].drop_duplicates(join_keys)
+        joinable = ((results['cusip_key'] != NULL_KEY) & results['Dealer'].notna()).to_numpy()
+        
         # Calculate changes for each period
         for period_name, ref_date in periods.items():
             available_date = self._find_nearest_available_date(ref_date)
             
             if available_date:
                 # Get historical data for this date
-                hist_data = self.df[self.df['Date'] == available_date][['CUSIP', 'Dealer', 'Bid Spread', 'Bid Size', 'Ask Size']].copy()
+                hist_data = self.df[self.df['Date'] == available_date][join_keys + ['Bid Spread', 'Bid Size', 'Ask Size']].copy()
                 
                 # Rename columns to avoid conflicts
                 hist_data = hist_data.rename(columns={
@@ -167,40 +175,25 @@ class RunMonitor:
                     'Ask Size': 'Ask Size_hist'
                 })
                 
-                # Merge with current data to calculate changes
-                merged = latest_data[['CUSIP', 'Dealer', 'Bid Spread', 'Bid Size', 'Ask Size']].merge(
-                    hist_data, on=['CUSIP', 'Dealer'], how='left'
+                # Join current and historical records on the integer key, aligned to the results rows
+                merged = results[join_keys].merge(
+                    latest_first.merge(hist_data.drop_duplicates(join_keys), on=join_keys, how='left'),
+                    on=join_keys, how='left'
                 )
                 
-                # Calculate Bid Spread change and assign to results using index alignment
-                change_series = pd.Series(index=results.index, dtype=float)
-                for i, (cusip, dealer) in enumerate(zip(results['CUSIP'], results['Dealer'])):
-                    mask = (merged['CUSIP'] == cusip) & (merged['Dealer'] == dealer)
-                    match = merged[mask]
-                    if len(match) > 0:
-                        change_series.iloc[i] = match['Bid Spread'].iloc[0] - match['Bid Spread_hist'].iloc[0]
-                    else:
-                        change_series.iloc[i] = np.nan
-                
-                results[period_name] = change_series
+                # Calculate Bid Spread change
+                results[period_name] = np.where(
+                    joinable, (merged['Bid Spread'] - merged['Bid Spread_hist']).to_numpy(dtype=float), np.nan
+                )
                 
                 # Calculate size changes for DoD and MTD
                 if period_name in ['DoD', 'MTD']:
-                    bid_size_change_series = pd.Series(index=results.index, dtype=float)
-                    ask_size_change_series = pd.Series(index=results.index, dtype=float)
-                    
-                    for i, (cusip, dealer) in enumerate(zip(results['CUSIP'], results['Dealer'])):
-                        mask = (merged['CUSIP'] == cusip) & (merged['Dealer'] == dealer)
-                        match = merged[mask]
-                        if len(match) > 0:
-                            bid_size_change_series.iloc[i] = match['Bid Size'].iloc[0] - match['Bid Size_hist'].iloc[0]
-                            ask_size_change_series.iloc[i] = match['Ask Size'].iloc[0] - match['Ask Size_hist'].iloc[0]
-                        else:
-                            bid_size_change_series.iloc[i] = np.nan
-                            ask_size_change_series.iloc[i] = np.nan
-                    
-                    results[f'{period_name} Chg Bid Size'] = bid_size_change_series
-                    results[f'{period_name} Chg Ask Size'] = ask_size_change_series
+                    results[f'{period_name} Chg Bid Size'] = np.where(
+                        joinable, (merged['Bid Size'] - merged['Bid Size_hist']).to_numpy(dtype=float), np.nan
+                    )
+                    results[f'{period_name} Chg Ask Size'] = np.where(
+                        joinable, (merged['Ask Size'] - merged['Ask Size_hist']).to_numpy(dtype=float), np.nan
+                    )
                 
                 valid_changes = results[period_name].notna().sum()
                 print(f"   {period_name:3s}: {valid_changes:,} valid changes calculated")
@@ -222,6 +215,7 @@ class RunMonitor:
         print("-" * 50)
         
         # Get latest data with size constraints
+        self._ensure_cusip_keys()
         latest_data = self.df[self.df['Date'] == self.most_recent_date].copy()
         
         # Apply size constraints for best level calculations
@@ -240,62 +234,20 @@ class RunMonitor:
         print(f"   Bid Size >= {self.min_size_threshold:,}: {len(bid_eligible):,} ({len(bid_eligible)/len(latest_data)*100:.1f}%)")
         print(f"   Ask Size >= {self.min_size_threshold:,}: {len(ask_eligible):,} ({len(ask_eligible)/len(latest_data)*100:.1f}%)")
         
-        # Calculate best levels for each CUSIP
-        best_levels = {}
-        
+        # Calculate best levels for each CUSIP: lowest spread, ties to the largest size
         print(f"\n🔍 Calculating best levels by CUSIP...")
-        for cusip in results['CUSIP'].unique():
-            cusip_bid_data = bid_eligible[bid_eligible['CUSIP'] == cusip]
-            cusip_ask_data = ask_eligible[ask_eligible['CUSIP'] == cusip]
-            
-            best_levels[cusip] = {
-                'Best Bid': np.nan,
-                'Best Offer': np.nan,
-                'Bid/Offer': np.nan,
-                'Dealer @ Best Bid': None,
-                'Dealer @ Best Offer': None,
-                'Size @ Best Bid': np.nan,
-                'Size @ Best Offer': np.nan
-            }
-            
-            # Find best bid (minimum spread)
-            if len(cusip_bid_data) > 0:
-                min_bid_spread = cusip_bid_data['Bid Spread'].min()
-                best_bid_records = cusip_bid_data[cusip_bid_data['Bid Spread'] == min_bid_spread]
-                
-                if len(best_bid_records) > 1:
-                    # Tie-breaker: largest size
-                    best_bid_record = best_bid_records.loc[best_bid_records['Bid Size'].idxmax()]
-                else:
-                    best_bid_record = best_bid_records.iloc[0]
-                
-                best_levels[cusip]['Best Bid'] = min_bid_spread
-                best_levels[cusip]['Dealer @ Best Bid'] = best_bid_record['Dealer']
-                best_levels[cusip]['Size @ Best Bid'] = best_bid_record['Bid Size']
-            
-            # Find best offer (minimum spread)
-            if len(cusip_ask_data) > 0:
-                min_ask_spread = cusip_ask_data['Ask Spread'].min()
-                best_ask_records = cusip_ask_data[cusip_ask_data['Ask Spread'] == min_ask_spread]
-                
-                if len(best_ask_records) > 1:
-                    # Tie-breaker: largest size
-                    best_ask_record = best_ask_records.loc[best_ask_records['Ask Size'].idxmax()]
-                else:
-                    best_ask_record = best_ask_records.iloc[0]
-                
-                best_levels[cusip]['Best Offer'] = min_ask_spread
-                best_levels[cusip]['Dealer @ Best Offer'] = best_ask_record['Dealer']
-                best_levels[cusip]['Size @ Best Offer'] = best_ask_record['Ask Size']
-            
-            # Calculate Bid/Offer spread
-            if not pd.isna(best_levels[cusip]['Best Bid']) and not pd.isna(best_levels[cusip]['Best Offer']):
-                best_levels[cusip]['Bid/Offer'] = best_levels[cusip]['Best Bid'] - best_levels[cusip]['Best Offer']
+        best_bid = self._best_by_cusip(bid_eligible, 'Bid Spread', 'Bid Size')
+        best_offer = self._best_by_cusip(ask_eligible, 'Ask Spread', 'Ask Size')
         
         # Add best level data to results
-        for col in ['Best Bid', 'Best Offer', 'Bid/Offer', 'Dealer @ Best Bid', 
-                   'Dealer @ Best Offer', 'Size @ Best Bid', 'Size @ Best Offer']:
-            results[col] = results['CUSIP'].map(lambda x: best_levels.get(x, {}).get(col, np.nan))
+        cusip_keys = results['cusip_key']
+        results['Best Bid'] = cusip_keys.map(best_bid['Bid Spread'])
+        results['Best Offer'] = cusip_keys.map(best_offer['Ask Spread'])
+        results['Bid/Offer'] = results['Best Bid'] - results['Best Offer']
+        results['Dealer @ Best Bid'] = cusip_keys.map(best_bid['Dealer'])
+        results['Dealer @ Best Offer'] = cusip_keys.map(best_offer['Dealer'])
+        results['Size @ Best Bid'] = cusip_keys.map(best_bid['Bid Size'])
+        results['Size @ Best Offer'] = cusip_keys.map(best_offer['Ask Size'])
         
         # Summary statistics
         valid_best_bids = results['Best Bid'].notna().sum()
@@ -404,6 +356,19 @@ class RunMonitor:
             print(f"[FAIL] ERROR saving files: {e}")
             raise
 
+    def _ensure_cusip_keys(self):
+        """Add integer CUSIP keys (cusip_key) used for the CUSIP joins and group-bys"""
+        if 'cusip_key' not in self.df.columns:
+            self.df['cusip_key'] = encode_cusips(self.df['CUSIP'])
+
+    @staticmethod
+    def _best_by_cusip(eligible, spread_col, size_col):
+        """Best record per CUSIP key: lowest spread, then largest size, then first seen"""
+        ranked = eligible[eligible['cusip_key'] != NULL_KEY].sort_values(
+            ['cusip_key', spread_col, size_col], ascending=[True, True, False], kind='mergesort', na_position='last'
+        )
+        return ranked.drop_duplicates('cusip_key').set_index('cusip_key')
+
     def _get_quarter_start(self, date):
         """Get the start of the quarter for a given date."""
         quarter = (date.month - 1) // 3 + 1
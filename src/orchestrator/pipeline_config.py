@@ -23,6 +23,7 @@ class OrchestrationConfig:
     fail_fast: bool = False
     continue_on_warnings: bool = True
     save_partial_results: bool = True
+    analysis_workers: int = 1  # processes for CUSIP orphan detection in data analysis
 
 
 @dataclass
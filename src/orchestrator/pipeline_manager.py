@@ -18,6 +18,7 @@ import pandas as pd
 
 from ..utils.logging import LogManager
 from ..utils.data_analyzer import analyze_pipeline_data
+from ..utils.universe_latest import load_universe_latest
 
 
 class PipelineStage(Enum):
@@ -403,7 +404,7 @@ class PipelineManager:
         
         # Common output file patterns based on stage
         stage_patterns = {
-            PipelineStage.UNIVERSE: ["universe.parquet", "universe_processed.csv"],
+            PipelineStage.UNIVERSE: ["universe.parquet", "universe_latest.parquet", "universe_processed.csv"],
             PipelineStage.PORTFOLIO: ["portfolio.parquet"],
             PipelineStage.HISTORICAL_GSPREAD: ["bond_z.parquet"],
             PipelineStage.RUNS_EXCEL: ["combined_runs.parquet"],
@@ -506,11 +507,16 @@ class PipelineManager:
         self.logger.info("[ANALYSIS] Starting comprehensive data analysis...")
         
         try:
+            # Latest-date validation uses the snapshot published by the universe stage
+            universe_latest = load_universe_latest('universe/universe.parquet', self.logger)
+            
             # Run complete analysis
             analysis_output = analyze_pipeline_data(
                 table_data=table_data,
                 logger=self.logger,
-                show_details=True
+                show_details=True,
+                max_workers=self.config.orchestration.analysis_workers,
+                universe_latest=universe_latest
             )
             
             self.logger.info("[ANALYSIS] Data analysis completed successfully")
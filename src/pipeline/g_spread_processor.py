@@ -2,11 +2,22 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from rapidfuzz import process, fuzz
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import yaml
 import io
+import csv
+import json
+import codecs
+import hashlib
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+from ..utils.bond_names import replace_unicode_fractions
+from ..utils.time_series_store import TimeSeriesStore
+from ..utils.universe_latest import load_universe_latest
+
 
 class GSpreadProcessor:
     """
@@ -14,15 +25,33 @@ class GSpreadProcessor:
     comprehensive validation, and detailed logging.
     """
     
-    def __init__(self, config_dict: dict, logger):
+    # Scorers available to fuzzy_matching.scoring_methods
+    SCORERS = {
+        'ratio': fuzz.ratio,
+        'partial_ratio': fuzz.partial_ratio,
+        'token_sort_ratio': fuzz.token_sort_ratio
+    }
+    
+    # Bytes read to detect the input encoding
+    DETECTION_BLOCK_BYTES = 1024 ** 2
+    
+    def __init__(self, config_dict: dict, logger, remap_all: bool = False, force_full_refresh: bool = False):
         self.logger = logger
         self.config = config_dict.get('g_spread_processor', {})
+        self.remap_all = remap_all
+        self.force_full_refresh = force_full_refresh
         
         # Initialize paths
         self.input_file = Path(self.config.get('input_file', ''))
         self.output_parquet = Path(self.config.get('output_parquet', ''))
         self.output_csv = Path(self.config.get('output_csv', ''))
         self.universe_reference = Path(self.config.get('universe_reference', ''))
+        self.ingest_cache_dir = Path(self.config.get(
+            'ingest_cache_dir', 'historical g spread/processed data/ingest_cache'
+        ))
+        self.mapping_table = Path(self.config.get(
+            'mapping_table', 'historical g spread/processed data/bond_column_mapping.parquet'
+        ))
         
         # Configuration sections
         self.fuzzy_config = self.config.get('fuzzy_matching', {})
@@ -66,14 +95,15 @@ class GSpreadProcessor:
             # Step 5: Save wide format outputs
             self._save_outputs(df_clean, format_type='wide')
             
-            # Step 6: Convert to long format
-            df_long = self._to_long_format(df_clean)
-            
-            # Step 7: Add CUSIP column to long format
-            df_long = self._add_cusip_column(df_long, universe_df)
-            
-            # Step 8: Save long format outputs (and overwrite main Parquet)
-            self._save_outputs(df_long, format_type='long')
+            # Steps 6-8: Reshape to long format with CUSIP, streaming blocks
+            # to the long format outputs (and overwriting the main Parquet)
+            date_col = self.column_config.get('date_column', 'DATE')
+            long_stats = {}
+            df_long = self._save_long_outputs(self._iter_long_format(df_clean, universe_df, long_stats), date_col)
+            self.logger.info(
+                f"Long format: {long_stats['records']} records from {long_stats['cells']} cells "
+                f"in {long_stats['blocks']} blocks ({long_stats['columns_without_cusip']} bond columns without CUSIP)"
+            )
             
             # Step 9: Final validation and analysis (on long format)
             self._perform_final_analysis(df_long, universe_df)
@@ -102,19 +132,12 @@ class GSpreadProcessor:
             return None
         
         try:
-            try:
-                df = pd.read_csv(self.input_file, encoding='utf-8')
-                self.logger.info(f"Raw data loaded: {df.shape} (utf-8)")
-            except UnicodeDecodeError:
-                try:
-                    df = pd.read_csv(self.input_file, encoding='utf-8-sig')
-                    self.logger.info(f"Raw data loaded: {df.shape} (utf-8-sig)")
-                except UnicodeDecodeError:
-                    df = pd.read_csv(self.input_file, encoding='latin1')
-                    self.logger.warning(f"Raw data loaded: {df.shape} (latin1 fallback)")
+            # Only rows appended since the last load are parsed; earlier rows come from the ingest cache
+            date_col = self.column_config.get('date_column', 'DATE')
+            df = self._ingest_input_csv(date_col)
+            self.logger.info(f"Raw data loaded: {df.shape}")
             
             # Convert DATE column to datetime immediately after loading
-            date_col = self.column_config.get('date_column', 'DATE')
             if date_col in df.columns:
                 self.logger.info(f"Converting {date_col} column from string to datetime...")
                 original_dtype = df[date_col].dtype
@@ -167,6 +190,170 @@ class GSpreadProcessor:
                 raise
             return None
     
+    def _ingest_input_csv(self, date_col: str) -> pd.DataFrame:
+        """
+        Load the input CSV incrementally.
+        
+        The ingest cache keeps every row loaded so far as parquet parts plus a state file
+        holding the byte length and hash of the CSV prefix those rows came from. When the
+        prefix is unchanged only the bytes after it are parsed, and only rows dated after
+        the last loaded date are kept; anything else (edited history, a new header, a
+        forced refresh) reloads the whole file and restarts the cache.
+        """
+        state_path = self.ingest_cache_dir / 'state.json'
+        state = None
+        if not self.force_full_refresh and state_path.exists():
+            try:
+                state = json.loads(state_path.read_text())
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable ingest state {state_path}: {str(e)}")
+        
+        file_size = self.input_file.stat().st_size
+        if state is not None and (
+            state.get('input_file') != str(self.input_file)
+            or file_size < state['prefix_bytes']
+            or self._prefix_digest(state['prefix_bytes']) != state['prefix_sha256']
+        ):
+            self.logger.info("Input CSV history changed since the last load - reloading the whole file")
+            state = None
+        
+        if state is None:
+            encoding, header_bytes, columns = self._read_header()
+            df = self._read_csv_rows(header_bytes, columns, encoding, date_col)
+            parts = [df]
+            self._reset_ingest_cache()
+        else:
+            encoding, columns = state['encoding'], state['columns']
+            parts = [pd.read_parquet(path) for path in sorted(self.ingest_cache_dir.glob('part-*.parquet'))]
+            df = self._read_csv_rows(state['prefix_bytes'], columns, encoding, date_col)
+            if date_col in df.columns and state.get('last_date'):
+                df = df[~(df[date_col] <= pd.Timestamp(state['last_date']))]
+            self.logger.info(f"Incremental load: {len(df)} new rows after {state.get('last_date')} "
+                             f"({file_size - state['prefix_bytes']} new bytes)")
+            if len(df) or not parts:
+                parts.append(df)
+        
+        prefix_bytes = self._complete_lines_length(file_size)
+        if len(df):
+            part_number = len(list(self.ingest_cache_dir.glob('part-*.parquet')))
+            df.to_parquet(self.ingest_cache_dir / f'part-{part_number:06d}.parquet', index=False)
+        loaded = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+        last_date = loaded[date_col].max() if date_col in loaded.columns else None
+        state_path.write_text(json.dumps({
+            'input_file': str(self.input_file),
+            'encoding': encoding,
+            'columns': columns,
+            'prefix_bytes': prefix_bytes,
+            'prefix_sha256': self._prefix_digest(prefix_bytes),
+            'last_date': None if last_date is None or pd.isna(last_date) else last_date.isoformat(),
+            'loaded_at': datetime.now().isoformat()
+        }, indent=2))
+        return loaded
+    
+    def _read_header(self) -> Tuple[str, int, List[str]]:
+        """Detect the encoding once from the first block and parse the header line."""
+        with open(self.input_file, 'rb') as f:
+            block = f.read(self.DETECTION_BLOCK_BYTES)
+            f.seek(0)
+            header = f.readline()
+        
+        encoding = 'utf-8'
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(block, final=len(block) < self.DETECTION_BLOCK_BYTES)
+        except UnicodeDecodeError:
+            encoding = 'latin1'
+            self.logger.warning("Input CSV is not valid UTF-8 - reading as latin1")
+        
+        text = header.decode('utf-8-sig' if encoding == 'utf-8' else encoding, errors='replace')
+        columns = next(csv.reader([text.rstrip('\r\n')]), [])
+        return encoding, len(header), self._mangle_column_names(columns)
+    
+    def _read_csv_rows(self, offset: int, columns: List[str], encoding: str, date_col: str) -> pd.DataFrame:
+        """Parse the CSV rows after a byte offset with Arrow's multithreaded reader, in blocks."""
+        if offset >= self.input_file.stat().st_size:
+            return pd.DataFrame({col: pd.Series(dtype='datetime64[ns]' if col == date_col else float)
+                                 for col in columns})
+        block_size = int(self.config.get('csv_block_size_mb', 16) * 1024 ** 2)
+        
+        def read(read_encoding):
+            with open(self.input_file, 'rb') as f:
+                f.seek(offset)
+                return pacsv.read_csv(
+                    f,
+                    read_options=pacsv.ReadOptions(column_names=columns, encoding=read_encoding,
+                                                   block_size=block_size, use_threads=True),
+                    convert_options=pacsv.ConvertOptions(column_types={col: pa.string() for col in columns},
+                                                         strings_can_be_null=True)
+                )
+        
+        try:
+            table = read(encoding)
+        except pa.ArrowInvalid as e:
+            if encoding != 'utf-8' or 'utf8' not in str(e).lower():
+                raise
+            self.logger.warning("Invalid UTF-8 after the first block - rereading the new rows as latin1")
+            table = read('latin1')
+        
+        return pd.DataFrame({col: self._column_values(table.column(col), col == date_col) for col in columns})
+    
+    @staticmethod
+    def _column_values(values, is_date: bool):
+        """Arrow string column as dates (MM/DD/YYYY), numbers, or strings when not numeric."""
+        if is_date:
+            return pd.to_datetime(values.to_pandas(), format='%m/%d/%Y', errors='coerce')
+        try:
+            return values.cast(pa.float64()).to_numpy(zero_copy_only=False)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            return values.to_pandas().astype(object).to_numpy()
+    
+    @staticmethod
+    def _mangle_column_names(columns: List[str]) -> List[str]:
+        """Column names as pandas.read_csv gives them: blanks become 'Unnamed: i', repeats get '.1', '.2'."""
+        counts = {}
+        mangled = []
+        for position, column in enumerate(columns):
+            column = column or f'Unnamed: {position}'
+            count = counts.get(column, 0)
+            while count > 0:
+                counts[column] = count + 1
+                column = f'{column}.{count}'
+                count = counts.get(column, 0)
+            counts[column] = count + 1
+            mangled.append(column)
+        return mangled
+    
+    def _complete_lines_length(self, file_size: int) -> int:
+        """Length of the file up to and including its last newline."""
+        with open(self.input_file, 'rb') as f:
+            position = file_size
+            while position > 0:
+                start = max(0, position - 65536)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b'\n')
+                if newline >= 0:
+                    return start + newline + 1
+                position = start
+        return 0
+    
+    def _prefix_digest(self, length: int) -> str:
+        """SHA-256 of the first ``length`` bytes of the input file."""
+        digest = hashlib.sha256()
+        with open(self.input_file, 'rb') as f:
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(remaining, 1024 ** 2 * 8))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                remaining -= len(chunk)
+        return digest.hexdigest()
+    
+    def _reset_ingest_cache(self):
+        """Empty the ingest cache before a full reload."""
+        self.ingest_cache_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.ingest_cache_dir.glob('part-*.parquet'):
+            path.unlink()
+    
     def _load_universe_reference(self) -> Optional[pd.DataFrame]:
         """Load and validate universe reference data."""
         self.logger.info("--- LOADING UNIVERSE REFERENCE DATA ---")
@@ -179,7 +366,9 @@ class GSpreadProcessor:
             return None
         
         try:
-            universe_df = pd.read_parquet(self.universe_reference, engine='pyarrow')
+            # Latest-date snapshot published by the universe pipeline (no full history read)
+            latest = load_universe_latest(self.universe_reference, self.logger)
+            universe_df = latest.frame.copy()
             self.logger.info(f"Universe reference loaded: {universe_df.shape}")
             
             # Validate Security column exists
@@ -191,56 +380,34 @@ class GSpreadProcessor:
                 return None
             
             # Check if universe data is time-series (has Date column)
-            if 'Date' in universe_df.columns:
-                self.logger.info("Time-series universe data detected - filtering to most recent date only")
-                
-                # Convert Date column to datetime
-                universe_df['Date'] = pd.to_datetime(universe_df['Date'])
-                
-                # Find the most recent date across ALL records
-                most_recent_date = universe_df['Date'].max()
-                self.logger.info(f"Most recent date in universe: {most_recent_date.strftime('%Y-%m-%d')}")
+            duplicate_securities = universe_df['Security'].duplicated()
+            if latest.date is not None:
+                self.logger.info(f"Most recent date in universe: {latest.date.strftime('%Y-%m-%d')}")
                 
-                # Filter to only records from the most recent date
-                universe_df = universe_df[universe_df['Date'] == most_recent_date].copy()
-                
-                self.logger.info(f"Universe data filtered to most recent date: {universe_df.shape}")
-                
-                # Check for duplicates in the filtered data
-                duplicate_securities = universe_df['Security'].duplicated()
                 if duplicate_securities.any():
                     dup_count = duplicate_securities.sum()
                     dup_list = universe_df.loc[duplicate_securities, 'Security'].unique().tolist()
                     self.logger.warning(
                         f"Found {dup_count} duplicate Security values on the most recent date "
-                        f"({most_recent_date.strftime('%Y-%m-%d')}): {dup_list[:10]}... "
+                        f"({latest.date.strftime('%Y-%m-%d')}): {dup_list[:10]}... "
                         f"Will keep the first occurrence of each duplicate."
                     )
-                    
-                    # Instead of failing, keep only the first occurrence of each Security
                     universe_df = universe_df.drop_duplicates(subset=['Security'], keep='first')
                     self.logger.info(f"After deduplication: {len(universe_df)} unique securities")
-                    
-                    # Log which duplicates were removed
-                    for security in dup_list[:5]:  # Show first 5 examples
-                        original_count = (universe_df['Security'] == security).sum()
-                        self.logger.info(f"  Deduplicated '{security}': kept 1 record")
                 
                 self.logger.info(f"[OK] Universe data successfully filtered to most recent date with {len(universe_df)} unique securities")
                 
-            else:
+            elif duplicate_securities.any():
                 # Check for duplicates in non-time-series data
-                duplicate_securities = universe_df['Security'].duplicated()
-                if duplicate_securities.any():
-                    dup_count = duplicate_securities.sum()
-                    dup_list = universe_df.loc[duplicate_securities, 'Security'].unique().tolist()
-                    error_msg = (
-                        f"Duplicate Security values found in universe reference: {dup_list[:10]}... "
-                        f"({dup_count} total duplicates). "
-                        f"All Security values must be unique for a valid merge."
-                    )
-                    self.logger.error(error_msg)
-                    raise ValueError(error_msg)
+                dup_count = duplicate_securities.sum()
+                dup_list = universe_df.loc[duplicate_securities, 'Security'].unique().tolist()
+                error_msg = (
+                    f"Duplicate Security values found in universe reference: {dup_list[:10]}... "
+                    f"({dup_count} total duplicates). "
+                    f"All Security values must be unique for a valid merge."
+                )
+                self.logger.error(error_msg)
+                raise ValueError(error_msg)
             
             # Check universe integrity if configured
             if self.validation_config.get('data_quality', {}).get('check_universe_integrity', True):
@@ -282,48 +449,78 @@ class GSpreadProcessor:
         
         self.logger.info(f"Bond columns to process: {len(bond_columns)}")
         
-        # Perform unique fuzzy mapping
-        available_securities = set(security_names)
-        rename_map = {}
-        mapping_report = []
-        unmapped_bonds = []
-        
         # Get fuzzy matching configuration
         threshold = self.fuzzy_config.get('default_threshold', 85)
         scoring_methods = self.fuzzy_config.get('scoring_methods', ['ratio'])
         
+        matching_config = self._matching_config(threshold, scoring_methods)
+        
         self.logger.info(f"Fuzzy matching threshold: {threshold}%")
         self.logger.info(f"Scoring methods: {scoring_methods}")
         
-        for bond in sorted(bond_columns):
-            if bond in available_securities:
+        # Reuse stored mappings whose target is still in the universe; only the rest are matched
+        bonds = sorted(bond_columns)
+        universe_date = self._universe_date(universe_df)
+        stored = self._reusable_mappings(bonds, security_names, universe_date, matching_config)
+        reserved = {entry[0] for entry in stored.values() if entry[0] is not None}
+        self.logger.info(f"Reused stored mappings: {len(stored)} (matching {len(bonds) - len(stored)} columns)")
+        
+        # Exact matches are kept; the rest are scored against the remaining securities in one pass
+        to_match = [bond for bond in bonds if bond not in stored]
+        exact = [bond for bond in to_match if bond in security_names]
+        fuzzy_bonds = [bond for bond in to_match if bond not in security_names]
+        choices = sorted(security_names - set(exact) - reserved)
+        scores = self._score_matrix(fuzzy_bonds, choices, scoring_methods, threshold)
+        
+        # One-to-one assignment: each bond, in order, takes its best security still available
+        taken = np.zeros(len(choices), dtype=bool)
+        best_matches = {}
+        for row, bond in enumerate(fuzzy_bonds):
+            if not len(choices):
+                break
+            candidate_scores = np.where(taken, -1.0, scores[row])
+            column = int(np.argmax(candidate_scores))
+            if candidate_scores[column] >= threshold:
+                taken[column] = True
+                best_matches[bond] = (choices[column], float(candidate_scores[column]))
+        
+        rename_map = {}
+        mapping_report = []
+        unmapped_bonds = []
+        
+        for bond in bonds:
+            if bond in stored:
+                # Stored mapping
+                security, score, method = stored[bond]
+                mapping_report.append((bond, security, score, method))
+                if method == 'fuzzy':
+                    rename_map[bond] = security
+                elif method == 'unmapped':
+                    unmapped_bonds.append(bond)
+            elif bond in security_names:
                 # Exact match
-                available_securities.remove(bond)
                 mapping_report.append((bond, bond, 100.0, 'exact'))
                 if self.logging_config.get('log_mapping_details', True):
                     msg = f"KEPT: {bond}"
                     self.logger.info(msg)
                     if self.logging_config.get('log_console_and_file', True):
                         print(msg)
-            else:
+            elif bond in best_matches:
                 # Fuzzy match
-                best_match, best_score = self._find_best_fuzzy_match(
-                    bond, available_securities, scoring_methods, threshold
-                )
-                
-                if best_match and best_score >= threshold:
-                    rename_map[bond] = best_match
-                    available_securities.remove(best_match)
-                    mapping_report.append((bond, best_match, best_score, 'fuzzy'))
-                    bond_ascii = self.replace_unicode_fractions(bond)
-                    best_match_ascii = self.replace_unicode_fractions(best_match) if best_match else best_match
-                    msg = f"MAPPED: {bond_ascii} -> {best_match_ascii} (Similarity: {best_score:.1f}%)"
-                    self.logger.info(msg)
-                    if self.logging_config.get('log_console_and_file', True):
-                        print(msg)
-                else:
-                    unmapped_bonds.append(bond)
-                    mapping_report.append((bond, None, 0.0, 'unmapped'))
+                best_match, best_score = best_matches[bond]
+                rename_map[bond] = best_match
+                mapping_report.append((bond, best_match, best_score, 'fuzzy'))
+                bond_ascii = self.replace_unicode_fractions(bond)
+                best_match_ascii = self.replace_unicode_fractions(best_match)
+                msg = f"MAPPED: {bond_ascii} -> {best_match_ascii} (Similarity: {best_score:.1f}%)"
+                self.logger.info(msg)
+                if self.logging_config.get('log_console_and_file', True):
+                    print(msg)
+            else:
+                unmapped_bonds.append(bond)
+                mapping_report.append((bond, None, 0.0, 'unmapped'))
+        
+        self._save_column_mapping(mapping_report, universe_date, matching_config)
         
         # Log mapping summary
         exact_matches = len([r for r in mapping_report if r[3] == 'exact'])
@@ -348,32 +545,88 @@ class GSpreadProcessor:
         
         return df_mapped
     
-    def _find_best_fuzzy_match(self, bond: str, available_securities: set, 
-                              scoring_methods: List[str], threshold: float) -> Tuple[Optional[str], float]:
-        """Find the best fuzzy match using multiple scoring methods."""
-        if not available_securities:
-            return None, 0.0
+    def _universe_date(self, universe_df: pd.DataFrame) -> Optional[str]:
+        """Date of the (latest) universe the columns are mapped against, if it is dated."""
+        if 'Date' not in universe_df.columns or universe_df['Date'].isna().all():
+            return None
+        return pd.Timestamp(universe_df['Date'].max()).strftime('%Y-%m-%d')
+    
+    @staticmethod
+    def _matching_config(threshold: float, scoring_methods: List[str]) -> str:
+        """Fuzzy matching settings stored with each mapping, as canonical JSON."""
+        return json.dumps({'threshold': float(threshold), 'scoring_methods': list(scoring_methods)},
+                          sort_keys=True)
+    
+    def _reusable_mappings(self, bonds: List[str], security_names: set, universe_date: Optional[str],
+                           matching_config: str) -> Dict[str, Tuple[Optional[str], float, str]]:
+        """
+        Stored mappings still valid for this run: the target is in the latest universe and
+        is not itself a bond column. Fuzzy and unmapped columns are rematched when the matching
+        config changed or the column now has an exact match; unmapped columns are also retried
+        when the universe date changes.
+        """
+        if self.remap_all:
+            self.logger.info("Remapping all columns (stored mappings ignored)")
+            return {}
+        if not self.mapping_table.exists():
+            return {}
         
-        best_match = None
-        best_score = 0.0
+        try:
+            stored = pd.read_parquet(self.mapping_table)
+        except Exception as e:
+            self.logger.warning(f"Could not read column mapping table {self.mapping_table}: {str(e)}")
+            return {}
+        
+        # Tables written before the config was stored never match it
+        stored_configs = stored['matching_config'] if 'matching_config' in stored.columns else [None] * len(stored)
+        
+        bond_set = set(bonds)
+        reusable = {}
+        for bond, security, score, method, mapped_date, mapped_config in zip(
+            stored['bond_column'], stored['security'], stored['score'], stored['method'],
+            stored['universe_date'], stored_configs
+        ):
+            if bond not in bond_set:
+                continue
+            if method != 'exact' and (mapped_config != matching_config or bond in security_names):
+                continue
+            if method == 'unmapped':
+                if universe_date is not None and mapped_date == universe_date:
+                    reusable[bond] = (None, 0.0, 'unmapped')
+            elif security in security_names and (security not in bond_set or security == bond):
+                reusable[bond] = (security, float(score), method)
+        return reusable
+    
+    def _save_column_mapping(self, mapping_report: List[Tuple], universe_date: Optional[str],
+                             matching_config: str):
+        """Store the accepted mapping for every current bond column, with the matching config used."""
+        mapping_df = pd.DataFrame(mapping_report, columns=['bond_column', 'security', 'score', 'method'])
+        mapping_df['universe_date'] = universe_date
+        mapping_df['matching_config'] = matching_config
+        mapping_df['mapped_at'] = datetime.now().isoformat()
+        try:
+            self.mapping_table.parent.mkdir(parents=True, exist_ok=True)
+            mapping_df.to_parquet(self.mapping_table, index=False)
+            self.logger.info(f"Saved column mapping table: {self.mapping_table} ({len(mapping_df)} columns)")
+        except Exception as e:
+            self.logger.warning(f"Could not save column mapping table {self.mapping_table}: {str(e)}")
+    
+    def _score_matrix(self, bonds: List[str], securities: List[str],
+                      scoring_methods: List[str], threshold: float) -> np.ndarray:
+        """Element-wise best score over all scoring methods for every bond/security pair."""
+        scores = np.zeros((len(bonds), len(securities)), dtype=np.float64)
+        if not bonds or not securities:
+            return scores
         
         for method in scoring_methods:
-            if method == 'ratio':
-                scorer = fuzz.ratio
-            elif method == 'partial_ratio':
-                scorer = fuzz.partial_ratio
-            elif method == 'token_sort_ratio':
-                scorer = fuzz.token_sort_ratio
-            else:
+            scorer = self.SCORERS.get(method)
+            if scorer is None:
                 continue
-            
-            match, score, _ = process.extractOne(bond, available_securities, scorer=scorer)
-            
-            if score > best_score:
-                best_score = score
-                best_match = match
+            # Scores below the threshold come back as 0, letting rapidfuzz skip most of the work
+            np.maximum(scores, process.cdist(bonds, securities, scorer=scorer, dtype=np.float64,
+                                             score_cutoff=threshold, workers=-1), out=scores)
         
-        return best_match, best_score
+        return scores
     
     def _handle_duplicate_columns(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
         """Handle duplicate columns after renaming."""
@@ -656,16 +909,8 @@ class GSpreadProcessor:
             valid_pct = df[col].notna().sum() / len(df) * 100
             self.logger.info(f"  - {col}: {valid_pct:.1f}% valid data")
     
-    def _to_long_format(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Convert wide DataFrame to long format with columns: DATE, Security, GSpread."""
-        date_col = self.column_config.get('date_column', 'DATE')
-        bond_columns = [col for col in df.columns if col != date_col]
-        long_df = pd.melt(df, id_vars=[date_col], value_vars=bond_columns,
-                          var_name='Security', value_name='GSpread')
-        return long_df
-    
-    def _add_cusip_column(self, df_long: pd.DataFrame, universe_df: pd.DataFrame) -> pd.DataFrame:
-        """Add CUSIP column as the first column by matching Security to universe reference from most recent date. Includes detailed logging."""
+    def _cusip_by_column(self, bond_columns: List[str], universe_df: pd.DataFrame) -> pd.Series:
+        """Look up the CUSIP of each bond column in the universe reference from its most recent date. Includes detailed logging."""
         self.logger.info("--- ADDING CUSIP COLUMN VIA UNIVERSE LOOKUP ---")
         
         # Log universe data details
@@ -684,81 +929,159 @@ class GSpreadProcessor:
         if 'Security' not in universe_df.columns or 'CUSIP' not in universe_df.columns:
             self.logger.error("Universe reference must contain 'Security' and 'CUSIP' columns.")
             raise ValueError("Universe reference missing required columns.")
-        # Merge to add CUSIP
-        merged = df_long.merge(
-            universe_df[['Security', 'CUSIP']],
-            on='Security',
-            how='left',
-            validate='many_to_one',
-            indicator=True
-        )
-        # Move CUSIP to first column
-        cols = merged.columns.tolist()
-        cols.insert(0, cols.pop(cols.index('CUSIP')))
-        merged = merged[cols]
-        # Logging before filtering
-        total_before = len(merged)
-        matched = merged['CUSIP'].notna().sum()
-        unmatched = total_before - matched
-        pct_matched = matched / total_before * 100 if total_before else 0
-        pct_unmatched = unmatched / total_before * 100 if total_before else 0
-        self.logger.info(f"Total records before filtering: {total_before}")
-        self.logger.info(f"Matched CUSIP: {matched} ({pct_matched:.2f}%)")
-        self.logger.info(f"Unmatched CUSIP: {unmatched} ({pct_unmatched:.2f}%)")
-        
-        if unmatched > 0:
-            unmatched_securities = merged.loc[merged['CUSIP'].isna(), 'Security'].unique()
-            self.logger.warning(f"Example unmatched securities: {unmatched_securities[:10]}")
-            
-            # Filter out records with missing CUSIP
-            self.logger.info(f"Removing {unmatched} records with missing CUSIP...")
-            merged_filtered = merged[merged['CUSIP'].notna()].copy()
-            
-            # Log results after filtering
-            total_after = len(merged_filtered)
-            self.logger.info(f"Total records after filtering: {total_after}")
-            self.logger.info(f"Records removed: {total_before - total_after}")
-            self.logger.info(f"Final match rate: 100.00% (all remaining records have CUSIP)")
-        else:
-            merged_filtered = merged.copy()
-            self.logger.info("No unmatched records to remove - all records have CUSIP")
+        if universe_df['Security'].dropna().duplicated().any():
+            self.logger.error("Universe reference has duplicate Security values.")
+            raise ValueError("Universe reference Security values must be unique.")
+        
+        lookup = universe_df.dropna(subset=['Security']).set_index('Security')['CUSIP']
+        cusips = lookup.reindex(bond_columns)
+        matched = cusips.notna().sum()
+        self.logger.info(f"Bond columns matched to a CUSIP: {matched} of {len(bond_columns)}")
+        
+        unmatched_securities = cusips.index[cusips.isna()]
+        if len(unmatched_securities) > 0:
+            self.logger.warning(f"Example unmatched securities: {list(unmatched_securities[:10])}")
+            self.logger.info(f"Dropping {len(unmatched_securities)} bond columns with missing CUSIP")
         
         # Example matches
-        if len(merged_filtered) > 0:
-            example_matches = merged_filtered[['Security', 'CUSIP']].drop_duplicates().head(10)
+        if matched > 0:
+            example_matches = cusips.dropna().head(10).rename_axis('Security').reset_index()
             self.logger.info(f"Example matches:\n{example_matches}")
         
-        # Remove merge indicator column
-        merged_filtered = merged_filtered.drop(columns=['_merge'])
-        return merged_filtered
+        return cusips
+    
+    def _iter_long_format(self, df: pd.DataFrame, universe_df: pd.DataFrame,
+                          stats: Optional[Dict[str, int]] = None):
+        """
+        Reshape the wide DataFrame to long format one block of bond columns at a time.
+        
+        Yields DataFrames with columns CUSIP, DATE, Security, GSpread in melt
+        order (bond by bond, then date), holding only non-empty cells of bonds
+        with a CUSIP. Security is categorical over the matched bond columns and
+        CUSIP is taken from a code-indexed array, so no block is ever merged.
+        
+        Args:
+            df: Wide DataFrame with a date column and one column per bond
+            universe_df: Universe reference with Security and CUSIP columns
+            stats: Optional dict filled with cell, record and column counts
+        """
+        date_col = self.column_config.get('date_column', 'DATE')
+        block_columns = max(int(self.config.get('long_format_block_columns', 500)), 1)
+        bond_columns = [col for col in df.columns if col != date_col]
+        
+        cusips = self._cusip_by_column(bond_columns, universe_df)
+        matched = cusips.dropna()
+        security_dtype = pd.CategoricalDtype(list(matched.index))
+        cusip_by_code = matched.to_numpy(dtype=object)
+        dates = df[date_col].to_numpy()
+        
+        if stats is not None:
+            stats.update(cells=len(df) * len(bond_columns), records=0, blocks=0,
+                         columns_without_cusip=len(bond_columns) - len(matched))
+        
+        for start in range(0, len(matched), block_columns):
+            block = df[list(matched.index[start:start + block_columns])]
+            non_numeric = [col for col in block.columns if not pd.api.types.is_numeric_dtype(block[col])]
+            if non_numeric:
+                self.logger.warning(f"Coercing {len(non_numeric)} non-numeric bond columns to numbers: {non_numeric[:5]}")
+                block = block.apply(pd.to_numeric, errors='coerce')
+            
+            # Transposed so non-empty cells come out bond by bond, then date
+            values = block.to_numpy(dtype='float64', na_value=np.nan).T
+            present = ~np.isnan(values)
+            column_idx, row_idx = np.nonzero(present)
+            codes = start + column_idx
+            
+            long_block = self._long_frame(cusip_by_code[codes], dates[row_idx],
+                                          pd.Categorical.from_codes(codes, dtype=security_dtype),
+                                          values[present], date_col)
+            if stats is not None:
+                stats['records'] += len(long_block)
+                stats['blocks'] += 1
+            if len(long_block):
+                yield long_block
+    
+    @staticmethod
+    def _long_frame(cusips, dates, securities, spreads, date_col: str) -> pd.DataFrame:
+        """Assemble a long-format frame with columns CUSIP, DATE, Security, GSpread."""
+        return pd.DataFrame({
+            'CUSIP': cusips,
+            date_col: dates,
+            'Security': securities,
+            'GSpread': spreads
+        })
+    
+    def _save_long_outputs(self, blocks, date_col: str) -> pd.DataFrame:
+        """
+        Stream long-format blocks to the long CSV and the main Parquet file.
+        
+        Each block is appended to the CSV and written as its own Parquet row
+        group; both files are written under a temporary name and moved into
+        place once complete. Security is stored as plain strings.
+        
+        Returns:
+            pd.DataFrame: The written long-format records, for final analysis
+        """
+        self.logger.info("--- SAVING OUTPUTS (LONG FORMAT) ---")
+        processed_data_dir = Path('historical g spread/processed data')
+        processed_data_dir.mkdir(parents=True, exist_ok=True)
+        csv_path = processed_data_dir / 'bond_g_sprd_long.csv'
+        main_parquet_path = Path('historical g spread/bond_g_sprd_time_series.parquet')
+        csv_tmp = csv_path.with_name(csv_path.name + '.tmp')
+        parquet_tmp = main_parquet_path.with_name(main_parquet_path.name + '.tmp')
+        
+        written = []
+        writer = None
+        try:
+            for block in blocks:
+                block.to_csv(csv_tmp, mode='a' if written else 'w', header=not written, index=False)
+                table = pa.Table.from_pandas(block.astype({'Security': str}), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(parquet_tmp, table.schema)
+                writer.write_table(table)
+                written.append(block)
+            
+            if written:
+                long_df = pd.concat(written, ignore_index=True)
+            else:
+                long_df = self._long_frame(np.array([], dtype=object), np.array([], dtype='datetime64[ns]'),
+                                           pd.Categorical([]), np.array([], dtype='float64'), date_col)
+                long_df.to_csv(csv_tmp, index=False)
+                long_df.astype({'Security': object}).to_parquet(parquet_tmp, index=False)
+            if writer is not None:
+                writer.close()
+                writer = None
+            
+            csv_tmp.replace(csv_path)
+            parquet_tmp.replace(main_parquet_path)
+            self.logger.info(f"Saved CSV (long): {csv_path}")
+            self.logger.info(f"CSV file size (long): {csv_path.stat().st_size / 1024**2:.1f} MB")
+            self.logger.info(f"Overwrote main Parquet file with long format: {main_parquet_path}")
+            self.logger.info(f"Main Parquet file size (long): {main_parquet_path.stat().st_size / 1024**2:.1f} MB")
+            return long_df
+        except Exception as e:
+            self.logger.error(f"Failed to save outputs: {str(e)}")
+            raise
+        finally:
+            if writer is not None:
+                writer.close()
+            for tmp_path in (csv_tmp, parquet_tmp):
+                if tmp_path.exists():
+                    tmp_path.unlink()
     
     def _save_outputs(self, df: pd.DataFrame, format_type: str = 'wide'):
-        """Save processed data to CSV for both wide and long formats. For long format, also overwrite the main Parquet file."""
+        """Save the wide-format CSV. Long format is streamed by _save_long_outputs."""
         self.logger.info(f"--- SAVING OUTPUTS ({format_type.upper()} FORMAT) ---")
         try:
             # Determine output paths
             processed_data_dir = Path('historical g spread/processed data')
             processed_data_dir.mkdir(parents=True, exist_ok=True)
-            if format_type == 'wide':
-                csv_path = processed_data_dir / 'bond_g_sprd_wide.csv'
-                # Save to CSV only
-                df.to_csv(csv_path, index=False)
-                self.logger.info(f"Saved CSV (wide): {csv_path}")
-                csv_size = csv_path.stat().st_size / 1024**2
-                self.logger.info(f"CSV file size (wide): {csv_size:.1f} MB")
-            else:
-                csv_path = processed_data_dir / 'bond_g_sprd_long.csv'
-                # Save to CSV
-                df.to_csv(csv_path, index=False)
-                self.logger.info(f"Saved CSV (long): {csv_path}")
-                csv_size = csv_path.stat().st_size / 1024**2
-                self.logger.info(f"CSV file size (long): {csv_size:.1f} MB")
-                # Overwrite the main Parquet file with long format
-                main_parquet_path = Path('historical g spread/bond_g_sprd_time_series.parquet')
-                df.to_parquet(main_parquet_path, index=False)
-                parquet_size = main_parquet_path.stat().st_size / 1024**2
-                self.logger.info(f"Overwrote main Parquet file with long format: {main_parquet_path}")
-                self.logger.info(f"Main Parquet file size (long): {parquet_size:.1f} MB")
+            csv_path = processed_data_dir / f'bond_g_sprd_{format_type}.csv'
+            # Save to CSV only
+            df.to_csv(csv_path, index=False)
+            self.logger.info(f"Saved CSV ({format_type}): {csv_path}")
+            csv_size = csv_path.stat().st_size / 1024**2
+            self.logger.info(f"CSV file size ({format_type}): {csv_size:.1f} MB")
         except Exception as e:
             self.logger.error(f"Failed to save outputs: {str(e)}")
             raise
@@ -779,11 +1102,7 @@ class GSpreadProcessor:
         if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
             raise ValueError(f"{date_col} column must be datetime type for date filtering")
         
-        start_dt = pd.to_datetime(start_date)
-        end_dt = pd.to_datetime(end_date)
-        
-        mask = (df[date_col] >= start_dt) & (df[date_col] <= end_dt)
-        filtered_df = df[mask].copy()
+        filtered_df = TimeSeriesStore.for_frame(df, date_col).range(start_date, end_date)
         
         self.logger.info(f"Filtered by date range {start_date} to {end_date}: {len(filtered_df)} records")
         return filtered_df
@@ -803,8 +1122,7 @@ class GSpreadProcessor:
         if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
             raise ValueError(f"{date_col} column must be datetime type for year filtering")
         
-        mask = df[date_col].dt.year == year
-        year_df = df[mask].copy()
+        year_df = TimeSeriesStore.for_frame(df, date_col).year(year)
         
         self.logger.info(f"Extracted year {year} data: {len(year_df)} records")
         return year_df
@@ -823,9 +1141,7 @@ class GSpreadProcessor:
         if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
             raise ValueError(f"{date_col} column must be datetime type for business day filtering")
         
-        # Monday=0, Sunday=6, so weekdays 0-4 are business days
-        mask = df[date_col].dt.weekday < 5
-        business_df = df[mask].copy()
+        business_df = TimeSeriesStore.for_frame(df, date_col).business_days()
         
         self.logger.info(f"Business days only: {len(business_df)} records ({len(business_df)/len(df)*100:.1f}%)")
         return business_df
@@ -845,23 +1161,8 @@ class GSpreadProcessor:
         if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
             raise ValueError(f"{date_col} column must be datetime type for resampling")
         
-        # Set date as index for resampling
-        df_resample = df.set_index(date_col)
-        
-        # Resample to month-end frequency
-        if agg_method == 'last':
-            monthly_df = df_resample.groupby(pd.Grouper(freq='M')).last()
-        elif agg_method == 'first':
-            monthly_df = df_resample.groupby(pd.Grouper(freq='M')).first()
-        elif agg_method == 'mean':
-            monthly_df = df_resample.groupby(pd.Grouper(freq='M')).mean()
-        elif agg_method == 'median':
-            monthly_df = df_resample.groupby(pd.Grouper(freq='M')).median()
-        else:
-            raise ValueError(f"Unsupported aggregation method: {agg_method}")
-        
-        # Reset index to get DATE back as column
-        monthly_df = monthly_df.reset_index()
+        # Month-end resample, cached per aggregation method
+        monthly_df = TimeSeriesStore.for_frame(df, date_col).resample('M', agg_method)
         
         self.logger.info(f"Resampled to monthly using '{agg_method}': {len(monthly_df)} periods")
         return monthly_df
@@ -880,45 +1181,24 @@ class GSpreadProcessor:
         if not pd.api.types.is_datetime64_any_dtype(df[date_col]):
             raise ValueError(f"{date_col} column must be datetime type for feature extraction")
         
-        df_enhanced = df.copy()
-        
-        # Add date features
-        df_enhanced['Year'] = df_enhanced[date_col].dt.year
-        df_enhanced['Month'] = df_enhanced[date_col].dt.month
-        df_enhanced['Quarter'] = df_enhanced[date_col].dt.quarter
-        df_enhanced['DayOfWeek'] = df_enhanced[date_col].dt.dayofweek  # Monday=0
-        df_enhanced['DayName'] = df_enhanced[date_col].dt.day_name()
-        df_enhanced['MonthName'] = df_enhanced[date_col].dt.month_name()
-        df_enhanced['IsBusinessDay'] = df_enhanced[date_col].dt.weekday < 5
-        df_enhanced['IsMonthEnd'] = df_enhanced[date_col].dt.is_month_end
-        df_enhanced['IsQuarterEnd'] = df_enhanced[date_col].dt.is_quarter_end
-        df_enhanced['IsYearEnd'] = df_enhanced[date_col].dt.is_year_end
+        df_enhanced = TimeSeriesStore.for_frame(df, date_col).with_date_features()
         
         self.logger.info(f"Added {9} date features for analytics")
         return df_enhanced
 
     def replace_unicode_fractions(self, text):
-        if not isinstance(text, str):
-            return text
-        return (
-            text.replace('⅛', '1/8')
-                .replace('⅜', '3/8')
-                .replace('⅝', '5/8')
-                .replace('⅞', '7/8')
-                .replace('⅓', '1/3')
-                .replace('⅔', '2/3')
-                .replace('¼', '1/4')
-                .replace('¾', '3/4')
-                .replace('½', '1/2')
-        )
+        return replace_unicode_fractions(text)
 
 
-def process_g_spread_files(logger=None) -> Optional[pd.DataFrame]:
+def process_g_spread_files(logger=None, remap_all: bool = False,
+                           force_full_refresh: bool = False) -> Optional[pd.DataFrame]:
     """
     Main entry point for G spread processing.
     
     Args:
         logger: Logger instance (optional, will create one if not provided)
+        remap_all: Fuzzy-match every bond column again, ignoring the stored mapping
+        force_full_refresh: Parse the whole input CSV again, ignoring the ingest cache
         
     Returns:
         pd.DataFrame: Processed long format DataFrame or None if failed
@@ -940,7 +1220,8 @@ def process_g_spread_files(logger=None) -> Optional[pd.DataFrame]:
             logger = log_manager.logger
         
         # Initialize processor
-        processor = GSpreadProcessor(config_dict, logger)
+        processor = GSpreadProcessor(config_dict, logger, remap_all=remap_all,
+                                     force_full_refresh=force_full_refresh)
         
         # Process files - this already does all the analysis internally
         result_df = processor.process_g_spread_files()
@@ -953,4 +1234,5 @@ def process_g_spread_files(logger=None) -> Optional[pd.DataFrame]:
             logger.error(f"G spread processing failed: {str(e)}")
         else:
             print(f"G spread processing failed: {str(e)}")
-        raise 
\ No newline at end of file
+        raise 
+
@@ -3,7 +3,8 @@ Parquet file processing module.
 """
 import os
 import pandas as pd
-from typing import Optional
+import pyarrow.parquet as pq
+from typing import Optional, Iterator, List
 
 from .base import BaseProcessor
 from ..models.data_models import ProcessingResult
@@ -177,6 +178,31 @@ class ParquetProcessor(BaseProcessor):
                 error=e
             )
     
+    def iter_parquet_batches(self, file_path: str = None, batch_size: int = 65536,
+                             columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream a Parquet file as pandas DataFrames, one Arrow record batch at a time.
+        
+        Only one batch is materialised at once, so peak memory is bounded by
+        ``batch_size`` rather than by the size of the file.
+        """
+        if file_path is None:
+            file_path = self.config.output_parquet
+        
+        parquet_file = pq.ParquetFile(file_path)
+        if columns is not None:
+            available = set(parquet_file.schema_arrow.names)
+            columns = [col for col in columns if col in available]
+        
+        self.logger.info(
+            f"Streaming Parquet file in batches of {batch_size}: {file_path} "
+            f"({parquet_file.metadata.num_rows} rows, {parquet_file.num_row_groups} row groups)"
+        )
+        
+        for record_batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            self.stats.rows_processed += record_batch.num_rows
+            yield record_batch.to_pandas()
+    
     def _merge_with_existing(self, new_df: pd.DataFrame, file_path: str) -> Optional[pd.DataFrame]:
         """Merge new DataFrame with existing Parquet file"""
         try:
@@ -15,6 +15,7 @@ import io
 
 from ..utils.validators import DataValidator
 from ..utils.reporting import DataReporter
+from ..utils.time_series_store import TimeSeriesStore
 
 # --- Configuration Loading ---
 def load_config():
@@ -282,11 +283,7 @@ def filter_portfolio_by_date_range(df: pd.DataFrame, start_date: str, end_date:
     if not pd.api.types.is_datetime64_any_dtype(df['Date']):
         raise ValueError("Date column must be datetime type for date filtering")
     
-    start_dt = pd.to_datetime(start_date)
-    end_dt = pd.to_datetime(end_date)
-    
-    mask = (df['Date'] >= start_dt) & (df['Date'] <= end_dt)
-    filtered_df = df[mask].copy()
+    filtered_df = TimeSeriesStore.for_frame(df, 'Date').range(start_date, end_date)
     
     if logger:
         logger.info(f"Filtered portfolio by date range {start_date} to {end_date}: {len(filtered_df)} records")
@@ -305,11 +302,10 @@ def get_portfolio_latest_date(df: pd.DataFrame, logger: Logger = None) -> pd.Dat
     if not pd.api.types.is_datetime64_any_dtype(df['Date']):
         raise ValueError("Date column must be datetime type for date operations")
     
-    latest_date = df['Date'].max()
-    latest_df = df[df['Date'] == latest_date].copy()
+    latest_df = TimeSeriesStore.for_frame(df, 'Date').latest()
     
     if logger:
-        latest_str = pd.to_datetime(latest_date).strftime('%Y-%m-%d')
+        latest_str = pd.to_datetime(latest_df['Date'].max()).strftime('%Y-%m-%d')
         logger.info(f"Extracted latest portfolio date {latest_str}: {len(latest_df)} records")
     return latest_df
 
@@ -326,19 +322,7 @@ def add_portfolio_date_features(df: pd.DataFrame, logger: Logger = None) -> pd.D
     if not pd.api.types.is_datetime64_any_dtype(df['Date']):
         raise ValueError("Date column must be datetime type for feature extraction")
     
-    df_enhanced = df.copy()
-    
-    # Add date features
-    df_enhanced['Year'] = df_enhanced['Date'].dt.year
-    df_enhanced['Month'] = df_enhanced['Date'].dt.month
-    df_enhanced['Quarter'] = df_enhanced['Date'].dt.quarter
-    df_enhanced['DayOfWeek'] = df_enhanced['Date'].dt.dayofweek  # Monday=0
-    df_enhanced['DayName'] = df_enhanced['Date'].dt.day_name()
-    df_enhanced['MonthName'] = df_enhanced['Date'].dt.month_name()
-    df_enhanced['IsBusinessDay'] = df_enhanced['Date'].dt.weekday < 5
-    df_enhanced['IsMonthEnd'] = df_enhanced['Date'].dt.is_month_end
-    df_enhanced['IsQuarterEnd'] = df_enhanced['Date'].dt.is_quarter_end
-    df_enhanced['IsYearEnd'] = df_enhanced['Date'].dt.is_year_end
+    df_enhanced = TimeSeriesStore.for_frame(df, 'Date').with_date_features()
     
     if logger:
         logger.info(f"Added {9} date features for portfolio analytics")
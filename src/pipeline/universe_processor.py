@@ -10,6 +10,8 @@ import io
 
 from ..utils.validators import DataValidator
 from ..utils.reporting import DataReporter
+from ..utils.time_series_store import TimeSeriesStore
+from ..utils.universe_latest import publish_universe_latest, latest_path
 
 # --- Configuration Loading ---
 def load_config():
@@ -136,6 +138,13 @@ def process_universe_files(logger: Logger, force_full_refresh: bool = False):
 
     if not files_to_process:
         logger.info("\nNo new or modified files to process. The Parquet file is up-to-date.")
+        snapshot_path = latest_path(parquet_path)
+        if existing_df is not None and (not snapshot_path.exists()
+                                        or snapshot_path.stat().st_mtime_ns < parquet_path.stat().st_mtime_ns):
+            try:
+                publish_universe_latest(existing_df, parquet_path, logger)
+            except Exception as e:
+                logger.warning(f"Could not publish latest universe snapshot: {e}")
         return
 
     logger.info(f"\nFound {len(files_to_process)} files to process...")
@@ -342,6 +351,13 @@ def process_universe_files(logger: Logger, force_full_refresh: bool = False):
         logger.info("Updated processing state file.")
     except Exception as e:
         logger.critical(f"Error saving to Parquet: {e}")
+        return
+    
+    # Consumers rebuild a missing or stale snapshot themselves, so a failure here is not fatal
+    try:
+        publish_universe_latest(final_df, parquet_path, logger)
+    except Exception as e:
+        logger.warning(f"Could not publish latest universe snapshot: {e}")
 
 # --- Analytics Helper Functions ---
 def filter_universe_by_date_range(df: pd.DataFrame, start_date: str, end_date: str, logger: Logger = None) -> pd.DataFrame:
@@ -359,11 +375,7 @@ def filter_universe_by_date_range(df: pd.DataFrame, start_date: str, end_date: s
     if not pd.api.types.is_datetime64_any_dtype(df['Date']):
         raise ValueError("Date column must be datetime type for date filtering")
     
-    start_dt = pd.to_datetime(start_date)
-    end_dt = pd.to_datetime(end_date)
-    
-    mask = (df['Date'] >= start_dt) & (df['Date'] <= end_dt)
-    filtered_df = df[mask].copy()
+    filtered_df = TimeSeriesStore.for_frame(df, 'Date').range(start_date, end_date)
     
     if logger:
         logger.info(f"Filtered universe by date range {start_date} to {end_date}: {len(filtered_df)} records")
@@ -382,11 +394,10 @@ def get_universe_latest_date(df: pd.DataFrame, logger: Logger = None) -> pd.Data
     if not pd.api.types.is_datetime64_any_dtype(df['Date']):
         raise ValueError("Date column must be datetime type for date operations")
     
-    latest_date = df['Date'].max()
-    latest_df = df[df['Date'] == latest_date].copy()
+    latest_df = TimeSeriesStore.for_frame(df, 'Date').latest()
     
     if logger:
-        latest_str = pd.to_datetime(latest_date).strftime('%Y-%m-%d')
+        latest_str = pd.to_datetime(latest_df['Date'].max()).strftime('%Y-%m-%d')
         logger.info(f"Extracted latest universe date {latest_str}: {len(latest_df)} records")
     return latest_df
 
@@ -424,19 +435,7 @@ def add_universe_date_features(df: pd.DataFrame, logger: Logger = None) -> pd.Da
     if not pd.api.types.is_datetime64_any_dtype(df['Date']):
         raise ValueError("Date column must be datetime type for feature extraction")
     
-    df_enhanced = df.copy()
-    
-    # Add date features
-    df_enhanced['Year'] = df_enhanced['Date'].dt.year
-    df_enhanced['Month'] = df_enhanced['Date'].dt.month
-    df_enhanced['Quarter'] = df_enhanced['Date'].dt.quarter
-    df_enhanced['DayOfWeek'] = df_enhanced['Date'].dt.dayofweek  # Monday=0
-    df_enhanced['DayName'] = df_enhanced['Date'].dt.day_name()
-    df_enhanced['MonthName'] = df_enhanced['Date'].dt.month_name()
-    df_enhanced['IsBusinessDay'] = df_enhanced['Date'].dt.weekday < 5
-    df_enhanced['IsMonthEnd'] = df_enhanced['Date'].dt.is_month_end
-    df_enhanced['IsQuarterEnd'] = df_enhanced['Date'].dt.is_quarter_end
-    df_enhanced['IsYearEnd'] = df_enhanced['Date'].dt.is_year_end
+    df_enhanced = TimeSeriesStore.for_frame(df, 'Date').with_date_features()
     
     if logger:
         logger.info(f"Added {9} date features for universe analytics")
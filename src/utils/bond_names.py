@@ -0,0 +1,348 @@
+"""
+Bond name parsing and name-to-CUSIP resolution.
+
+Security names across the universe, portfolio, runs and G-spread files
+follow the Bloomberg ``TICKER COUPON MM/DD/YY`` form, with coupons written
+as decimals, ``4 5/8`` or ``4 ⅝``. The resolver:
+
+- Parses names into ticker, coupon and maturity for whole columns at once.
+- Keeps an inverted index from (ticker, coupon, maturity) blocks, and from
+  (maturity, coupon) blocks for tickers spelt differently, to the universe
+  names in them, so a name is only fuzzy-scored against the few candidates
+  in its own block instead of every name, and never against a bond with a
+  different coupon.
+- Resolves exact (normalised) names first, then scores each block with a
+  single ``rapidfuzz.process.cdist`` call.
+- Persists to ``bond_name_index`` and updates incrementally: only names
+  added, changed or removed since the last save are written.
+"""
+
+import re
+import sqlite3
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz
+
+
+UNICODE_FRACTIONS = {
+    '⅛': '1/8', '⅜': '3/8', '⅝': '5/8', '⅞': '7/8',
+    '⅓': '1/3', '⅔': '2/3', '¼': '1/4', '¾': '3/4', '½': '1/2'
+}
+
+SCORERS = {
+    'ratio': fuzz.ratio,
+    'partial_ratio': fuzz.partial_ratio,
+    'token_sort_ratio': fuzz.token_sort_ratio
+}
+
+BOND_NAME_PATTERN = (
+    r'^(?P<ticker>[A-Z0-9&.\-]+) '
+    r'(?P<whole>\d+(?:\.\d+)?)?(?: ?(?P<fraction>\d+/\d+))? '
+    r'(?P<month>\d{1,2})/(?P<day>\d{1,2})/(?P<year>\d{4}|\d{2})\b'
+)
+
+BOND_NAME_INDEX_TABLE = """
+    CREATE TABLE IF NOT EXISTS bond_name_index (
+        name TEXT PRIMARY KEY,
+        security TEXT,
+        cusip TEXT,
+        ticker TEXT,
+        coupon REAL,
+        maturity TEXT,
+        updated_timestamp TIMESTAMP
+    ) WITHOUT ROWID
+"""
+
+BOND_NAME_INDEX_BLOCKS = (
+    "CREATE INDEX IF NOT EXISTS idx_bond_name_index_block ON bond_name_index (ticker, maturity)"
+)
+
+_FRACTION_CHARACTERS = re.compile('[' + ''.join(UNICODE_FRACTIONS) + ']')
+
+
+def replace_unicode_fractions(text):
+    """Replace unicode vulgar fractions with ``n/d`` (non-strings pass through)."""
+    if not isinstance(text, str):
+        return text
+    for character, fraction in UNICODE_FRACTIONS.items():
+        text = text.replace(character, fraction)
+    return text
+
+
+def normalize_bond_names(names) -> pd.Series:
+    """Upper-case names with fractions spelled out and whitespace collapsed (nulls stay null)."""
+    names = pd.Series(names, dtype=object)
+    present = names.notna()
+    text = names[present].astype(str)
+    text = text.str.replace(_FRACTION_CHARACTERS, lambda match: ' ' + UNICODE_FRACTIONS[match.group(0)], regex=True)
+    text = text.str.upper().str.replace(r'\s+', ' ', regex=True).str.strip()
+    result = pd.Series(None, index=names.index, dtype=object)
+    result[present] = text.to_numpy(dtype=object)
+    return result.where(result != '', None)
+
+
+def parse_bond_names(names) -> pd.DataFrame:
+    """
+    Parse bond names into ticker, coupon and maturity.
+
+    Args:
+        names: Security names (array-like, nulls allowed)
+
+    Returns:
+        DataFrame with name (normalised), ticker, coupon (float) and maturity
+        (``YYYY-MM-DD``); the parsed fields are null for names that do not
+        follow ``TICKER COUPON MM/DD/YY``. Two-digit years are 20YY.
+    """
+    normalized = normalize_bond_names(names)
+    parts = normalized.astype(object).str.extract(BOND_NAME_PATTERN)
+
+    whole = pd.to_numeric(parts['whole'], errors='coerce')
+    fraction = parts['fraction'].str.split('/', expand=True) if parts['fraction'].notna().any() else None
+    coupon = whole.fillna(0.0)
+    if fraction is not None:
+        coupon = coupon + (pd.to_numeric(fraction[0], errors='coerce') /
+                           pd.to_numeric(fraction[1], errors='coerce')).fillna(0.0)
+    has_coupon = parts['whole'].notna() | parts['fraction'].notna()
+
+    year = pd.to_numeric(parts['year'], errors='coerce')
+    year = year.where(year >= 100, year + 2000)
+    maturity = pd.to_datetime(pd.DataFrame({
+        'year': year, 'month': pd.to_numeric(parts['month'], errors='coerce'),
+        'day': pd.to_numeric(parts['day'], errors='coerce')
+    }), errors='coerce')
+
+    parsed = (maturity.notna() & has_coupon).to_numpy()
+    return pd.DataFrame({
+        'name': normalized.to_numpy(dtype=object),
+        'ticker': np.where(parsed, parts['ticker'].to_numpy(dtype=object), None),
+        'coupon': np.where(parsed, coupon.to_numpy(dtype=float), np.nan),
+        'maturity': np.where(parsed, maturity.dt.strftime('%Y-%m-%d').to_numpy(dtype=object), None)
+    }, index=normalized.index)
+
+
+def _coupon_key(coupon: Optional[float]) -> Optional[float]:
+    """Coupon rounded for use in a block key"""
+    return None if coupon is None or pd.isna(coupon) else round(float(coupon), 6)
+
+
+def missing_cusip_mask(cusips: pd.Series) -> pd.Series:
+    """True where a CUSIP is null, blank, or a stringified null ('nan', 'None')."""
+    text = cusips.astype(object).where(cusips.notna(), '').astype(str).str.strip()
+    return text.str.lower().isin(['', 'nan', 'none', 'null'])
+
+
+class BondNameResolver:
+    """
+    Resolves security names to CUSIPs through a blocked inverted index of universe names.
+    """
+
+    def __init__(self, threshold: float = 85, scoring_methods: Iterable[str] = ('ratio', 'token_sort_ratio'),
+                 logger=None):
+        """
+        Initialize an empty resolver.
+
+        Args:
+            threshold: Minimum fuzzy score (0-100) for a match
+            scoring_methods: rapidfuzz scorers to take the best score of
+            logger: Optional logger
+        """
+        self.threshold = threshold
+        self.scorers = [SCORERS[method] for method in scoring_methods if method in SCORERS]
+        self.logger = logger
+
+        # name -> (security, cusip, ticker, coupon, maturity)
+        self._entries: Dict[str, Tuple[str, str, Optional[str], Optional[float], Optional[str]]] = {}
+        self._blocks: Dict[Tuple, set] = {}
+        self._dirty: set = set()
+        self._removed: set = set()
+        self.stats = {'resolved_exact': 0, 'resolved_fuzzy': 0, 'unresolved': 0, 'candidates_scored': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def load(cls, conn: sqlite3.Connection, **kwargs) -> 'BondNameResolver':
+        """Build a resolver from the persisted index (empty if none was saved)."""
+        resolver = cls(**kwargs)
+        resolver.ensure_table(conn)
+        for name, security, cusip, ticker, coupon, maturity in conn.execute(
+            "SELECT name, security, cusip, ticker, coupon, maturity FROM bond_name_index"
+        ):
+            resolver._add_entry(name, (security, cusip, ticker, coupon, maturity))
+        return resolver
+
+    def update(self, df: pd.DataFrame, name_column: str = 'Security', cusip_column: str = 'CUSIP',
+               remove_missing: bool = False) -> Dict[str, int]:
+        """
+        Add or update universe names.
+
+        Args:
+            df: Universe rows
+            name_column: Column holding the security names
+            cusip_column: Column holding the CUSIPs names resolve to
+            remove_missing: Drop indexed names not present in ``df``
+
+        Returns:
+            Counts of names added, changed and removed
+        """
+        pairs = df[[name_column, cusip_column]]
+        pairs = pairs[pairs[name_column].notna() & ~missing_cusip_mask(pairs[cusip_column])]
+        parsed = parse_bond_names(pairs[name_column])
+        parsed['security'] = pairs[name_column].astype(object)
+        parsed['cusip'] = pairs[cusip_column].astype(str).str.strip().astype(object)
+        parsed = parsed[parsed['name'].notna()].drop_duplicates('name', keep='last')
+
+        counts = {'added': 0, 'changed': 0, 'removed': 0}
+        for name, security, cusip, ticker, coupon, maturity in zip(
+            parsed['name'], parsed['security'], parsed['cusip'],
+            parsed['ticker'], parsed['coupon'], parsed['maturity']
+        ):
+            entry = (security, cusip, ticker, None if pd.isna(coupon) else float(coupon), maturity)
+            previous = self._entries.get(name)
+            if previous == entry:
+                continue
+            counts['changed' if previous is not None else 'added'] += 1
+            if previous is not None:
+                self._remove_entry(name)
+            self._add_entry(name, entry)
+            self._dirty.add(name)
+            self._removed.discard(name)
+
+        if remove_missing:
+            for name in set(self._entries) - set(parsed['name']):
+                self._remove_entry(name)
+                self._dirty.discard(name)
+                self._removed.add(name)
+                counts['removed'] += 1
+
+        self._log_event("Bond name index updated", counts)
+        return counts
+
+    def save(self, conn: sqlite3.Connection) -> int:
+        """
+        Write names changed since the last save (no commit).
+
+        Returns:
+            Number of rows written or deleted
+        """
+        self.ensure_table(conn)
+        now = datetime.now().isoformat()
+        rows = [(name, *self._entries[name], now) for name in self._dirty]
+        conn.executemany(
+            "INSERT OR REPLACE INTO bond_name_index "
+            "(name, security, cusip, ticker, coupon, maturity, updated_timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        conn.executemany("DELETE FROM bond_name_index WHERE name = ?", [(name,) for name in self._removed])
+        written = len(rows) + len(self._removed)
+        self._dirty.clear()
+        self._removed.clear()
+        return written
+
+    def resolve(self, names) -> pd.DataFrame:
+        """
+        Resolve security names to CUSIPs.
+
+        Args:
+            names: Security names (array-like, nulls allowed)
+
+        Returns:
+            DataFrame aligned with ``names``: name, matched_name, cusip, score
+            and match_type ('exact', 'fuzzy' or 'unmatched')
+        """
+        parsed = parse_bond_names(names)
+        distinct = parsed.dropna(subset=['name']).drop_duplicates('name')
+
+        matches: Dict[str, Tuple[str, float, str]] = {}
+        pending: Dict[Tuple, List[str]] = {}
+        for name, ticker, coupon, maturity in zip(
+            distinct['name'], distinct['ticker'], distinct['coupon'], distinct['maturity']
+        ):
+            if name in self._entries:
+                matches[name] = (name, 100.0, 'exact')
+            elif maturity is not None:
+                pending.setdefault((ticker, _coupon_key(coupon), maturity), []).append(name)
+
+        # Score each block's queries against that block's candidates only
+        for block, queries in pending.items():
+            candidates = self._candidates(*block)
+            if not candidates or not self.scorers:
+                continue
+            self.stats['candidates_scored'] += len(queries) * len(candidates)
+            scores = np.zeros((len(queries), len(candidates)), dtype=np.float64)
+            for scorer in self.scorers:
+                np.maximum(scores, process.cdist(queries, candidates, scorer=scorer, dtype=np.float64,
+                                                 score_cutoff=self.threshold), out=scores)
+            best = scores.argmax(axis=1)
+            for row, query in enumerate(queries):
+                score = scores[row, best[row]]
+                if score >= self.threshold:
+                    matches[query] = (candidates[best[row]], float(score), 'fuzzy')
+
+        unmatched = (None, 0.0, 'unmatched')
+        rows = [matches.get(name, unmatched) if name is not None else unmatched for name in parsed['name']]
+        result = pd.DataFrame({
+            'name': parsed['name'].to_numpy(dtype=object),
+            'matched_name': np.array([row[0] for row in rows], dtype=object),
+            'cusip': np.array([self._entries[row[0]][1] if row[0] is not None else None for row in rows], dtype=object),
+            'score': np.array([row[1] for row in rows], dtype=float),
+            'match_type': np.array([row[2] for row in rows], dtype=object)
+        }, index=parsed.index)
+
+        self.stats['resolved_exact'] += int((result['match_type'] == 'exact').sum())
+        self.stats['resolved_fuzzy'] += int((result['match_type'] == 'fuzzy').sum())
+        self.stats['unresolved'] += int((result['match_type'] == 'unmatched').sum())
+        return result
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Index size and resolution counts."""
+        return {
+            'names': len(self._entries),
+            'blocks': len(self._blocks),
+            'unsaved_changes': len(self._dirty) + len(self._removed),
+            **self.stats
+        }
+
+    @staticmethod
+    def ensure_table(conn: sqlite3.Connection):
+        """Create the index table if needed."""
+        conn.execute(BOND_NAME_INDEX_TABLE)
+        conn.execute(BOND_NAME_INDEX_BLOCKS)
+
+    def _candidates(self, ticker: str, coupon: float, maturity: str) -> List[str]:
+        """Names in the query's ticker/coupon/maturity block, else in its maturity/coupon block (ticker spelt differently)"""
+        candidates = self._blocks.get(('ticker', ticker, coupon, maturity))
+        if not candidates:
+            candidates = self._blocks.get(('coupon', maturity, coupon), set())
+        return sorted(candidates)
+
+    @staticmethod
+    def _block_keys(entry: Tuple) -> List[Tuple]:
+        """Blocks a parsed name belongs to"""
+        _, _, ticker, coupon, maturity = entry
+        if maturity is None:
+            return []
+        return [('ticker', ticker, _coupon_key(coupon), maturity), ('coupon', maturity, _coupon_key(coupon))]
+
+    def _add_entry(self, name: str, entry: Tuple):
+        """Index one name under its blocks"""
+        self._entries[name] = entry
+        for block in self._block_keys(entry):
+            self._blocks.setdefault(block, set()).add(name)
+
+    def _remove_entry(self, name: str):
+        """Drop one name from the entries and its blocks"""
+        for block in self._block_keys(self._entries.pop(name)):
+            members = self._blocks.get(block)
+            if members is not None:
+                members.discard(name)
+                if not members:
+                    del self._blocks[block]
+
+    def _log_event(self, message: str, details: Dict[str, Any] = None):
+        """Log a resolver event"""
+        if self.logger:
+            self.logger.info(f"{message}: {details or {}}")
@@ -0,0 +1,114 @@
+"""
+Compact 64-bit integer keys for CUSIPs.
+
+CUSIP-shaped values (up to 11 characters of ``0-9``, ``A-Z``, ``* @ #``
+and the ``space . - /`` found in CDX and cash pseudo-CUSIPs) are packed as
+base-44 digits into a signed 64-bit integer:
+
+- Reversible: ``decode_cusips(encode_cusips(x)) == x`` for those values.
+- Order-preserving: integer order equals string order, so sorted keys
+  sort the CUSIPs too.
+- Anything else (longer pseudo names, lowercase, other characters) gets a
+  stable 62-bit hash above the packed range, so every non-null value still
+  has its own key; those keys cannot be decoded.
+- Null is ``NULL_KEY`` (0).
+
+Keys are int64 rather than uint64 so the same column works as a pandas
+join key, an Arrow ``int64`` column and a SQLite ``INTEGER``.
+"""
+
+import sqlite3
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+ALPHABET = ' #*-./0123456789@ABCDEFGHIJKLMNOPQRSTUVWXYZ'  # ASCII order keeps keys sorted like strings
+BASE = len(ALPHABET) + 1  # digit 0 pads short values
+MAX_CUSIP_LENGTH = 11  # 44 ** 11 < 2 ** 63
+NULL_KEY = 0
+
+_PACKED_LIMIT = BASE ** MAX_CUSIP_LENGTH
+_HASHED_FLAG = 1 << 62  # hashed keys live in [2 ** 62, 2 ** 63), above every packed key
+_POWERS = BASE ** np.arange(MAX_CUSIP_LENGTH - 1, -1, -1, dtype=np.int64)
+_PACKABLE = '[' + ''.join('\\' + char if char in '-.*/#@' else char for char in ALPHABET) + ']{1,%d}' % MAX_CUSIP_LENGTH
+
+_DIGITS = np.zeros(256, dtype=np.int64)
+_DIGITS[np.frombuffer(ALPHABET.encode('ascii'), dtype=np.uint8)] = np.arange(1, BASE)
+_CHARACTERS = np.frombuffer(b'\x00' + ALPHABET.encode('ascii'), dtype=np.uint8)
+
+assert _PACKED_LIMIT < _HASHED_FLAG
+
+
+def encode_cusips(values) -> np.ndarray:
+    """
+    Encode CUSIPs as int64 keys.
+
+    Args:
+        values: CUSIPs (array-like, nulls allowed)
+
+    Returns:
+        int64 array; NULL_KEY for nulls
+    """
+    series = pd.Series(values, dtype=object).reset_index(drop=True)
+    keys = np.full(len(series), NULL_KEY, dtype=np.int64)
+    present = series.notna().to_numpy()
+    if not present.any():
+        return keys
+
+    text = series[present].astype(str)
+    packable = text.str.fullmatch(_PACKABLE).fillna(False).to_numpy(dtype=bool)
+    positions = np.flatnonzero(present)
+
+    if packable.any():
+        encoded = np.array(text[packable].tolist(), dtype='S%d' % MAX_CUSIP_LENGTH)
+        digits = _DIGITS[encoded.view(np.uint8).reshape(-1, MAX_CUSIP_LENGTH)]
+        keys[positions[packable]] = digits @ _POWERS
+
+    if not packable.all():
+        hashed = pd.util.hash_pandas_object(text[~packable], index=False).to_numpy(dtype=np.uint64)
+        keys[positions[~packable]] = (hashed >> np.uint64(2)).astype(np.int64) | _HASHED_FLAG
+    return keys
+
+
+def decode_cusips(keys) -> np.ndarray:
+    """
+    Decode int64 keys back to CUSIPs.
+
+    Args:
+        keys: Keys from encode_cusips
+
+    Returns:
+        Object array of CUSIPs; None for NULL_KEY and for hashed keys
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    result = np.full(len(keys), None, dtype=object)
+    packed = (keys > NULL_KEY) & (keys < _PACKED_LIMIT)
+    if packed.any():
+        digits = (keys[packed, None] // _POWERS) % BASE
+        text = _CHARACTERS[digits].view('S%d' % MAX_CUSIP_LENGTH).ravel()
+        result[packed] = np.char.decode(text, 'ascii')
+    return result
+
+
+def is_reversible(keys) -> np.ndarray:
+    """True for keys that decode back to their CUSIP."""
+    keys = np.asarray(keys, dtype=np.int64)
+    return (keys > NULL_KEY) & (keys < _PACKED_LIMIT)
+
+
+def encode_cusip(value) -> Optional[int]:
+    """Encode one CUSIP (None for null)."""
+    key = int(encode_cusips([value])[0])
+    return None if key == NULL_KEY else key
+
+
+def register_sqlite_function(conn: sqlite3.Connection, name: str = 'cusip_key'):
+    """
+    Make ``cusip_key(text)`` available in SQL on this connection.
+
+    Meant for queries and for filling stored key columns; keep it out of
+    schema objects (indexes, views), which every connection would then need.
+    """
+    conn.create_function(name, 1, encode_cusip, deterministic=True)
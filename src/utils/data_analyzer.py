@@ -14,6 +14,10 @@ from datetime import datetime
 import logging
 from io import StringIO
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .universe_membership import UniverseMembershipIndex
+from .universe_latest import UniverseLatest
 
 
 class DataAnalyzer:
@@ -286,21 +290,129 @@ class DataAnalyzer:
         return "\n".join(output)
 
 
+def _security_column(df: pd.DataFrame, table_name: str, cusip_col: str) -> Optional[str]:
+    """Column holding the security name for a CUSIP column (None when there is none)"""
+    # Check for standard security columns first
+    for col in ['Security', 'SECURITY', 'security']:
+        if col in df.columns:
+            return col
+    
+    # For g_spread table, each CUSIP column has its own security column
+    if table_name == 'g_spread':
+        if cusip_col == 'CUSIP_1' and 'Security_1' in df.columns:
+            return 'Security_1'
+        if cusip_col == 'CUSIP_2' and 'Security_2' in df.columns:
+            return 'Security_2'
+    return None
+
+
+def find_orphaned_cusips(table_name: str, df: pd.DataFrame, cusip_columns: List[str],
+                         membership: UniverseMembershipIndex, latest_only: bool) -> Optional[Dict[str, Any]]:
+    """
+    Find CUSIPs of one table that are not in the universe.
+    
+    Every CUSIP column is stacked into one long (cusip, security) frame, an
+    anti-join against the membership index keeps the orphaned rows, and a
+    single groupby gives each orphan's instance count and first security name.
+    Module-level so it can run in a worker process.
+    
+    Args:
+        table_name: Name of the table
+        df: Table rows to check
+        cusip_columns: CUSIP columns of the table
+        membership: Universe membership index
+        latest_only: Check against the latest universe date instead of any date
+        
+    Returns:
+        Orphan details for the table, or None when it has no orphans
+    """
+    stacked = pd.concat([
+        pd.DataFrame({
+            'cusip': df[cusip_col].values,
+            'security': df[security_col].values if security_col else None
+        })
+        for cusip_col, security_col in (
+            (cusip_col, _security_column(df, table_name, cusip_col)) for cusip_col in cusip_columns
+        )
+    ], ignore_index=True)
+    stacked = stacked[stacked['cusip'].notna()]
+    
+    # Anti-join: keep only rows whose CUSIP is missing from the universe
+    is_member = membership.contains if latest_only else membership.contains_any
+    orphaned = stacked[~is_member(stacked['cusip'].values)]
+    if orphaned.empty:
+        return None
+    
+    grouped = orphaned.groupby('cusip', sort=False).agg(
+        count=('cusip', 'size'),
+        security_name=('security', 'first')
+    )
+    orphaned_details = [
+        {'cusip': cusip, 'security_name': security_name, 'count': int(count)}
+        for cusip, count, security_name in zip(
+            grouped.index, grouped['count'], grouped['security_name'].where(grouped['security_name'].notna(), 'Unknown')
+        )
+    ]
+    return {
+        'orphaned_cusips': orphaned_details,
+        'total_instances': int(grouped['count'].sum()),
+        'unique_cusips': len(orphaned_details)
+    }
+
+
 class CUSIPValidator:
     """
     Validates CUSIPs across all tables and detects orphaned CUSIPs.
     """
     
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(self, logger: Optional[logging.Logger] = None, max_workers: Optional[int] = None):
         """
         Initialize CUSIP validator.
         
         Args:
             logger: Optional logger for output
+            max_workers: Check tables in a process pool of this size (None or 1 checks them in-process)
         """
         self.logger = logger
+        self.max_workers = max_workers
         self.orphaned_cusips = {}
+        self._membership = None
+    
+    def membership_index(self, universe_df: pd.DataFrame) -> UniverseMembershipIndex:
+        """
+        Get the universe membership index for a universe DataFrame, built once per DataFrame.
         
+        Args:
+            universe_df: Universe rows (CUSIP and, for point-in-time checks, Date)
+            
+        Returns:
+            UniverseMembershipIndex over the universe dates
+        """
+        if self._membership is None or self._membership[0] is not universe_df:
+            if 'CUSIP' in universe_df.columns:
+                index = UniverseMembershipIndex.from_frame(universe_df)
+            else:
+                index = UniverseMembershipIndex()
+            self._membership = (universe_df, index)
+        return self._membership[1]
+    
+    def _find_orphans(self, tables: List[Tuple[str, pd.DataFrame, List[str]]],
+                      membership: UniverseMembershipIndex, latest_only: bool) -> Dict[str, Dict[str, Any]]:
+        """Orphan details per table, checking tables in a process pool when configured"""
+        if self.max_workers and self.max_workers > 1 and len(tables) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tables))) as executor:
+                futures = [
+                    executor.submit(find_orphaned_cusips, table_name, df, cusip_columns, membership, latest_only)
+                    for table_name, df, cusip_columns in tables
+                ]
+                results = [future.result() for future in futures]
+        else:
+            results = [
+                find_orphaned_cusips(table_name, df, cusip_columns, membership, latest_only)
+                for table_name, df, cusip_columns in tables
+            ]
+        return {table[0]: result for table, result in zip(tables, results) if result is not None}
+    
     def validate_cusips(self, table_data: Dict[str, pd.DataFrame], 
                        universe_table: str = 'universe') -> Dict[str, Any]:
         """
@@ -328,85 +440,31 @@ class CUSIPValidator:
                 'summary': {}
             }
         
-        # Get universe CUSIPs
+        # Get universe CUSIPs; membership checks go through the index in bulk
+        membership = self.membership_index(universe_df)
         universe_cusips = set()
         if 'CUSIP' in universe_df.columns:
             universe_cusips = set(universe_df['CUSIP'].dropna().unique())
         
-        # Find orphaned CUSIPs in other tables
-        orphaned_results = {}
-        summary = {
-            'universe_cusips': len(universe_cusips),
-            'tables_checked': 0,
-            'total_orphaned_instances': 0,
-            'unique_orphaned_cusips': set()
-        }
-        
+        # Collect the tables with CUSIP columns (handle variations like CUSIP_1, CUSIP_2)
+        tables = []
         for table_name, df in table_data.items():
             if table_name == universe_table or df is None or df.empty:
                 continue
-            
-            # Find CUSIP columns (handle variations like CUSIP_1, CUSIP_2)
             cusip_columns = [col for col in df.columns if 'CUSIP' in col.upper()]
-            if not cusip_columns:
-                continue
-            
-            summary['tables_checked'] += 1
-            
-            # Get all CUSIPs from all CUSIP columns in this table
-            table_cusips = set()
-            for cusip_col in cusip_columns:
-                table_cusips.update(df[cusip_col].dropna().unique())
-            
-            orphaned_in_table = [cusip for cusip in table_cusips if cusip not in universe_cusips]
-            
-            if orphaned_in_table:
-                # Get security names for orphaned CUSIPs
-                orphaned_details = []
-                for cusip in orphaned_in_table:
-                    # Find which CUSIP column(s) contain this CUSIP
-                    cusip_instances = 0
-                    security_name = "Unknown"
-                    
-                    for cusip_col in cusip_columns:
-                        cusip_data = df[df[cusip_col] == cusip]
-                        if len(cusip_data) > 0:
-                            cusip_instances += len(cusip_data)
-                            
-                            # Get security name if available
-                            if security_name == "Unknown":
-                                security_col = None
-                                # Check for standard security columns first
-                                for col in ['Security', 'SECURITY', 'security']:
-                                    if col in df.columns:
-                                        security_col = col
-                                        break
-                                
-                                # For g_spread table, check Security_1 and Security_2
-                                if security_col is None and table_name == 'g_spread':
-                                    # Check which CUSIP column this CUSIP is in
-                                    if cusip_col == 'CUSIP_1' and 'Security_1' in df.columns:
-                                        security_col = 'Security_1'
-                                    elif cusip_col == 'CUSIP_2' and 'Security_2' in df.columns:
-                                        security_col = 'Security_2'
-                                
-                                if security_col:
-                                    security_name = cusip_data[security_col].iloc[0]
-                    
-                    orphaned_details.append({
-                        'cusip': cusip,
-                        'security_name': security_name,
-                        'count': cusip_instances
-                    })
-                
-                orphaned_results[table_name] = {
-                    'orphaned_cusips': orphaned_details,
-                    'total_instances': sum(detail['count'] for detail in orphaned_details),
-                    'unique_cusips': len(orphaned_in_table)
-                }
-                
-                summary['total_orphaned_instances'] += orphaned_results[table_name]['total_instances']
-                summary['unique_orphaned_cusips'].update(orphaned_in_table)
+            if cusip_columns:
+                tables.append((table_name, df, cusip_columns))
+        
+        # Find orphaned CUSIPs in other tables
+        orphaned_results = self._find_orphans(tables, membership, latest_only=False)
+        summary = {
+            'universe_cusips': len(universe_cusips),
+            'tables_checked': len(tables),
+            'total_orphaned_instances': sum(result['total_instances'] for result in orphaned_results.values()),
+            'unique_orphaned_cusips': {
+                detail['cusip'] for result in orphaned_results.values() for detail in result['orphaned_cusips']
+            }
+        }
         
         return {
             'orphaned_cusips': orphaned_results,
@@ -415,7 +473,8 @@ class CUSIPValidator:
         }
     
     def validate_cusips_latest_universe(self, table_data: Dict[str, pd.DataFrame], 
-                                       universe_table: str = 'universe') -> Dict[str, Any]:
+                                       universe_table: str = 'universe',
+                                       universe_latest: Optional[UniverseLatest] = None) -> Dict[str, Any]:
         """
         Validate CUSIPs across all tables against only the most recent date in the universe table.
         For time series tables, also check only their latest date against universe's latest date.
@@ -423,10 +482,18 @@ class CUSIPValidator:
         Args:
             table_data: Dictionary of {table_name: dataframe}
             universe_table: Name of the universe table
+            universe_latest: Published latest-universe snapshot; when given it is used
+                             instead of the universe table's history
             
         Returns:
             Dictionary with validation results against latest universe
         """
+        if universe_latest is not None:
+            universe_df = universe_latest.frame
+            latest_date = universe_latest.date
+            membership = UniverseMembershipIndex.from_frame(universe_df)
+            return self._validate_against_latest(table_data, universe_table, membership, latest_date)
+        
         if universe_table not in table_data:
             return {
                 'error': f"Universe table '{universe_table}' not found in data",
@@ -443,30 +510,24 @@ class CUSIPValidator:
             }
         
         # Find the most recent date in universe
+        # (without a Date column the index holds all universe data as one date)
         latest_date = None
         if 'Date' in universe_df.columns:
             latest_date = universe_df['Date'].max()
-            latest_universe_df = universe_df[universe_df['Date'] == latest_date]
-        else:
-            # If no Date column, use all universe data
-            latest_universe_df = universe_df
         
+        # Membership checks go through the index in bulk
+        membership = self.membership_index(universe_df)
+        return self._validate_against_latest(table_data, universe_table, membership, latest_date)
+    
+    def _validate_against_latest(self, table_data: Dict[str, pd.DataFrame], universe_table: str,
+                                 membership: UniverseMembershipIndex, latest_date) -> Dict[str, Any]:
+        """Orphan results for each table's latest rows against the latest universe date"""
         # Get CUSIPs from the most recent universe
-        latest_universe_cusips = set()
-        if 'CUSIP' in latest_universe_df.columns:
-            latest_universe_cusips = set(latest_universe_df['CUSIP'].dropna().unique())
+        latest_universe_cusips = set(membership.members())
         
-        # Find orphaned CUSIPs in other tables
-        orphaned_results = {}
+        # Collect each table's latest rows
+        tables = []
         table_latest_dates = {}  # Store latest dates for each table
-        summary = {
-            'universe_cusips': len(latest_universe_cusips),
-            'latest_date': str(latest_date) if latest_date is not None else 'N/A',
-            'tables_checked': 0,
-            'total_orphaned_instances': 0,
-            'unique_orphaned_cusips': set()
-        }
-        
         for table_name, df in table_data.items():
             if table_name == universe_table or df is None or df.empty:
                 continue
@@ -476,8 +537,6 @@ class CUSIPValidator:
             if not cusip_columns:
                 continue
             
-            summary['tables_checked'] += 1
-            
             # For time series tables, get only the latest date data
             if 'Date' in df.columns:
                 table_latest_date = df['Date'].max()
@@ -491,61 +550,19 @@ class CUSIPValidator:
                 table_latest_dates[table_name] = "All Data (Non-Time Series)"
                 if self.logger:
                     self.logger.info(f"Table {table_name}: Using all data (non-time series)")
-            
-            # Get all CUSIPs from all CUSIP columns in this table (latest date only for time series)
-            table_cusips = set()
-            for cusip_col in cusip_columns:
-                table_cusips.update(latest_df[cusip_col].dropna().unique())
-            
-            orphaned_in_table = [cusip for cusip in table_cusips if cusip not in latest_universe_cusips]
-            
-            if orphaned_in_table:
-                # Get security names for orphaned CUSIPs
-                orphaned_details = []
-                for cusip in orphaned_in_table:
-                    # Find which CUSIP column(s) contain this CUSIP
-                    cusip_instances = 0
-                    security_name = "Unknown"
-                    
-                    for cusip_col in cusip_columns:
-                        cusip_data = latest_df[latest_df[cusip_col] == cusip]
-                        if len(cusip_data) > 0:
-                            cusip_instances += len(cusip_data)
-                            
-                            # Get security name if available
-                            if security_name == "Unknown":
-                                security_col = None
-                                # Check for standard security columns first
-                                for col in ['Security', 'SECURITY', 'security']:
-                                    if col in df.columns:
-                                        security_col = col
-                                        break
-                                
-                                # For g_spread table, check Security_1 and Security_2
-                                if security_col is None and table_name == 'g_spread':
-                                    # Check which CUSIP column this CUSIP is in
-                                    if cusip_col == 'CUSIP_1' and 'Security_1' in df.columns:
-                                        security_col = 'Security_1'
-                                    elif cusip_col == 'CUSIP_2' and 'Security_2' in df.columns:
-                                        security_col = 'Security_2'
-                                
-                                if security_col:
-                                    security_name = cusip_data[security_col].iloc[0]
-                    
-                    orphaned_details.append({
-                        'cusip': cusip,
-                        'security_name': security_name,
-                        'count': cusip_instances
-                    })
-                
-                orphaned_results[table_name] = {
-                    'orphaned_cusips': orphaned_details,
-                    'total_instances': sum(detail['count'] for detail in orphaned_details),
-                    'unique_cusips': len(orphaned_in_table)
-                }
-                
-                summary['total_orphaned_instances'] += orphaned_results[table_name]['total_instances']
-                summary['unique_orphaned_cusips'].update(orphaned_in_table)
+            tables.append((table_name, latest_df, cusip_columns))
+        
+        # Find orphaned CUSIPs in other tables
+        orphaned_results = self._find_orphans(tables, membership, latest_only=True)
+        summary = {
+            'universe_cusips': len(latest_universe_cusips),
+            'latest_date': str(latest_date) if latest_date is not None else 'N/A',
+            'tables_checked': len(tables),
+            'total_orphaned_instances': sum(result['total_instances'] for result in orphaned_results.values()),
+            'unique_orphaned_cusips': {
+                detail['cusip'] for result in orphaned_results.values() for detail in result['orphaned_cusips']
+            }
+        }
         
         return {
             'orphaned_cusips': orphaned_results,
@@ -646,7 +663,9 @@ class CUSIPValidator:
 
 def analyze_pipeline_data(table_data: Dict[str, pd.DataFrame], 
                          logger: Optional[logging.Logger] = None,
-                         show_details: bool = True) -> str:
+                         show_details: bool = True,
+                         max_workers: Optional[int] = None,
+                         universe_latest: Optional[UniverseLatest] = None) -> str:
     """
     Convenience function to run complete data analysis and CUSIP validation.
     
@@ -654,6 +673,8 @@ def analyze_pipeline_data(table_data: Dict[str, pd.DataFrame],
         table_data: Dictionary of {table_name: dataframe}
         logger: Optional logger for output
         show_details: Whether to show detailed analysis
+        max_workers: Processes for per-table orphan detection (None checks tables in-process)
+        universe_latest: Published latest-universe snapshot for the latest-date validation
         
     Returns:
         Complete formatted analysis output
@@ -666,13 +687,13 @@ def analyze_pipeline_data(table_data: Dict[str, pd.DataFrame],
     output.append(analysis_output)
     
     # CUSIP validation (all universe dates)
-    validator = CUSIPValidator(logger)
+    validator = CUSIPValidator(logger, max_workers=max_workers)
     validation_results = validator.validate_cusips(table_data)
     validation_output = validator.format_validation_output(validation_results)
     output.append(validation_output)
     
     # CUSIP validation (latest universe date only)
-    latest_validation_results = validator.validate_cusips_latest_universe(table_data)
+    latest_validation_results = validator.validate_cusips_latest_universe(table_data, universe_latest=universe_latest)
     latest_validation_output = validator.format_latest_universe_validation_output(latest_validation_results)
     output.append(latest_validation_output)
     
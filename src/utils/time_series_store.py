@@ -0,0 +1,268 @@
+"""
+Indexed time-series store for the analytics helpers.
+
+Keeps a sorted DatetimeIndex over a frame's date column, with the row
+offsets of every year and month and the business-day row positions
+computed once. Range, year, month and latest-date lookups are
+``searchsorted`` or dict hits followed by a positional take, and
+resamples and date features are computed once per store and reused, so
+repeated research calls never rescan the full history. Results keep the
+frame's own row order and index, as boolean masks over it would.
+"""
+
+import weakref
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+
+def _period_end_alias(alias: str, legacy_alias: str) -> str:
+    """Offset alias for a period end ('ME'/'QE' on newer pandas, 'M'/'Q' before)."""
+    try:
+        to_offset(alias)
+        return alias
+    except ValueError:
+        return legacy_alias
+
+
+# Period-end offset aliases for resample()
+RESAMPLE_FREQUENCIES = {
+    'M': _period_end_alias('ME', 'M'),
+    'Q': _period_end_alias('QE', 'Q'),
+}
+
+# Aggregations supported by resample()
+AGG_METHODS = ('last', 'first', 'mean', 'median')
+
+# Stores kept by for_frame(), most recently used last
+STORE_CACHE_SIZE = 4
+
+
+class TimeSeriesStore:
+    """
+    A frame with a sorted date index and precomputed year, month and business-day offsets.
+
+    The date index, resamples and date features are taken from the frame as
+    it was when they were built. Stores notice rows or columns being added or
+    removed and the first or last date changing; after editing values or
+    dates in place, call invalidate() so they are rebuilt.
+    """
+
+    # id(frame) -> store for for_frame(); stores only hold their frame weakly
+    # and are dropped when it is garbage collected
+    _cache: 'OrderedDict[int, TimeSeriesStore]' = OrderedDict()
+
+    def __init__(self, df: pd.DataFrame, date_column: str = 'Date'):
+        """
+        Build a store over a DataFrame.
+
+        Args:
+            df: Rows with a datetime date column (other columns are kept as is)
+            date_column: Column holding the dates
+        """
+        if not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+            raise ValueError(f"{date_column} column must be datetime type")
+
+        self.date_column = date_column
+        # Stores cached by for_frame() drop _owner so they never keep the frame alive
+        self._frame_ref = weakref.ref(df)
+        self._owner = df
+        self._build(df)
+
+    def _build(self, df: pd.DataFrame):
+        """Index the frame's dates and drop cached resamples and features."""
+        dates = pd.DatetimeIndex(df[self.date_column], copy=True)
+        self._dates = dates
+        # Row positions in date order (None when the frame is already sorted)
+        if dates.is_monotonic_increasing:
+            self._order = None
+        else:
+            self._order = np.argsort(np.where(dates.isna(), np.iinfo(np.int64).max, dates.asi8), kind='stable')
+        self._index = dates if self._order is None else dates[self._order]
+        # NaT sorts last and is left out of every lookup
+        self._valid = len(self._index) - int(self._index.isna().sum())
+
+        valid_index = self._index[:self._valid]
+        self._year_offsets = self._offsets(valid_index.year)
+        self._month_offsets = self._offsets(valid_index.year * 100 + valid_index.month)
+        self._columns = df.columns.copy()
+        self._business_positions = np.flatnonzero(np.asarray(dates.weekday < 5) & ~np.asarray(dates.isna()))
+        self._resamples: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self._features: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def for_frame(cls, df: pd.DataFrame, date_column: str = 'Date') -> 'TimeSeriesStore':
+        """
+        Store for a DataFrame, reused while the same frame is passed again.
+
+        A cached store is rebuilt if rows or columns were added or removed or
+        the first or last date changed since it was built. The cache never
+        keeps a frame alive: its store is dropped when the frame is garbage
+        collected.
+        """
+        key = id(df)
+        cached = cls._cache.get(key)
+        if cached is not None and cached.frame is df and cached._matches(df, date_column):
+            cls._cache.move_to_end(key)
+            return cached
+
+        store = cls(df, date_column)
+        store._owner = None
+        store._frame_ref = weakref.ref(df, lambda ref, key=key: cls._evict(key, ref))
+        cls._cache[key] = store
+        cls._cache.move_to_end(key)
+        while len(cls._cache) > STORE_CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return store
+
+    @classmethod
+    def _evict(cls, key: int, ref: weakref.ref):
+        """Drop the cached store of a collected frame (unless the id now belongs to another frame)."""
+        cached = cls._cache.get(key)
+        if cached is not None and cached._frame_ref is ref:
+            del cls._cache[key]
+
+    @classmethod
+    def clear_cache(cls):
+        """Drop every store held for for_frame()."""
+        cls._cache.clear()
+
+    def invalidate(self):
+        """Rebuild the store after values or dates of its frame were edited in place."""
+        self._build(self.frame)
+
+    def _matches(self, df: pd.DataFrame, date_column: str) -> bool:
+        """Whether the frame still has the store's shape, columns and first and last dates (O(1))."""
+        if date_column != self.date_column or df.shape[0] != len(self._dates):
+            return False
+        if not self._columns.equals(df.columns):
+            return False
+        dates = df[date_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            return False
+        if len(dates) == 0:
+            return True
+        ends = pd.DatetimeIndex(dates.iloc[[0, -1]])
+        return bool(ends.equals(self._dates[[0, -1]]))
+
+    @staticmethod
+    def _offsets(periods) -> Dict[int, Tuple[int, int]]:
+        """Row offsets (start, stop) of each period in sorted period values."""
+        values = np.asarray(periods)
+        uniques, starts = np.unique(values, return_index=True)
+        stops = np.append(starts[1:], len(values))
+        return {int(period): (int(start), int(stop)) for period, start, stop in zip(uniques, starts, stops)}
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The frame the store was built over (not a copy)."""
+        frame = self._frame_ref()
+        if frame is None:
+            raise ReferenceError("The frame of this store has been garbage collected")
+        return frame
+
+    def _slice(self, start: int, stop: int) -> pd.DataFrame:
+        """Copy of the rows at sorted positions start to stop, in frame order."""
+        if self._order is None:
+            return self.frame.iloc[start:stop].copy()
+        return self.frame.iloc[np.sort(self._order[start:stop])].copy()
+
+    def range(self, start_date, end_date) -> pd.DataFrame:
+        """Rows dated from start_date to end_date, both inclusive."""
+        valid_index = self._index[:self._valid]
+        start = valid_index.searchsorted(pd.Timestamp(start_date), side='left')
+        stop = valid_index.searchsorted(pd.Timestamp(end_date), side='right')
+        return self._slice(start, max(start, stop))
+
+    def year(self, year: int) -> pd.DataFrame:
+        """Rows dated in a calendar year."""
+        return self._slice(*self._year_offsets.get(int(year), (0, 0)))
+
+    def month(self, year: int, month: int) -> pd.DataFrame:
+        """Rows dated in a calendar month."""
+        return self._slice(*self._month_offsets.get(int(year) * 100 + int(month), (0, 0)))
+
+    def latest(self) -> pd.DataFrame:
+        """Rows dated on the most recent date."""
+        if self._valid == 0:
+            return self._slice(0, 0)
+        start = self._index[:self._valid].searchsorted(self._index[self._valid - 1], side='left')
+        return self._slice(start, self._valid)
+
+    def business_days(self) -> pd.DataFrame:
+        """Rows dated Monday to Friday."""
+        return self.frame.iloc[self._business_positions].copy()
+
+    def resample(self, freq: str = 'M', agg_method: str = 'last') -> pd.DataFrame:
+        """
+        Rows aggregated to period ends, computed once per frequency and method.
+
+        The store is rebuilt first if the frame's shape, columns or first or
+        last date changed; values edited in place need invalidate().
+
+        Args:
+            freq: 'M' for month end or 'Q' for quarter end
+            agg_method: Aggregation method ('last', 'first', 'mean', 'median')
+
+        Returns:
+            One row per period with the period-end date in the date column
+        """
+        if agg_method not in AGG_METHODS:
+            raise ValueError(f"Unsupported aggregation method: {agg_method}")
+        if freq not in RESAMPLE_FREQUENCIES:
+            raise ValueError(f"Unsupported resample frequency: {freq}")
+
+        frame = self.frame
+        if not self._matches(frame, self.date_column):
+            self._build(frame)
+
+        key = (freq, agg_method)
+        if key not in self._resamples:
+            grouped = frame.set_index(self.date_column).groupby(
+                pd.Grouper(freq=RESAMPLE_FREQUENCIES[freq])
+            )
+            self._resamples[key] = getattr(grouped, agg_method)().reset_index()
+        return self._resamples[key].copy()
+
+    def with_date_features(self) -> pd.DataFrame:
+        """
+        Copy of the rows with calendar feature columns added.
+
+        Features are computed once per distinct date of the store's date index
+        and spread to the rows.
+        """
+        if not self._features:
+            codes, dates = pd.factorize(self._dates)
+            features = {
+                'Year': dates.year,
+                'Month': dates.month,
+                'Quarter': dates.quarter,
+                'DayOfWeek': dates.dayofweek,  # Monday=0
+                'DayName': dates.day_name(),
+                'MonthName': dates.month_name(),
+                'IsBusinessDay': dates.weekday < 5,
+                'IsMonthEnd': dates.is_month_end,
+                'IsQuarterEnd': dates.is_quarter_end,
+                'IsYearEnd': dates.is_year_end,
+            }
+            self._features = {name: self._spread(np.asarray(values), codes) for name, values in features.items()}
+
+        df_enhanced = self.frame.copy()
+        for name, values in self._features.items():
+            df_enhanced[name] = values
+        return df_enhanced
+
+    @staticmethod
+    def _spread(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Per-date values taken to rows (False or missing where the row date is NaT)."""
+        if (codes >= 0).all():
+            return values[codes]
+        if values.dtype == bool:
+            return np.where(codes >= 0, values[codes], False)
+        return pd.Series(values).reindex(codes).to_numpy()
@@ -0,0 +1,169 @@
+"""
+Latest-universe snapshot shared by the universe consumers.
+
+The universe pipeline publishes the rows of its most recent date, with
+repeated Security/CUSIP pairs dropped, as ``universe_latest.parquet`` next
+to ``universe.parquet``. Consumers load it through ``load_universe_latest``,
+which caches the snapshot per file and only falls back to reading the full
+universe history when the snapshot is missing or older than the history.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# Snapshot file name, written next to the universe history file
+UNIVERSE_LATEST_FILE = 'universe_latest.parquet'
+
+# Parquet schema metadata key holding the snapshot details
+METADATA_KEY = b'universe_latest'
+
+# Snapshot path -> ((mtime_ns, size), snapshot)
+_cache: Dict[str, Tuple[Tuple[int, int], 'UniverseLatest']] = {}
+
+
+class UniverseLatest:
+    """
+    Universe rows of the most recent date, with a Security-to-CUSIP map.
+    """
+
+    def __init__(self, frame: pd.DataFrame, duplicates_dropped: int = 0):
+        """
+        Wrap latest-date universe rows.
+
+        Args:
+            frame: Universe rows of one date (or of an undated universe)
+            duplicates_dropped: Rows dropped as repeated Security/CUSIP pairs
+        """
+        self.frame = frame
+        self.duplicates_dropped = duplicates_dropped
+        self.date = None
+        if 'Date' in frame.columns and frame['Date'].notna().any():
+            self.date = pd.Timestamp(frame['Date'].max())
+
+        # First CUSIP listed for each Security
+        self.cusip_by_security: Dict[str, str] = {}
+        if 'Security' in frame.columns and 'CUSIP' in frame.columns:
+            named = frame[frame['Security'].notna() & frame['CUSIP'].notna()].drop_duplicates(subset=['Security'])
+            self.cusip_by_security = dict(zip(named['Security'], named['CUSIP']))
+        self.cusips = np.array([], dtype=object)
+        if 'CUSIP' in frame.columns:
+            self.cusips = frame['CUSIP'].dropna().unique().astype(object)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def cusips_for(self, securities) -> pd.Series:
+        """CUSIP of each Security name (missing for names not in the universe)."""
+        securities = pd.Series(securities)
+        cusips = securities.map(self.cusip_by_security)
+        return pd.Series(np.where(cusips.notna(), cusips.to_numpy(dtype=object), None),
+                         index=securities.index, dtype=object)
+
+
+def latest_path(universe_path: Union[str, Path]) -> Path:
+    """Snapshot path for a universe history file."""
+    return Path(universe_path).with_name(UNIVERSE_LATEST_FILE)
+
+
+def build_universe_latest(universe_df: pd.DataFrame) -> UniverseLatest:
+    """
+    Build the latest-date snapshot from universe rows.
+
+    Rows of the most recent Date are kept (all rows when there is no Date
+    column) and repeated Security/CUSIP pairs are dropped. A Security listed
+    with several CUSIPs keeps every row; cusip_by_security maps it to the
+    first one.
+    """
+    if 'Date' in universe_df.columns:
+        dates = pd.to_datetime(universe_df['Date'])
+        latest = universe_df[dates == dates.max()].copy()
+        latest['Date'] = dates[dates == dates.max()]
+    else:
+        latest = universe_df.copy()
+
+    rows_before = len(latest)
+    subset = [col for col in ('Security', 'CUSIP') if col in latest.columns]
+    if subset:
+        latest = latest.drop_duplicates(subset=subset)
+    return UniverseLatest(latest.reset_index(drop=True), rows_before - len(latest))
+
+
+def publish_universe_latest(universe_df: pd.DataFrame, universe_path: Union[str, Path],
+                            logger=None) -> UniverseLatest:
+    """
+    Build the latest-date snapshot and write it next to the universe history.
+
+    Args:
+        universe_df: Universe history rows
+        universe_path: Universe history file the snapshot belongs to
+        logger: Optional logger for messages
+
+    Returns:
+        The published snapshot
+    """
+    snapshot = build_universe_latest(universe_df)
+    path = latest_path(universe_path)
+    details = {
+        'date': snapshot.date.strftime('%Y-%m-%d') if snapshot.date is not None else None,
+        'duplicates_dropped': int(snapshot.duplicates_dropped),
+        'securities': len(snapshot.cusip_by_security)
+    }
+
+    table = pa.Table.from_pandas(snapshot.frame, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(details)})
+    tmp_path = path.with_name(path.name + '.tmp')
+    pq.write_table(table, tmp_path)
+    tmp_path.replace(path)
+
+    stat = path.stat()
+    _cache[str(path.resolve())] = ((stat.st_mtime_ns, stat.st_size), snapshot)
+    if logger:
+        logger.info(f"Published latest universe {details['date'] or '(undated)'}: {len(snapshot)} rows to '{path}'")
+    return snapshot
+
+
+def load_universe_latest(universe_path: Union[str, Path], logger=None) -> Optional[UniverseLatest]:
+    """
+    Load the latest-date universe snapshot, cached until its file changes.
+
+    A missing snapshot, or one older than the universe history, is rebuilt
+    from the history and published.
+
+    Args:
+        universe_path: Universe history file
+        logger: Optional logger for messages
+
+    Returns:
+        The snapshot, or None if neither the snapshot nor the history exists
+    """
+    universe_path = Path(universe_path)
+    path = latest_path(universe_path)
+    history_mtime = universe_path.stat().st_mtime_ns if universe_path.exists() else None
+
+    if path.exists():
+        stat = path.stat()
+        if history_mtime is None or stat.st_mtime_ns >= history_mtime:
+            key = str(path.resolve())
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = _cache.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+            table = pq.read_table(path)
+            details = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+            snapshot = UniverseLatest(table.to_pandas(), details.get('duplicates_dropped', 0))
+            _cache[key] = (signature, snapshot)
+            return snapshot
+
+    if history_mtime is None:
+        return None
+    if logger:
+        logger.info(f"Latest universe snapshot missing or stale - rebuilding from '{universe_path}'")
+    return publish_universe_latest(pd.read_parquet(universe_path), universe_path, logger)
@@ -0,0 +1,218 @@
+"""
+Point-in-time universe membership index.
+
+Answers "was this CUSIP in the universe as of date D" for whole columns
+at once. CUSIPs are integer-encoded against an append-only vocabulary and
+each universe date keeps a sorted array of member codes. A lookup packs
+(date position, code) into one int64 key and runs a single
+``np.searchsorted`` over all dates, so validating millions of rows needs
+no Python-level set building or row loops.
+"""
+
+import sqlite3
+from typing import Dict, Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Date used for universes that carry no Date column
+UNDATED = np.datetime64('1970-01-01', 'D')
+
+
+def to_day(values) -> np.ndarray:
+    """Convert dates (strings, Timestamps, datetime64) to datetime64[D]."""
+    if np.ndim(values) == 0:
+        return pd.Timestamp(values).to_datetime64().astype('datetime64[D]')
+    return np.asarray(pd.to_datetime(values)).astype('datetime64[D]')
+
+
+class UniverseMembershipIndex:
+    """
+    Universe membership per date, as sorted arrays of integer-encoded CUSIPs.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._vocabulary = pd.Index([], dtype=object)
+        self._members: Dict[np.datetime64, np.ndarray] = {}
+        self._dates = np.array([], dtype='datetime64[D]')
+        self._keys: Optional[np.ndarray] = None
+        self._any_date: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, cusip_column: str = 'CUSIP',
+                   date_column: Optional[str] = 'Date') -> 'UniverseMembershipIndex':
+        """
+        Build an index from a universe DataFrame.
+
+        Args:
+            df: Universe rows
+            cusip_column: Column holding the CUSIPs
+            date_column: Column holding the universe date (None, or missing, files
+                         every row under a single undated universe)
+        """
+        index = cls()
+        index.add_frame(df, cusip_column, date_column)
+        return index
+
+    @classmethod
+    def from_database(cls, conn: sqlite3.Connection,
+                      table_name: str = 'universe_historical') -> 'UniverseMembershipIndex':
+        """Build an index from the universe history table."""
+        index = cls()
+        index.refresh(conn, table_name)
+        return index
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Indexed universe dates, ascending."""
+        return self._dates.copy()
+
+    @property
+    def latest_date(self) -> Optional[np.datetime64]:
+        """Most recent indexed universe date."""
+        return self._dates[-1] if len(self._dates) else None
+
+    def add_date(self, date, cusips: Iterable) -> int:
+        """
+        Set the members of one universe date (replacing any previous members).
+
+        Args:
+            date: Universe date
+            cusips: CUSIPs in the universe on that date
+
+        Returns:
+            Number of distinct members
+        """
+        day = to_day(date) if date is not None else UNDATED
+        values = pd.Series(cusips, dtype=object).dropna().unique()
+        self._extend_vocabulary(values)
+        self._members[day] = np.sort(self._vocabulary.get_indexer(values)).astype(np.int64)
+        self._dates = np.array(sorted(self._members), dtype='datetime64[D]')
+        self._keys = self._any_date = None
+        return len(self._members[day])
+
+    def add_frame(self, df: pd.DataFrame, cusip_column: str = 'CUSIP', date_column: Optional[str] = 'Date'):
+        """Add (or replace) every universe date present in a DataFrame."""
+        if date_column is None or date_column not in df.columns:
+            self.add_date(None, df[cusip_column])
+            return
+        days = pd.Series(to_day(df[date_column]), index=df.index)
+        for day, cusips in df[cusip_column].groupby(days[days.notna()]):
+            self.add_date(day, cusips)
+
+    def refresh(self, conn: sqlite3.Connection, table_name: str = 'universe_historical',
+                dates: Optional[Iterable] = None) -> int:
+        """
+        Load universe dates from the database incrementally.
+
+        Args:
+            conn: Database connection
+            table_name: Universe history table (or view)
+            dates: Dates to (re)load; by default only dates after the latest indexed one
+
+        Returns:
+            Number of universe dates loaded
+        """
+        if dates is not None:
+            days = sorted({str(day) for day in to_day(list(dates))})
+            where_sql = f"WHERE date(date) IN ({', '.join('?' for _ in days)})"
+            params = days
+        elif self.latest_date is not None:
+            where_sql, params = "WHERE date >= ?", [str(self.latest_date + np.timedelta64(1, 'D'))]
+        else:
+            where_sql, params = "", []
+        if dates is not None and not params:
+            return 0
+
+        rows = pd.read_sql_query(
+            f'SELECT date AS "Date", cusip_standardized AS "CUSIP" FROM "{table_name}" {where_sql}',
+            conn, params=params
+        )
+        if dates is not None:
+            # Dates reloaded with no rows left are no longer universe dates
+            for day in set(to_day(days)) - set(to_day(rows['Date']) if len(rows) else []):
+                self._members.pop(day, None)
+            self._dates = np.array(sorted(self._members), dtype='datetime64[D]')
+            self._keys = self._any_date = None
+        self.add_frame(rows)
+        return rows['Date'].nunique()
+
+    def members(self, date=None) -> np.ndarray:
+        """CUSIPs in the universe on a date (the latest one by default)."""
+        day = self.latest_date if date is None else to_day(date)
+        if day is None or day not in self._members:
+            return np.array([], dtype=object)
+        return self._vocabulary.take(self._members[day]).to_numpy(dtype=object)
+
+    def encode(self, cusips) -> np.ndarray:
+        """Integer codes for CUSIPs (-1 for CUSIPs never seen in the universe)."""
+        return self._vocabulary.get_indexer(pd.Index(np.asarray(cusips, dtype=object)))
+
+    def contains(self, cusips, as_of=None) -> np.ndarray:
+        """
+        Membership of each CUSIP in the universe as of a date.
+
+        Args:
+            cusips: CUSIPs to check (array-like)
+            as_of: None for the latest universe, one date for every row, or one
+                   date per row; each date resolves to the latest universe date on
+                   or before it
+
+        Returns:
+            Boolean array, one entry per CUSIP
+        """
+        codes = self.encode(cusips)
+        result = np.zeros(len(codes), dtype=bool)
+        if not len(self._dates) or not len(codes):
+            return result
+
+        if as_of is None:
+            positions = np.full(len(codes), len(self._dates) - 1, dtype=np.int64)
+        else:
+            days = np.broadcast_to(to_day(as_of), codes.shape)
+            positions = np.searchsorted(self._dates, days, side='right').astype(np.int64) - 1
+            positions[np.isnat(days)] = -1
+
+        valid = (codes >= 0) & (positions >= 0)
+        keys = self._member_keys()
+        if not len(keys):
+            return result
+        queries = positions[valid] * len(self._vocabulary) + codes[valid]
+        found = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+        result[valid] = keys[found] == queries
+        return result
+
+    def contains_any(self, cusips) -> np.ndarray:
+        """Membership of each CUSIP in the universe on any indexed date."""
+        codes = self.encode(cusips)
+        if self._any_date is None:
+            self._any_date = np.unique(np.concatenate(list(self._members.values()))) if self._members \
+                else np.array([], dtype=np.int64)
+        return np.isin(codes, self._any_date)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Size of the index."""
+        return {
+            'universe_dates': len(self._dates),
+            'first_date': str(self._dates[0]) if len(self._dates) else None,
+            'latest_date': str(self.latest_date) if self.latest_date is not None else None,
+            'distinct_cusips': len(self._vocabulary),
+            'memberships': int(sum(len(members) for members in self._members.values()))
+        }
+
+    def _extend_vocabulary(self, values: np.ndarray):
+        """Append CUSIPs not seen before; existing codes never change"""
+        new = values[self._vocabulary.get_indexer(pd.Index(values, dtype=object)) < 0]
+        if len(new):
+            self._vocabulary = self._vocabulary.append(pd.Index(new, dtype=object))
+
+    def _member_keys(self) -> np.ndarray:
+        """Sorted (date position, code) keys for every membership, built lazily"""
+        if self._keys is None:
+            stride = len(self._vocabulary)
+            self._keys = np.concatenate([
+                position * stride + self._members[day] for position, day in enumerate(self._dates)
+            ]) if len(self._dates) else np.array([], dtype=np.int64)
+        return self._keys
@@ -0,0 +1,122 @@
+"""
+Tests for Bond Name Resolution
+
+This module tests bond name parsing (decimal, fractional and unicode
+coupons), blocked name-to-CUSIP resolution (never across coupons) and the
+persisted, incremental name index.
+"""
+
+import pytest
+import sqlite3
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.utils.bond_names import (
+    BondNameResolver, parse_bond_names, normalize_bond_names, missing_cusip_mask, replace_unicode_fractions
+)
+
+
+class TestBondNameParsing:
+    """Test bond name parsing functionality."""
+
+    def test_parse_coupon_forms(self):
+        """Test decimal, fractional and unicode coupons, and two- and four-digit years."""
+        parsed = parse_bond_names(['ACACN 4 ⅝ 08/15/29', 'acacn 4⅝  8/15/29 Corp', 'ALACN 5 1/4 01/11/2082',
+                                   'HYDONE 2.71 02/28/50 ', 'CDX HY', None])
+
+        assert list(parsed['name'][:2]) == ['ACACN 4 5/8 08/15/29', 'ACACN 4 5/8 8/15/29 CORP']
+        assert list(parsed['ticker'][:4]) == ['ACACN', 'ACACN', 'ALACN', 'HYDONE']
+        assert list(parsed['coupon'][:4]) == [4.625, 4.625, 5.25, 2.71]
+        assert list(parsed['maturity'][:4]) == ['2029-08-15', '2029-08-15', '2082-01-11', '2050-02-28']
+        assert parsed['maturity'][4:].isna().all()
+
+    def test_invalid_maturity_is_unparsed(self):
+        """Test an impossible date leaves the name unparsed."""
+        assert pd.isna(parse_bond_names(['XCN 4.97 02/31/34'])['maturity'][0])
+
+    def test_helpers(self):
+        """Test fraction replacement, normalisation and missing CUSIP detection."""
+        assert replace_unicode_fractions('AL 4 ⅝ 10/01/28') == 'AL 4 5/8 10/01/28'
+        assert replace_unicode_fractions(None) is None
+        assert list(normalize_bond_names([' al  4 ⅝ 10/01/28', ''])) == ['AL 4 5/8 10/01/28', None]
+        assert list(missing_cusip_mask(pd.Series(['nan', None, ' ', '00084DAX8']))) == [True, True, True, False]
+
+
+class TestBondNameResolver:
+    """Test BondNameResolver class functionality."""
+
+    @pytest.fixture
+    def universe_df(self):
+        """Universe names with their CUSIPs."""
+        return pd.DataFrame({
+            'Security': ['ACACN 4 5/8 08/15/29', 'CAN 1 09/01/26', 'XCN 4.97 02/16/34', 'XCN 4.836 02/18/32', 'CDX HY'],
+            'CUSIP': ['00084DAX8', '135087M27', '98385XAA1', '98385XAB9', None]
+        })
+
+    @pytest.fixture
+    def connection(self):
+        """Create in-memory database."""
+        conn = sqlite3.connect(':memory:')
+        yield conn
+        conn.close()
+
+    def test_resolve(self, universe_df):
+        """Test exact, fuzzy (same block and ticker fallback) and unmatched names."""
+        resolver = BondNameResolver()
+        resolver.update(universe_df)
+
+        result = resolver.resolve(pd.Series(
+            ['ACACN 4 ⅝ 08/15/29', 'XCN 4.97 2/16/2034', 'XCNCN 4.97 02/16/34', 'ZZZ 1 01/01/40', 'JUNK', None],
+            index=range(10, 16)
+        ))
+
+        assert list(result.index) == list(range(10, 16))
+        assert list(result['match_type']) == ['exact', 'fuzzy', 'fuzzy', 'unmatched', 'unmatched', 'unmatched']
+        assert list(result['cusip'][:3]) == ['00084DAX8', '98385XAA1', '98385XAA1']
+        assert result['cusip'][3:].isna().all()
+        assert (result['score'][1:3] >= 85).all()
+
+    def test_only_block_candidates_scored(self, universe_df):
+        """Test a name is scored only against candidates in its own block."""
+        resolver = BondNameResolver()
+        resolver.update(universe_df)
+
+        resolver.resolve(['XCN 4.97 2/16/2034', 'XCN 4.836 2/18/2032'])
+
+        assert resolver.get_statistics()['candidates_scored'] == 2
+
+    def test_coupon_must_match(self):
+        """Test bonds of one issuer and maturity at different coupons each resolve to their own CUSIP."""
+        resolver = BondNameResolver()
+        resolver.update(pd.DataFrame({
+            'Security': ['T 2 05/15/30', 'T 2.5 05/15/30'],
+            'CUSIP': ['91282CAA9', '91282CAB7']
+        }))
+
+        result = resolver.resolve(['T 2 5/15/2030', 'T 2.5 5/15/2030', 'T 2.25 05/15/30'])
+
+        assert list(result['cusip'][:2]) == ['91282CAA9', '91282CAB7']
+        assert list(result['match_type']) == ['fuzzy', 'fuzzy', 'unmatched']
+        assert pd.isna(result['cusip'][2])
+
+    def test_persist_and_incremental_update(self, universe_df, connection):
+        """Test saving writes only changed names and a loaded index resolves the same way."""
+        resolver = BondNameResolver()
+        assert resolver.update(universe_df) == {'added': 4, 'changed': 0, 'removed': 0}
+        assert resolver.save(connection) == 4
+
+        changed = universe_df.copy()
+        changed.loc[1, 'CUSIP'] = '135087M35'
+        assert resolver.update(changed.iloc[:3], remove_missing=True) == {'added': 0, 'changed': 1, 'removed': 1}
+        assert resolver.save(connection) == 2
+        assert resolver.save(connection) == 0
+
+        loaded = BondNameResolver.load(connection)
+
+        assert len(loaded) == 3
+        assert list(loaded.resolve(['CAN 1 9/1/26'])['cusip']) == ['135087M35']
+        assert connection.execute("SELECT COUNT(*) FROM bond_name_index").fetchone()[0] == 3
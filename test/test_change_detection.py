@@ -0,0 +1,135 @@
+"""
+Tests for Row-Hash Change Detection
+
+This module tests the vectorised row hash, the row hash column added to
+existing tables and the split of a reload into inserted, updated,
+unchanged and deleted rows.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.change_detection import ChangeDetector, ROW_HASH_COLUMN, row_hashes
+
+
+UNIVERSE_DDL = """
+    CREATE TABLE universe_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Security" TEXT, "G Sprd" REAL, source_file TEXT,
+        UNIQUE("Date", "CUSIP", cusip_standardized)
+    );
+"""
+
+KEY_COLUMNS = ['Date', 'CUSIP', 'cusip_standardized']
+
+
+def _universe(dates=('2025-06-02 00:00:00', '2025-06-03 00:00:00'), count=4) -> pd.DataFrame:
+    """Universe rows as the loader stages them"""
+    df = pd.DataFrame([
+        {'Date': date, 'CUSIP': f'{n:06d}AA{n}', 'cusip_standardized': f'{n:06d}AA{n}',
+         'Security': f'BOND {n}', 'G Sprd': float(n), 'source_file': 'universe.parquet'}
+        for date in dates for n in range(count)
+    ])
+    df[ROW_HASH_COLUMN] = row_hashes(df, ['Security', 'G Sprd', 'source_file'])
+    return df
+
+
+class TestChangeDetector:
+    """Test ChangeDetector class functionality."""
+
+    @pytest.fixture
+    def temp_db_path(self):
+        """Create temporary database path."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+        yield db_path
+        try:
+            if os.path.exists(db_path):
+                os.unlink(db_path)
+        except PermissionError:
+            pass
+
+    @pytest.fixture
+    def connection(self, temp_db_path):
+        """Create database holding the hashed universe rows."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.executescript(UNIVERSE_DDL)
+        assert ChangeDetector().ensure_column(conn, 'universe_historical') is True
+        _universe().to_sql('universe_historical', conn, if_exists='append', index=False)
+        conn.commit()
+        yield conn
+        conn.close()
+
+    def test_row_hashes_follow_content(self):
+        """Test equal content hashes equally whatever the index, and any change alters the hash."""
+        df = _universe()
+        shuffled = df.iloc[::-1]
+        changed = df.copy()
+        changed.loc[0, 'G Sprd'] = 9.5
+
+        assert row_hashes(df, ['Security', 'G Sprd']).dtype == 'int64'
+        assert (row_hashes(shuffled, ['Security', 'G Sprd'])[::-1] == row_hashes(df, ['Security', 'G Sprd'])).all()
+        assert (row_hashes(changed, ['G Sprd']) != row_hashes(df, ['G Sprd'])).tolist() == [True] + [False] * 7
+
+    def test_ensure_column_is_idempotent(self, connection):
+        """Test the column is added once and exposed by the table."""
+        detector = ChangeDetector()
+
+        assert detector.ensure_column(connection, 'universe_historical') is False
+        assert detector.ensure_column(connection, 'missing_table') is False
+        assert detector.has_column(connection, 'universe_historical') is True
+
+    def test_identical_reload_writes_nothing(self, connection):
+        """Test an unchanged reload is classified as entirely unchanged."""
+        changed, removed, counts = ChangeDetector().classify(
+            connection, 'universe_historical', _universe(), KEY_COLUMNS
+        )
+
+        assert changed.empty
+        assert removed.empty
+        assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 8, 'deleted': 0}
+
+    def test_reload_keeps_new_and_changed_rows(self, connection):
+        """Test only new keys and changed content are kept for writing."""
+        reload = _universe(dates=('2025-06-03 00:00:00', '2025-06-04 00:00:00'))
+        reload.loc[1, 'G Sprd'] = 42.0
+        reload[ROW_HASH_COLUMN] = row_hashes(reload, ['Security', 'G Sprd', 'source_file'])
+
+        changed, removed, counts = ChangeDetector().classify(connection, 'universe_historical', reload, KEY_COLUMNS)
+
+        assert counts == {'inserted': 4, 'updated': 1, 'unchanged': 3, 'deleted': 0}
+        assert changed['Date'].tolist() == ['2025-06-03 00:00:00'] + ['2025-06-04 00:00:00'] * 4
+        assert changed.loc[0, 'G Sprd'] == 42.0
+        assert removed.empty
+
+    def test_rows_without_hash_count_as_updated(self, connection):
+        """Test rows stored before hashing are rewritten once."""
+        connection.execute(f"UPDATE universe_historical SET {ROW_HASH_COLUMN} = NULL WHERE \"CUSIP\" = '000001AA1'")
+
+        changed, _, counts = ChangeDetector().classify(connection, 'universe_historical', _universe(), KEY_COLUMNS)
+
+        assert counts['updated'] == 2
+        assert changed['CUSIP'].tolist() == ['000001AA1', '000001AA1']
+
+    def test_whole_table_reports_removed_keys(self, connection):
+        """Test a full refresh compares every stored row and lists keys missing from the file."""
+        reload = _universe(dates=('2025-06-03 00:00:00',), count=3)
+
+        changed, removed, counts = ChangeDetector().classify(
+            connection, 'universe_historical', reload, KEY_COLUMNS, whole_table=True
+        )
+
+        assert changed.empty
+        assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 3, 'deleted': 5}
+        assert sorted(map(tuple, removed.values.tolist()))[-1] == ('2025-06-03 00:00:00', '000003AA3', '000003AA3')
+        assert list(removed.columns) == KEY_COLUMNS
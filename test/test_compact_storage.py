@@ -0,0 +1,287 @@
+"""
+Tests for Compact Storage
+
+This module tests the integer-keyed compact layout: migration behind a
+compatibility view, duplicate-key, NULL-key and NULL-CUSIP handling, index
+use for date filters, row-wise writes through INSTEAD OF triggers,
+set-based merges into the fact table and the space saved on disk.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.compact_storage import CompactStorage
+from db.database.staging import StagingArea
+
+
+UNIVERSE_DDL = """
+    CREATE TABLE universe_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Security" TEXT, "G Sprd" REAL, universe_match_status TEXT DEFAULT 'pending',
+        source_file TEXT, file_date DATE, loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE("Date", "CUSIP", cusip_standardized)
+    );
+    CREATE INDEX idx_universe_date_cusip ON universe_historical(date, cusip_standardized);
+"""
+
+RUNS_DDL = """
+    CREATE TABLE combined_runs_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Dealer" TEXT, "Bid Spread" REAL, source_file TEXT,
+        UNIQUE("Date", "CUSIP", cusip_standardized, "Dealer")
+    );
+"""
+
+SOURCE_FILE = 'C:/Users/trader/work_supa/universe/processed data/universe.parquet'
+
+
+class TestCompactStorage:
+    """Test CompactStorage class functionality."""
+
+    @pytest.fixture
+    def temp_db_path(self):
+        """Create temporary database path."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+        yield db_path
+        try:
+            if os.path.exists(db_path):
+                os.unlink(db_path)
+        except PermissionError:
+            pass
+
+    @pytest.fixture
+    def connection(self, temp_db_path):
+        """Create database with a row-layout universe table."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.executescript(UNIVERSE_DDL)
+        conn.executemany("""
+            INSERT INTO universe_historical
+                ("Date", "CUSIP", cusip_standardized, "Security", "G Sprd", source_file, file_date, loaded_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, '2025-06-03 10:00:00.123456')
+        """, [
+            (f'2025-06-{day:02d} 00:00:00', f'{n:06d}aa{n % 10}', f'{n:06d}AA{n % 10}', f'BOND {n}',
+             n / 10.0, SOURCE_FILE, f'2025-06-{day:02d} 00:00:00')
+            for day in (1, 2) for n in range(50)
+        ])
+        conn.commit()
+        yield conn
+        conn.close()
+
+    @pytest.fixture
+    def storage(self, connection):
+        """Migrate the universe table to compact storage."""
+        compact_storage = CompactStorage()
+        connection.execute("BEGIN")
+        stats = compact_storage.migrate(connection, 'universe_historical')
+        connection.commit()
+        assert stats['rows_migrated'] == 100
+        assert stats['dim_security'] == 50
+        assert stats['dim_load_batch'] == 1
+        return compact_storage
+
+    def _rows(self, connection):
+        return connection.execute("""
+            SELECT "Date", "CUSIP", cusip_standardized, "Security", "G Sprd", universe_match_status,
+                   source_file, file_date, loaded_timestamp
+            FROM universe_historical ORDER BY "Date", cusip_standardized
+        """).fetchall()
+
+    def test_migration_keeps_rows_behind_view(self, connection):
+        """Test the view returns exactly the rows the table held."""
+        before = self._rows(connection)
+        CompactStorage().migrate(connection, 'universe_historical')
+        connection.commit()
+
+        assert self._rows(connection) == before
+        kinds = dict(connection.execute("SELECT name, type FROM sqlite_master WHERE name LIKE 'universe%'"))
+        assert kinds['universe_historical'] == 'view'
+        assert kinds['universe_historical_facts'] == 'table'
+        assert 'WITHOUT ROWID' in connection.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'universe_historical_facts'"
+        ).fetchone()[0]
+        assert connection.execute(
+            "SELECT date_jd, security_id FROM universe_historical_facts ORDER BY 1, 2 LIMIT 1"
+        ).fetchone() == (2460828, 1)
+
+    def test_duplicate_keys_abort_unless_collapsed(self, connection):
+        """Test rows sharing a compact key abort the migration unless collapsing is allowed."""
+        connection.execute("""
+            INSERT INTO universe_historical ("Date", "CUSIP", cusip_standardized, "G Sprd", source_file)
+            VALUES ('2025-06-01 16:30:00', '000001aa1', '000001AA1', 9.9, 'intraday.parquet')
+        """)
+        connection.commit()
+
+        with pytest.raises(ValueError, match="1 rows sharing a compact key"):
+            CompactStorage().migrate(connection, 'universe_historical')
+        connection.rollback()
+        assert connection.execute(
+            "SELECT type FROM sqlite_master WHERE name = 'universe_historical'"
+        ).fetchone() == ('table',)
+
+        stats = CompactStorage().migrate(connection, 'universe_historical', allow_collapse=True)
+        connection.commit()
+
+        assert stats['rows_collapsed'] == 1
+        assert stats['rows_migrated'] == 101
+        assert connection.execute("SELECT COUNT(*) FROM universe_historical").fetchone() == (100,)
+
+    def test_null_cusip_rows_abort(self, temp_db_path):
+        """Test rows without a CUSIP key abort the migration before anything is changed."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("""
+            CREATE TABLE portfolio_historical (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, "Date" DATE NOT NULL, "CUSIP" TEXT,
+                cusip_standardized TEXT, "QUANTITY" REAL
+            )
+        """)
+        conn.executemany("""
+            INSERT INTO portfolio_historical ("Date", "CUSIP", cusip_standardized, "QUANTITY") VALUES (?, ?, ?, ?)
+        """, [('2025-06-02', '000001aa1', '000001AA1', 1.0), ('2025-06-02', 'bad', None, 2.0),
+              ('2025-06-02', None, None, 3.0)])
+        conn.commit()
+
+        with pytest.raises(ValueError, match="2 rows with a NULL or unparseable date"):
+            CompactStorage().migrate(conn, 'portfolio_historical')
+        conn.rollback()
+
+        assert conn.execute(
+            "SELECT name FROM sqlite_master WHERE name IN ('portfolio_historical', 'dim_security')"
+        ).fetchall() == [('portfolio_historical',)]
+        conn.close()
+
+    def test_null_key_column_kept(self, temp_db_path):
+        """Test runs rows without a Dealer migrate, read back as NULL and stay writable."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.executescript(RUNS_DDL)
+        conn.executemany("""
+            INSERT INTO combined_runs_historical ("Date", "CUSIP", cusip_standardized, "Dealer", "Bid Spread")
+            VALUES ('2025-06-02', ?, ?, ?, ?)
+        """, [('000001aa1', '000001AA1', 'BMO', 1.0), ('000001aa1', '000001AA1', None, 2.0),
+              ('000002aa2', '000002AA2', None, 3.0)])
+        conn.commit()
+
+        stats = CompactStorage().migrate(conn, 'combined_runs_historical')
+        conn.commit()
+
+        assert stats['null_key_rows'] == 2
+        assert stats['rows_collapsed'] == 0
+        assert conn.execute("""
+            SELECT cusip_standardized, "Dealer", "Bid Spread" FROM combined_runs_historical
+            ORDER BY cusip_standardized, "Bid Spread"
+        """).fetchall() == [('000001AA1', 'BMO', 1.0), ('000001AA1', None, 2.0), ('000002AA2', None, 3.0)]
+
+        conn.execute("""UPDATE combined_runs_historical SET "Bid Spread" = 4.0 WHERE "Dealer" IS NULL""")
+        conn.execute("DELETE FROM combined_runs_historical WHERE cusip_standardized = '000002AA2'")
+        assert conn.execute(
+            'SELECT "Dealer", "Bid Spread" FROM combined_runs_historical ORDER BY "Bid Spread"'
+        ).fetchall() == [('BMO', 1.0), (None, 4.0)]
+        conn.close()
+
+    def test_date_and_cusip_filters_use_indexes(self, connection, storage):
+        """Test filters on the view's text columns become integer key searches."""
+        plan = " ".join(row[3] for row in connection.execute("""
+            EXPLAIN QUERY PLAN
+            SELECT 1 FROM universe_historical WHERE date = ? AND cusip_standardized = ?
+        """, ('2025-06-02 00:00:00', '000007AA7')))
+
+        assert 'SEARCH f USING' in plan
+        assert 'SCAN f' not in plan
+        assert connection.execute("""
+            SELECT "G Sprd" FROM universe_historical WHERE date = ? AND cusip_standardized = ?
+        """, ('2025-06-02 00:00:00', '000007AA7')).fetchone() == (0.7,)
+
+    def test_row_writes_through_triggers(self, connection, storage):
+        """Test INSERT, UPDATE and DELETE on the view reach the fact table."""
+        connection.execute("""
+            INSERT INTO universe_historical ("Date", "CUSIP", cusip_standardized, "Security", source_file)
+            VALUES ('2025-06-03 00:00:00', 'NEW000001', 'NEW000001', 'NEW BOND', 'new.parquet')
+        """)
+        row = connection.execute("""
+            SELECT universe_match_status, source_file FROM universe_historical WHERE cusip_standardized = 'NEW000001'
+        """).fetchone()
+        assert row == ('pending', 'new.parquet')
+
+        connection.execute("""
+            UPDATE universe_historical SET "G Sprd" = 9.5 WHERE cusip_standardized = 'NEW000001'
+        """)
+        assert connection.execute(
+            "SELECT \"G Sprd\" FROM universe_historical WHERE cusip_standardized = 'NEW000001'"
+        ).fetchone() == (9.5,)
+
+        connection.execute("DELETE FROM universe_historical WHERE date = '2025-06-01 00:00:00'")
+        assert connection.execute("SELECT COUNT(*) FROM universe_historical_facts").fetchone() == (51,)
+
+    def test_staged_merge_upserts_fact_rows(self, connection, storage):
+        """Test a set-based merge updates existing keys and inserts new ones."""
+        staged = pd.DataFrame({
+            'Date': ['2025-06-02 00:00:00', '2025-06-03 00:00:00'],
+            'CUSIP': ['000001aa1', '000001aa1'],
+            'cusip_standardized': ['000001AA1', '000001AA1'],
+            'G Sprd': [5.0, 6.0],
+            'source_file': ['reload.parquet', 'reload.parquet']
+        })
+        with StagingArea(connection) as staging:
+            staging.stage_dataframe('universe_stage', staged)
+            with staging.write_transaction():
+                merged = storage.merge(
+                    staging, 'universe_historical', 'universe_stage',
+                    columns=list(staged.columns),
+                    conflict_columns=['Date', 'CUSIP', 'cusip_standardized']
+                )
+
+        assert merged == 2
+        assert connection.execute("""
+            SELECT "Date", "G Sprd", source_file FROM universe_historical
+            WHERE cusip_standardized = '000001AA1' ORDER BY "Date"
+        """).fetchall() == [
+            ('2025-06-01 00:00:00', 0.1, SOURCE_FILE),
+            ('2025-06-02 00:00:00', 5.0, 'reload.parquet'),
+            ('2025-06-03 00:00:00', 6.0, 'reload.parquet')
+        ]
+        assert connection.execute("SELECT COUNT(*) FROM dim_load_batch").fetchone() == (2,)
+
+    def test_schema_validation_ignores_compacted_tables(self, connection, storage):
+        """Test a compacted table and its row-table indexes are not reported missing."""
+        validation = storage.filter_schema_validation(connection, {
+            'schema_valid': False,
+            'missing_tables': ['universe_historical'],
+            'missing_views': [],
+            'missing_indexes': ['idx_universe_date_cusip']
+        }, {'idx_universe_date_cusip': 'CREATE INDEX idx_universe_date_cusip ON universe_historical(date, cusip_standardized)'})
+
+        assert validation['schema_valid'] is True
+        assert validation['missing_tables'] == []
+        assert validation['missing_indexes'] == []
+
+    def test_storage_shrinks(self, connection, temp_db_path):
+        """Test the compact layout takes a fraction of the row layout's pages."""
+        connection.executemany("""
+            INSERT INTO universe_historical
+                ("Date", "CUSIP", cusip_standardized, "G Sprd", source_file, file_date, loaded_timestamp)
+            VALUES (date('2025-01-01', '+' || ? || ' days') || ' 00:00:00', ?, ?, 1.0, ?,
+                    date('2025-01-01', '+' || ? || ' days') || ' 00:00:00', '2025-06-03 10:00:00.123456')
+        """, [
+            (day, f'{n:06d}aa{n % 10}', f'{n:06d}AA{n % 10}', SOURCE_FILE, day)
+            for day in range(60) for n in range(200)
+        ])
+        connection.commit()
+        connection.execute("VACUUM")
+        size_before = os.path.getsize(temp_db_path)
+
+        CompactStorage().migrate(connection, 'universe_historical')
+        connection.commit()
+        connection.execute("VACUUM")
+
+        assert os.path.getsize(temp_db_path) * 3 < size_before
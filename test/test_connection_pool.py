@@ -0,0 +1,106 @@
+"""
+Tests for Reader Connection Pool
+
+This module tests the pooled connection mode: one writer in WAL mode,
+read-only query-only readers, consistent snapshots while the writer
+commits, bounded reader count and pool statistics.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import threading
+import os
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.connection_pool import ConnectionPool
+
+
+class TestConnectionPool:
+    """Test ConnectionPool class functionality."""
+
+    @pytest.fixture
+    def temp_db_path(self):
+        """Create temporary database path."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+        yield db_path
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                if os.path.exists(db_path + suffix):
+                    os.unlink(db_path + suffix)
+            except PermissionError:
+                pass
+
+    @pytest.fixture
+    def pool(self, temp_db_path):
+        """Create pool with a populated table."""
+        connection_pool = ConnectionPool(temp_db_path, reader_count=2, config={'acquire_timeout': 0.2})
+        writer = connection_pool.writer()
+        writer.execute("CREATE TABLE prices (id INTEGER PRIMARY KEY, value REAL)")
+        writer.executemany("INSERT INTO prices (value) VALUES (?)", [(i,) for i in range(10)])
+        writer.commit()
+        yield connection_pool
+        connection_pool.close_all()
+
+    def test_writer_uses_wal(self, pool):
+        """Test the writer switches the database to WAL."""
+        assert pool.writer().execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+    def test_readers_are_read_only(self, pool):
+        """Test pooled readers reject writes."""
+        with pool.read_snapshot() as conn:
+            assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO prices (value) VALUES (1)")
+
+        # A failed write does not poison the pool
+        assert pool.execute_read("SELECT COUNT(*) FROM prices") == [(10,)]
+
+    def test_snapshot_is_consistent_during_writes(self, pool):
+        """Test a snapshot keeps its view while the writer commits."""
+        writer = pool.writer()
+        with pool.read_snapshot() as conn:
+            before = conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+            writer.executemany("INSERT INTO prices (value) VALUES (?)", [(i,) for i in range(5)])
+            writer.commit()
+            assert conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0] == before == 10
+
+        assert pool.execute_read("SELECT COUNT(*) FROM prices") == [(15,)]
+
+    def test_reader_limit_and_timeout(self, pool):
+        """Test the pool never opens more readers than configured."""
+        with pool.read_snapshot(), pool.read_snapshot():
+            with pytest.raises(TimeoutError):
+                with pool.read_snapshot(timeout=0.05):
+                    pass
+
+        stats = pool.get_connection_statistics()
+        assert stats['readers_created'] == 2
+        assert stats['peak_readers_in_use'] == 2
+        assert stats['acquire_timeouts'] == 1
+        assert stats['readers_in_use'] == 0
+
+    def test_concurrent_readers_share_pool(self, pool):
+        """Test many threads reuse the bounded set of readers."""
+        results = []
+
+        def read_count():
+            for _ in range(5):
+                results.append(pool.execute_read("SELECT COUNT(*) FROM prices")[0][0])
+
+        threads = [threading.Thread(target=read_count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = pool.get_connection_statistics()
+        assert results == [10] * 20
+        assert stats['mode'] == 'pooled'
+        assert stats['snapshots_served'] == 20
+        assert stats['readers_created'] <= 2
@@ -0,0 +1,124 @@
+"""
+Tests for the Persistent CUSIP Standardization Cache
+
+This module tests memoised standardisation of distinct values, hit and
+miss statistics, persistence across cache instances, pending entries
+surviving a rolled-back load and invalidation when the special mappings
+change.
+"""
+
+import pytest
+import sqlite3
+import pandas as pd
+from pathlib import Path
+import sys
+from unittest.mock import Mock
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.utils.cusip_cache import CUSIPStandardizationCache, standardizer_version
+from db.utils.cusip_vectorized import standardize_series
+
+
+class TestCUSIPStandardizationCache:
+    """Test CUSIPStandardizationCache class functionality."""
+
+    @pytest.fixture
+    def standardizer(self):
+        """Create a standardizer carrying the default special mappings."""
+        standardizer = Mock(spec=['special_mappings', 'enable_check_digit_validation'])
+        standardizer.special_mappings = {'123': '123000002', '789': '789000007'}
+        standardizer.enable_check_digit_validation = True
+        return standardizer
+
+    @pytest.fixture
+    def connection(self):
+        """Create in-memory database."""
+        conn = sqlite3.connect(':memory:')
+        yield conn
+        conn.close()
+
+    @pytest.fixture
+    def cusips(self):
+        """A column with repeated values and nulls."""
+        return pd.Series(['912810TM', '123', None, '912810TM', 'INVALID!@#', '123'], index=range(10, 16))
+
+    def test_results_match_uncached(self, standardizer, cusips):
+        """Test cached results are the same as standardising the column directly."""
+        cache = CUSIPStandardizationCache(standardizer)
+
+        first = cache.standardize_series(cusips)
+        second = cache.standardize_series(cusips)
+
+        pd.testing.assert_frame_equal(first, standardize_series(cusips, standardizer))
+        pd.testing.assert_frame_equal(second, first)
+
+        stats = cache.get_statistics()
+        assert stats['misses'] == 3
+        assert stats['hits'] == 3
+        assert stats['rows_served'] == 12
+        assert stats['hit_rate'] == 50.0
+
+    def test_persisted_across_instances(self, standardizer, cusips, connection):
+        """Test a new cache starts warm from the table."""
+        writer = CUSIPStandardizationCache(standardizer)
+        writer.standardize_series(cusips, connection)
+        assert writer.flush(connection) == 3
+        connection.commit()
+        writer.mark_persisted()
+
+        cache = CUSIPStandardizationCache(standardizer)
+        results = cache.standardize_series(cusips, connection)
+
+        assert list(results['cusip_standardized']) == ['912810TM0', '123000002', '', '912810TM0', 'INVALID!@#', '123000002']
+        assert cache.get_statistics()['entries_loaded'] == 3
+        assert cache.get_statistics()['misses'] == 0
+
+    def test_pending_until_committed(self, standardizer, cusips, connection):
+        """Test standardising only reads, and entries flushed by a rolled-back load are flushed again."""
+        cache = CUSIPStandardizationCache(standardizer)
+        cache.standardize_series(cusips, connection)
+        assert not connection.in_transaction
+        assert cache.pending == 3
+
+        cache.flush(connection)
+        connection.rollback()
+        assert cache.pending == 3
+        assert cache.standardize_series(cusips, connection)['cusip_standardized'].iloc[1] == '123000002'
+
+        assert cache.flush(connection) == 3
+        connection.commit()
+        cache.mark_persisted()
+
+        assert cache.pending == 0
+        assert cache.get_statistics()['entries_persisted'] == 3
+        assert connection.execute("SELECT COUNT(*) FROM cusip_standardization_cache").fetchone()[0] == 3
+
+    def test_special_mapping_change_invalidates(self, standardizer, connection):
+        """Test changing the special mappings discards results from the old version."""
+        cache = CUSIPStandardizationCache(standardizer)
+        old_version = cache.version
+        cache.standardize_series(pd.Series(['456']), connection)
+        cache.flush(connection)
+        connection.commit()
+        cache.mark_persisted()
+
+        standardizer.special_mappings = {**standardizer.special_mappings, '456': '456000009'}
+        results = cache.standardize_series(pd.Series(['456']), connection)
+        cache.flush(connection)
+
+        assert results.iloc[0]['cusip_standardized'] == '456000009'
+        assert results.iloc[0]['standardization_status'] == 'mapped'
+        assert cache.version != old_version
+        assert cache.get_statistics()['invalidations'] == 1
+        assert connection.execute(
+            "SELECT DISTINCT standardizer_version FROM cusip_standardization_cache"
+        ).fetchall() == [(cache.version,)]
+
+    def test_version_covers_check_digit_setting(self, standardizer):
+        """Test the version changes with the check-digit validation setting."""
+        version = standardizer_version(standardizer)
+        standardizer.enable_check_digit_validation = False
+
+        assert standardizer_version(standardizer) != version
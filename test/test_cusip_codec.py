@@ -0,0 +1,77 @@
+"""
+Tests for the 64-bit CUSIP Key Codec
+
+This module tests round trips for CUSIP-shaped values, string-order
+preservation, hashed keys for values that cannot be packed, nulls and the
+SQLite key function.
+"""
+
+import sqlite3
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.utils.cusip_codec import (
+    encode_cusips, decode_cusips, encode_cusip, is_reversible, register_sqlite_function, NULL_KEY
+)
+
+
+class TestCUSIPCodec:
+    """Test CUSIP key codec functionality."""
+
+    def test_round_trip(self):
+        """Test CUSIP-shaped values decode back to themselves."""
+        cusips = ['912810TM0', '037833100', '123', 'CDX HY', 'CASH USD', '38141G*A1', '0#@.-/ZZZZZ']
+
+        keys = encode_cusips(cusips)
+
+        assert keys.dtype == np.int64
+        assert is_reversible(keys).all()
+        assert list(decode_cusips(keys)) == cusips
+
+    def test_key_order_matches_string_order(self):
+        """Test sorting the keys sorts the CUSIPs."""
+        cusips = ['912810TM0', '912810TM', '037833100', 'A', 'AB', '00', '0', 'CASH USD', 'ZZZZZZZZZZZ']
+
+        keys = encode_cusips(cusips)
+
+        assert [cusips[i] for i in np.argsort(keys)] == sorted(cusips)
+
+    def test_unpackable_values_are_hashed(self):
+        """Test values outside the alphabet or too long get distinct, stable hashed keys."""
+        values = ['averylongpseudocusip', 'invalid!', 'INVALID!', '912810tm0']
+
+        keys = encode_cusips(values)
+
+        assert not is_reversible(keys).any()
+        assert len(set(keys)) == len(values)
+        assert (keys > encode_cusips(['ZZZZZZZZZZZ'])[0]).all()
+        assert list(encode_cusips(pd.Series(values[::-1]))) == list(keys[::-1])
+        assert list(decode_cusips(keys)) == [None] * len(values)
+
+    def test_nulls(self):
+        """Test nulls map to NULL_KEY and decode to None."""
+        keys = encode_cusips(pd.Series(['912810TM0', None, np.nan], index=[5, 6, 7]))
+
+        assert list(keys[1:]) == [NULL_KEY, NULL_KEY]
+        assert list(decode_cusips(keys)) == ['912810TM0', None, None]
+        assert encode_cusip(None) is None
+        assert len(encode_cusips([])) == 0
+
+    def test_sqlite_function(self):
+        """Test SQL keys match the vectorised keys."""
+        conn = sqlite3.connect(':memory:')
+        register_sqlite_function(conn)
+        cusips = ['912810TM0', 'averylongpseudocusip', None]
+
+        sql_keys = [row[0] for row in conn.execute(
+            "SELECT cusip_key(value) FROM (SELECT '912810TM0' AS value UNION ALL "
+            "SELECT 'averylongpseudocusip' UNION ALL SELECT NULL) "
+        )]
+        conn.close()
+
+        assert sql_keys == [int(encode_cusips(cusips)[0]), int(encode_cusips(cusips)[1]), None]
@@ -0,0 +1,78 @@
+"""
+Tests for CUSIPValidator Orphan Detection
+
+This module tests the anti-join orphan detection: instance counts and
+security names across several CUSIP columns, tables without a security
+column, and checking tables in a process pool.
+"""
+
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.utils.data_analyzer import CUSIPValidator, find_orphaned_cusips
+from src.utils.universe_membership import UniverseMembershipIndex
+
+
+class TestCUSIPValidator:
+    """Test CUSIPValidator class functionality."""
+
+    @pytest.fixture
+    def table_data(self):
+        """Universe plus portfolio, G-spread pair and dealer tables."""
+        return {
+            'universe': pd.DataFrame({'Date': pd.to_datetime(['2025-06-02'] * 2), 'CUSIP': ['A', 'B']}),
+            'portfolio': pd.DataFrame({
+                'CUSIP': ['A', 'Z', 'Z', None, 'Y'],
+                'SECURITY': ['Bond A', None, 'Bond Z', 'Bond ?', 'Bond Y']
+            }),
+            'g_spread': pd.DataFrame({
+                'CUSIP_1': ['A', 'Q', 'B'],
+                'CUSIP_2': ['Q', 'B', 'W'],
+                'Security_1': ['Bond A', 'Bond Q1', 'Bond B'],
+                'Security_2': ['Bond Q2', 'Bond B', 'Bond W']
+            }),
+            'dealers': pd.DataFrame({'CUSIP': ['V', 'V', 'A']})
+        }
+
+    def test_counts_and_security_names(self, table_data):
+        """Test one pass gives instance counts and the first known security name per orphan."""
+        results = CUSIPValidator().validate_cusips(table_data)
+        orphans = results['orphaned_cusips']
+
+        assert orphans['portfolio'] == {
+            'orphaned_cusips': [
+                {'cusip': 'Z', 'security_name': 'Bond Z', 'count': 2},
+                {'cusip': 'Y', 'security_name': 'Bond Y', 'count': 1}
+            ],
+            'total_instances': 3,
+            'unique_cusips': 2
+        }
+        assert orphans['g_spread']['orphaned_cusips'] == [
+            {'cusip': 'Q', 'security_name': 'Bond Q1', 'count': 2},
+            {'cusip': 'W', 'security_name': 'Bond W', 'count': 1}
+        ]
+        assert orphans['dealers']['orphaned_cusips'] == [{'cusip': 'V', 'security_name': 'Unknown', 'count': 2}]
+        assert results['summary']['tables_checked'] == 3
+        assert results['summary']['total_orphaned_instances'] == 8
+        assert results['summary']['unique_orphaned_cusips'] == {'Z', 'Y', 'Q', 'W', 'V'}
+
+    def test_table_without_orphans(self, table_data):
+        """Test tables fully covered by the universe report nothing."""
+        membership = UniverseMembershipIndex.from_frame(table_data['universe'])
+
+        assert find_orphaned_cusips(
+            'portfolio', pd.DataFrame({'CUSIP': ['A', 'B']}), ['CUSIP'], membership, latest_only=True
+        ) is None
+
+    def test_process_pool_matches_in_process(self, table_data):
+        """Test checking tables in worker processes gives the same results."""
+        in_process = CUSIPValidator().validate_cusips_latest_universe(table_data)
+        pooled = CUSIPValidator(max_workers=2).validate_cusips_latest_universe(table_data)
+
+        assert pooled['orphaned_cusips'] == in_process['orphaned_cusips']
+        assert pooled['summary'] == in_process['summary']
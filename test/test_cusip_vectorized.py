@@ -0,0 +1,90 @@
+"""
+Tests for Vectorised CUSIP Standardization
+
+This module tests standardize_series against the scalar standardizer's
+rules: special mappings, pattern classification, check-digit validation
+and appending, null handling and alignment with the input index.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import sys
+from unittest.mock import Mock
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.utils.cusip_vectorized import standardize_series, standardization_counts, check_digits
+
+
+# (input, cusip_original, cusip_standardized, status, pattern) as standardize_cusip gives them
+SCALAR_CASES = [
+    ('912810TM0', '912810TM0', '912810TM0', 'standardized', 'standard_9'),
+    ('912810TM', '912810TM', '912810TM0', 'standardized', 'standard_8'),
+    ('912810', '912810', '912810000', 'standardized', 'standard_6'),
+    ('456', '456', '456000000', 'standardized', 'cdx'),
+    ('CASH USD', 'CASH USD', 'CASHUSD', 'standardized', 'cash'),
+    ('123', '123', '123000002', 'mapped', 'special_mapping'),
+    ('INVALID!@#', 'INVALID!@#', 'INVALID!@#', 'invalid', 'unknown'),
+    ('912810TM1', '912810TM1', '912810TM1', 'invalid', 'standard_9'),
+    ('912810tm0', '912810TM0', '912810TM0', 'standardized', 'standard_9'),
+    ('  912810TM0  ', '912810TM0', '912810TM0', 'standardized', 'standard_9'),
+    ('', '', '', 'invalid', 'empty'),
+    (None, '', '', 'invalid', 'empty'),
+    (np.nan, '', '', 'invalid', 'empty')
+]
+
+
+class TestStandardizeSeries:
+    """Test standardize_series functionality."""
+
+    @pytest.fixture
+    def standardizer(self):
+        """Create a standardizer carrying the default special mappings."""
+        standardizer = Mock(spec=['special_mappings', 'enable_check_digit_validation'])
+        standardizer.special_mappings = {'123': '123000002', '789': '789000007'}
+        standardizer.enable_check_digit_validation = True
+        return standardizer
+
+    def test_matches_scalar_rules(self, standardizer):
+        """Test every scalar test case gives the same value, status and pattern."""
+        cusips = pd.Series([case[0] for case in SCALAR_CASES], dtype=object)
+
+        results = standardize_series(cusips, standardizer)
+
+        assert list(results.itertuples(index=False, name=None)) == [case[1:] for case in SCALAR_CASES]
+
+    def test_without_check_digit_validation(self, standardizer):
+        """Test a wrong check digit passes when validation is disabled."""
+        standardizer.enable_check_digit_validation = False
+
+        results = standardize_series(pd.Series(['912810TM1']), standardizer)
+
+        assert results.iloc[0]['standardization_status'] == 'standardized'
+
+    def test_aligned_to_input_index(self, standardizer):
+        """Test repeated and null values are broadcast back to their own rows."""
+        cusips = pd.Series(['38259P50', None, '38259P50', '789', 123], index=[10, 11, 12, 13, 14])
+
+        results = standardize_series(cusips, standardizer)
+
+        assert list(results.index) == [10, 11, 12, 13, 14]
+        assert list(results['cusip_standardized']) == ['38259P508', '', '38259P508', '789000007', '123000002']
+        assert standardization_counts(results) == {'standardized': 2, 'mapped': 2, 'invalid': 1}
+
+    def test_empty_series(self, standardizer):
+        """Test an empty column gives an empty result with all columns."""
+        results = standardize_series(pd.Series([], dtype=object), standardizer)
+
+        assert results.empty
+        assert list(results.columns) == [
+            'cusip_original', 'cusip_standardized', 'standardization_status', 'standardization_pattern'
+        ]
+
+    def test_check_digits(self):
+        """Test check digits for known CUSIPs, and None for invalid characters."""
+        digits = check_digits(pd.Series(['912810TM', '03783310', '38259P50', '9128!0TM']))
+
+        assert list(digits) == ['0', '0', '8', None]
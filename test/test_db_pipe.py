@@ -0,0 +1,137 @@
+"""
+Tests for the Database Pipeline Loaders
+
+This module tests the non-streaming combined runs loader end to end:
+staged merges into the live table, CUSIP cache entries and bond names
+persisted with the load, missing CUSIPs resolved from security names,
+routing of rows for a sealed year into that year's shard and slow-query
+logging of the staged merge statements.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+# The pipeline needs the database core (connection, schema, logger)
+pytest.importorskip("db.database.schema")
+
+from db_pipe import DatabasePipeline
+
+
+def runs_frame(dates):
+    """Two dealers quoting one bond on each date, with an older repeated quote."""
+    rows = []
+    for date in dates:
+        rows += [
+            {'Date': date, 'Time': '09:00', 'CUSIP': '912810TM0', 'Security': 'T 4.5 02/15/36',
+             'Dealer': 'BMO', 'Bid Spread': 100.0, 'Ask Spread': 95.0, 'Keyword': 'UST'},
+            {'Date': date, 'Time': '10:00', 'CUSIP': '912810TM0', 'Security': 'T 4.5 02/15/36',
+             'Dealer': 'BMO', 'Bid Spread': 101.0, 'Ask Spread': 96.0, 'Keyword': 'UST'},
+            {'Date': date, 'Time': '10:00', 'CUSIP': '912810TM0', 'Security': 'T 4.5 02/15/36',
+             'Dealer': 'RBC', 'Bid Spread': 102.0, 'Ask Spread': 97.0, 'Keyword': 'UST'},
+        ]
+    return pd.DataFrame(rows)
+
+
+class TestCombinedRunsLoader:
+    """Test DatabasePipeline combined runs loading functionality."""
+
+    @pytest.fixture
+    def pipeline(self, tmp_path, monkeypatch):
+        """Initialized pipeline over a database in a temporary directory."""
+        monkeypatch.chdir(tmp_path)
+        pipeline = DatabasePipeline(database_path=str(tmp_path / 'trading_analytics.db'),
+                                    config_path=str(tmp_path / 'missing.yaml'), disable_logging=True)
+        assert pipeline.initialize_database()
+        yield pipeline
+        pipeline.db_connection.disconnect()
+
+    def test_load_keeps_most_recent_quote(self, pipeline, tmp_path):
+        """Test the most recent quote per date, CUSIP and dealer is merged."""
+        runs_file = tmp_path / 'combined_runs.csv'
+        runs_frame(['2025-06-02']).to_csv(runs_file, index=False)
+
+        assert pipeline.load_combined_runs_data(str(runs_file), force_full_refresh=True)
+
+        rows = pipeline._connect().execute(
+            'SELECT "Dealer", "Bid Spread", file_date FROM combined_runs_historical ORDER BY "Dealer"'
+        ).fetchall()
+        assert rows == [('BMO', 101.0, '2025-06-02'), ('RBC', 102.0, '2025-06-02')]
+        assert pipeline.cusip_cache.pending == 0
+        assert pipeline._connect().execute(
+            "SELECT cusip_standardized FROM cusip_standardization_cache"
+        ).fetchall() == [('912810TM0',)]
+
+    def test_missing_cusip_resolved_from_name(self, pipeline, tmp_path):
+        """Test a quote without a CUSIP is loaded under the universe CUSIP of its security name."""
+        conn = pipeline._connect()
+        conn.execute("""
+            INSERT INTO universe_historical ("Date", "CUSIP", cusip_standardized, "Security")
+            VALUES ('2025-06-01', '912810TM0', '912810TM0', 'T 4.5 02/15/36')
+        """)
+        conn.commit()
+        runs_df = runs_frame(['2025-06-02'])
+        runs_df.loc[2, 'CUSIP'] = None
+        runs_file = tmp_path / 'combined_runs.csv'
+        runs_df.to_csv(runs_file, index=False)
+
+        assert pipeline.load_combined_runs_data(str(runs_file), force_full_refresh=True)
+
+        conn = pipeline._connect()
+        assert conn.execute(
+            'SELECT "CUSIP" FROM combined_runs_historical WHERE "Dealer" = \'RBC\''
+        ).fetchall() == [('912810TM0',)]
+        assert conn.execute("SELECT name, cusip FROM bond_name_index").fetchall() == [
+            ('T 4.5 02/15/36', '912810TM0')
+        ]
+
+    def test_sealed_year_rows_merged_into_shard(self, pipeline, tmp_path):
+        """Test runs for a sealed year land in its shard, not the main table."""
+        runs_file = tmp_path / 'combined_runs.csv'
+        runs_frame(['2023-03-01', '2025-06-02']).to_csv(runs_file, index=False)
+        assert pipeline.load_combined_runs_data(str(runs_file), force_full_refresh=True)
+
+        conn = pipeline._connect()
+        assert pipeline.shard_manager.seal_years(conn)[2023] == {'universe_historical': 0,
+                                                                 'portfolio_historical': 0,
+                                                                 'combined_runs_historical': 2}
+
+        runs_frame(['2023-03-01', '2023-09-01', '2025-06-03']).to_csv(runs_file, index=False)
+        assert pipeline.load_combined_runs_data(str(runs_file))
+
+        conn = pipeline._connect()
+        shard = pipeline.shard_manager.schema_name(2023)
+        assert conn.execute(
+            f'SELECT "Date", COUNT(*) FROM {shard}.combined_runs_historical GROUP BY "Date" ORDER BY "Date"'
+        ).fetchall() == [('2023-03-01', 2), ('2023-09-01', 2)]
+        assert conn.execute(
+            'SELECT "Date", COUNT(*) FROM main.combined_runs_historical GROUP BY "Date" ORDER BY "Date"'
+        ).fetchall() == [('2025-06-02', 2), ('2025-06-03', 2)]
+        assert conn.execute('SELECT COUNT(*) FROM combined_runs_historical').fetchone()[0] == 8
+
+    def test_merge_statements_logged(self, tmp_path, monkeypatch):
+        """Test a load's staged merge and anti-join statements reach perf_query_log."""
+        monkeypatch.chdir(tmp_path)
+        pipeline = DatabasePipeline(database_path=str(tmp_path / 'trading_analytics.db'),
+                                    config_path=str(tmp_path / 'missing.yaml'), disable_logging=True,
+                                    slow_query_ms=1e-9)
+        assert pipeline.initialize_database()
+        runs_file = tmp_path / 'combined_runs.csv'
+        runs_frame(['2025-06-02']).to_csv(runs_file, index=False)
+        assert pipeline.load_combined_runs_data(str(runs_file), force_full_refresh=True)
+        runs_frame(['2025-06-03']).to_csv(runs_file, index=False)
+        assert pipeline.load_combined_runs_data(str(runs_file))
+
+        pipeline._flush_slow_queries()
+        statements = [row[0] for row in pipeline._connect().execute(
+            "SELECT normalized_sql FROM perf_query_log WHERE source = 'staging'"
+        )]
+        pipeline.db_connection.disconnect()
+
+        merges = [sql for sql in statements if sql.startswith('INSERT INTO "main"."combined_runs_historical"')]
+        assert merges and any('NOT EXISTS' in sql for sql in merges)
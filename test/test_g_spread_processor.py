@@ -0,0 +1,268 @@
+"""
+Tests for G Spread Fuzzy Mapping
+
+This module tests the score-matrix column mapping: exact matches, the best
+score across scoring methods, one-to-one assignment, the threshold and the
+stored column mapping reused across runs (and rematched when the matching
+config changes or an exact match appears), the incremental CSV ingestion
+and the block-wise long-format reshape.
+"""
+
+import json
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+from unittest.mock import Mock
+from rapidfuzz import process, fuzz
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.pipeline.g_spread_processor import GSpreadProcessor
+
+
+class TestGSpreadFuzzyMapping:
+    """Test GSpreadProcessor fuzzy mapping functionality."""
+
+    @pytest.fixture
+    def config_dict(self, tmp_path):
+        """Processor configuration with console output off and a temporary mapping table."""
+        return {'g_spread_processor': {
+            'mapping_table': str(tmp_path / 'bond_column_mapping.parquet'),
+            'fuzzy_matching': {
+                'default_threshold': 85,
+                'scoring_methods': ['ratio', 'partial_ratio', 'token_sort_ratio']
+            },
+            'logging': {'log_console_and_file': False},
+            'error_handling': {'fail_on_no_matches': False}
+        }}
+
+    @pytest.fixture
+    def processor(self, config_dict):
+        """Create a processor."""
+        return GSpreadProcessor(config_dict, Mock())
+
+    @pytest.fixture
+    def universe_df(self):
+        """Universe security names."""
+        return pd.DataFrame({'Security': [
+            'BNS 4.5 12/15/30', 'RY 5.25 03/01/29', 'TD 3.2 06/01/27', 'CM 2.95 06/19/29', None
+        ]})
+
+    def test_mapping(self, processor, universe_df):
+        """Test exact, fuzzy and unmapped columns."""
+        df = pd.DataFrame(columns=['DATE', 'BNS 4.5 12/15/30', 'RY 5.25 3/1/29', 'TD 3.2 06/01/2027',
+                                   'Unnamed: 9', 'ZZZ 1 01/01/40'])
+
+        mapped = processor._perform_fuzzy_mapping(df, universe_df)
+
+        assert list(mapped.columns) == ['DATE', 'BNS 4.5 12/15/30', 'RY 5.25 03/01/29', 'TD 3.2 06/01/27',
+                                        'Unnamed: 9', 'ZZZ 1 01/01/40']
+
+    def test_one_to_one_assignment(self, processor, universe_df):
+        """Test a security already taken by an earlier column is not reused."""
+        df = pd.DataFrame(columns=['DATE', 'RY 5.25 03/01/2029', 'RY 5.25 3/1/29'])
+
+        mapped = processor._perform_fuzzy_mapping(df, universe_df)
+
+        assert list(mapped.columns) == ['DATE', 'RY 5.25 03/01/29', 'RY 5.25 3/1/29']
+
+    def test_scores_match_extract_one(self, processor, universe_df):
+        """Test the score matrix gives the same best match and score as extractOne per method."""
+        securities = sorted(universe_df['Security'].dropna())
+        bonds = ['RY 5.25 3/1/29', 'TD 3.2 06/01/2027', 'CM 2.95 6/19/29']
+        methods = ['ratio', 'partial_ratio', 'token_sort_ratio']
+
+        scores = processor._score_matrix(bonds, securities, methods, 0)
+
+        for row, bond in enumerate(bonds):
+            best = max(process.extractOne(bond, securities, scorer=getattr(fuzz, method))[1]
+                       for method in methods)
+            assert scores[row].max() == pytest.approx(best)
+
+    def test_stored_mapping_reused(self, config_dict, universe_df):
+        """Test a second run reuses stored mappings and matches only new columns."""
+        dated = universe_df.assign(Date=pd.Timestamp('2025-06-02'))
+        df = pd.DataFrame(columns=['DATE', 'RY 5.25 3/1/29', 'ZZZ 1 01/01/40'])
+        GSpreadProcessor(config_dict, Mock())._perform_fuzzy_mapping(df, dated)
+
+        processor = GSpreadProcessor(config_dict, Mock())
+        processor._score_matrix = Mock(wraps=processor._score_matrix)
+        mapped = processor._perform_fuzzy_mapping(df.assign(**{'TD 3.2 06/01/2027': None}), dated)
+
+        assert list(mapped.columns) == ['DATE', 'RY 5.25 03/01/29', 'ZZZ 1 01/01/40', 'TD 3.2 06/01/27']
+        assert processor._score_matrix.call_args[0][0] == ['TD 3.2 06/01/2027']
+        stored = pd.read_parquet(config_dict['g_spread_processor']['mapping_table'])
+        assert list(stored['method']) == ['fuzzy', 'fuzzy', 'unmapped']
+        assert set(stored['universe_date']) == {'2025-06-02'}
+
+    def test_vanished_target_and_remap_all(self, config_dict, universe_df):
+        """Test columns whose target left the universe are rematched, and remap_all rematches everything."""
+        df = pd.DataFrame(columns=['DATE', 'RY 5.25 3/1/29', 'TD 3.2 06/01/2027'])
+        GSpreadProcessor(config_dict, Mock())._perform_fuzzy_mapping(df, universe_df)
+
+        processor = GSpreadProcessor(config_dict, Mock())
+        processor._score_matrix = Mock(wraps=processor._score_matrix)
+        processor._perform_fuzzy_mapping(df, universe_df[universe_df['Security'] != 'TD 3.2 06/01/27'])
+        assert processor._score_matrix.call_args[0][0] == ['TD 3.2 06/01/2027']
+
+        processor = GSpreadProcessor(config_dict, Mock(), remap_all=True)
+        processor._score_matrix = Mock(wraps=processor._score_matrix)
+        processor._perform_fuzzy_mapping(df, universe_df)
+        assert processor._score_matrix.call_args[0][0] == ['RY 5.25 3/1/29', 'TD 3.2 06/01/2027']
+
+    def test_config_change_rematches(self, config_dict, universe_df):
+        """Test fuzzy and unmapped columns are rematched when the threshold or scoring methods change."""
+        dated = universe_df.assign(Date=pd.Timestamp('2025-06-02'))
+        df = pd.DataFrame(columns=['DATE', 'BNS 4.5 12/15/30', 'RY 5.25 3/1/29', 'ZZZ 1 01/01/40'])
+        GSpreadProcessor(config_dict, Mock())._perform_fuzzy_mapping(df, dated)
+
+        config_dict['g_spread_processor']['fuzzy_matching']['default_threshold'] = 99
+        processor = GSpreadProcessor(config_dict, Mock())
+        processor._score_matrix = Mock(wraps=processor._score_matrix)
+        mapped = processor._perform_fuzzy_mapping(df, dated)
+
+        assert processor._score_matrix.call_args[0][0] == ['RY 5.25 3/1/29', 'ZZZ 1 01/01/40']
+        assert list(mapped.columns) == ['DATE', 'BNS 4.5 12/15/30', 'RY 5.25 3/1/29', 'ZZZ 1 01/01/40']
+        stored = pd.read_parquet(config_dict['g_spread_processor']['mapping_table'])
+        assert set(stored['matching_config'].map(lambda config: json.loads(config)['threshold'])) == {99.0}
+
+    def test_new_exact_match_replaces_fuzzy(self, config_dict, universe_df):
+        """Test a stored fuzzy mapping gives way to an exact match once the universe has one."""
+        dated = universe_df.assign(Date=pd.Timestamp('2025-06-02'))
+        df = pd.DataFrame(columns=['DATE', 'RY 5.25 3/1/29'])
+        GSpreadProcessor(config_dict, Mock())._perform_fuzzy_mapping(df, dated)
+
+        exact = pd.concat([dated, pd.DataFrame({'Security': ['RY 5.25 3/1/29'], 'Date': [pd.Timestamp('2025-06-02')]})])
+        mapped = GSpreadProcessor(config_dict, Mock())._perform_fuzzy_mapping(df, exact)
+
+        assert list(mapped.columns) == ['DATE', 'RY 5.25 3/1/29']
+        stored = pd.read_parquet(config_dict['g_spread_processor']['mapping_table'])
+        assert list(stored['method']) == ['exact']
+
+
+class TestGSpreadIngestion:
+    """Test GSpreadProcessor incremental CSV ingestion functionality."""
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        """Wide G-spread CSV with a unicode column, a repeated column and a non-numeric column."""
+        path = tmp_path / 'bond_g_sprd_time_series.csv'
+        path.write_text(
+            'DATE,ACACN 4 ⅝ 08/15/29,CAN 1 09/01/26,CAN 1 09/01/26,NOTE\n'
+            '01/02/2025,1.5,#N/A N/A,3,a\n'
+            '01/03/2025,2.5,2,3,b\n',
+            encoding='utf-8'
+        )
+        return path
+
+    def make_processor(self, csv_path, **kwargs):
+        """Create a processor reading csv_path with its ingest cache next to it."""
+        return GSpreadProcessor({'g_spread_processor': {
+            'input_file': str(csv_path),
+            'ingest_cache_dir': str(csv_path.parent / 'ingest_cache')
+        }}, Mock(), **kwargs)
+
+    def test_matches_pandas_read_csv(self, csv_path):
+        """Test a full load gives the frame pandas.read_csv gives."""
+        expected = pd.read_csv(csv_path)
+        expected['DATE'] = pd.to_datetime(expected['DATE'], format='%m/%d/%Y')
+
+        loaded = self.make_processor(csv_path)._ingest_input_csv('DATE')
+
+        pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+
+    def test_incremental_append(self, csv_path):
+        """Test a later run parses only the appended rows."""
+        self.make_processor(csv_path)._ingest_input_csv('DATE')
+        with open(csv_path, 'a', encoding='utf-8') as f:
+            f.write('01/06/2025,3.5,4,5,c\n')
+
+        processor = self.make_processor(csv_path)
+        processor._read_csv_rows = Mock(wraps=processor._read_csv_rows)
+        loaded = processor._ingest_input_csv('DATE')
+
+        assert processor._read_csv_rows.call_args[0][0] > 0
+        assert list(loaded['ACACN 4 ⅝ 08/15/29']) == [1.5, 2.5, 3.5]
+        assert list(loaded['CAN 1 09/01/26.1']) == [3, 3, 5]
+        assert len(self.make_processor(csv_path)._ingest_input_csv('DATE')) == 3
+
+    def test_edited_history_reloads(self, csv_path):
+        """Test a change to already loaded rows, or a forced refresh, reloads the whole file."""
+        self.make_processor(csv_path)._ingest_input_csv('DATE')
+        csv_path.write_text(csv_path.read_text(encoding='utf-8').replace('1.5', '1.7'), encoding='utf-8')
+
+        loaded = self.make_processor(csv_path)._ingest_input_csv('DATE')
+        assert list(loaded['ACACN 4 ⅝ 08/15/29']) == [1.7, 2.5]
+
+        processor = self.make_processor(csv_path, force_full_refresh=True)
+        processor._read_csv_rows = Mock(wraps=processor._read_csv_rows)
+        assert len(processor._ingest_input_csv('DATE')) == 2
+        header = csv_path.read_text(encoding='utf-8').splitlines(keepends=True)[0]
+        assert processor._read_csv_rows.call_args[0][0] == len(header.encode('utf-8'))
+
+    def test_latin1_detected_once(self, tmp_path):
+        """Test a non-UTF-8 file is read as latin1 without a failed UTF-8 pass."""
+        path = tmp_path / 'latin1.csv'
+        path.write_bytes('DATE,CAFÉ 5 01/01/30\n01/02/2025,1\n'.encode('latin1'))
+
+        loaded = self.make_processor(path)._ingest_input_csv('DATE')
+
+        assert list(loaded.columns) == ['DATE', 'CAFÉ 5 01/01/30']
+        assert list(loaded['CAFÉ 5 01/01/30']) == [1.0]
+
+
+class TestGSpreadLongFormat:
+    """Test GSpreadProcessor long-format reshape functionality."""
+
+    @pytest.fixture
+    def wide_df(self):
+        """Wide frame with empty cells, a bond without CUSIP and a text column."""
+        return pd.DataFrame({
+            'DATE': pd.to_datetime(['2025-01-02', '2025-01-03', '2025-01-06']),
+            'BNS 4.5 12/15/30': [1.0, None, 3.0],
+            'ZZZ 1 01/01/40': [4.0, 5.0, 6.0],
+            'RY 5.25 03/01/29': [None, None, 7.0],
+            'TD 3.2 06/01/27': ['8', 'x', None]
+        })
+
+    @pytest.fixture
+    def universe_df(self):
+        """Universe names with their CUSIPs."""
+        return pd.DataFrame({
+            'Security': ['BNS 4.5 12/15/30', 'RY 5.25 03/01/29', 'TD 3.2 06/01/27', 'CM 2.95 06/19/29'],
+            'CUSIP': ['064159AA1', '780082AA1', '89114QAA1', '13607HAA1']
+        })
+
+    def test_blocks_match_melt(self, wide_df, universe_df):
+        """Test the blocks hold the non-empty melt rows with a CUSIP, in melt order."""
+        processor = GSpreadProcessor({'g_spread_processor': {'long_format_block_columns': 2}}, Mock())
+        stats = {}
+
+        blocks = list(processor._iter_long_format(wide_df, universe_df, stats))
+        long_df = pd.concat(blocks, ignore_index=True)
+
+        assert len(blocks) == 2
+        assert isinstance(long_df['Security'].dtype, pd.CategoricalDtype)
+        assert list(long_df.columns) == ['CUSIP', 'DATE', 'Security', 'GSpread']
+        assert list(long_df['Security'].astype(str)) == ['BNS 4.5 12/15/30', 'BNS 4.5 12/15/30',
+                                                         'RY 5.25 03/01/29', 'TD 3.2 06/01/27']
+        assert list(long_df['CUSIP']) == ['064159AA1', '064159AA1', '780082AA1', '89114QAA1']
+        assert list(long_df['GSpread']) == [1.0, 3.0, 7.0, 8.0]
+        assert list(long_df['DATE'].dt.day) == [2, 6, 6, 2]
+        assert stats == {'cells': 12, 'records': 4, 'blocks': 2, 'columns_without_cusip': 1}
+
+    def test_save_long_outputs(self, wide_df, universe_df, tmp_path, monkeypatch):
+        """Test streamed blocks are written to the CSV and Parquet outputs with plain string Security."""
+        monkeypatch.chdir(tmp_path)
+        processor = GSpreadProcessor({'g_spread_processor': {'long_format_block_columns': 1}}, Mock())
+
+        long_df = processor._save_long_outputs(processor._iter_long_format(wide_df, universe_df), 'DATE')
+
+        saved = pd.read_parquet(tmp_path / 'historical g spread' / 'bond_g_sprd_time_series.parquet')
+        assert len(long_df) == len(saved) == 4
+        assert not isinstance(saved['Security'].dtype, pd.CategoricalDtype)
+        assert list(saved['Security']) == list(long_df['Security'].astype(str))
+        assert len(pd.read_csv(tmp_path / 'historical g spread' / 'processed data' / 'bond_g_sprd_long.csv')) == 4
+        assert not list((tmp_path / 'historical g spread').rglob('*.tmp'))
@@ -0,0 +1,98 @@
+"""
+Tests for the Index Advisor
+
+This module tests turning perf_query_log entries into ranked candidate
+indexes: key column order, covering columns, temporary sorts and
+suggestions already served by existing indexes.
+"""
+
+import pytest
+import sqlite3
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.query_log import SlowQueryLog
+from db.database.index_advisor import IndexAdvisor
+
+
+SCHEMA_DDL = """
+    CREATE TABLE combined_runs_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Dealer" TEXT NOT NULL, "Bid Spread" REAL, "Ask Spread" REAL, "Keyword" TEXT
+    );
+    CREATE INDEX idx_runs_date_cusip ON combined_runs_historical(date, cusip_standardized);
+"""
+
+
+class TestIndexAdvisor:
+    """Test IndexAdvisor class functionality."""
+
+    @pytest.fixture
+    def connection(self):
+        """Create in-memory database holding a runs table."""
+        conn = sqlite3.connect(':memory:')
+        conn.executescript(SCHEMA_DDL)
+        yield conn
+        conn.close()
+
+    def _log(self, connection, statements):
+        """Record statements as slow queries with their real plans"""
+        log = SlowQueryLog(threshold_ms=0, plan_connection=lambda: connection)
+        for sql, params, duration_ms in statements:
+            log.observe(sql, params, duration_ms)
+        log.flush(connection)
+
+    def test_no_log_no_advice(self, connection):
+        """Test a database without a slow-query log gets no suggestions."""
+        assert IndexAdvisor().advise(connection) == []
+
+    def test_covering_index_for_scan(self, connection):
+        """Test equality then range columns, plus the few selected columns, ranked by total time."""
+        self._log(connection, [
+            ('SELECT "Bid Spread" FROM combined_runs_historical WHERE "Dealer" = ? AND "Ask Spread" > ?',
+             ('TD', 100), 400.0),
+            ('SELECT "Bid Spread" FROM combined_runs_historical WHERE "Dealer" = ? AND "Ask Spread" > ?',
+             ('RBC', 90), 300.0),
+            ('SELECT * FROM combined_runs_historical WHERE "Keyword" = ?', ('CAD',), 200.0)
+        ])
+
+        advice = IndexAdvisor().advise(connection)
+
+        assert [item['columns'] for item in advice] == [['Dealer', 'Ask Spread', 'Bid Spread'], ['Keyword']]
+        assert advice[0]['create_sql'] == (
+            'CREATE INDEX IF NOT EXISTS idx_combined_runs_historical_dealer_ask_spread_bid_spread '
+            'ON "combined_runs_historical"("Dealer", "Ask Spread", "Bid Spread")'
+        )
+        assert advice[0]['covering'] is True
+        assert advice[0]['executions'] == 2
+        assert advice[0]['total_ms'] == 700.0
+        assert advice[0]['reasons'] == ['SCAN combined_runs_historical']
+        assert advice[1]['covering'] is False
+
+        # The suggestion removes the scan it was made for
+        connection.execute(advice[0]['create_sql'])
+        assert [item['columns'] for item in IndexAdvisor().advise(connection)] == [['Keyword']]
+
+    def test_ordering_columns_and_min_executions(self, connection):
+        """Test sort and grouping columns become keys, and rare statements can be ignored."""
+        self._log(connection, [
+            ('SELECT DISTINCT "Dealer" FROM combined_runs_historical ORDER BY "Dealer"', (), 50.0),
+            ('SELECT "Keyword", COUNT(*) FROM combined_runs_historical GROUP BY "Keyword"', (), 50.0),
+            ('SELECT "Keyword", COUNT(*) FROM combined_runs_historical GROUP BY "Keyword"', (), 50.0)
+        ])
+
+        assert [item['columns'] for item in IndexAdvisor().advise(connection)] == [['Keyword'], ['Dealer']]
+        assert [item['columns'] for item in IndexAdvisor(min_executions=2).advise(connection)] == [['Keyword']]
+
+    def test_existing_index_not_suggested(self, connection):
+        """Test statements already searching an index produce no suggestion."""
+        self._log(connection, [
+            ('SELECT COUNT(*) FROM combined_runs_historical WHERE date = ?', ('2025-06-02',), 900.0),
+            ('SELECT COUNT(*) FROM combined_runs_historical', (), 900.0)
+        ])
+
+        assert IndexAdvisor().advise(connection) == []
@@ -0,0 +1,150 @@
+"""
+Tests for Materialised Views
+
+This module tests the materialised replacements for cusip_match_summary
+and data_quality_dashboard: installation under the original view names,
+date-scoped delta maintenance and trigger-maintained quality counters.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.materialized_views import MaterializedViews
+
+
+TRUTH_SQL = """
+    SELECT COUNT(DISTINCT cusip_standardized),
+           COUNT(DISTINCT CASE WHEN universe_match_status = 'matched' THEN cusip_standardized END),
+           COUNT(DISTINCT CASE WHEN universe_match_status = 'unmatched' THEN cusip_standardized END),
+           MAX(date)
+    FROM portfolio_historical
+"""
+
+
+class TestMaterializedViews:
+    """Test MaterializedViews class functionality."""
+
+    @pytest.fixture
+    def temp_db_path(self):
+        """Create temporary database path."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+        yield db_path
+        try:
+            if os.path.exists(db_path):
+                os.unlink(db_path)
+        except PermissionError:
+            pass
+
+    @pytest.fixture
+    def connection(self, temp_db_path):
+        """Create database with the original aggregate views."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.executescript("""
+            CREATE TABLE portfolio_historical (
+                "Date" DATE NOT NULL, cusip_standardized TEXT, universe_match_status TEXT,
+                UNIQUE("Date", cusip_standardized)
+            );
+            CREATE TABLE data_quality_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT,
+                check_type TEXT NOT NULL, check_result TEXT NOT NULL,
+                check_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE VIEW cusip_match_summary AS
+                SELECT 'portfolio_historical' AS table_name, COUNT(DISTINCT cusip_standardized) AS total_cusips
+                FROM portfolio_historical;
+            CREATE VIEW data_quality_dashboard AS
+                SELECT table_name, COUNT(*) AS total_checks FROM data_quality_log GROUP BY table_name;
+
+            INSERT INTO portfolio_historical VALUES
+                ('2025-06-01', 'AAA111111', 'matched'),
+                ('2025-06-01', 'ZZZ999999', 'unmatched'),
+                ('2025-06-02', 'AAA111111', 'matched');
+        """)
+        conn.commit()
+        yield conn
+        conn.close()
+
+    @pytest.fixture
+    def views(self, connection):
+        """Install the materialised views."""
+        materialized_views = MaterializedViews()
+        assert materialized_views.ensure_installed(connection) is True
+        connection.commit()
+        return materialized_views
+
+    def _summary_row(self, connection):
+        return connection.execute("""
+            SELECT total_cusips, matched_cusips, unmatched_cusips, reference_date
+            FROM cusip_match_summary WHERE table_name = 'portfolio_historical'
+        """).fetchone()
+
+    def test_install_keeps_view_names(self, connection, views):
+        """Test views are replaced under their original names and originals are kept."""
+        view_sql = dict(connection.execute("SELECT name, sql FROM sqlite_master WHERE type = 'view'"))
+
+        assert 'mv_cusip_match_summary' in view_sql['cusip_match_summary']
+        assert 'mv_data_quality_dashboard' in view_sql['data_quality_dashboard']
+        originals = connection.execute("SELECT view_name FROM mv_view_definitions ORDER BY 1").fetchall()
+        assert originals == [('cusip_match_summary',), ('data_quality_dashboard',)]
+        assert views.ensure_installed(connection) is False
+
+    def test_initial_build_matches_full_aggregate(self, connection, views):
+        """Test the installed summary equals the full-table aggregate."""
+        assert self._summary_row(connection) == connection.execute(TRUTH_SQL).fetchone()
+
+    def test_date_delta_matches_full_aggregate(self, connection, views):
+        """Test a delta over rewritten dates keeps the summary exact."""
+        dates = ['2025-06-01', '2025-06-03']
+        views.begin_delta(connection, 'portfolio_historical', dates)
+        connection.executescript("""
+            INSERT INTO portfolio_historical VALUES ('2025-06-01', 'ZZZ999999', 'matched')
+                ON CONFLICT ("Date", cusip_standardized) DO UPDATE SET universe_match_status = 'matched';
+            INSERT INTO portfolio_historical VALUES ('2025-06-03', 'CCC333333', 'unmatched');
+        """)
+        views.end_delta(connection, 'portfolio_historical', dates)
+
+        assert self._summary_row(connection) == connection.execute(TRUTH_SQL).fetchone()
+        assert self._summary_row(connection) == (3, 2, 1, '2025-06-03')
+
+    def test_full_refresh_rebuilds_table_state(self, connection, views):
+        """Test a full refresh (no dates) recomputes the table's state."""
+        connection.execute("DELETE FROM portfolio_historical")
+        connection.execute("INSERT INTO portfolio_historical VALUES ('2025-07-01', 'BBB222222', 'matched')")
+        views.end_delta(connection, 'portfolio_historical', None)
+
+        assert self._summary_row(connection) == (1, 1, 0, '2025-07-01')
+
+    def test_quality_dashboard_follows_log_changes(self, connection, views):
+        """Test triggers keep quality counters current on insert and delete."""
+        connection.executemany(
+            "INSERT INTO data_quality_log (table_name, check_type, check_result) VALUES (?, ?, ?)",
+            [('universe_historical', 'nulls', 'pass'), ('universe_historical', 'range', 'fail'),
+             ('portfolio_historical', 'nulls', 'warning')]
+        )
+        rows = {row[0]: row[1:6] for row in connection.execute("SELECT * FROM data_quality_dashboard")}
+        assert rows['universe_historical'] == (2, 1, 1, 0, 50.0)
+        assert rows['portfolio_historical'] == (1, 0, 0, 1, 0.0)
+
+        connection.execute("DELETE FROM data_quality_log WHERE check_type = 'range'")
+        connection.execute("DELETE FROM data_quality_log WHERE table_name = 'portfolio_historical'")
+        rows = {row[0]: row[1:6] for row in connection.execute("SELECT * FROM data_quality_dashboard")}
+        assert rows == {'universe_historical': (1, 1, 0, 0, 100.0)}
+
+    def test_restore_views(self, connection, views):
+        """Test the original view definitions can be put back."""
+        views.restore_views(connection)
+
+        view_sql = connection.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'cusip_match_summary'"
+        ).fetchone()[0]
+        assert 'mv_' not in view_sql
+        triggers = connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall()
+        assert triggers == []
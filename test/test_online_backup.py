@@ -0,0 +1,125 @@
+"""
+Tests for Online Backup
+
+This module tests the throttled online backup: step-wise copying with
+progress reporting, consistency under concurrent writes, streaming
+compression and rotation of old backups.
+"""
+
+import pytest
+import sqlite3
+import gzip
+import os
+import time
+import tempfile
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.backup import OnlineBackup
+
+
+class TestOnlineBackup:
+    """Test OnlineBackup class functionality."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory."""
+        with tempfile.TemporaryDirectory() as tmp:
+            yield Path(tmp)
+
+    @pytest.fixture
+    def source_db(self, temp_dir):
+        """Create a WAL-mode database spanning many pages."""
+        db_path = temp_dir / 'source.db'
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE universe_historical (id INTEGER PRIMARY KEY, payload TEXT)")
+        conn.executemany(
+            "INSERT INTO universe_historical (payload) VALUES (?)",
+            [('x' * 500,) for _ in range(400)]
+        )
+        conn.commit()
+        conn.close()
+        return db_path
+
+    def test_backup_in_steps_reports_progress(self, source_db, temp_dir):
+        """Test the copy runs in several steps and reports progress."""
+        progress_events = []
+        backup = OnlineBackup(str(source_db), pages_per_step=5, sleep_seconds=0,
+                              progress_callback=progress_events.append)
+
+        stats = backup.run(str(temp_dir / 'backup.db'))
+
+        assert stats['steps'] > 1
+        assert len(progress_events) == stats['steps']
+        assert progress_events[-1]['percent_complete'] == 100.0
+        assert stats['throughput_mb_per_second'] >= 0
+
+        conn = sqlite3.connect(stats['backup_path'])
+        assert conn.execute("SELECT COUNT(*) FROM universe_historical").fetchone()[0] == 400
+        conn.close()
+        assert not (temp_dir / 'backup.db.partial').exists()
+
+    def test_concurrent_writes_do_not_restart_backup(self, source_db, temp_dir):
+        """Test writers keep working during the backup and the copy is a consistent snapshot."""
+        writer = sqlite3.connect(source_db)
+        steps_with_write = []
+
+        def write_during_backup(progress):
+            writer.execute("INSERT INTO universe_historical (payload) VALUES ('during')")
+            writer.commit()
+            steps_with_write.append(progress['steps'])
+
+        backup = OnlineBackup(str(source_db), pages_per_step=5, sleep_seconds=0,
+                              progress_callback=write_during_backup)
+        stats = backup.run(str(temp_dir / 'backup.db'))
+        writer.close()
+
+        conn = sqlite3.connect(stats['backup_path'])
+        assert conn.execute("SELECT COUNT(*) FROM universe_historical").fetchone()[0] == 400
+        conn.close()
+        # One progress event per step: the copy was never restarted
+        assert steps_with_write == list(range(1, stats['steps'] + 1))
+
+    def test_compressed_backup(self, source_db, temp_dir):
+        """Test finished backup is gzip-compressed and the raw copy removed."""
+        backup = OnlineBackup(str(source_db), sleep_seconds=0)
+
+        stats = backup.run(str(temp_dir / 'backup.db'), compress=True)
+
+        assert stats['compressed'] is True
+        assert stats['backup_path'].endswith('.db.gz')
+        assert not (temp_dir / 'backup.db').exists()
+
+        restored = temp_dir / 'restored.db'
+        with gzip.open(stats['backup_path'], 'rb') as compressed:
+            restored.write_bytes(compressed.read())
+        conn = sqlite3.connect(restored)
+        assert conn.execute("SELECT COUNT(*) FROM universe_historical").fetchone()[0] == 400
+        conn.close()
+
+    def test_rotate_backups_keeps_newest(self, temp_dir):
+        """Test rotation deletes all but the newest backups."""
+        for index in range(4):
+            path = temp_dir / f'trading_analytics_backup_2025060{index}.db'
+            path.write_bytes(b'backup')
+            os.utime(path, (time.time() + index, time.time() + index))
+
+        removed = OnlineBackup.rotate_backups(str(temp_dir), 'trading_analytics_backup_*', keep=2)
+
+        assert sorted(path.name for path in removed) == [
+            'trading_analytics_backup_20250600.db', 'trading_analytics_backup_20250601.db'
+        ]
+        assert sorted(path.name for path in temp_dir.glob('trading_analytics_backup_*')) == [
+            'trading_analytics_backup_20250602.db', 'trading_analytics_backup_20250603.db'
+        ]
+
+    def test_missing_database_raises(self, temp_dir):
+        """Test backing up a missing database fails cleanly."""
+        backup = OnlineBackup(str(temp_dir / 'missing.db'))
+
+        with pytest.raises(FileNotFoundError):
+            backup.run(str(temp_dir / 'backup.db'))
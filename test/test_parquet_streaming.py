@@ -0,0 +1,59 @@
+"""
+Tests for streaming Parquet reads used by the --low-memory database loaders.
+"""
+
+import pytest
+import tempfile
+import os
+from pathlib import Path
+import sys
+from unittest.mock import Mock
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.pipeline.parquet_processor import ParquetProcessor
+
+
+class TestParquetStreaming:
+    """Test ParquetProcessor.iter_parquet_batches."""
+
+    @pytest.fixture
+    def parquet_path(self):
+        """Create a temporary Parquet file with several row groups."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'combined_runs.parquet')
+            df = pd.DataFrame({
+                'Date': pd.date_range('2025-01-01', periods=250, freq='D'),
+                'CUSIP': [f'CUSIP{i:04d}' for i in range(250)],
+                'Bid Spread': range(250)
+            })
+            df.to_parquet(path, index=False, row_group_size=100)
+            yield path
+
+    @pytest.fixture
+    def processor(self):
+        """Create ParquetProcessor with a mock logger."""
+        return ParquetProcessor(config={}, logger=Mock())
+
+    def test_batches_are_bounded(self, processor, parquet_path):
+        """Test no batch exceeds the requested size and all rows are seen."""
+        batches = list(processor.iter_parquet_batches(parquet_path, batch_size=40))
+
+        assert all(len(batch) <= 40 for batch in batches)
+        assert sum(len(batch) for batch in batches) == 250
+        assert processor.stats.rows_processed == 250
+
+        combined = pd.concat(batches, ignore_index=True)
+        assert combined['CUSIP'].tolist() == [f'CUSIP{i:04d}' for i in range(250)]
+
+    def test_column_projection_ignores_missing(self, processor, parquet_path):
+        """Test only requested, existing columns are read."""
+        batch = next(processor.iter_parquet_batches(
+            parquet_path, batch_size=10, columns=['CUSIP', 'Date', 'Keyword']
+        ))
+
+        assert list(batch.columns) == ['CUSIP', 'Date']
+        assert pd.api.types.is_datetime64_any_dtype(batch['Date'])
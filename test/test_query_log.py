@@ -0,0 +1,138 @@
+"""
+Tests for the Slow-Query Log
+
+This module tests SQL normalisation, parameter shapes, the timing
+wrapper with its threshold and sampling, timed statements on a raw
+connection, plan capture and flushing to perf_query_log.
+"""
+
+import pytest
+import sqlite3
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.query_log import SlowQueryLog, normalize_sql, param_shape
+
+
+class QueryRunner:
+    """Stands in for DatabaseConnection's query methods."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute_query(self, query, params=(), fetch_results=True):
+        cursor = self.conn.execute(query, params)
+        return cursor.fetchall() if fetch_results else cursor.rowcount
+
+    def execute_many(self, query, params_list):
+        return self.conn.executemany(query, params_list).rowcount
+
+
+class TestSlowQueryLog:
+    """Test SlowQueryLog class functionality."""
+
+    @pytest.fixture
+    def connection(self):
+        """Create in-memory database with a small table."""
+        conn = sqlite3.connect(':memory:')
+        conn.execute('CREATE TABLE runs ("Date" TEXT, "CUSIP" TEXT, "Dealer" TEXT, "Bid Spread" REAL)')
+        conn.executemany('INSERT INTO runs VALUES (?, ?, ?, ?)', [
+            ('2025-06-02', f'{n:09d}', 'TD', float(n)) for n in range(50)
+        ])
+        conn.commit()
+        yield conn
+        conn.close()
+
+    def test_normalize_sql(self):
+        """Test literals and placeholder lists collapse so executions group together."""
+        assert normalize_sql("""
+            SELECT "G Sprd", t1.x FROM universe_historical
+            WHERE date = '2025-06-02' AND n IN (1, 2, 3) AND c IN (?, ?) LIMIT 10
+        """) == (
+            'SELECT "G Sprd", t1.x FROM universe_historical '
+            'WHERE date = ? AND n IN (?, ...) AND c IN (?, ...) LIMIT ?'
+        )
+
+    def test_param_shape(self):
+        """Test parameters are described without their values."""
+        assert param_shape(None) == 'none'
+        assert param_shape(('a', 1)) == 'tuple[2]'
+        assert param_shape({'as_of': 1, 'min_size': 2}) == 'dict[as_of, min_size]'
+        assert param_shape([(1, 2, 3)] * 10) == 'many[10 x 3]'
+
+    def test_instrumented_calls_are_logged_with_plans(self, connection):
+        """Test slow calls are recorded with normalised SQL, rows and plan, then flushed."""
+        runner = QueryRunner(connection)
+        log = SlowQueryLog(threshold_ms=0, plan_connection=lambda: connection)
+        log.instrument(runner, 'execute_query', source='db_connection')
+        log.instrument(runner, 'execute_query', source='db_connection')  # idempotent
+
+        assert len(runner.execute_query('SELECT * FROM runs WHERE "Dealer" = ?', ('TD',))) == 50
+        runner.execute_query("SELECT * FROM runs WHERE \"Dealer\" = 'RBC'")
+
+        assert log.pending == 2
+        assert log.flush(connection) == 2
+        rows = connection.execute("""
+            SELECT source, statement_type, normalized_sql, param_shape, rows_touched, query_plan
+            FROM perf_query_log ORDER BY id
+        """).fetchall()
+        assert rows[0] == (
+            'db_connection', 'SELECT', 'SELECT * FROM runs WHERE "Dealer" = ?', 'tuple[1]', 50, 'SCAN runs'
+        )
+        assert rows[1][2] == rows[0][2]
+        assert rows[1][4] == 0
+
+    def test_threshold_and_sampling(self, connection):
+        """Test fast calls and unsampled slow calls are not recorded."""
+        runner = QueryRunner(connection)
+        log = SlowQueryLog(threshold_ms=60_000)
+        log.instrument(runner, 'execute_query')
+        runner.execute_query('SELECT COUNT(*) FROM runs')
+
+        assert log.get_statistics()['calls_timed'] == 1
+        assert log.pending == 0
+
+        unsampled = SlowQueryLog(threshold_ms=0, sample_rate=0.0)
+        assert unsampled.observe('SELECT 1', (), 5.0) is False
+        assert unsampled.get_statistics()['slow_calls'] == 1
+        with pytest.raises(ValueError):
+            SlowQueryLog(sample_rate=1.5)
+
+    def test_executemany_explained_with_first_row(self, connection):
+        """Test batched writes are recorded with their row count and batch shape."""
+        runner = QueryRunner(connection)
+        log = SlowQueryLog(threshold_ms=0, plan_connection=lambda: connection)
+        log.instrument(runner, 'execute_many')
+        runner.execute_many('UPDATE runs SET "Bid Spread" = ? WHERE "CUSIP" = ?', [(1.0, '000000001'), (2.0, '000000002')])
+        connection.commit()
+        log.flush(connection)
+
+        assert connection.execute(
+            "SELECT statement_type, param_shape, rows_touched, query_plan FROM perf_query_log"
+        ).fetchone() == ('UPDATE', 'many[2 x 2]', 2, 'SCAN runs')
+
+    def test_raw_connection_statements_timed(self, connection):
+        """Test statements run through execute() on a raw connection are recorded with their row count."""
+        log = SlowQueryLog(threshold_ms=0, plan_connection=lambda: connection)
+
+        cursor = log.execute(connection, 'DELETE FROM runs WHERE "Bid Spread" < ?', (10.0,), source='staging')
+        connection.commit()
+        log.flush(connection)
+
+        assert cursor.rowcount == 10
+        assert connection.execute(
+            "SELECT source, statement_type, param_shape, rows_touched, query_plan FROM perf_query_log"
+        ).fetchone() == ('staging', 'DELETE', 'tuple[1]', 10, 'SCAN runs')
+
+    def test_flush_refuses_open_transaction(self, connection):
+        """Test entries are never written into a caller's transaction."""
+        log = SlowQueryLog(threshold_ms=0)
+        log.observe('SELECT 1', (), 1.0)
+        connection.execute('DELETE FROM runs WHERE "CUSIP" = ?', ('000000001',))
+
+        with pytest.raises(RuntimeError):
+            log.flush(connection)
+        assert log.pending == 1
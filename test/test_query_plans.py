@@ -0,0 +1,174 @@
+"""
+Tests for Query Plan Regressions
+
+This module builds a synthetic database with the loaders' tables, views and
+indexes and checks that every catalogued pipeline and status query uses an index and
+stays within its latency budget. Scale and budgets can be raised with
+QUERY_PLAN_SCALE and QUERY_PLAN_BUDGET_SCALE, e.g. QUERY_PLAN_SCALE=10.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.query_plans import QUERY_CATALOGUE, QueryPlanAuditor, build_synthetic_database
+
+
+SCALE = float(os.environ.get('QUERY_PLAN_SCALE', '1'))
+BUDGET_SCALE = float(os.environ.get('QUERY_PLAN_BUDGET_SCALE', '1'))
+
+# Tables, view and indexes the catalogued queries run against, with the
+# columns db_pipe.py inserts and the index names test_database_schema.py pins
+SCHEMA_DDL = """
+    CREATE TABLE universe_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL,
+        cusip_standardized TEXT NOT NULL, "Security" TEXT, "G Sprd" REAL, "OAS (Mid)" REAL,
+        "Yrs (Mat)" REAL, "Rating" TEXT, source_file TEXT, file_date DATE,
+        loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE("Date", "CUSIP", cusip_standardized)
+    );
+    CREATE TABLE portfolio_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL,
+        cusip_standardized TEXT NOT NULL, "SECURITY" TEXT, "QUANTITY" REAL NOT NULL, "PRICE" REAL,
+        "MARKET VALUE" REAL, "WEIGHT" REAL, universe_match_status TEXT DEFAULT 'pending',
+        universe_match_date DATE, source_file TEXT, file_date DATE,
+        loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE("Date", "CUSIP", cusip_standardized)
+    );
+    CREATE TABLE combined_runs_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Security" TEXT, "Dealer" TEXT NOT NULL, "Bid Spread" REAL, "Ask Spread" REAL,
+        "Bid Size" REAL, "Ask Size" REAL, "Bid Interpolated Spread to Government" REAL,
+        "Keyword" TEXT, universe_match_status TEXT DEFAULT 'pending', source_file TEXT,
+        file_date DATE, loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE("Date", "CUSIP", cusip_standardized, "Dealer")
+    );
+    CREATE TABLE run_monitor (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Security" TEXT, "Bid Spread" REAL, "Ask Spread" REAL, "Bid Size" REAL, "Ask Size" REAL,
+        "DoD" REAL, "WoW" REAL, "MTD" REAL, "QTD" REAL, "YTD" REAL, "1YR" REAL,
+        "Best Bid" REAL, "Best Offer" REAL, "Bid/Offer" REAL, "G Spread" REAL, "Keyword" TEXT,
+        universe_match_status TEXT, universe_match_date DATE, source_file TEXT,
+        loaded_timestamp TIMESTAMP, UNIQUE(cusip_standardized)
+    );
+    CREATE TABLE gspread_analytics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, "CUSIP" TEXT, cusip_standardized TEXT,
+        "Security" TEXT, "GSpread" REAL, "DATE" DATE, cusip_1_standardized TEXT,
+        cusip_2_standardized TEXT, universe_match_status TEXT, universe_match_date DATE,
+        source_file TEXT, loaded_timestamp TIMESTAMP
+    );
+    CREATE TABLE unmatched_cusips_all_dates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, source_table TEXT NOT NULL, date DATE,
+        cusip_original TEXT NOT NULL, cusip_standardized TEXT, security_name TEXT,
+        match_status TEXT DEFAULT 'unmatched', universe_match_attempted_date DATE, source_file TEXT,
+        loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE unmatched_cusips_last_date (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, source_table TEXT NOT NULL, cusip_original TEXT NOT NULL,
+        cusip_standardized TEXT, security_name TEXT, universe_match_attempted_date DATE, source_file TEXT,
+        loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, UNIQUE(source_table, cusip_standardized)
+    );
+    CREATE VIEW current_universe AS
+        SELECT * FROM universe_historical WHERE date = (SELECT MAX(date) FROM universe_historical);
+    CREATE INDEX idx_universe_date_cusip ON universe_historical(date, cusip_standardized);
+    CREATE INDEX idx_universe_cusip ON universe_historical(cusip_standardized, date);
+    CREATE INDEX idx_portfolio_date_cusip ON portfolio_historical(date, cusip_standardized);
+    CREATE INDEX idx_portfolio_cusip ON portfolio_historical(cusip_standardized, date);
+    CREATE INDEX idx_runs_date_cusip ON combined_runs_historical(date, cusip_standardized);
+    CREATE INDEX idx_runs_cusip ON combined_runs_historical(cusip_standardized, date);
+    CREATE INDEX idx_gspread_cusips ON gspread_analytics(cusip_1_standardized, cusip_2_standardized);
+"""
+
+
+class LoaderSchema:
+    """Local stand-in for DatabaseSchema holding the indexed loader tables."""
+
+    def create_complete_schema(self, conn):
+        conn.executescript(SCHEMA_DDL)
+        return True
+
+
+@pytest.fixture(scope='module')
+def synthetic_db_path():
+    """Create temporary database path."""
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+        db_path = f.name
+    os.unlink(db_path)
+    yield db_path
+    try:
+        if os.path.exists(db_path):
+            os.unlink(db_path)
+    except PermissionError:
+        pass
+
+
+@pytest.fixture(scope='module')
+def results(synthetic_db_path):
+    """Build the synthetic database and run the catalogue once."""
+    row_counts = build_synthetic_database(
+        synthetic_db_path, dates=int(30 * SCALE), cusips=int(400 * SCALE), schema=LoaderSchema()
+    )
+    assert row_counts['universe_historical'] > 0
+
+    conn = sqlite3.connect(synthetic_db_path)
+    try:
+        auditor = QueryPlanAuditor(conn, repeat=3, budget_scale=BUDGET_SCALE)
+        yield {result['name']: result for result in auditor.run_catalogue()}
+    finally:
+        conn.close()
+
+
+class TestQueryPlans:
+    """Test catalogued queries against a synthetic database."""
+
+    @pytest.mark.parametrize('query_name', [entry['name'] for entry in QUERY_CATALOGUE])
+    def test_query_uses_indexes(self, results, query_name):
+        """Test a catalogued query never falls back to a full table scan."""
+        result = results[query_name]
+        assert result['full_scans'] == [], "\n".join(result['plan'])
+
+    @pytest.mark.parametrize('query_name', [entry['name'] for entry in QUERY_CATALOGUE])
+    def test_query_within_budget(self, results, query_name):
+        """Test a catalogued query stays within its latency budget."""
+        result = results[query_name]
+        assert not result['over_budget'], (
+            f"{result['median_ms']:.1f} ms > {result['budget_ms']:.1f} ms"
+        )
+
+    def test_synthetic_data_has_orphans(self, results):
+        """Test the synthetic data exercises the orphan queries."""
+        assert results['portfolio_orphans_latest']['rows'] > 0
+        assert results['run_monitor_orphans']['rows'] > 0
+        assert results['portfolio_universe_match']['rows'] == 1
+
+    def test_auditor_flags_dropped_index(self):
+        """Test a query is reported once the index it relies on is gone."""
+        conn = sqlite3.connect(':memory:')
+        conn.executescript("""
+            CREATE TABLE universe_historical (date TEXT, cusip_standardized TEXT);
+            CREATE INDEX idx_universe_date_cusip ON universe_historical(date, cusip_standardized);
+        """)
+        auditor = QueryPlanAuditor(conn)
+        entry = {
+            'name': 'by_date',
+            'sql': "SELECT * FROM universe_historical WHERE date = :reference_date",
+            'budget_ms': 1000.0
+        }
+        params = {'reference_date': '2025-06-02'}
+
+        assert auditor.run_query(entry, params)['full_scans'] == []
+
+        conn.execute("DROP INDEX idx_universe_date_cusip")
+        result = auditor.run_query(entry, params)
+        assert result['full_scans'] == ['universe_historical']
+        assert QueryPlanAuditor.find_regressions([result]) == [
+            'by_date: full scan of universe_historical'
+        ]
+        conn.close()
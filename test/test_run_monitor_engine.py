@@ -0,0 +1,227 @@
+"""
+Tests for the In-Database Run Monitor
+
+This module tests period reference dates, period changes and best levels
+computed from combined_runs_historical, parity with runs/run_monitor.py,
+the history/current tables the engine writes and the universe match status
+and unmatched CUSIP tracking of the current report.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from datetime import datetime
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).parent.parent / "runs"))
+
+from db.database.run_monitor_engine import RunMonitorEngine, period_reference_dates, _report_sql, PERIODS
+from run_monitor import RunMonitor
+
+
+RUNS_DDL = """
+    CREATE TABLE combined_runs_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Security" TEXT, "Dealer" TEXT NOT NULL, "Bid Spread" REAL, "Ask Spread" REAL,
+        "Bid Size" REAL, "Ask Size" REAL, "Bid Interpolated Spread to Government" REAL,
+        "Keyword" TEXT, universe_match_status TEXT DEFAULT 'pending', source_file TEXT,
+        file_date DATE, loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE("Date", "CUSIP", cusip_standardized, "Dealer")
+    );
+    CREATE INDEX idx_runs_date_cusip ON combined_runs_historical(date, cusip_standardized);
+    CREATE TABLE run_monitor (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Security" TEXT, "Bid Spread" REAL, "Ask Spread" REAL, "Bid Size" REAL, "Ask Size" REAL,
+        "DoD" REAL, "WoW" REAL, "MTD" REAL, "QTD" REAL, "YTD" REAL, "1YR" REAL,
+        "DoD Chg Bid Size" REAL, "DoD Chg Ask Size" REAL, "MTD Chg Bid Size" REAL, "MTD Chg Ask Size" REAL,
+        "Best Bid" REAL, "Best Offer" REAL, "Bid/Offer" REAL, "Dealer @ Best Bid" TEXT,
+        "Dealer @ Best Offer" TEXT, "Size @ Best Bid" REAL, "Size @ Best Offer" REAL, "G Spread" REAL,
+        "Keyword" TEXT, universe_match_status TEXT, universe_match_date DATE, source_file TEXT,
+        loaded_timestamp TIMESTAMP, UNIQUE(cusip_standardized)
+    );
+    CREATE TABLE universe_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL,
+        cusip_standardized TEXT, "Security" TEXT
+    );
+    CREATE INDEX idx_universe_date_cusip ON universe_historical(date, cusip_standardized);
+    CREATE TABLE unmatched_cusips_all_dates (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, source_table TEXT NOT NULL, date DATE,
+        cusip_original TEXT NOT NULL, cusip_standardized TEXT, security_name TEXT,
+        match_status TEXT DEFAULT 'unmatched', universe_match_attempted_date DATE, source_file TEXT,
+        loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE unmatched_cusips_last_date (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, source_table TEXT NOT NULL, cusip_original TEXT NOT NULL,
+        cusip_standardized TEXT, security_name TEXT, universe_match_attempted_date DATE, source_file TEXT,
+        loaded_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, UNIQUE(source_table, cusip_standardized)
+    );
+"""
+
+DATES = ['2024-06-10', '2024-12-31', '2025-03-31', '2025-05-30', '2025-06-06', '2025-06-12', '2025-06-13']
+DEALERS = ['BMO', 'RBC', 'TD']
+
+
+def _runs_frame() -> pd.DataFrame:
+    """Deterministic runs for three CUSIPs quoted by three dealers"""
+    rng = np.random.default_rng(7)
+    rows = []
+    for date in DATES:
+        for n in range(3):
+            for dealer in DEALERS:
+                if n == 2 and dealer == 'TD' and date == '2025-06-12':
+                    continue  # A dealer missing on the DoD date
+                rows.append({
+                    'Date': pd.Timestamp(date), 'CUSIP': f'00000{n}AA{n}', 'Security': f'BOND {n}',
+                    'Dealer': dealer,
+                    'Bid Spread': float(rng.integers(80, 120)), 'Ask Spread': float(rng.integers(70, 110)),
+                    'Bid Size': float(rng.choice([1_000_000, 2_000_000, 5_000_000])),
+                    'Ask Size': float(rng.choice([1_000_000, 2_000_000, 5_000_000])),
+                    'Bid Interpolated Spread to Government': float(rng.integers(60, 100)),
+                    'Keyword': 'CAD'
+                })
+    return pd.DataFrame(rows)
+
+
+class TestRunMonitorEngine:
+    """Test RunMonitorEngine class functionality."""
+
+    @pytest.fixture
+    def temp_db_path(self):
+        """Create temporary database path."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+        yield db_path
+        try:
+            if os.path.exists(db_path):
+                os.unlink(db_path)
+        except PermissionError:
+            pass
+
+    @pytest.fixture
+    def runs(self):
+        """Runs history as runs/run_monitor.py reads it."""
+        return _runs_frame()
+
+    @pytest.fixture
+    def connection(self, temp_db_path, runs):
+        """Create database holding the runs history."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.executescript(RUNS_DDL)
+        stored = runs.copy()
+        stored['Date'] = stored['Date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        stored['cusip_standardized'] = stored['CUSIP']
+        stored.to_sql('combined_runs_historical', conn, if_exists='append', index=False)
+        universe = stored[['CUSIP', 'cusip_standardized', 'Security']].drop_duplicates()
+        universe.assign(Date='2025-06-13 00:00:00').to_sql('universe_historical', conn, if_exists='append', index=False)
+        conn.commit()
+        yield conn
+        conn.close()
+
+    def test_period_reference_dates(self):
+        """Test reference dates follow runs/run_monitor.py."""
+        references = period_reference_dates(datetime(2025, 6, 13))
+
+        assert references['DoD'] == datetime(2025, 6, 12)
+        assert references['WoW'] == datetime(2025, 6, 6)
+        assert references['MTD'] == datetime(2025, 5, 31)
+        assert references['QTD'] == datetime(2025, 3, 31)
+        assert references['YTD'] == datetime(2024, 12, 31)
+        assert references['1YR'] == datetime(2024, 6, 13)
+
+    def test_periods_resolve_to_available_dates(self, connection):
+        """Test each period resolves to the latest runs date on or before it."""
+        engine = RunMonitorEngine()
+        as_of = engine.resolve_as_of(connection)
+
+        assert as_of == '2025-06-13 00:00:00'
+        assert engine.resolve_periods(connection, as_of) == {
+            'DoD': '2025-06-12 00:00:00',
+            'WoW': '2025-06-06 00:00:00',
+            'MTD': '2025-05-30 00:00:00',
+            'QTD': '2025-03-31 00:00:00',
+            'YTD': '2024-12-31 00:00:00',
+            '1YR': '2024-06-10 00:00:00'
+        }
+        assert engine.resolve_as_of(connection, '2025-06-08') == '2025-06-06 00:00:00'
+        assert engine.resolve_as_of(connection, '2024-01-01') is None
+
+    def test_matches_pandas_run_monitor(self, connection, runs):
+        """Test the in-database report matches runs/run_monitor.py per CUSIP."""
+        monitor = RunMonitor(source_file='unused.parquet', output_dir='runs')
+        monitor.df = runs
+        monitor.most_recent_date = runs['Date'].max()
+        expected = monitor.calculate_best_levels(monitor.calculate_period_changes())
+        expected = expected.groupby('CUSIP').agg({
+            'DoD': 'mean', 'WoW': 'mean', 'MTD': 'mean', 'QTD': 'mean', 'YTD': 'mean', '1YR': 'mean',
+            'DoD Chg Bid Size': 'mean', 'MTD Chg Ask Size': 'mean',
+            'Best Bid': 'mean', 'Best Offer': 'mean', 'Dealer @ Best Bid': 'first', 'Bid Size': 'sum'
+        })
+
+        RunMonitorEngine().refresh(connection)
+        actual = pd.read_sql_query(
+            "SELECT * FROM run_monitor_history", connection
+        ).set_index('CUSIP')[expected.columns]
+
+        pd.testing.assert_frame_equal(
+            actual.sort_index(), expected.sort_index(), check_names=False, check_dtype=False
+        )
+
+    def test_refresh_writes_history_and_current(self, connection):
+        """Test every as-of date is kept and run_monitor holds the latest."""
+        engine = RunMonitorEngine()
+        past = engine.refresh(connection, '2025-06-12')
+        latest = engine.refresh(connection)
+
+        assert past == {**past, 'as_of_date': '2025-06-12', 'rows_written': 3, 'current_updated': False}
+        assert latest['current_updated'] is True
+        assert connection.execute(
+            "SELECT as_of_date, COUNT(*) FROM run_monitor_history GROUP BY as_of_date"
+        ).fetchall() == [('2025-06-12', 3), ('2025-06-13', 3)]
+        assert connection.execute("""
+            SELECT COUNT(*), MIN(universe_match_status), MIN(source_file) FROM run_monitor
+        """).fetchone() == (3, 'matched', 'combined_runs_historical')
+
+        # Recomputing a date replaces its rows
+        engine.refresh(connection)
+        assert connection.execute("SELECT COUNT(*) FROM run_monitor_history").fetchone() == (6,)
+        assert connection.execute("SELECT COUNT(*) FROM run_monitor").fetchone() == (3,)
+
+    def test_cusip_outside_latest_universe_unmatched(self, connection):
+        """Test a CUSIP missing from the latest universe date is reported and tracked as unmatched."""
+        connection.execute("UPDATE universe_historical SET \"Date\" = '2025-06-12 00:00:00' WHERE \"CUSIP\" = '000002AA2'")
+        engine = RunMonitorEngine()
+
+        assert engine.refresh(connection)['unmatched_cusips'] == 1
+        engine.refresh(connection)
+
+        assert connection.execute("""
+            SELECT "CUSIP", universe_match_status FROM run_monitor ORDER BY "CUSIP"
+        """).fetchall() == [('000000AA0', 'matched'), ('000001AA1', 'matched'), ('000002AA2', 'unmatched')]
+        assert connection.execute("""
+            SELECT source_table, date, cusip_original, security_name FROM unmatched_cusips_all_dates
+        """).fetchall() == [('run_monitor', '2025-06-13', '000002AA2', 'BOND 2')]
+        assert connection.execute(
+            "SELECT cusip_standardized FROM unmatched_cusips_last_date WHERE source_table = 'run_monitor'"
+        ).fetchall() == [('000002AA2',)]
+
+    def test_report_reads_only_indexed_dates(self, connection):
+        """Test the report finds as-of and reference rows through indexes, never a table scan."""
+        params = {f'period_{period.lower()}': '2025-06-12 00:00:00' for period in PERIODS}
+        params.update({'as_of': '2025-06-13 00:00:00', 'min_size': 2_000_000})
+        plan = [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + _report_sql(), params)]
+
+        assert any(step.startswith('SEARCH h USING INDEX') for step in plan)
+        assert not any(step.startswith(('SCAN l', 'SCAN h', 'SCAN combined_runs_historical')) for step in plan)
+
+    def test_refresh_without_runs_raises(self, connection):
+        """Test an as-of date before the first runs date is rejected."""
+        with pytest.raises(ValueError):
+            RunMonitorEngine().refresh(connection, '2020-01-01')
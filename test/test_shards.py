@@ -0,0 +1,191 @@
+"""
+Tests for Per-Year History Shards
+
+This module tests sealing cold years into shard files, the union views
+that keep existing queries working, routing of staged merges, full
+refresh clearing, per-shard VACUUM and backup tracking.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.shards import ShardManager
+from db.database.staging import StagingArea
+from db.database.connection_pool import ConnectionPool
+
+
+UNIVERSE_DDL = """
+    CREATE TABLE universe_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Security" TEXT, "G Sprd" REAL, source_file TEXT,
+        UNIQUE("Date", "CUSIP", cusip_standardized)
+    );
+    CREATE INDEX idx_universe_date_cusip ON universe_historical(date, cusip_standardized);
+    CREATE VIEW universe_latest AS
+        SELECT * FROM universe_historical WHERE date = (SELECT MAX(date) FROM universe_historical);
+"""
+
+DATES = ['2023-03-01 00:00:00', '2023-09-01 00:00:00', '2024-02-01 00:00:00', '2025-06-02 00:00:00']
+
+
+class TestShardManager:
+    """Test ShardManager class functionality."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory for the database and its shards."""
+        directory = tempfile.mkdtemp()
+        yield Path(directory)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    @pytest.fixture
+    def db_path(self, temp_dir):
+        """Create database holding four dates of universe history over three years."""
+        path = temp_dir / 'trading_analytics.db'
+        conn = sqlite3.connect(path)
+        conn.executescript(UNIVERSE_DDL)
+        conn.executemany("""
+            INSERT INTO universe_historical ("Date", "CUSIP", cusip_standardized, "Security", "G Sprd", source_file)
+            VALUES (?, ?, ?, ?, ?, 'universe.parquet')
+        """, [
+            (date, f'{n:06d}AA{n}', f'{n:06d}AA{n}', f'BOND {n}', float(n))
+            for date in DATES for n in range(5)
+        ])
+        conn.commit()
+        conn.close()
+        return path
+
+    @pytest.fixture
+    def connection(self, db_path):
+        """Open the database."""
+        conn = sqlite3.connect(db_path)
+        yield conn
+        conn.close()
+
+    @pytest.fixture
+    def sealed(self, db_path, connection):
+        """Seal 2023 and 2024 into shards."""
+        manager = ShardManager(str(db_path))
+        assert manager.seal_years(connection) == {
+            2023: {'universe_historical': 10},
+            2024: {'universe_historical': 5}
+        }
+        return manager
+
+    def test_seal_moves_cold_years(self, db_path, connection, sealed):
+        """Test cold years leave the main table and land in their own files."""
+        assert connection.execute("SELECT COUNT(*) FROM main.universe_historical").fetchone() == (5,)
+        assert connection.execute("SELECT COUNT(*) FROM shard_2023.universe_historical").fetchone() == (10,)
+        assert sealed.shard_path(2023) == db_path.parent / 'trading_analytics_shards' / 'trading_analytics_2023.db'
+        assert sealed.shard_path(2024).exists()
+        assert [(shard['year'], shard['first_date'], shard['row_count'])
+                for shard in sealed.registered_shards(connection)] == [
+            (2023, '2023-03-01 00:00:00', 10), (2024, '2024-02-01 00:00:00', 5)
+        ]
+        assert connection.execute(
+            "SELECT sql IS NOT NULL FROM shard_2023.sqlite_master WHERE name = 'idx_universe_date_cusip'"
+        ).fetchone() == (1,)
+
+    def test_union_view_keeps_full_history(self, connection, sealed):
+        """Test unqualified reads see every year, main views keep reading the main table."""
+        assert connection.execute("SELECT COUNT(*) FROM universe_historical").fetchone() == (20,)
+        assert connection.execute(
+            "SELECT COUNT(DISTINCT date) FROM universe_historical WHERE cusip_standardized = '000001AA1'"
+        ).fetchone() == (4,)
+        assert connection.execute("SELECT DISTINCT date FROM universe_latest").fetchall() == [
+            ('2025-06-02 00:00:00',)
+        ]
+
+    def test_reattach_on_new_connection(self, db_path, sealed):
+        """Test a fresh connection sees the shards only after attach()."""
+        conn = sqlite3.connect(db_path)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM universe_historical").fetchone() == (5,)
+            assert ShardManager(str(db_path)).attach(conn) == [2023, 2024]
+            assert ShardManager(str(db_path)).attach(conn) == []
+            assert conn.execute("SELECT COUNT(*) FROM universe_historical").fetchone() == (20,)
+        finally:
+            conn.close()
+
+    def test_date_filter_probes_indexes(self, connection, sealed):
+        """Test a date filter searches each branch by index instead of scanning."""
+        plan = [row[3] for row in connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM universe_historical WHERE date = ?", ('2023-03-01 00:00:00',)
+        )]
+
+        assert any(step.startswith('SEARCH shard_2023.universe_historical USING INDEX') for step in plan)
+        assert not any(step.startswith('SCAN') for step in plan)
+
+    def test_staged_merge_routes_rows_by_year(self, connection, sealed):
+        """Test staged rows for a sealed year are merged into its shard."""
+        staged = pd.DataFrame({
+            'Date': ['2023-03-01 00:00:00', '2025-06-02 00:00:00', '2025-06-03 00:00:00'],
+            'CUSIP': ['000001AA1', '000001AA1', '000001AA1'],
+            'cusip_standardized': ['000001AA1', '000001AA1', '000001AA1'],
+            'G Sprd': [9.0, 9.0, 9.0]
+        })
+        routes = sealed.merge_routes(connection, 'universe_historical', 's."Date"')
+        assert [schema for schema, _ in routes] == ['shard_2023', 'shard_2024', 'main']
+
+        with StagingArea(connection) as staging:
+            staging.stage_dataframe('universe_stage', staged)
+            with staging.write_transaction():
+                for schema, route_sql in routes:
+                    staging.merge(
+                        'universe_historical', 'universe_stage', columns=list(staged.columns),
+                        conflict_columns=['Date', 'CUSIP', 'cusip_standardized'],
+                        where_sql=route_sql, target_schema=schema
+                    )
+
+        assert connection.execute("SELECT COUNT(*) FROM shard_2023.universe_historical").fetchone() == (10,)
+        assert connection.execute("SELECT COUNT(*) FROM main.universe_historical").fetchone() == (6,)
+        assert connection.execute("""
+            SELECT COUNT(*) FROM universe_historical WHERE cusip_standardized = '000001AA1' AND "G Sprd" = 9.0
+        """).fetchone() == (3,)
+
+    def test_clear_and_backup_tracking(self, connection, sealed):
+        """Test a full refresh clears the shards and marks them for the next backup."""
+        for shard in sealed.registered_shards(connection):
+            sealed.mark_backed_up(connection, shard['year'])
+        connection.commit()
+        assert sealed.shards_needing_backup(connection) == []
+
+        connection.execute("UPDATE main.shard_registry SET backup_timestamp = '2000-01-01 00:00:00'")
+        sealed.clear(connection, 'universe_historical')
+        connection.commit()
+
+        assert connection.execute("SELECT COUNT(*) FROM shard_2023.universe_historical").fetchone() == (0,)
+        assert [shard['year'] for shard in sealed.shards_needing_backup(connection)] == [2023, 2024]
+
+    def test_vacuum_shard_and_main(self, connection, sealed):
+        """Test VACUUM works with the union views in place and keeps them."""
+        sealed.vacuum(connection, 2023)
+        sealed.vacuum(connection)
+
+        assert connection.execute("SELECT COUNT(*) FROM universe_historical").fetchone() == (20,)
+        with pytest.raises(ValueError):
+            sealed.vacuum(connection, 2019)
+
+    def test_pool_readers_attach_read_only(self, db_path, sealed):
+        """Test pooled readers attach the shards read-only through on_connect."""
+        manager = ShardManager(str(db_path))
+        pool = ConnectionPool(
+            str(db_path), reader_count=1, on_connect=lambda reader: manager.attach(reader, read_only=True)
+        )
+        try:
+            assert pool.execute_read("SELECT COUNT(*) FROM universe_historical") == [(20,)]
+            with pool.read_snapshot() as reader:
+                with pytest.raises(sqlite3.OperationalError):
+                    reader.execute("DELETE FROM shard_2023.universe_historical")
+        finally:
+            pool.close_all()
@@ -0,0 +1,147 @@
+"""
+Tests for Read-Only Analyst Snapshots
+
+This module tests snapshot export through VACUUM INTO: the read-only
+file and its page size, table and date filters, folding history shards
+back in, and the manifest written alongside.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import shutil
+import json
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.snapshot import SnapshotExporter, open_snapshot, manifest_path, READ_PRAGMAS
+from db.database.shards import ShardManager
+
+
+SCHEMA_DDL = """
+    CREATE TABLE universe_historical (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        "Date" DATE NOT NULL, "CUSIP" TEXT NOT NULL, cusip_standardized TEXT NOT NULL,
+        "Security" TEXT, "G Sprd" REAL,
+        UNIQUE("Date", "CUSIP", cusip_standardized)
+    );
+    CREATE INDEX idx_universe_date_cusip ON universe_historical(date, cusip_standardized);
+    CREATE TABLE audit_log (id INTEGER PRIMARY KEY, message TEXT);
+    CREATE VIEW latest_universe AS
+        SELECT * FROM universe_historical WHERE date = (SELECT MAX(date) FROM universe_historical);
+    CREATE VIEW audit_messages AS SELECT message FROM audit_log;
+    CREATE TRIGGER audit_universe AFTER DELETE ON universe_historical
+        BEGIN INSERT INTO audit_log (message) VALUES ('deleted'); END;
+"""
+
+DATES = ['2024-03-01 00:00:00', '2025-01-02 00:00:00', '2025-06-02 00:00:00']
+
+
+class TestSnapshotExporter:
+    """Test SnapshotExporter class functionality."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory for the database and snapshots."""
+        directory = tempfile.mkdtemp()
+        yield Path(directory)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    @pytest.fixture
+    def db_path(self, temp_dir):
+        """Create a WAL database with three dates of universe history."""
+        path = temp_dir / 'trading_analytics.db'
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.executescript(SCHEMA_DDL)
+        conn.executemany("""
+            INSERT INTO universe_historical ("Date", "CUSIP", cusip_standardized, "Security", "G Sprd")
+            VALUES (?, ?, ?, ?, ?)
+        """, [(date, f'{n:06d}AA{n}', f'{n:06d}AA{n}', f'BOND {n}', float(n)) for date in DATES for n in range(5)])
+        conn.execute("INSERT INTO audit_log (message) VALUES ('loaded')")
+        conn.commit()
+        conn.close()
+        return path
+
+    def test_full_snapshot(self, db_path, temp_dir):
+        """Test a full snapshot holds every row, uses large pages and is read-only."""
+        snapshot_path = temp_dir / 'snapshots' / 'analytics.db'
+        manifest = SnapshotExporter(str(db_path)).export(str(snapshot_path))
+
+        assert manifest['page_size'] == 65536
+        assert manifest['tables']['universe_historical'] == {
+            'rows': 15, 'first_date': DATES[0], 'last_date': DATES[-1]
+        }
+        assert json.loads(manifest_path(str(snapshot_path)).read_text())['tables'] == manifest['tables']
+
+        conn = open_snapshot(str(snapshot_path))
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone() == ('delete',)
+            assert conn.execute("PRAGMA query_only").fetchone() == (READ_PRAGMAS['query_only'],)
+            assert conn.execute("SELECT COUNT(*) FROM latest_universe").fetchone() == (5,)
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM audit_log")
+        finally:
+            conn.close()
+
+    def test_snapshot_replaces_previous_one(self, db_path, temp_dir):
+        """Test exporting over an existing (read-only) snapshot replaces it."""
+        snapshot_path = temp_dir / 'analytics.db'
+        exporter = SnapshotExporter(str(db_path))
+        exporter.export(str(snapshot_path))
+
+        manifest = exporter.export(str(snapshot_path), tables=['audit_log'])
+
+        assert list(manifest['tables']) == ['audit_log']
+        assert not snapshot_path.with_name('analytics.db.partial').exists()
+
+    def test_table_and_date_filters(self, db_path, temp_dir):
+        """Test filters keep only the requested tables and dates, dropping dependent views and triggers."""
+        snapshot_path = temp_dir / 'slim.db'
+        manifest = SnapshotExporter(str(db_path)).export(
+            str(snapshot_path), tables=['universe_historical'], start_date='2025-01-01', end_date='2025-01-31'
+        )
+
+        assert list(manifest['tables']) == ['universe_historical']
+        assert manifest['filters'] == {
+            'tables': ['universe_historical'], 'start_date': '2025-01-01', 'end_date': '2025-01-31'
+        }
+        conn = open_snapshot(str(snapshot_path))
+        try:
+            assert conn.execute("SELECT DISTINCT date FROM universe_historical").fetchall() == [(DATES[1],)]
+            assert conn.execute("""
+                SELECT type, name FROM sqlite_master
+                WHERE type IN ('view', 'trigger', 'index') AND sql IS NOT NULL ORDER BY name
+            """).fetchall() == [('index', 'idx_universe_date_cusip'), ('view', 'latest_universe')]
+        finally:
+            conn.close()
+
+    def test_invalid_date_rejected(self, db_path, temp_dir):
+        """Test date filters must be plain YYYY-MM-DD dates."""
+        with pytest.raises(ValueError):
+            SnapshotExporter(str(db_path)).export(str(temp_dir / 'bad.db'), start_date="2025-01-01' OR 1")
+
+    def test_shards_folded_into_snapshot(self, db_path, temp_dir):
+        """Test sealed history shards are copied back into the snapshot tables."""
+        manager = ShardManager(str(db_path))
+        conn = sqlite3.connect(db_path)
+        try:
+            assert manager.seal_years(conn) == {2024: {'universe_historical': 5}}
+            shards = [(shard['year'], shard['path']) for shard in manager.registered_shards(conn)]
+        finally:
+            conn.close()
+
+        manifest = SnapshotExporter(str(db_path)).export(str(temp_dir / 'analytics.db'), shards=shards)
+
+        assert manifest['shards_included'] == [2024]
+        assert manifest['tables']['universe_historical']['rows'] == 15
+        assert 'shard_registry' not in manifest['tables']
+
+        excluded = SnapshotExporter(str(db_path)).export(
+            str(temp_dir / 'recent.db'), start_date='2025-01-01', shards=shards
+        )
+        assert excluded['shards_included'] == []
+        assert excluded['tables']['universe_historical']['rows'] == 10
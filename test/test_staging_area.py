@@ -0,0 +1,178 @@
+"""
+Tests for Staging Area
+
+This module tests the attached staging database used for set-based loads:
+bulk staging, UPSERT merges into live tables and anti-join filtering.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from pathlib import Path
+import sys
+
+import pandas as pd
+import numpy as np
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.staging import StagingArea, frame_to_records
+
+
+class TestStagingArea:
+    """Test StagingArea class functionality."""
+
+    @pytest.fixture
+    def temp_db_path(self):
+        """Create temporary database path."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+        yield db_path
+        try:
+            if os.path.exists(db_path):
+                os.unlink(db_path)
+        except PermissionError:
+            pass
+
+    @pytest.fixture
+    def connection(self, temp_db_path):
+        """Create database connection with a live target table."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.execute("""
+            CREATE TABLE universe_historical (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                "Date" DATE NOT NULL,
+                "CUSIP" TEXT NOT NULL,
+                cusip_standardized TEXT NOT NULL,
+                "G Sprd" REAL,
+                UNIQUE("Date", "CUSIP", cusip_standardized)
+            )
+        """)
+        conn.commit()
+        yield conn
+        conn.close()
+
+    @pytest.fixture
+    def universe_df(self):
+        """Create sample universe rows."""
+        return pd.DataFrame({
+            'Date': ['2025-06-01', '2025-06-01', '2025-06-02'],
+            'CUSIP': ['AAA111111', 'BBB222222', 'AAA111111'],
+            'cusip_standardized': ['AAA111111', 'BBB222222', 'AAA111111'],
+            'G Sprd': [100.0, np.nan, 101.5]
+        })
+
+    def test_attach_and_detach(self, connection):
+        """Test staging database is attached only inside the context."""
+        with StagingArea(connection) as staging:
+            databases = [row[1] for row in connection.execute("PRAGMA database_list")]
+            assert 'staging' in databases
+            assert staging.qualified('t') == '"staging"."t"'
+
+        databases = [row[1] for row in connection.execute("PRAGMA database_list")]
+        assert 'staging' not in databases
+
+    def test_stage_dataframe_has_no_constraints(self, connection, universe_df):
+        """Test staged table accepts rows and carries no indexes."""
+        with StagingArea(connection) as staging:
+            staged = staging.stage_dataframe('universe_stage', universe_df, batch_size=2)
+            assert staged == 3
+
+            indexes = connection.execute(
+                "SELECT name FROM staging.sqlite_master WHERE type = 'index'"
+            ).fetchall()
+            assert indexes == []
+
+            null_count = connection.execute(
+                'SELECT COUNT(*) FROM staging.universe_stage WHERE "G Sprd" IS NULL'
+            ).fetchone()[0]
+            assert null_count == 1
+
+    def test_merge_upserts_into_target(self, connection, universe_df):
+        """Test merge inserts new keys and updates existing ones."""
+        connection.execute("""
+            INSERT INTO universe_historical ("Date", "CUSIP", cusip_standardized, "G Sprd")
+            VALUES ('2025-06-01', 'AAA111111', 'AAA111111', 1.0)
+        """)
+        connection.commit()
+        original_id = connection.execute("SELECT id FROM universe_historical").fetchone()[0]
+
+        with StagingArea(connection) as staging:
+            staging.stage_dataframe('universe_stage', universe_df)
+            with staging.write_transaction():
+                merged = staging.merge(
+                    'universe_historical', 'universe_stage',
+                    columns=list(universe_df.columns),
+                    conflict_columns=['Date', 'CUSIP', 'cusip_standardized']
+                )
+
+        assert merged == 3
+        rows = connection.execute(
+            'SELECT id, "Date", "CUSIP", "G Sprd" FROM universe_historical ORDER BY "Date", "CUSIP"'
+        ).fetchall()
+        assert len(rows) == 3
+        # Existing row is updated in place rather than deleted and re-inserted
+        assert rows[0] == (original_id, '2025-06-01', 'AAA111111', 100.0)
+
+    def test_merge_with_anti_join(self, connection, universe_df):
+        """Test unmatched rows can be selected with an anti-join inside SQLite."""
+        connection.execute("CREATE TABLE unmatched (cusip TEXT, match_status TEXT)")
+        connection.commit()
+
+        with StagingArea(connection) as staging:
+            staging.stage_dataframe('universe_stage', universe_df)
+            staging.stage_dataframe('universe_keys', pd.DataFrame({'cusip_standardized': ['AAA111111']}))
+            with staging.write_transaction():
+                merged = staging.merge(
+                    'unmatched', 'universe_stage',
+                    columns=['cusip', 'match_status'],
+                    select_expressions=['s.cusip_standardized', '?'],
+                    where_sql=(
+                        f"NOT EXISTS (SELECT 1 FROM {staging.qualified('universe_keys')} u "
+                        "WHERE u.cusip_standardized = s.cusip_standardized)"
+                    ),
+                    params=('unmatched',)
+                )
+
+        assert merged == 1
+        assert connection.execute("SELECT * FROM unmatched").fetchall() == [('BBB222222', 'unmatched')]
+
+    def test_write_transaction_rolls_back(self, connection, universe_df):
+        """Test failed merge leaves the live table untouched."""
+        with StagingArea(connection) as staging:
+            staging.stage_dataframe('universe_stage', universe_df)
+            with pytest.raises(sqlite3.Error):
+                with staging.write_transaction():
+                    staging.merge('universe_historical', 'universe_stage', columns=list(universe_df.columns))
+                    staging.merge('missing_table', 'universe_stage', columns=list(universe_df.columns))
+
+        assert connection.execute("SELECT COUNT(*) FROM universe_historical").fetchone()[0] == 0
+
+    def test_stage_query_with_index(self, connection, universe_df):
+        """Test lookup sets can be materialised from the live database."""
+        with StagingArea(connection, location='') as staging:
+            staging.stage_dataframe('universe_stage', universe_df)
+            with staging.write_transaction():
+                staging.merge('universe_historical', 'universe_stage', columns=list(universe_df.columns))
+
+            count = staging.stage_query(
+                'universe_keys',
+                "SELECT DISTINCT cusip_standardized FROM main.universe_historical",
+                index_columns=['cusip_standardized']
+            )
+            assert count == 2
+
+    def test_frame_to_records_conversion(self):
+        """Test DataFrame values are converted to SQLite-bindable values."""
+        df = pd.DataFrame({
+            'when': pd.to_datetime(['2025-06-01', None]),
+            'qty': [1, 2],
+            'px': [1.5, np.nan]
+        })
+
+        records = frame_to_records(df)
+
+        assert records == [('2025-06-01 00:00:00', 1, 1.5), (None, 2, None)]
+        assert type(records[0][1]) is int
@@ -0,0 +1,140 @@
+"""
+Tests for Status Summaries
+
+This module tests the materialised status summary tables: per-date row
+counts maintained from load deltas, orphaned CUSIPs against the latest
+universe date and per-table match rates.
+"""
+
+import pytest
+import sqlite3
+import tempfile
+import os
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from db.database.status_summary import StatusSummary
+
+
+class TestStatusSummary:
+    """Test StatusSummary class functionality."""
+
+    @pytest.fixture
+    def temp_db_path(self):
+        """Create temporary database path."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+        yield db_path
+        try:
+            if os.path.exists(db_path):
+                os.unlink(db_path)
+        except PermissionError:
+            pass
+
+    @pytest.fixture
+    def connection(self, temp_db_path):
+        """Create database with universe, portfolio and run monitor rows."""
+        conn = sqlite3.connect(temp_db_path)
+        conn.executescript("""
+            CREATE TABLE universe_historical (
+                "Date" DATE NOT NULL, "CUSIP" TEXT, cusip_standardized TEXT, "Security" TEXT
+            );
+            CREATE INDEX idx_universe_date_cusip ON universe_historical(date, cusip_standardized);
+            CREATE TABLE portfolio_historical (
+                "Date" DATE NOT NULL, "CUSIP" TEXT, cusip_standardized TEXT, "SECURITY" TEXT
+            );
+            CREATE TABLE run_monitor ("CUSIP" TEXT, cusip_standardized TEXT, "Security" TEXT);
+
+            INSERT INTO universe_historical VALUES
+                ('2025-06-01', 'A', 'AAA111111', 'A bond'),
+                ('2025-06-01', 'B', 'BBB222222', 'B bond'),
+                ('2025-06-02', 'A', 'AAA111111', 'A bond');
+            INSERT INTO portfolio_historical VALUES
+                ('2025-06-01', 'B', 'BBB222222', 'B bond'),
+                ('2025-06-02', 'A', 'AAA111111', 'A bond'),
+                ('2025-06-02', 'B', 'BBB222222', 'B bond');
+            INSERT INTO run_monitor VALUES
+                ('A', 'AAA111111', 'A bond'),
+                ('Z', 'ZZZ999999', 'Z bond');
+        """)
+        conn.commit()
+        yield conn
+        conn.close()
+
+    @pytest.fixture
+    def summary(self, connection):
+        """Create and build the status summaries."""
+        status_summary = StatusSummary()
+        assert status_summary.ensure_tables(connection) is True
+        status_summary.rebuild(connection)
+        connection.commit()
+        return status_summary
+
+    def test_ensure_tables_only_creates_once(self, connection, summary):
+        """Test existing summary tables are not reported as new."""
+        assert summary.ensure_tables(connection) is False
+
+    def test_row_counts_and_latest_dates(self, connection, summary):
+        """Test totals and latest dates come from the summary tables."""
+        counts = summary.get_row_counts(connection)
+
+        assert counts['universe_historical'] == 3
+        assert counts['portfolio_historical'] == 3
+        assert counts['run_monitor'] == 2
+        # Missing live tables are reported as empty
+        assert counts['combined_runs_historical'] == 0
+
+        latest = summary.get_latest_dates(connection)
+        assert latest['universe_historical'] == '2025-06-02'
+        assert latest['portfolio_historical'] == '2025-06-02'
+
+    def test_refresh_counts_applies_only_touched_dates(self, connection, summary):
+        """Test a delta refresh recounts touched dates and leaves others alone."""
+        connection.execute("INSERT INTO universe_historical VALUES ('2025-06-03', 'C', 'CCC333333', 'C bond')")
+        # Untouched date is corrupted deliberately to prove it is not recomputed
+        connection.execute("""
+            UPDATE status_table_counts SET row_count = 99
+            WHERE table_name = 'universe_historical' AND date = '2025-06-01'
+        """)
+
+        summary.refresh_counts(connection, 'universe_historical', ['2025-06-03'])
+
+        rows = dict(connection.execute("""
+            SELECT date, row_count FROM status_table_counts WHERE table_name = 'universe_historical'
+        """).fetchall())
+        assert rows == {'2025-06-01': 99, '2025-06-02': 1, '2025-06-03': 1}
+
+    def test_orphans_against_latest_universe_date(self, connection, summary):
+        """Test orphans and match rates are computed for the latest universe date."""
+        coverage = summary.get_coverage(connection)
+
+        assert coverage['reference_date'] == '2025-06-02'
+        assert coverage['universe_cusips'] == 1
+        assert coverage['orphaned_by_table'] == {'portfolio_historical': 1, 'run_monitor': 1}
+        assert coverage['match_rates']['portfolio_historical'] == {
+            'total_cusips': 2, 'matched_cusips': 1, 'orphaned_cusips': 1, 'match_rate_percent': 50.0
+        }
+        assert [(o['table_name'], o['cusip_standardized']) for o in coverage['orphaned_cusips']] == [
+            ('portfolio_historical', 'BBB222222'), ('run_monitor', 'ZZZ999999')
+        ]
+
+    def test_refresh_orphans_after_universe_change(self, connection, summary):
+        """Test orphans clear once the universe covers the missing CUSIP."""
+        connection.execute("INSERT INTO universe_historical VALUES ('2025-06-02', 'B', 'BBB222222', 'B bond')")
+        summary.refresh_counts(connection, 'universe_historical', ['2025-06-02'])
+        summary.refresh_orphans(connection)
+
+        coverage = summary.get_coverage(connection)
+        assert coverage['orphaned_by_table'] == {'run_monitor': 1}
+        assert coverage['match_rates']['portfolio_historical']['match_rate_percent'] == 100.0
+
+    def test_rollback_discards_summary_delta(self, connection, summary):
+        """Test summaries roll back together with the data they describe."""
+        connection.execute("INSERT INTO portfolio_historical VALUES ('2025-06-02', 'C', 'CCC333333', 'C bond')")
+        summary.refresh_counts(connection, 'portfolio_historical', ['2025-06-02'])
+        connection.rollback()
+
+        assert summary.get_row_counts(connection)['portfolio_historical'] == 3
@@ -0,0 +1,134 @@
+"""
+Tests for the Indexed Time-Series Store
+
+This module tests range, year, month, latest-date and business-day lookups
+against boolean masks, cached resamples and date features, unsorted frames
+with missing dates, store reuse across calls without keeping frames alive,
+and invalidation after in-place edits.
+"""
+
+import gc
+import weakref
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.utils.time_series_store import TimeSeriesStore, RESAMPLE_FREQUENCIES
+
+
+class TestTimeSeriesStore:
+    """Test TimeSeriesStore class functionality."""
+
+    @pytest.fixture
+    def df(self):
+        """Unsorted daily rows over two years, with a missing date and a non-default index."""
+        rng = np.random.default_rng(0)
+        dates = pd.Series(rng.choice(pd.date_range('2023-11-01', '2025-02-28'), 500))
+        dates[7] = pd.NaT
+        return pd.DataFrame({'Date': dates, 'Value': rng.normal(size=500)}, index=rng.permutation(500) + 10)
+
+    def test_lookups_match_masks(self, df):
+        """Test lookups give the rows, order and index boolean masks give."""
+        store = TimeSeriesStore(df)
+        dates = df['Date']
+
+        pd.testing.assert_frame_equal(store.range('2024-02-01', '2024-03-15'),
+                                      df[(dates >= '2024-02-01') & (dates <= '2024-03-15')])
+        pd.testing.assert_frame_equal(store.year(2024), df[dates.dt.year == 2024])
+        pd.testing.assert_frame_equal(store.month(2024, 2), df[(dates.dt.year == 2024) & (dates.dt.month == 2)])
+        pd.testing.assert_frame_equal(store.latest(), df[dates == dates.max()])
+        pd.testing.assert_frame_equal(store.business_days(), df[dates.dt.weekday < 5])
+        assert len(store.year(1999)) == 0
+        assert len(store.range('2024-03-15', '2024-02-01')) == 0
+
+    def test_resample_cached(self, df):
+        """Test resamples match groupby and are computed once per frequency and method."""
+        store = TimeSeriesStore(df)
+        grouped = df.set_index('Date').groupby(pd.Grouper(freq=RESAMPLE_FREQUENCIES['M']))
+
+        monthly = store.resample('M', 'mean')
+        pd.testing.assert_frame_equal(monthly, grouped.mean().reset_index())
+
+        monthly['Value'] = 0.0
+        assert store.resample('M', 'mean')['Value'].ne(0.0).any()
+        assert len(store.resample('Q', 'last')) == 6
+        assert set(store._resamples) == {('M', 'mean'), ('Q', 'last')}
+        with pytest.raises(ValueError):
+            store.resample('M', 'sum')
+
+    def test_date_features(self, df):
+        """Test date features match the .dt accessors and leave the frame untouched."""
+        enhanced = TimeSeriesStore(df).with_date_features()
+
+        assert list(enhanced['Year'].dropna()) == list(df['Date'].dt.year.dropna())
+        assert list(enhanced['DayName'].dropna()) == list(df['Date'].dt.day_name().dropna())
+        assert list(enhanced['IsMonthEnd']) == list(df['Date'].dt.is_month_end)
+        assert 'Year' not in df.columns
+
+    def test_for_frame_reuses_store(self, df):
+        """Test the same frame reuses its store until its rows or dates change."""
+        TimeSeriesStore.clear_cache()
+        store = TimeSeriesStore.for_frame(df)
+
+        assert TimeSeriesStore.for_frame(df) is store
+        assert TimeSeriesStore.for_frame(df.copy()) is not store
+
+        df.loc[df.index[0], 'Date'] = pd.Timestamp('2029-01-01')
+        assert TimeSeriesStore.for_frame(df).latest()['Date'].tolist() == [pd.Timestamp('2029-01-01')]
+
+        df.loc[10_000] = [pd.Timestamp('2030-01-01'), 1.0]
+        assert len(TimeSeriesStore.for_frame(df).latest()) == 1
+        TimeSeriesStore.clear_cache()
+
+    def test_for_frame_does_not_keep_frame_alive(self, df):
+        """Test a cached store neither keeps its frame alive nor outlives it."""
+        TimeSeriesStore.clear_cache()
+        frame = df.copy()
+        TimeSeriesStore.for_frame(frame).resample('M', 'mean')
+        frame_ref = weakref.ref(frame)
+
+        del frame
+        gc.collect()
+
+        assert frame_ref() is None
+        assert len(TimeSeriesStore._cache) == 0
+
+    def test_resample_cache_hit_without_rehash(self, df):
+        """Test a second resample of an unchanged frame is served from the cache without hashing it."""
+        store = TimeSeriesStore(df)
+        store.resample('M', 'mean')
+        cached = store._resamples[('M', 'mean')]
+
+        with patch('src.utils.time_series_store.pd.util.hash_pandas_object') as hash_frame, \
+                patch.object(pd.DataFrame, 'groupby') as groupby:
+            store.resample('M', 'mean')
+
+        hash_frame.assert_not_called()
+        groupby.assert_not_called()
+        assert store._resamples[('M', 'mean')] is cached
+
+    def test_resample_after_invalidate(self, df):
+        """Test a resample is recomputed after in-place edits once the store is invalidated."""
+        store = TimeSeriesStore(df)
+        before = store.resample('M', 'mean')
+
+        df['Value'] = df['Value'] + 1.0
+        store.invalidate()
+        after = store.resample('M', 'mean')
+
+        np.testing.assert_allclose(after['Value'].dropna(), before['Value'].dropna() + 1.0)
+
+        df.loc[10_000] = [pd.Timestamp('2030-01-01'), 1.0]
+        assert store.resample('M', 'mean')['Date'].max() == pd.Timestamp('2030-01-31')
+
+    def test_requires_datetime(self):
+        """Test a non-datetime date column is rejected."""
+        with pytest.raises(ValueError):
+            TimeSeriesStore(pd.DataFrame({'Date': ['2024-01-01']}))
+
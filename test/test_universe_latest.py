@@ -0,0 +1,124 @@
+"""
+Tests for the Latest-Universe Snapshot
+
+This module tests building the latest-date snapshot (deduplication and the
+Security-to-CUSIP map), publishing it next to the universe history, the
+cached accessor and its rebuild of a missing or stale snapshot, and its use
+by the G-spread loader and the latest-universe CUSIP validation.
+"""
+
+import os
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+from unittest.mock import Mock, patch
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.utils.universe_latest import (
+    build_universe_latest, publish_universe_latest, load_universe_latest, latest_path
+)
+from src.utils.data_analyzer import CUSIPValidator
+from src.pipeline.g_spread_processor import GSpreadProcessor
+
+
+class TestUniverseLatest:
+    """Test latest-universe snapshot functionality."""
+
+    @pytest.fixture
+    def universe_df(self):
+        """Two universe dates, the latest with a repeated row and a repeated Security."""
+        return pd.DataFrame({
+            'Date': ['2025-06-01', '2025-06-01', '2025-06-02', '2025-06-02', '2025-06-02', '2025-06-02'],
+            'Security': ['OLD 1 01/01/30', 'BNS 4.5 12/15/30', 'BNS 4.5 12/15/30', 'BNS 4.5 12/15/30',
+                         'RY 5.25 03/01/29', 'RY 5.25 03/01/29'],
+            'CUSIP': ['00000AAA0', '064159AA1', '064159AA1', '064159AA1', '780082AA1', '780082AB9']
+        })
+
+    @pytest.fixture
+    def universe_path(self, tmp_path, universe_df):
+        """Universe history file."""
+        path = tmp_path / 'universe.parquet'
+        universe_df.to_parquet(path, index=False)
+        return path
+
+    def test_build(self, universe_df):
+        """Test the snapshot keeps the latest date without repeated Security/CUSIP pairs."""
+        snapshot = build_universe_latest(universe_df)
+
+        assert snapshot.date == pd.Timestamp('2025-06-02')
+        assert list(snapshot.frame['CUSIP']) == ['064159AA1', '780082AA1', '780082AB9']
+        assert snapshot.duplicates_dropped == 1
+        assert snapshot.cusip_by_security == {'BNS 4.5 12/15/30': '064159AA1', 'RY 5.25 03/01/29': '780082AA1'}
+        assert list(snapshot.cusips_for(['RY 5.25 03/01/29', 'OLD 1 01/01/30'])) == ['780082AA1', None]
+
+    def test_publish_and_cached_load(self, universe_df, universe_path):
+        """Test a published snapshot is loaded without reading the history, and cached."""
+        publish_universe_latest(universe_df, universe_path)
+
+        with patch('src.utils.universe_latest.pd.read_parquet') as read_history:
+            first = load_universe_latest(universe_path)
+            second = load_universe_latest(universe_path)
+
+        read_history.assert_not_called()
+        assert first is second
+        assert first.date == pd.Timestamp('2025-06-02')
+        assert first.duplicates_dropped == 1
+        assert latest_path(universe_path).name == 'universe_latest.parquet'
+
+    def test_missing_or_stale_snapshot_rebuilt(self, universe_df, universe_path):
+        """Test a missing snapshot, or one older than the history, is rebuilt from the history."""
+        assert load_universe_latest(universe_path).date == pd.Timestamp('2025-06-02')
+        assert latest_path(universe_path).exists()
+
+        newer = pd.concat([universe_df, pd.DataFrame({
+            'Date': ['2025-06-03'], 'Security': ['TD 3.2 06/01/27'], 'CUSIP': ['89114QAA1']
+        })])
+        newer.to_parquet(universe_path, index=False)
+        stale = latest_path(universe_path).stat().st_mtime_ns - 10**9
+        os.utime(latest_path(universe_path), ns=(stale, stale))
+
+        snapshot = load_universe_latest(universe_path)
+
+        assert snapshot.date == pd.Timestamp('2025-06-03')
+        assert list(snapshot.frame['Security']) == ['TD 3.2 06/01/27']
+        assert load_universe_latest(universe_path.parent / 'missing' / 'universe.parquet') is None
+
+    def test_g_spread_loader_uses_snapshot(self, universe_path):
+        """Test the G-spread universe reference is the latest-date snapshot."""
+        processor = GSpreadProcessor({'g_spread_processor': {'universe_reference': str(universe_path)}}, Mock())
+
+        universe_df = processor._load_universe_reference()
+
+        assert list(universe_df['Security']) == ['BNS 4.5 12/15/30', 'RY 5.25 03/01/29']
+        assert processor._universe_date(universe_df) == '2025-06-02'
+
+    def test_static_universe_duplicates_rejected(self, tmp_path):
+        """Test an undated universe with a repeated Security still fails the G-spread load."""
+        path = tmp_path / 'universe.parquet'
+        pd.DataFrame({'Security': ['A 1 01/01/30', 'A 1 01/01/30'], 'CUSIP': ['1', '2']}).to_parquet(path)
+        processor = GSpreadProcessor({'g_spread_processor': {'universe_reference': str(path)}}, Mock())
+
+        with pytest.raises(ValueError):
+            processor._load_universe_reference()
+
+    def test_validation_with_snapshot(self, universe_df):
+        """Test latest-universe validation gives the same results from the snapshot as from the history."""
+        table_data = {
+            'universe': universe_df.assign(Date=pd.to_datetime(universe_df['Date'])),
+            'portfolio': pd.DataFrame({
+                'Date': pd.to_datetime(['2025-06-02', '2025-06-02']),
+                'CUSIP': ['064159AA1', '00000AAA0'],
+                'SECURITY': ['BNS 4.5 12/15/30', 'OLD 1 01/01/30']
+            })
+        }
+
+        from_history = CUSIPValidator().validate_cusips_latest_universe(table_data)
+        from_snapshot = CUSIPValidator().validate_cusips_latest_universe(
+            {'portfolio': table_data['portfolio']}, universe_latest=build_universe_latest(universe_df)
+        )
+
+        assert from_snapshot['summary'] == from_history['summary']
+        assert from_snapshot['summary']['unique_orphaned_cusips'] == {'00000AAA0'}
@@ -0,0 +1,121 @@
+"""
+Tests for the Point-in-Time Universe Membership Index
+
+This module tests as-of membership lookups for whole columns, incremental
+refresh from universe_historical and CUSIPValidator's use of the index.
+"""
+
+import pytest
+import sqlite3
+import numpy as np
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add src to path for imports
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from src.utils.universe_membership import UniverseMembershipIndex
+from src.utils.data_analyzer import CUSIPValidator
+
+
+class TestUniverseMembershipIndex:
+    """Test UniverseMembershipIndex class functionality."""
+
+    @pytest.fixture
+    def universe_df(self):
+        """Two universe dates: A and B, then B and C."""
+        return pd.DataFrame({
+            'Date': pd.to_datetime(['2025-01-02', '2025-01-02', '2025-06-02', '2025-06-02']),
+            'CUSIP': ['A', 'B', 'B', 'C']
+        })
+
+    @pytest.fixture
+    def connection(self):
+        """Create in-memory database with universe history."""
+        conn = sqlite3.connect(':memory:')
+        conn.execute('CREATE TABLE universe_historical ("Date" DATE, "CUSIP" TEXT, cusip_standardized TEXT)')
+        conn.executemany('INSERT INTO universe_historical VALUES (?, ?, ?)', [
+            ('2025-01-02 00:00:00', 'A', 'A'), ('2025-06-02 00:00:00', 'B', 'B')
+        ])
+        yield conn
+        conn.close()
+
+    def test_latest_membership(self, universe_df):
+        """Test the default lookup is against the latest universe date."""
+        index = UniverseMembershipIndex.from_frame(universe_df)
+
+        assert list(index.contains(['A', 'B', 'C', 'Z', None])) == [False, True, True, False, False]
+        assert sorted(index.members()) == ['B', 'C']
+        assert list(index.contains_any(['A', 'C', 'Z'])) == [True, True, False]
+
+    def test_point_in_time_membership(self, universe_df):
+        """Test each row resolves to the latest universe date on or before its own date."""
+        index = UniverseMembershipIndex.from_frame(universe_df)
+
+        result = index.contains(
+            ['A', 'A', 'C', 'C', 'B', 'B'],
+            as_of=['2025-01-02', '2025-06-02', '2025-03-31', '2025-07-01', '2024-12-31', None]
+        )
+
+        assert list(result) == [True, False, False, True, False, False]
+        assert list(index.contains(['A', 'C'], as_of='2025-02-01')) == [True, False]
+
+    def test_undated_universe(self):
+        """Test a universe without a Date column is one membership set."""
+        index = UniverseMembershipIndex.from_frame(pd.DataFrame({'CUSIP': ['A', 'B']}))
+
+        assert list(index.contains(['A', 'Z'])) == [True, False]
+        assert list(index.contains(['A'], as_of='2030-01-01')) == [True]
+
+    def test_incremental_refresh(self, connection):
+        """Test refresh loads only new dates, and reloads dates it is given."""
+        index = UniverseMembershipIndex.from_database(connection)
+        assert index.get_statistics()['universe_dates'] == 2
+
+        connection.execute("INSERT INTO universe_historical VALUES ('2025-06-03 00:00:00', 'C', 'C')")
+        assert index.refresh(connection) == 1
+        assert str(index.latest_date) == '2025-06-03'
+
+        connection.execute("DELETE FROM universe_historical WHERE date LIKE '2025-06-02%'")
+        connection.execute("INSERT INTO universe_historical VALUES ('2025-01-02 00:00:00', 'Z', 'Z')")
+        index.refresh(connection, dates=['2025-01-02', '2025-06-02'])
+
+        assert [str(day) for day in index.dates] == ['2025-01-02', '2025-06-03']
+        assert sorted(index.members('2025-01-02')) == ['A', 'Z']
+        assert list(index.contains(['B'], as_of='2025-06-02')) == [False]
+
+    def test_empty_index(self):
+        """Test an empty index reports no members."""
+        index = UniverseMembershipIndex()
+
+        assert list(index.contains(['A'])) == [False]
+        assert list(index.contains_any(['A'])) == [False]
+        assert index.latest_date is None
+
+
+class TestCUSIPValidatorMembership:
+    """Test CUSIPValidator orphan detection through the membership index."""
+
+    def test_orphans_against_all_and_latest_universe(self):
+        """Test orphans over all universe dates and over the latest date only."""
+        table_data = {
+            'universe': pd.DataFrame({
+                'Date': pd.to_datetime(['2025-01-02', '2025-06-02', '2025-06-02']),
+                'CUSIP': ['A', 'B', 'C']
+            }),
+            'portfolio': pd.DataFrame({
+                'Date': pd.to_datetime(['2025-06-02'] * 3),
+                'CUSIP': ['A', 'B', 'Z'],
+                'SECURITY': ['Bond A', 'Bond B', 'Bond Z']
+            })
+        }
+        validator = CUSIPValidator()
+
+        all_dates = validator.validate_cusips(table_data)
+        latest = validator.validate_cusips_latest_universe(table_data)
+
+        assert [item['cusip'] for item in all_dates['orphaned_cusips']['portfolio']['orphaned_cusips']] == ['Z']
+        assert sorted(item['cusip'] for item in latest['orphaned_cusips']['portfolio']['orphaned_cusips']) == ['A', 'Z']
+        assert latest['universe_cusips'] == {'B', 'C'}
+        assert validator.membership_index(table_data['universe']) is validator.membership_index(table_data['universe'])